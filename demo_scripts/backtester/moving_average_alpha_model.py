@@ -12,12 +12,17 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 from datetime import datetime
+from typing import Sequence
+
+import numpy as np
+from pandas import DatetimeIndex
 
 from qf_lib.backtesting.alpha_model.alpha_model import AlphaModel
 from qf_lib.backtesting.alpha_model.exposure_enum import Exposure
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.data_providers.data_provider import DataProvider
 
 
@@ -26,6 +31,9 @@ class MovingAverageAlphaModel(AlphaModel):
     This is an example of a simple AlphaModel. It applies two Exponential Moving Averages of different time periods
     on the recent market close prices of an asset to determine the suggested move. It suggests to go LONG on this asset
     if the shorter close prices moving average exceeds the longer one. Otherwise it suggests to go SHORT.
+
+    The model implements also the batch calculation of exposures (calculate_exposures), which returns the same values
+    as the calculate_exposure function called for every date, but computes the moving averages for all dates at once.
     """
     def __init__(self, fast_time_period: int, slow_time_period: int,
                  risk_estimation_factor: float, data_provider: DataProvider):
@@ -53,5 +61,57 @@ class MovingAverageAlphaModel(AlphaModel):
         else:
             return Exposure.SHORT
 
+    def calculate_exposures(self, tickers: Sequence[Ticker], dates: DatetimeIndex, frequency: Frequency) \
+            -> QFDataFrame:
+        exposures = QFDataFrame(index=dates, columns=tickers, data=Exposure.OUT.value)
+
+        for ticker in tickers:
+            close_tms = self._get_close_prices(ticker, dates, frequency)
+            if len(close_tms) < self.slow_time_period:
+                continue
+
+            # Both moving averages are computed over the window of the last slow_time_period bars, the same way as it
+            # is done in calculate_exposure, for every window at once
+            windows_starts = np.arange(len(close_tms) - self.slow_time_period + 1)
+            fast_ma = self._windowed_ewm(close_tms.values, windows_starts, self.fast_time_period)
+            slow_ma = self._windowed_ewm(close_tms.values, windows_starts, self.slow_time_period)
+            windows_exposures = np.where(fast_ma > slow_ma, Exposure.LONG.value, Exposure.SHORT.value)
+
+            # At each date only the bars with earlier timestamps are available
+            last_bar_positions = np.searchsorted(close_tms.index.values, dates.values, side="left") - 1
+            window_positions = last_bar_positions - self.slow_time_period + 1
+            has_enough_bars = window_positions >= 0
+            exposures.loc[has_enough_bars, ticker] = windows_exposures[window_positions[has_enough_bars]]
+
+        return exposures
+
+    def _get_close_prices(self, ticker: Ticker, dates: DatetimeIndex, frequency: Frequency):
+        """ Returns the close prices, necessary to compute the exposures for all the dates. """
+        try:
+            warm_up_close_tms = self.data_provider.historical_price(ticker, PriceField.Close, self.slow_time_period + 1,
+                                                                    dates[0], frequency)
+            start_date = warm_up_close_tms.index[0]
+        except ValueError:
+            start_date = dates[0]
+
+        close_tms = self.data_provider.get_price(ticker, PriceField.Close, start_date, dates[-1], frequency)
+        return close_tms.dropna()
+
+    def _windowed_ewm(self, values: np.ndarray, windows_starts: np.ndarray, time_period: int) -> np.ndarray:
+        """
+        Returns the last value of the exponential moving average (ewm with adjust=False) computed separately over every
+        window of slow_time_period values starting at the given positions. The recursion is applied to all windows
+        at once and follows the arithmetic of pandas, so that the results are identical.
+        """
+        alpha = 2.0 / (time_period + 1.0)
+        old_weight = 1.0 - alpha
+
+        ewm = values[windows_starts]
+        for i in range(1, self.slow_time_period):
+            current_values = values[windows_starts + i]
+            ewm = np.where(ewm != current_values,
+                           (old_weight * ewm + alpha * current_values) / (old_weight + alpha), ewm)
+        return ewm
+
     def __hash__(self):
         return hash((self.__class__.__name__, self.fast_time_period, self.slow_time_period, self.risk_estimation_factor))
@@ -0,0 +1,85 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from demo_scripts.backtester.moving_average_alpha_model import MovingAverageAlphaModel
+from demo_scripts.common.utils.dummy_ticker import DummyTicker
+from qf_lib.backtesting.data_handler.daily_data_handler import DailyDataHandler
+from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
+from qf_lib.backtesting.fast_alpha_model_tester.fast_alpha_models_tester import FastAlphaModelTester, \
+    FastAlphaModelTesterConfig
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.columnar_preset_data_provider import ColumnarPresetDataProvider
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataframes_equal
+
+data_start_date = datetime(2014, 1, 1)
+start_date = datetime(2015, 1, 1)
+end_date = datetime(2019, 12, 31)
+number_of_tickers = 20
+
+
+def _create_data_handler(timer: SettableTimer) -> DailyDataHandler:
+    dates = pd.bdate_range(data_start_date, end_date)
+    tickers = [DummyTicker("T{:02d}".format(i)) for i in range(number_of_tickers)]
+
+    rng = np.random.default_rng(2021)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (len(dates), len(tickers))), axis=0))
+    close[rng.uniform(size=close.shape) < 0.02] = np.nan  # missing prices
+    values = np.stack([close, close * 1.01, close * 0.99, close, np.full_like(close, 1e6)], axis=2)
+
+    data_array = QFDataArray.create(dates, tickers, PriceField.ohlcv(), values)
+    data_provider = ColumnarPresetDataProvider(data_array, data_start_date, end_date, Frequency.DAILY)
+    return DailyDataHandler(data_provider, timer)
+
+
+def main():
+    MarketOpenEvent.set_trigger_time({"hour": 13, "minute": 30, "second": 0, "microsecond": 0})
+    MarketCloseEvent.set_trigger_time({"hour": 20, "minute": 0, "second": 0, "microsecond": 0})
+
+    timer = SettableTimer(start_date)
+    data_handler = _create_data_handler(timer)
+    tickers = data_handler.data_provider.price_cube.tickers.tolist()
+
+    config = FastAlphaModelTesterConfig(MovingAverageAlphaModel, {
+        "fast_time_period": 5, "slow_time_period": 20, "risk_estimation_factor": 1.25
+    }, ("fast_time_period", "slow_time_period"))
+    tester = FastAlphaModelTester([config], tickers, start_date, end_date, data_handler, timer)
+
+    model = config.generate_model(data_handler)
+    backtest_dates = tester._get_backtest_dates()
+
+    time = perf_counter()
+    expected_exposures = tester._calculate_exposures_for_every_date(model, tickers, backtest_dates)
+    every_date_time = perf_counter() - time
+
+    time = perf_counter()
+    batch_exposures = tester._calculate_exposures_in_batch(model, tickers, backtest_dates)
+    batch_time = perf_counter() - time
+
+    assert_dataframes_equal(expected_exposures.astype(float), batch_exposures)
+    print("Exposures calculated for every date: {:.2f} s".format(every_date_time))
+    print("Exposures calculated in batch: {:.2f} s".format(batch_time))
+    print("The exposures are identical")
+
+
+if __name__ == '__main__':
+    main()
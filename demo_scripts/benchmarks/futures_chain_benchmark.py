@@ -0,0 +1,123 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+Simulates daily usage of futures in a backtest: for 30 futures families (quarterly contracts) over 20 years, every day
+the current specific ticker is computed and the back adjusted chain of prices of the last year is requested from
+the FuturesChain. Reports the time of both operations. The specific ticker lookup is compared with the previous
+implementation, which located the current contract in the shifted expiration dates index on every call.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.expiration_date_field import ExpirationDateField
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.enums.security_type import SecurityType
+from qf_lib.common.tickers.tickers import BloombergTicker, Ticker
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.containers.futures.future_tickers.bloomberg_future_ticker import BloombergFutureTicker
+from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
+from qf_lib.containers.futures.futures_adjustment_method import FuturesAdjustmentMethod
+from qf_lib.containers.futures.futures_chain import FuturesChain
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+
+number_of_families = 30
+start_date = pd.Timestamp("2000-01-03")
+end_date = pd.Timestamp("2019-12-31")
+contract_lifetime = pd.Timedelta(days=400)
+lookback = RelativeDelta(years=1)
+
+
+def previous_specific_ticker(future_ticker: FutureTicker, time) -> Ticker:
+    """ Previous implementation of the specific ticker lookup (without the 24h cache). """
+    exp_dates = future_ticker.get_expiration_dates().sort_index()
+    date_index = exp_dates.index - pd.Timedelta(days=future_ticker.get_days_before_exp_date() - 1)
+    date_index = pd.DatetimeIndex([dt + RelativeDelta(hour=0, minute=0, second=0, microsecond=0)
+                                   for dt in date_index])
+    date_index_loc = date_index.get_loc(time, method="pad")
+    return exp_dates.iloc[date_index_loc:].iloc[future_ticker.get_N()]
+
+
+def create_family(family_number: int, rng: np.random.Generator):
+    """ Creates the future ticker and the data provider with prices of its quarterly contracts. """
+    family_code = "F{}{}".format(chr(65 + family_number // 26), chr(65 + family_number % 26))
+    future_ticker = BloombergFutureTicker(family_code, family_code + "{} Comdty", 1, 5, 10, designated_contracts="HMUZ")
+
+    dates = pd.bdate_range(start_date, end_date)
+    spot_prices = 100 * np.exp(np.cumsum(rng.normal(0.0, 0.01, len(dates))))
+
+    tickers, exp_dates = [], []
+    for year in range(start_date.year, end_date.year + 2):
+        for month, month_code in zip((3, 6, 9, 12), "HMUZ"):
+            tickers.append(BloombergTicker("{}{}{:02d} Comdty".format(family_code, month_code, year % 100),
+                                           SecurityType.FUTURE, 10))
+            exp_dates.append(pd.Timestamp(year, month, 15))
+
+    data = np.full((len(dates), len(tickers), len(PriceField.ohlcv())), np.nan)
+    for i, exp_date in enumerate(exp_dates):
+        traded = (dates <= exp_date) & (dates > exp_date - contract_lifetime)
+        days_to_expiration = (exp_date - dates[traded]).days.values
+        close_prices = spot_prices[traded] * (1 + 0.0001 * days_to_expiration)
+        data[traded, i, :4] = close_prices[:, np.newaxis] * np.array([0.999, 1.01, 0.99, 1.0])
+        data[traded, i, 4] = 1000.0
+
+    data_array = QFDataArray.create(dates, tickers, PriceField.ohlcv(), data=data)
+    exp_dates_df = QFDataFrame(index=tickers, columns=[ExpirationDateField.LastTradeableDate], data=exp_dates)
+    data_provider = PresetDataProvider(data_array, start_date, end_date, Frequency.DAILY,
+                                       exp_dates={future_ticker: exp_dates_df})
+    return future_ticker, data_provider, dates
+
+
+def main():
+    rng = np.random.default_rng(2021)
+    specific_ticker_time = previous_specific_ticker_time = chain_time = 0.0
+    number_of_calls = 0
+
+    for family_number in range(number_of_families):
+        future_ticker, data_provider, dates = create_family(family_number, rng)
+        timer = SettableTimer(dates[0])
+        future_ticker.initialize_data_provider(timer, data_provider)
+        futures_chain = FuturesChain(future_ticker, data_provider, FuturesAdjustmentMethod.BACK_ADJUSTED)
+
+        for date in dates[260:]:
+            timer.set_current_time(date)
+            number_of_calls += 1
+
+            start_time = perf_counter()
+            specific_ticker = future_ticker.get_current_specific_ticker()
+            specific_ticker_time += perf_counter() - start_time
+
+            start_time = perf_counter()
+            previous_ticker = previous_specific_ticker(future_ticker, date)
+            previous_specific_ticker_time += perf_counter() - start_time
+            assert previous_ticker == specific_ticker
+
+            start_time = perf_counter()
+            futures_chain.get_price(PriceField.ohlcv(), date - lookback, date)
+            chain_time += perf_counter() - start_time
+
+    print("{} futures families, {} daily calls".format(number_of_families, number_of_calls))
+    print("Specific ticker lookup: {:.3f} s (previous implementation: {:.3f} s)".format(
+        specific_ticker_time, previous_specific_ticker_time))
+    print("Back adjusted chain of the last year: {:.3f} s ({:.1f} us per call)".format(
+        chain_time, chain_time / number_of_calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+Runs a 10-year backtest-like loop over 1-minute bars served by the MemoryMappedPresetDataProvider and reports the peak
+resident set size of the process. The bundle is generated on disk first (float32 OHLC and int64 volume), chunk by
+chunk, so it is never loaded into memory as a whole. Every configuration is run in a separate process, as the peak
+resident set size cannot be reset within a process.
+"""
+import multiprocessing
+import resource
+import tempfile
+from datetime import datetime
+from time import perf_counter
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from demo_scripts.common.utils.dummy_ticker import DummyTicker
+from qf_lib.backtesting.data_handler.intraday_data_handler import IntradayDataHandler
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.memory_mapped_preset_data_provider import MemoryMappedPresetDataProvider
+from qf_lib.data_providers.memory_mapped_price_cube import MemoryMappedPriceCube
+
+start_date = datetime(2010, 1, 1)
+end_date = datetime(2019, 12, 31)
+number_of_tickers = 100
+tickers = [DummyTicker("T{:03d}".format(i)) for i in range(number_of_tickers)]
+fields = PriceField.ohlcv()
+dtypes = {PriceField.Open: np.float32, PriceField.High: np.float32, PriceField.Low: np.float32,
+          PriceField.Close: np.float32, PriceField.Volume: np.int64}
+
+# the backtest loop queries the data handler every `step` minutes of every trading day
+step = RelativeDelta(minutes=30)
+max_paged_in_dates_configurations = [None, 390 * 20]
+
+
+def _monthly_chunks() -> Iterator[QFDataArray]:
+    rng = np.random.default_rng(2021)
+    for month_start in pd.date_range(start_date, end_date, freq="MS"):
+        days = pd.bdate_range(month_start, month_start + pd.offsets.MonthEnd(0))
+        dates = pd.DatetimeIndex([d for day in days for d in pd.date_range(
+            day + pd.Timedelta(hours=13, minutes=30), day + pd.Timedelta(hours=19, minutes=59), freq="1min")])
+
+        close = 100 + np.cumsum(rng.normal(0, 0.05, (len(dates), number_of_tickers)), axis=0)
+        values = np.stack([close, close + 0.05, close - 0.05, close, rng.integers(100, 1000, close.shape)], axis=2)
+        yield QFDataArray.create(dates, tickers, fields, values)
+
+
+def _run_backtest(directory: str, max_paged_in_dates) -> dict:
+    data_provider = MemoryMappedPresetDataProvider(directory, frequency=Frequency.MIN_1,
+                                                   max_paged_in_dates=max_paged_in_dates)
+    timer = SettableTimer()
+    data_handler = IntradayDataHandler(data_provider, timer)
+
+    start_time = perf_counter()
+    number_of_steps = 0
+    for day in pd.bdate_range(start_date, end_date):
+        current_time = day + RelativeDelta(hour=14, minute=0)
+        while current_time <= day + RelativeDelta(hour=20, minute=0):
+            timer.set_current_time(current_time)
+            data_handler.get_last_available_price(tickers)
+            data_handler.historical_price(tickers, PriceField.Close, 30)
+            current_time += step
+            number_of_steps += 1
+
+    return {
+        "steps": number_of_steps,
+        "time [s]": perf_counter() - start_time,
+        "peak RSS [MB]": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        cube = MemoryMappedPriceCube.create(directory, _monthly_chunks(), tickers, fields, dtypes)
+        dense_size = len(cube.dates) * len(tickers) * len(fields) * 8 / 2 ** 20
+        print("Bars: {}, size of a dense float64 QFDataArray: {:.0f} MB".format(len(cube.dates), dense_size))
+        del cube
+
+        results = {}
+        with multiprocessing.get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+            for max_paged_in_dates in max_paged_in_dates_configurations:
+                results[str(max_paged_in_dates)] = pool.apply(_run_backtest, (directory, max_paged_in_dates))
+
+    results = pd.DataFrame.from_dict(results, orient="index")
+    results.index.name = "max paged in dates"
+    print(results.round(1))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+Records the positions history of a portfolio holding a few hundred positions, every day for 20 years, and reports
+the memory used by the recorded history and the time needed to build the positions history dataframes. The results
+are compared with the previous implementation of the Portfolio, which recorded a dictionary of BacktestPositionSummary
+objects every day.
+"""
+import gc
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from typing import Type, Sequence
+
+import numpy as np
+import pandas as pd
+
+from demo_scripts.common.utils.dummy_ticker import DummyTicker
+from qf_lib.backtesting.portfolio.backtest_position import BacktestPositionSummary
+from qf_lib.backtesting.portfolio.portfolio import Portfolio
+from qf_lib.backtesting.portfolio.transaction import Transaction
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.containers.series.qf_series import QFSeries
+
+start_date = datetime(2000, 1, 3)
+end_date = datetime(2019, 12, 31)
+number_of_tickers = 300
+tickers = [DummyTicker("T{:03d}".format(i)) for i in range(number_of_tickers)]
+
+
+class PreviousPortfolio(Portfolio):
+    """ Portfolio recording a dictionary of BacktestPositionSummary objects every day. """
+
+    def __init__(self, data_handler, initial_cash: float, timer: SettableTimer):
+        super().__init__(data_handler, initial_cash, timer)
+        self._summaries_history = []
+
+    def _record_state(self, quantities: Sequence[float], market_values: Sequence[float],
+                      total_exposures: Sequence[float], total_pnls: Sequence[float], directions: Sequence[int]):
+        self._dates.append(self.timer.now())
+        self._portfolio_values.append(self.net_liquidation)
+        self._leverage_list.append(self.gross_exposure_of_positions / self.net_liquidation)
+        self._summaries_history.append({
+            ticker: BacktestPositionSummary(position) for ticker, position in self.open_positions_dict.items()
+        })
+
+    def positions_history(self) -> QFDataFrame:
+        return QFDataFrame(data=self._summaries_history, index=self._dates)
+
+    def positions_history_frame(self, field: str) -> QFDataFrame:
+        return self.positions_history().applymap(
+            lambda x: getattr(x, field) if isinstance(x, BacktestPositionSummary) else np.nan)
+
+
+class DataHandlerStub:
+    def __init__(self):
+        self.prices = QFSeries(index=tickers, data=100.0)
+
+    def get_last_available_price(self, tickers: Sequence[Ticker]) -> QFSeries:
+        return self.prices.loc[tickers]
+
+
+def _record_history(portfolio_type: Type[Portfolio]):
+    rng = np.random.default_rng(2021)
+    timer = SettableTimer(start_date)
+    data_handler = DataHandlerStub()
+    portfolio = portfolio_type(data_handler, 10000000, timer)
+    for ticker in tickers:
+        portfolio.transact_transaction(Transaction(start_date, ticker, 100, 100.0, 1.0))
+
+    gc.collect()
+    tracemalloc.start()
+    memory_before = tracemalloc.get_traced_memory()[0]
+    start_time = perf_counter()
+
+    for date in pd.bdate_range(start_date, end_date):
+        timer.set_current_time(date)
+        data_handler.prices *= np.exp(rng.normal(0, 0.01, number_of_tickers))
+        portfolio.update(record=True)
+
+    recording_time = perf_counter() - start_time
+    gc.collect()
+    history_memory = tracemalloc.get_traced_memory()[0] - memory_before
+    tracemalloc.stop()
+
+    start_time = perf_counter()
+    exposures = portfolio.positions_history_frame("total_exposure")
+    exposures_frame_time = perf_counter() - start_time
+
+    return exposures, history_memory, recording_time, exposures_frame_time
+
+
+def main():
+    all_exposures = []
+    for name, portfolio_type in (("Previous portfolio", PreviousPortfolio), ("Portfolio", Portfolio)):
+        exposures, history_memory, recording_time, exposures_frame_time = _record_history(portfolio_type)
+        all_exposures.append(exposures)
+        print("{}: {} records, history memory {:.1f} MB, recording {:.2f} s, exposures frame {:.2f} s".format(
+            name, exposures.notna().values.sum(), history_memory / 2 ** 20, recording_time, exposures_frame_time))
+
+    assert np.allclose(all_exposures[0].values, all_exposures[1].values), "The recorded exposures differ"
+
+
+if __name__ == '__main__':
+    main()
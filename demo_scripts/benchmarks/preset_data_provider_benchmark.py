@@ -0,0 +1,81 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from timeit import timeit
+
+import numpy as np
+import pandas as pd
+
+from demo_scripts.common.utils.dummy_ticker import DummyTicker
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.columnar_preset_data_provider import ColumnarPresetDataProvider
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+
+start_date = datetime(2018, 1, 1)
+end_date = datetime(2019, 12, 31)
+query_date = datetime(2019, 6, 14)
+
+numbers_of_tickers = [50, 500, 5000]
+number_of_calls = 20
+
+
+def _create_data_array(number_of_tickers: int) -> QFDataArray:
+    dates = pd.bdate_range(start_date, end_date)
+    tickers = [DummyTicker("T{:05d}".format(i)) for i in range(number_of_tickers)]
+    fields = PriceField.ohlcv()
+
+    rng = np.random.default_rng(2021)
+    data = rng.uniform(10, 100, (len(dates), len(tickers), len(fields)))
+    return QFDataArray.create(dates, tickers, fields, data)
+
+
+def _time_per_call(function) -> float:
+    """ Returns the average latency of a single call in milliseconds. """
+    return timeit(function, number=number_of_calls) / number_of_calls * 1000
+
+
+def _benchmark(data_provider, tickers):
+    return {
+        "get_price": _time_per_call(lambda: data_provider.get_price(
+            tickers, PriceField.ohlcv(), datetime(2019, 5, 1), query_date, Frequency.DAILY)),
+        "historical_price": _time_per_call(lambda: data_provider.historical_price(
+            tickers, PriceField.Close, 20, query_date, Frequency.DAILY)),
+        "get_last_available_price": _time_per_call(lambda: data_provider.get_last_available_price(
+            tickers, Frequency.DAILY, query_date)),
+    }
+
+
+def main():
+    results = {}
+    for number_of_tickers in numbers_of_tickers:
+        data_array = _create_data_array(number_of_tickers)
+        tickers = data_array.tickers.values.tolist()
+
+        preset_data_provider = PresetDataProvider(data_array, start_date, end_date, Frequency.DAILY)
+        columnar_data_provider = ColumnarPresetDataProvider(data_array, start_date, end_date, Frequency.DAILY)
+
+        results[(number_of_tickers, "PresetDataProvider")] = _benchmark(preset_data_provider, tickers)
+        results[(number_of_tickers, "ColumnarPresetDataProvider")] = _benchmark(columnar_data_provider, tickers)
+
+    results = pd.DataFrame.from_dict(results, orient="index")
+    results.index.names = ["tickers", "data provider"]
+
+    print("Average latency of a single call [ms]")
+    print(results.round(3))
+
+
+if __name__ == '__main__':
+    main()
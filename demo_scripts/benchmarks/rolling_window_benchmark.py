@@ -0,0 +1,85 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+Computes rolling statistics (total cumulative return, volatility, Sharpe ratio and max drawdown) of 20 years of daily
+returns and reports the time needed by the rolling_window. The results are compared with the previous implementation
+of the rolling_window, which created each window with loc and added the results to the series one by one.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.ratios.sharpe_ratio import sharpe_ratio
+from qf_lib.common.utils.returns.max_drawdown import max_drawdown
+from qf_lib.common.utils.volatility.get_volatility import get_volatility
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.rolling_kernels import total_cumulative_return_kernel, volatility_kernel, \
+    sharpe_ratio_kernel, max_drawdown_kernel
+from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
+
+window_size = 252
+step = 1
+
+
+def previous_rolling_window(series: QFSeries, func) -> QFSeries:
+    """ Previous implementation of the rolling_window. """
+    result = QFSeries()
+
+    window_start = 0
+    while window_start + window_size <= len(series):
+        window_end = window_start + window_size - 1
+        start = series.index[window_start]
+        end = series.index[window_end]
+        result[end] = func(series.loc[start:end])
+        window_start += step
+
+    return result
+
+
+def main():
+    dates = pd.bdate_range("2000-01-03", "2019-12-31")
+    returns_tms = SimpleReturnsSeries(data=np.random.default_rng(2021).normal(0.0003, 0.01, len(dates)), index=dates)
+    print("{} daily returns, window of {} samples, step {}".format(len(returns_tms), window_size, step))
+
+    functions = [
+        ("Total return", lambda window: window.total_cumulative_return(), total_cumulative_return_kernel()),
+        ("Volatility", lambda window: get_volatility(window, Frequency.DAILY), volatility_kernel(Frequency.DAILY)),
+        ("Sharpe ratio", lambda window: sharpe_ratio(window, Frequency.DAILY), sharpe_ratio_kernel(Frequency.DAILY)),
+        ("Max drawdown", lambda window: max_drawdown(window), max_drawdown_kernel()),
+    ]
+
+    for name, function, kernel in functions:
+        start_time = perf_counter()
+        expected_series = previous_rolling_window(returns_tms, function)
+        previous_time = perf_counter() - start_time
+
+        start_time = perf_counter()
+        series = returns_tms.rolling_window(window_size, function, step=step)
+        function_time = perf_counter() - start_time
+
+        start_time = perf_counter()
+        kernel_series = returns_tms.rolling_window(window_size, kernel, step=step)
+        kernel_time = perf_counter() - start_time
+
+        assert np.allclose(expected_series.values, series.values), "{}: results differ".format(name)
+        assert np.allclose(expected_series.values, kernel_series.values), "{}: kernel results differ".format(name)
+
+        print("{:>12}: previous {:.2f} s, rolling window {:.2f} s, kernel {:.4f} s (speedup x{:.0f})".format(
+            name, previous_time, function_time, kernel_time, previous_time / kernel_time))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+Measures the number of TimeEvents dispatched per second by the Scheduler, for a set of 1-minute PeriodicEvents and the
+market open / close events. The results are compared with the previous implementation of the Scheduler, which
+computed the next trigger time of every subscribed event on every call.
+"""
+import operator
+from datetime import datetime
+from time import perf_counter
+from typing import List, Tuple, Type
+
+from qf_lib.backtesting.events.time_event.periodic_event.calculate_and_place_orders_event import \
+    CalculateAndPlaceOrdersPeriodicEvent
+from qf_lib.backtesting.events.time_event.periodic_event.intraday_bar_event import IntradayBarEvent
+from qf_lib.backtesting.events.time_event.periodic_event.periodic_event import PeriodicEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
+from qf_lib.backtesting.events.time_event.scheduler import Scheduler
+from qf_lib.backtesting.events.time_event.single_time_event.schedule_order_execution_event import \
+    ScheduleOrderExecutionEvent
+from qf_lib.backtesting.events.time_event.time_event import TimeEvent
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+
+start_date = datetime(2021, 1, 4)
+end_date = datetime(2021, 3, 1)
+number_of_periodic_events = 10
+
+
+class PreviousScheduler(Scheduler):
+    """ Scheduler computing the next trigger time of every subscribed event on every call. """
+
+    def get_next_time_events(self) -> Tuple[List[TimeEvent], datetime]:
+        now = self.timer.now()
+
+        times_and_events = [
+            (time_event.next_trigger_time(now), time_event) for time_event in self._time_event_type_to_object.values()
+            if time_event.next_trigger_time(now) is not None
+        ]
+        next_trigger_time, _ = min(times_and_events, key=operator.itemgetter(0))
+        next_time_events = [event for time, event in times_and_events if time == next_trigger_time]
+        next_time_events.sort(key=lambda ev: self._time_events_priority.get(type(ev), float('inf')))
+        return next_time_events, next_trigger_time
+
+
+def _create_periodic_event_type(number: int):
+    event_type = type("PeriodicEvent{}".format(number), (PeriodicEvent, ), {"notify": lambda self, listener: None})
+    event_type.set_frequency(Frequency.MIN_1)
+    event_type.set_start_and_end_time({"hour": 13, "minute": 30}, {"hour": 20, "minute": 0})
+    return event_type
+
+
+def _dispatch_events(scheduler_type: Type[Scheduler]) -> Tuple[List[Tuple[datetime, List[str]]], float]:
+    timer = SettableTimer(start_date)
+    scheduler = scheduler_type(timer)
+
+    event_types = [MarketOpenEvent, MarketCloseEvent, IntradayBarEvent, CalculateAndPlaceOrdersPeriodicEvent,
+                   ScheduleOrderExecutionEvent]
+    event_types += [_create_periodic_event_type(i) for i in range(number_of_periodic_events)]
+    for event_type in event_types:
+        scheduler.subscribe(event_type, None)
+
+    dispatched_events = []
+    start_time = perf_counter()
+    while timer.now() < end_date:
+        time_events, next_trigger_time = scheduler.get_next_time_events()
+        timer.set_current_time(next_trigger_time)
+        dispatched_events.append((next_trigger_time, [type(event).__name__ for event in time_events]))
+
+    return dispatched_events, perf_counter() - start_time
+
+
+def main():
+    MarketOpenEvent.set_trigger_time({"hour": 13, "minute": 30, "second": 0, "microsecond": 0})
+    MarketCloseEvent.set_trigger_time({"hour": 20, "minute": 0, "second": 0, "microsecond": 0})
+    CalculateAndPlaceOrdersPeriodicEvent.set_frequency(Frequency.MIN_1)
+    CalculateAndPlaceOrdersPeriodicEvent.set_start_and_end_time({"hour": 13, "minute": 30}, {"hour": 20, "minute": 0})
+
+    expected_events, previous_time = _dispatch_events(PreviousScheduler)
+    actual_events, time = _dispatch_events(Scheduler)
+    assert expected_events == actual_events, "The schedulers dispatched different events"
+
+    number_of_events = sum(len(events) for _, events in actual_events)
+    print("{} time events dispatched between {} and {}".format(number_of_events, start_date.date(), end_date.date()))
+    print("Previous scheduler: {:.0f} events / s".format(number_of_events / previous_time))
+    print("Heap-based scheduler: {:.0f} events / s".format(number_of_events / time))
+
+
+if __name__ == '__main__':
+    main()
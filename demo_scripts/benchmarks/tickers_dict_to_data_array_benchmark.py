@@ -0,0 +1,80 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+"""
+Converts a dictionary of 2,000 tickers (5 fields, 5,000 dates, tickers listed on different dates) into a QFDataArray
+and reports the time needed by the tickers_dict_to_data_array. The result is compared with the previous
+implementation, which converted each data frame into a DataArray and concatenated them.
+"""
+from time import perf_counter
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.containers.dimension_names import DATES, FIELDS, TICKERS
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.helpers import tickers_dict_to_data_array
+
+number_of_tickers = 2000
+number_of_dates = 5000
+
+
+def previous_tickers_dict_to_data_array(tickers_data_dict, requested_tickers, requested_fields) -> QFDataArray:
+    """ Previous implementation of the tickers_dict_to_data_array. """
+    tickers = []
+    data_arrays = []
+    for ticker, df in tickers_data_dict.items():
+        df.index.name = DATES
+        data_array = df.to_xarray().to_array(dim=FIELDS, name=ticker).transpose(DATES, FIELDS)
+        tickers.append(ticker)
+        data_arrays.append(data_array)
+
+    result = QFDataArray.concat(data_arrays, dim=pd.Index(tickers, name=TICKERS))
+    result = result.reindex(tickers=requested_tickers, fields=requested_fields)
+    result.name = None
+    return result
+
+
+def main():
+    rng = np.random.default_rng(2021)
+    dates = pd.bdate_range("2000-01-03", periods=number_of_dates)
+    fields = PriceField.ohlcv()
+
+    tickers_data_dict = {}
+    for i in range(number_of_tickers):
+        listing_date = rng.integers(0, number_of_dates // 2)
+        ticker_dates = dates[listing_date:]
+        values = rng.normal(100.0, 1.0, (len(ticker_dates), len(fields)))
+        tickers_data_dict[BloombergTicker("Example {} Equity".format(i))] = QFDataFrame(
+            data=values, index=ticker_dates, columns=fields)
+    tickers = list(tickers_data_dict.keys())
+    print("{} tickers, {} fields, {} dates".format(number_of_tickers, len(fields), number_of_dates))
+
+    start_time = perf_counter()
+    expected_data_array = previous_tickers_dict_to_data_array(tickers_data_dict, tickers, fields)
+    previous_time = perf_counter() - start_time
+
+    start_time = perf_counter()
+    data_array = tickers_dict_to_data_array(tickers_data_dict, tickers, fields)
+    direct_time = perf_counter() - start_time
+
+    assert np.array_equal(expected_data_array.values, data_array.values, equal_nan=True), "results differ"
+    print("previous {:.2f} s, direct assembly {:.2f} s (speedup x{:.0f})".format(
+        previous_time, direct_time, previous_time / direct_time))
+
+
+if __name__ == '__main__':
+    main()
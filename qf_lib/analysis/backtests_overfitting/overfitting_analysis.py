@@ -12,12 +12,15 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 import itertools
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Tuple, Callable, Optional
 import pandas as pd
 import numpy as np
 
+from qf_lib.analysis.backtests_overfitting.ranking_functions import SlicesRankingFunction
 from qf_lib.common.enums.frequency import Frequency
-from qf_lib.common.utils.returns.cagr import cagr
+from qf_lib.common.utils.dateutils.to_days import to_days
+from qf_lib.common.utils.miscellaneous.constants import DAYS_PER_YEAR_AVG
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.dataframe.simple_returns_dataframe import SimpleReturnsDataFrame
 from qf_lib.containers.series.qf_series import QFSeries
@@ -28,16 +31,38 @@ class OverfittingAnalysis:
     Class providing statistics and analysis for checking if backtest is overfitted.
     It is based on the algorithms described in "The probability of backtest overfitting" by Bailey,
     Borwein, Lopez de Prado and Jim Zhu.
+
+    If the ranking function is a SlicesRankingFunction, the sums of returns required by the function are computed once
+    for every slice and the qualities of all strategies in all In-Sample and Out-Of-Sample sets are computed from them
+    with array operations (in chunks of combinations of slices, optionally distributed across a pool of processes).
+    Any other callable is called for every strategy and every set.
+
+    Parameters
+    ----------
+    multiple_returns_timeseries: SimpleReturnsDataFrame
+        simple returns of all strategies (one column per strategy)
+    ranking_function: Callable
+        function computing the quality of the strategy from its series of simple returns (or a SlicesRankingFunction)
+    num_of_slices: int
+        number of slices, into which the returns are split; it should be an even number
+    number_of_processes: int
+        number of processes across which the chunks of combinations of slices are distributed (used only for
+        SlicesRankingFunction). 1 (default) means that everything is computed in the current process, None means that
+        the number of processes is equal to the number of CPUs
+    combinations_chunk_size: int
+        number of combinations of slices evaluated at once (used only for SlicesRankingFunction)
     """
 
     def __init__(self, multiple_returns_timeseries: SimpleReturnsDataFrame, ranking_function: Callable,
-                 num_of_slices: int = 14):
+                 num_of_slices: int = 14, number_of_processes: Optional[int] = 1, combinations_chunk_size: int = 500):
 
         self.num_of_slices = num_of_slices
         assert self.num_of_slices % 2 == 0, "Number of slices should be an even number"
 
         self.ranking_function = ranking_function
         self.multiple_returns_timeseries = multiple_returns_timeseries
+        self.number_of_processes = number_of_processes
+        self.combinations_chunk_size = combinations_chunk_size
 
         self._is_set = None
         self._oos_set = None
@@ -45,15 +70,16 @@ class OverfittingAnalysis:
         (dates column + one column of returns for each strategy). First column contains In-Sample sets
         and the second one contains Out-Of-Sample sets. """
 
-        self.is_ranking = None  # type: Optional[List[QFDataFrame]]
-        """ List of QFDataFrames, each of which contains 2 columns - quality and rank, and is indexed by the strategies
-        names. Looking at one of these data frames we can learn which strategy (described using its name) had the
-        highest performance ("rank") and what was that performance ("quality") in the In-Sample period. """
+        self.is_qualities = None  # type: Optional[QFDataFrame]
+        """ QFDataFrame indexed by the numbers of combinations of slices, with one column for each strategy. It contains
+        the quality of every strategy in the In-Sample set of every combination. """
 
-        self.oos_ranking = None  # type: Optional[List[QFDataFrame]]
-        """ List of QFDataFrames, each of which contains 2 columns - quality and rank, and is indexed by the strategies
-        names. Looking at one of these data frames we can learn which strategy (described using its name) had the
-        highest performance ("rank") and what was that performance ("quality") in the Out-Of-Sample period. """
+        self.oos_qualities = None  # type: Optional[QFDataFrame]
+        """ QFDataFrame indexed by the numbers of combinations of slices, with one column for each strategy. It contains
+        the quality of every strategy in the Out-Of-Sample set of every combination. """
+
+        self._is_ranking = None  # type: Optional[List[QFDataFrame]]
+        self._oos_ranking = None  # type: Optional[List[QFDataFrame]]
 
         self.best_is_strategies_names = None  # Optional[List[str]]
         """ List of strategies with the maximum rank. If multiple values equal the maximum, the first strategy with
@@ -61,10 +87,27 @@ class OverfittingAnalysis:
 
         self._rankings_computed = False
 
+    @property
+    def is_ranking(self) -> Optional[List[QFDataFrame]]:
+        """ List of QFDataFrames, each of which contains 2 columns - quality and rank, and is indexed by the strategies
+        names. Looking at one of these data frames we can learn which strategy (described using its name) had the
+        highest performance ("rank") and what was that performance ("quality") in the In-Sample period. """
+        if self._is_ranking is None and self.is_qualities is not None:
+            self._is_ranking = self._rankings_from_qualities(self.is_qualities)
+        return self._is_ranking
+
+    @property
+    def oos_ranking(self) -> Optional[List[QFDataFrame]]:
+        """ List of QFDataFrames, each of which contains 2 columns - quality and rank, and is indexed by the strategies
+        names. Looking at one of these data frames we can learn which strategy (described using its name) had the
+        highest performance ("rank") and what was that performance ("quality") in the Out-Of-Sample period. """
+        if self._oos_ranking is None and self.oos_qualities is not None:
+            self._oos_ranking = self._rankings_from_qualities(self.oos_qualities)
+        return self._oos_ranking
+
     def calculate_overfitting_probability(self):
         """ Returns the probability of backtest overfitting. """
-        if not all([self.best_is_strategies_names, self.oos_ranking, self.is_ranking]):
-            self.create_is_oos_rankings()
+        self.create_is_oos_rankings()
 
         logits = self.calculate_relative_rank_logits(self.best_is_strategies_names)
         logits_distribution = self._calculate_distribution(logits)
@@ -96,10 +139,8 @@ class OverfittingAnalysis:
             combination set, the best one in the in-sample period).
         """
         self.create_is_oos_rankings()
-        oos_qualities = [oos_ranking["quality"].loc[best_is_strategy] for oos_ranking, best_is_strategy
-                         in zip(self.oos_ranking, self.best_is_strategies_names)]
-        is_qualities = [is_ranking["quality"].loc[best_is_strategy] for is_ranking, best_is_strategy
-                        in zip(self.is_ranking, self.best_is_strategies_names)]
+        oos_qualities = self._qualities_of_strategies(self.oos_qualities, self.best_is_strategies_names)
+        is_qualities = self._qualities_of_strategies(self.is_qualities, self.best_is_strategies_names)
         return QFDataFrame(data={"OOS": oos_qualities, "IS": is_qualities})
 
     def calculate_relative_rank_logits(self, strategies_names: List):
@@ -110,20 +151,88 @@ class OverfittingAnalysis:
         """
         self.create_is_oos_rankings()
         num_of_strategies = len(self.multiple_returns_timeseries.columns)
-        relative_ranks = QFSeries(data=[oos_ranking["rank"].loc[best_is_strategy] / (num_of_strategies + 1)
-                                        for oos_ranking, best_is_strategy in zip(self.oos_ranking, strategies_names)])
+
+        # the rank (computed with the "min" method) is equal to 1 + the number of strategies with lower quality
+        strategies_qualities = self._qualities_of_strategies(self.oos_qualities, strategies_names)
+        ranks = np.sum(self.oos_qualities.values < strategies_qualities[:, np.newaxis], axis=1) + 1.0
+
+        relative_ranks = QFSeries(data=ranks / (num_of_strategies + 1))
         logits = np.log(relative_ranks.divide(1.0 - relative_ranks))
         return logits
 
     def create_is_oos_rankings(self):
         if not self._rankings_computed:
-            self._is_set, self._oos_set = self.form_different_is_and_oos_sets(self.multiple_returns_timeseries)
-            self.is_ranking = [self.rank_strategies(is_element) for is_element in self._is_set]
-            self.oos_ranking = [self.rank_strategies(oos_element) for oos_element in self._oos_set]
-
-            self.best_is_strategies_names = [is_element["rank"].idxmax() for is_element in self.is_ranking]
+            if isinstance(self.ranking_function, SlicesRankingFunction):
+                is_qualities, oos_qualities = self._compute_qualities_from_slices_statistics()
+            else:
+                self._is_set, self._oos_set = self.form_different_is_and_oos_sets(self.multiple_returns_timeseries)
+                self._is_ranking = [self.rank_strategies(is_element) for is_element in self._is_set]
+                self._oos_ranking = [self.rank_strategies(oos_element) for oos_element in self._oos_set]
+
+                is_qualities = np.array([is_element["quality"].values for is_element in self._is_ranking])
+                oos_qualities = np.array([oos_element["quality"].values for oos_element in self._oos_ranking])
+
+            columns = self.multiple_returns_timeseries.columns
+            self.is_qualities = QFDataFrame(data=is_qualities, columns=columns)
+            self.oos_qualities = QFDataFrame(data=oos_qualities, columns=columns)
+
+            # if multiple strategies have the maximum quality, the first one is taken
+            self.best_is_strategies_names = list(columns[np.argmax(is_qualities, axis=1)])
             self._rankings_computed = True
 
+    def _compute_qualities_from_slices_statistics(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the qualities of all strategies in all In-Sample and Out-Of-Sample sets from the statistics
+        of slices. Returns the two (number_of_combinations x number_of_strategies) arrays.
+        """
+        aligned_df, size_of_slices = self._align_to_slices(self.multiple_returns_timeseries)
+        returns = aligned_df.values
+        slices_statistics = np.stack([
+            self.ranking_function.slice_statistics(returns[i:i + size_of_slices])
+            for i in range(0, len(returns), size_of_slices)
+        ], axis=1)
+
+        # The IS and OOS sets are indexed by the dates of the first half of the data frame
+        dates = aligned_df.index[:len(aligned_df) // 2]
+
+        is_slices_masks = self._is_slices_masks()
+        chunks = [is_slices_masks[i:i + self.combinations_chunk_size]
+                  for i in range(0, len(is_slices_masks), self.combinations_chunk_size)]
+        tasks = [(self.ranking_function, slices_statistics, chunk, dates) for chunk in chunks]
+
+        if self.number_of_processes == 1:
+            results = [_qualities_of_combinations(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.number_of_processes) as executor:
+                results = list(executor.map(_qualities_of_combinations, *zip(*tasks)))
+
+        is_qualities = np.concatenate([is_chunk for is_chunk, _ in results])
+        oos_qualities = np.concatenate([oos_chunk for _, oos_chunk in results])
+        return is_qualities, oos_qualities
+
+    def _align_to_slices(self, multiple_returns_timeseries: QFDataFrame) -> Tuple[QFDataFrame, int]:
+        """ Returns the part of the data frame, which can be split into slices, and the size of the slices. """
+        # Drop all rows not aligned to num_of_slices. E.g if the df has 233 rows and the num_of_slices is 50,
+        # then last 33 rows of the original matrix will be dropped
+        rows_to_keep = (multiple_returns_timeseries.num_of_rows // self.num_of_slices) * self.num_of_slices
+        aligned_df = multiple_returns_timeseries.iloc[:rows_to_keep]
+        if aligned_df.empty:
+            raise ValueError("Too few rows in the data frame.")
+
+        size_of_slices = aligned_df.num_of_rows // self.num_of_slices
+        return aligned_df, size_of_slices
+
+    def _is_slices_masks(self) -> np.ndarray:
+        """
+        Returns the (number_of_combinations x num_of_slices) array, in which the i-th row contains 1.0 for the slices
+        forming the In-Sample set of the i-th combination and 0.0 for the slices forming its Out-Of-Sample set.
+        The combinations are in the same order as in the form_different_is_and_oos_sets.
+        """
+        combinations = list(itertools.combinations(range(self.num_of_slices), self.num_of_slices // 2))
+        masks = np.zeros((len(combinations), self.num_of_slices))
+        masks[np.repeat(np.arange(len(combinations)), self.num_of_slices // 2), np.concatenate(combinations)] = 1.0
+        return masks
+
     def form_different_is_and_oos_sets(self, multiple_returns_timeseries: QFDataFrame) -> Tuple:
         """
         Splits slices into two groups of equal sizes for all possible combinations.
@@ -135,14 +244,7 @@ class OverfittingAnalysis:
         A and B (C and D) will be concatenated (so that there will be one timeseries AB),
         and so will be one CD timeseries.
         """
-        # Drop all rows not aligned to num_of_slices. E.g if the df has 233 rows and the num_of_slices is 50,
-        # then last 33 rows of the original matrix will be dropped
-        rows_to_keep = (multiple_returns_timeseries.num_of_rows // self.num_of_slices) * self.num_of_slices
-        aligned_df = multiple_returns_timeseries.iloc[:rows_to_keep]
-        if aligned_df.empty:
-            raise ValueError("Too few rows in the data frame.")
-
-        size_of_slices = aligned_df.num_of_rows // self.num_of_slices
+        aligned_df, size_of_slices = self._align_to_slices(multiple_returns_timeseries)
         df_slices = [SimpleReturnsDataFrame(aligned_df.iloc[i:i + size_of_slices, :])
                      for i in range(0, len(aligned_df), size_of_slices)]
 
@@ -184,13 +286,33 @@ class OverfittingAnalysis:
         return rank_df
 
     def _get_best_strategies_returns(self) -> List[float]:
-        """ Returns the annual returns of the best IS strategies """
-        annual_returns = []
-        for oos_set, best_strategy_name in zip(self._oos_set, self.best_is_strategies_names):
-            best_strategy_tms = oos_set.loc[:, best_strategy_name]
-            annual_simple_return = cagr(best_strategy_tms, Frequency.DAILY)
-            annual_returns.append(annual_simple_return)
-        return annual_returns
+        """ Returns the annual returns (CAGR) of the best IS strategies in the OOS sets """
+        aligned_df, size_of_slices = self._align_to_slices(self.multiple_returns_timeseries)
+        log_returns = np.log1p(aligned_df.values)
+        slices_log_returns = np.add.reduceat(np.nan_to_num(log_returns), np.arange(0, len(log_returns), size_of_slices))
+
+        # total log returns of the best IS strategies in the OOS sets
+        best_strategies = aligned_df.columns.get_indexer(self.best_is_strategies_names)
+        oos_slices_masks = 1.0 - self._is_slices_masks()
+        total_log_returns = np.sum(oos_slices_masks * slices_log_returns[:, best_strategies].T, axis=1)
+
+        # The OOS sets are indexed by the dates of the first half of the data frame
+        dates = aligned_df.index[:len(aligned_df) // 2]
+        period_length = dates[-1] - (dates[0] - pd.Timedelta(Frequency.DAILY.nr_of_calendar_days(), unit='D'))
+        period_length_in_years = to_days(period_length) / DAYS_PER_YEAR_AVG
+
+        return np.expm1(total_log_returns / period_length_in_years).tolist()
+
+    @staticmethod
+    def _qualities_of_strategies(qualities: QFDataFrame, strategies_names: List) -> np.ndarray:
+        """ Returns the quality of the given strategy (one strategy per combination) in each of combinations. """
+        strategies = qualities.columns.get_indexer(strategies_names)
+        return qualities.values[np.arange(len(strategies)), strategies]
+
+    def _rankings_from_qualities(self, qualities: QFDataFrame) -> List[QFDataFrame]:
+        ranks = qualities.rank(axis=1, method="min", ascending=True)
+        return [QFDataFrame(data={"quality": qualities.values[i], "rank": ranks.values[i]}, index=qualities.columns)
+                for i in range(qualities.num_of_rows)]
 
     def _calculate_distribution(self, qf_series: QFSeries):
         """
@@ -207,3 +329,21 @@ class OverfittingAnalysis:
         occurrences = qf_series.value_counts(sort=False).sort_index()
         normalized_occurrences = occurrences / occurrences.sum()
         return normalized_occurrences
+
+
+def _qualities_of_combinations(ranking_function: SlicesRankingFunction, slices_statistics: np.ndarray,
+                               is_slices_masks: np.ndarray, dates: pd.DatetimeIndex) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Computes the qualities of the strategies in the In-Sample and Out-Of-Sample sets of the given chunk
+    of combinations of slices (possibly in a worker process).
+    """
+    # (number_of_statistics x number_of_combinations x number_of_strategies) sums over the slices of each set
+    is_statistics = np.matmul(is_slices_masks, slices_statistics)
+    oos_statistics = np.matmul(1.0 - is_slices_masks, slices_statistics)
+
+    is_qualities = ranking_function.quality(is_statistics, dates)
+    oos_qualities = ranking_function.quality(oos_statistics, dates)
+
+    if not (np.isfinite(is_qualities).all() and np.isfinite(oos_qualities).all()):
+        raise ValueError("There exist nan or infinite values in the rank_df")
+    return is_qualities, oos_qualities
@@ -0,0 +1,159 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from abc import ABCMeta, abstractmethod
+
+import numpy as np
+from pandas import DatetimeIndex, Timedelta
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.dateutils.to_days import to_days
+from qf_lib.common.utils.miscellaneous.constants import DAYS_PER_YEAR_AVG
+from qf_lib.common.utils.ratios.omega_ratio import omega_ratio
+from qf_lib.common.utils.ratios.sharpe_ratio import sharpe_ratio
+from qf_lib.common.utils.ratios.sorino_ratio import sorino_ratio
+from qf_lib.containers.series.qf_series import QFSeries
+
+
+class SlicesRankingFunction(metaclass=ABCMeta):
+    """
+    Ranking function used by the OverfittingAnalysis, which depends on the returns only through their sums
+    (e.g. sums of log returns, sums of squared log returns and numbers of returns). The sums are computed once for
+    every slice of the returns and the quality of the strategies in all In-Sample and Out-Of-Sample sets is computed
+    from them at once, instead of calling the function for every set and strategy.
+
+    The function may be also called as a regular ranking function with a single series of simple returns as argument.
+    """
+
+    @abstractmethod
+    def __call__(self, returns_tms: QFSeries) -> float:
+        """ Computes the quality of a single series of simple returns. """
+        pass
+
+    @abstractmethod
+    def slice_statistics(self, returns: np.ndarray) -> np.ndarray:
+        """
+        Computes the sums for the (number_of_rows x number_of_strategies) array of simple returns of a slice.
+        Returns the (number_of_statistics x number_of_strategies) array.
+        """
+        pass
+
+    @abstractmethod
+    def quality(self, statistics: np.ndarray, dates: DatetimeIndex) -> np.ndarray:
+        """
+        Computes the quality of the strategies from the (number_of_statistics x ...) array of sums over the sets
+        of slices. The dates are the dates of the sets (common for all the sets). Returns the array of shape
+        of statistics[0].
+        """
+        pass
+
+    @staticmethod
+    def _period_length_in_years(dates: DatetimeIndex, frequency: Frequency) -> float:
+        """ Length of the period covered by returns with the given dates, computed in the same way as in cagr. """
+        first_date = dates[0] - Timedelta(frequency.nr_of_calendar_days(), unit='D')
+        return to_days(dates[-1] - first_date) / DAYS_PER_YEAR_AVG
+
+    @staticmethod
+    def _volatility(count: np.ndarray, sums: np.ndarray, sums_of_squares: np.ndarray, frequency: Frequency):
+        with np.errstate(all="ignore"):
+            variance = np.maximum((sums_of_squares - sums ** 2 / count) / (count - 1), 0.0)
+        return np.sqrt(variance) * np.sqrt(frequency.occurrences_in_year)
+
+
+class SharpeRatioRankingFunction(SlicesRankingFunction):
+    """ Ranks the strategies by the Sharpe Ratio (as computed by the sharpe_ratio function). """
+
+    def __init__(self, frequency: Frequency = Frequency.DAILY, risk_free: float = 0):
+        self.frequency = frequency
+        self.risk_free = risk_free
+
+    def __call__(self, returns_tms: QFSeries) -> float:
+        return sharpe_ratio(returns_tms, self.frequency, self.risk_free)
+
+    def slice_statistics(self, returns: np.ndarray) -> np.ndarray:
+        log_returns = np.log1p(returns)
+        return np.stack([
+            np.sum(~np.isnan(log_returns), axis=0),
+            np.nansum(log_returns, axis=0),
+            np.nansum(log_returns ** 2, axis=0)
+        ])
+
+    def quality(self, statistics: np.ndarray, dates: DatetimeIndex) -> np.ndarray:
+        count, sums, sums_of_squares = statistics
+        annual_log_return = sums / self._period_length_in_years(dates, self.frequency)
+        annual_volatility = self._volatility(count, sums, sums_of_squares, self.frequency)
+        with np.errstate(all="ignore"):
+            return (annual_log_return - self.risk_free) / annual_volatility
+
+
+class SorinoRatioRankingFunction(SlicesRankingFunction):
+    """ Ranks the strategies by the Sorino Ratio (as computed by the sorino_ratio function). """
+
+    def __init__(self, frequency: Frequency = Frequency.DAILY, risk_free: float = 0):
+        self.frequency = frequency
+        self.risk_free = risk_free
+
+    def __call__(self, returns_tms: QFSeries) -> float:
+        return sorino_ratio(returns_tms, self.frequency, self.risk_free)
+
+    def slice_statistics(self, returns: np.ndarray) -> np.ndarray:
+        log_returns = np.log1p(returns)
+        negative_log_returns = np.where(returns < 0, log_returns, np.nan)
+        return np.stack([
+            np.nansum(log_returns, axis=0),
+            np.sum(~np.isnan(negative_log_returns), axis=0),
+            np.nansum(negative_log_returns, axis=0),
+            np.nansum(negative_log_returns ** 2, axis=0)
+        ])
+
+    def quality(self, statistics: np.ndarray, dates: DatetimeIndex) -> np.ndarray:
+        sums, negative_count, negative_sums, negative_sums_of_squares = statistics
+        annualised_growth_rate = np.expm1(sums / self._period_length_in_years(dates, self.frequency))
+        downside_volatility = self._volatility(negative_count, negative_sums, negative_sums_of_squares, self.frequency)
+        with np.errstate(all="ignore"):
+            return (annualised_growth_rate - self.risk_free) / downside_volatility
+
+
+class OmegaRatioRankingFunction(SlicesRankingFunction):
+    """ Ranks the strategies by the Omega Ratio (as computed by the omega_ratio function). """
+
+    def __init__(self, threshold: float = 0):
+        self.threshold = threshold
+
+    def __call__(self, returns_tms: QFSeries) -> float:
+        return omega_ratio(returns_tms, self.threshold)
+
+    def slice_statistics(self, returns: np.ndarray) -> np.ndarray:
+        excess_returns = returns - self.threshold
+        return np.stack([
+            np.sum(np.where(excess_returns >= 0, excess_returns, 0.0), axis=0),
+            np.sum(np.where(excess_returns < 0, -excess_returns, 0.0), axis=0)
+        ])
+
+    def quality(self, statistics: np.ndarray, dates: DatetimeIndex) -> np.ndarray:
+        upside, downside = statistics
+        with np.errstate(all="ignore"):
+            return upside / downside
+
+
+class TotalReturnRankingFunction(SlicesRankingFunction):
+    """ Ranks the strategies by the total cumulative return. """
+
+    def __call__(self, returns_tms: QFSeries) -> float:
+        return returns_tms.to_prices().total_cumulative_return()
+
+    def slice_statistics(self, returns: np.ndarray) -> np.ndarray:
+        return np.nansum(np.log1p(returns), axis=0)[np.newaxis]
+
+    def quality(self, statistics: np.ndarray, dates: DatetimeIndex) -> np.ndarray:
+        return np.expm1(statistics[0])
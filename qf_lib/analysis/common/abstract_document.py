@@ -22,9 +22,9 @@ from qf_lib.analysis.timeseries_analysis.timeseries_analysis import TimeseriesAn
 from qf_lib.common.enums.plotting_mode import PlottingMode
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.common.utils.returns.drawdown_tms import drawdown_tms
-from qf_lib.common.utils.volatility.get_volatility import get_volatility
 from qf_lib.containers.series.prices_series import PricesSeries
 from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.rolling_kernels import total_cumulative_return_kernel, volatility_kernel
 from qf_lib.documents_utils.document_exporting.document import Document
 from qf_lib.documents_utils.document_exporting.element.grid import GridElement
 from qf_lib.documents_utils.document_exporting.element.page_header import PageHeaderElement
@@ -179,13 +179,7 @@ class AbstractDocument(metaclass=ABCMeta):
 
         legend = LegendDecorator()
 
-        def tot_return(window):
-            return PricesSeries(window).total_cumulative_return()
-
-        def volatility(window):
-            return get_volatility(PricesSeries(window), freq)
-
-        functions = [tot_return, volatility]
+        functions = [total_cumulative_return_kernel(), volatility_kernel(freq)]
         names = ['Rolling Return', 'Rolling Volatility']
         for func, name in zip(functions, names):
             rolling = tms.rolling_window(rolling_window_len, func, step=step)
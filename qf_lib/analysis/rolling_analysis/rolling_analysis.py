@@ -14,6 +14,7 @@
 
 from qf_lib.containers.dataframe.prices_dataframe import PricesDataFrame
 from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.rolling_kernels import total_cumulative_return_kernel
 
 
 class RollingAnalysisFactory:
@@ -43,8 +44,8 @@ class RollingAnalysisFactory:
 
             step = int(window * 0.2)
 
-            strategy_rolling = df[strategy_name].rolling_window(window, lambda x: x.total_cumulative_return(), step)
-            benchmark_rolling = df[benchmark_name].rolling_window(window, lambda x: x.total_cumulative_return(), step)
+            strategy_rolling = df[strategy_name].rolling_window(window, total_cumulative_return_kernel(), step)
+            benchmark_rolling = df[benchmark_name].rolling_window(window, total_cumulative_return_kernel(), step)
 
             outperforming = strategy_rolling > benchmark_rolling
             percentage_outperforming = len(strategy_rolling[outperforming]) / len(strategy_rolling)
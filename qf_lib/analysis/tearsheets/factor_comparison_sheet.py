@@ -19,6 +19,7 @@ from qf_lib.analysis.common.abstract_document import AbstractDocument
 from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
 from qf_lib.common.utils.error_handling import ErrorHandling
 from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.rolling_kernels import total_cumulative_return_kernel
 from qf_lib.documents_utils.document_exporting.element.chart import ChartElement
 from qf_lib.documents_utils.document_exporting.element.new_page import NewPageElement
 from qf_lib.documents_utils.document_exporting.element.paragraph import ParagraphElement
@@ -152,11 +153,7 @@ class FactorComparisonSheet(AbstractDocument):
                                                        chart_title: str = "Relative Performance",
                                                        legend_subtitle: str = "Strategy - Benchmark"):
         diff = strategy_tms.to_simple_returns().subtract(benchmark_tms.to_simple_returns(), fill_value=0)
-
-        def total_cumulative_return(series) -> float:
-            return series.total_cumulative_return()
-
-        diff = diff.rolling_window(window_size=128, func=total_cumulative_return, step=5)
+        diff = diff.rolling_window(window_size=128, func=total_cumulative_return_kernel(), step=5)
 
         chart = LineChart(start_x=diff.index[0], end_x=diff.index[-1], log_scale=False)
         position_decorator = AxesPositionDecorator(*self.full_image_axis_position)
@@ -14,6 +14,7 @@
 from datetime import datetime
 
 import matplotlib as plt
+import numpy as np
 import pandas as pd
 from pandas import Timedelta
 from pandas.tseries.frequencies import to_offset
@@ -22,7 +23,6 @@ from qf_lib.analysis.common.abstract_document import AbstractDocument
 from qf_lib.common.utils.error_handling import ErrorHandling
 from qf_lib.analysis.trade_analysis.trades_generator import TradesGenerator
 from qf_lib.backtesting.monitoring.backtest_result import BacktestResult
-from qf_lib.backtesting.portfolio.backtest_position import BacktestPositionSummary
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.series.qf_series import QFSeries
@@ -96,7 +96,7 @@ class PortfolioAnalysisSheet(AbstractDocument):
         chart.add_decorator(AxesPositionDecorator(*self.full_image_axis_position))
         legend = LegendDecorator(key="legend_decorator")
 
-        positions_history = self.backtest_result.portfolio.positions_history()
+        positions_history = self.backtest_result.portfolio.positions_history_frame("quantity")
 
         # Find all not NaN values (not NaN values indicate that the position was open for this contract at that time)
         # and count their number for each row (for each of the dates)
@@ -134,12 +134,11 @@ class PortfolioAnalysisSheet(AbstractDocument):
         chart.add_decorator(legend)
 
         # Add top asset contribution
-        positions_history = self.backtest_result.portfolio.positions_history()
+        positions_history = self.backtest_result.portfolio.positions_history_frame("total_exposure")
         if positions_history.empty:
             raise ValueError("No positions found in positions history")
 
-        positions_history = positions_history.applymap(
-            lambda x: x.total_exposure if isinstance(x, BacktestPositionSummary) else 0)
+        positions_history = positions_history.fillna(0)
 
         # Group all the tickers by their names and take the maximal total exposure for each of the groups - in case
         # if two contracts for a single asset will be included in the open positions in the portfolio at any point of
@@ -209,9 +208,7 @@ class PortfolioAnalysisSheet(AbstractDocument):
         chart.add_decorator(AxesPositionDecorator(*self.full_image_axis_position))
 
         # Get the assets history
-        assets_history = self.backtest_result.portfolio.positions_history()
-        assets_history = assets_history.applymap(
-            lambda x: x.total_exposure if isinstance(x, BacktestPositionSummary) else 0)
+        assets_history = self.backtest_result.portfolio.positions_history_frame("total_exposure").fillna(0)
 
         def gini(group):
             # Function computing the Gini coefficients for each row
@@ -285,17 +282,14 @@ class PortfolioAnalysisSheet(AbstractDocument):
         closed_positions_pnl = closed_positions_pnl.sort_values(by="Time")
 
         # Get all open positions history
-        open_positions_history = self.backtest_result.portfolio.positions_history()
-        open_positions_history = open_positions_history.reset_index().melt(
-            id_vars='index', value_vars=open_positions_history.columns, var_name='Ticker',
-            value_name='Position summary')
+        directions_history = self.backtest_result.portfolio.positions_history_frame("direction").fillna(0)
+        total_pnls_history = self.backtest_result.portfolio.positions_history_frame("total_pnl").fillna(0)
+        number_of_dates, number_of_tickers = directions_history.shape
         open_positions_pnl = QFDataFrame(data={
-            "Tickers name": open_positions_history["Ticker"].apply(lambda t: t.name),
-            "Time": open_positions_history["index"],
-            "Direction": open_positions_history["Position summary"].apply(
-                lambda p: p.direction if isinstance(p, BacktestPositionSummary) else 0),
-            "Total PnL of open position": open_positions_history["Position summary"].apply(
-                lambda p: p.total_pnl if isinstance(p, BacktestPositionSummary) else 0)
+            "Tickers name": np.tile([ticker.name for ticker in directions_history.columns], number_of_dates),
+            "Time": np.repeat(directions_history.index.values, number_of_tickers),
+            "Direction": directions_history.values.ravel().astype(int),
+            "Total PnL of open position": total_pnls_history.values.ravel()
         })
 
         all_positions_pnl = pd.concat([closed_positions_pnl, open_positions_pnl], sort=False)
@@ -0,0 +1,338 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import heapq
+from datetime import datetime
+from math import copysign, exp, isnan, log, sqrt
+
+from pandas import Timedelta
+
+from qf_lib.analysis.timeseries_analysis.timeseries_analysis_dto import TimeseriesAnalysisDTO
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.dateutils.to_days import to_days
+from qf_lib.common.utils.miscellaneous.constants import DAYS_PER_YEAR_AVG
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.returns_series import ReturnsSeries
+
+
+class IncrementalTimeseriesAnalysis(TimeseriesAnalysisDTO):
+    """
+    Online counterpart of the TimeseriesAnalysis. Instead of being computed from the whole timeseries of returns,
+    the statistics are updated every time new returns are added, which makes it possible to follow the statistics
+    of a long backtest while it is running. The analysis exposes the same fields as the TimeseriesAnalysisDTO and
+    the values are equal (up to the floating point precision) to the ones computed by the TimeseriesAnalysis for
+    the series of all added returns.
+
+    All statistics are derived from the running state (running moments of returns and log returns, running sums,
+    the current peak and drawdown of the cumulative returns and the current monthly return), which is updated in O(1)
+    per return. The only exception is the 5% CVaR, which is exact and keeps all the returns in two heaps (the tail
+    of the worst returns and all the remaining ones), so its update costs O(log n).
+
+    Returns should be added in chronological order. NaN returns are skipped.
+
+    Parameters
+    ----------
+    frequency: Frequency
+        frequency of the added returns
+    name: str
+        name of the analysed timeseries
+    """
+
+    cvar_percentage = 0.05
+
+    def __init__(self, frequency: Frequency, name: str = None):
+        super().__init__()
+        self.frequency = frequency
+        self.name = name
+
+        self.percentage_of_positive_returns = None
+        self.percentage_of_negative_returns = None
+
+        self._initial_date = None
+        self._returns_moments = _RunningMoments()
+        self._log_returns_moments = _RunningMoments()
+        self._positive_log_returns_moments = _RunningMoments()
+        self._negative_log_returns_moments = _RunningMoments()
+
+        self._sum_of_positive_returns = 0.0
+        self._sum_of_negative_returns = 0.0
+
+        # drawdown state of the prices series, which starts with the initial price equal to 1.0
+        self._price = 1.0
+        self._peak_price = 1.0
+        self._max_drawdown = 0.0
+        self._sum_of_drawdowns = 0.0
+        self._drawdown_start_date = None
+        self._is_in_drawdown = False
+        self._sum_of_drawdowns_durations = 0.0
+        self._number_of_finished_drawdowns = 0
+
+        # monthly returns used by the gain to pain ratio
+        self._current_month = None
+        self._current_month_growth = 1.0
+        self._sum_of_finished_monthly_returns = 0.0
+        self._sum_of_finished_negative_monthly_returns = 0.0
+
+        # the worst returns (max-heap of negated values) and all the remaining returns (min-heap)
+        self._tail_returns = []
+        self._remaining_returns = []
+        self._sum_of_tail_returns = 0.0
+
+    @property
+    def number_of_samples(self) -> int:
+        """ Number of returns added to the analysis. """
+        return self._returns_moments.count
+
+    def add_return(self, date: datetime, simple_return: float):
+        """
+        Adds a single simple return of the given date and updates all the statistics.
+        """
+        self._add_return(date, simple_return)
+        self._calculate_statistics()
+
+    def add_returns(self, returns_tms: QFSeries):
+        """
+        Adds a batch of returns, indexed by dates, and updates all the statistics once, after all returns were added.
+        If the series is not a ReturnsSeries, its values are treated as simple returns.
+        """
+        if isinstance(returns_tms, ReturnsSeries):
+            returns_tms = returns_tms.to_simple_returns()
+
+        for date, simple_return in zip(returns_tms.index, returns_tms.values.tolist()):
+            self._add_return(date, simple_return)
+        self._calculate_statistics()
+
+    def _add_return(self, date: datetime, simple_return: float):
+        if isnan(simple_return):
+            return
+
+        if self.end_date is not None and date < self.end_date:
+            raise ValueError("Returns should be added in chronological order. The return of {} was added after the "
+                             "return of {}".format(date, self.end_date))
+
+        if self._initial_date is None:
+            self.start_date = date
+            self._initial_date = date - Timedelta(days=self.frequency.nr_of_calendar_days())
+            self._drawdown_start_date = self._initial_date
+        self.end_date = date
+
+        log_return = log(1 + simple_return)
+        self._returns_moments.add(simple_return)
+        self._log_returns_moments.add(log_return)
+
+        if simple_return > 0:
+            self._positive_log_returns_moments.add(log_return)
+        elif simple_return < 0:
+            self._negative_log_returns_moments.add(log_return)
+
+        if simple_return < 0:
+            self._sum_of_negative_returns -= simple_return
+        else:
+            self._sum_of_positive_returns += simple_return
+
+        self._update_drawdowns(date, simple_return)
+        self._update_monthly_returns(date, simple_return)
+        self._update_tail_returns(simple_return)
+
+    def _update_drawdowns(self, date: datetime, simple_return: float):
+        self._price *= 1 + simple_return
+        self._peak_price = max(self._peak_price, self._price)
+
+        drawdown = 1 - self._price / self._peak_price
+        self._max_drawdown = max(self._max_drawdown, drawdown)
+        self._sum_of_drawdowns += drawdown
+
+        if drawdown == 0:
+            if self._is_in_drawdown:
+                self._sum_of_drawdowns_durations += to_days(date - self._drawdown_start_date)
+                self._number_of_finished_drawdowns += 1
+                self._is_in_drawdown = False
+            self._drawdown_start_date = date
+        else:
+            self._is_in_drawdown = True
+
+    def _update_monthly_returns(self, date: datetime, simple_return: float):
+        month = (date.year, date.month)
+        if month != self._current_month:
+            if self._current_month is not None:
+                monthly_return = self._current_month_growth - 1
+                self._sum_of_finished_monthly_returns += monthly_return
+                self._sum_of_finished_negative_monthly_returns += min(monthly_return, 0.0)
+
+            self._current_month = month
+            self._current_month_growth = 1.0
+
+        self._current_month_growth *= 1 + simple_return
+
+    def _update_tail_returns(self, simple_return: float):
+        if self._tail_returns and simple_return < -self._tail_returns[0]:
+            heapq.heappush(self._tail_returns, -simple_return)
+            self._sum_of_tail_returns += simple_return
+        else:
+            heapq.heappush(self._remaining_returns, simple_return)
+
+        tail_length = round(self.number_of_samples * self.cvar_percentage)
+        while len(self._tail_returns) > tail_length:
+            value = -heapq.heappop(self._tail_returns)
+            self._sum_of_tail_returns -= value
+            heapq.heappush(self._remaining_returns, value)
+
+        while len(self._tail_returns) < tail_length:
+            value = heapq.heappop(self._remaining_returns)
+            self._sum_of_tail_returns += value
+            heapq.heappush(self._tail_returns, -value)
+
+    # ========= Methods calculating statistics of the timeseries =========
+
+    def _calculate_statistics(self):
+        if self.number_of_samples == 0:
+            return
+
+        self._calculate_return()
+        self._calculate_volatility()
+        self._calculate_risk_stats()
+        self._calculate_ratios()
+        self._calculate_returns_stats()
+
+    def _calculate_return(self):
+        self.total_return = self._price - 1
+
+        period_length_in_years = to_days(self.end_date - self._initial_date) / DAYS_PER_YEAR_AVG
+        self.cagr = pow(self._price, 1 / period_length_in_years) - 1
+
+    def _calculate_volatility(self):
+        self.annualised_vol = self._annualise(self._log_returns_moments.std())
+        self.annualised_upside_vol = self._annualise(self._positive_log_returns_moments.std())
+        self.annualised_downside_vol = self._annualise(self._negative_log_returns_moments.std())
+
+    def _calculate_ratios(self):
+        self.sharpe_ratio = _divide(log(self.cagr + 1), self.annualised_vol)
+        self.omega_ratio = _divide(self._sum_of_positive_returns, self._sum_of_negative_returns)
+        self.calmar_ratio = _divide(self.cagr, self.max_drawdown)
+        self.sorino_ratio = _divide(self.cagr, self.annualised_downside_vol)
+
+        current_monthly_return = self._current_month_growth - 1
+        sum_of_monthly_returns = self._sum_of_finished_monthly_returns + current_monthly_return
+        sum_of_negative_monthly_returns = \
+            self._sum_of_finished_negative_monthly_returns + min(current_monthly_return, 0.0)
+        if sum_of_negative_monthly_returns != 0:
+            self.gain_to_pain_ratio = sum_of_monthly_returns / abs(sum_of_negative_monthly_returns)
+        else:
+            self.gain_to_pain_ratio = float("inf")
+
+    def _calculate_risk_stats(self):
+        if self._tail_returns:
+            self.cvar = self._sum_of_tail_returns / len(self._tail_returns)
+            annualised_log_cvar = self._annualise(log(1 + self.cvar))
+            self.annualised_cvar = exp(annualised_log_cvar) - 1
+        else:
+            self.cvar = float("nan")
+            self.annualised_cvar = float("nan")
+
+        self.max_drawdown = self._max_drawdown
+        # the drawdown of the initial price (equal to 0) is also taken into account
+        self.avg_drawdown = self._sum_of_drawdowns / (self.number_of_samples + 1)
+
+        sum_of_durations = self._sum_of_drawdowns_durations
+        number_of_drawdowns = self._number_of_finished_drawdowns
+        if self._is_in_drawdown:
+            sum_of_durations += to_days(self.end_date - self._drawdown_start_date)
+            number_of_drawdowns += 1
+        self.avg_drawdown_duration = sum_of_durations / number_of_drawdowns if number_of_drawdowns > 0 else 0.0
+
+    def _calculate_returns_stats(self):
+        self.best_return = self._returns_moments.max
+        self.worst_return = self._returns_moments.min
+
+        self.percentage_of_positive_returns = self._positive_log_returns_moments.count / self.number_of_samples
+        self.percentage_of_negative_returns = self._negative_log_returns_moments.count / self.number_of_samples
+
+        self.avg_positive_return = _divide(self._sum_of_positive_returns, self._positive_log_returns_moments.count)
+        self.avg_negative_return = _divide(-self._sum_of_negative_returns, self._negative_log_returns_moments.count)
+
+        self.kelly = _divide(self._returns_moments.mean, self._returns_moments.var())
+        self.skewness = self._returns_moments.skewness()
+        self.kurtosis = self._returns_moments.kurtosis()
+
+    def _annualise(self, value: float) -> float:
+        return value * sqrt(self.frequency.occurrences_in_year)
+
+
+class _RunningMoments:
+    """
+    Running count, mean, minimum, maximum and central moments (up to the 4th one) of a stream of values, updated
+    with the Welford-like one-pass formulas.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.min = float("nan")
+        self.max = float("nan")
+
+        self._m2 = 0.0
+        self._m3 = 0.0
+        self._m4 = 0.0
+
+    def add(self, value: float):
+        previous_count = self.count
+        self.count += 1
+        n = self.count
+
+        delta = value - self.mean
+        delta_n = delta / n
+        delta_n2 = delta_n * delta_n
+        term = delta * delta_n * previous_count
+
+        self.mean += delta_n
+        self._m4 += term * delta_n2 * (n * n - 3 * n + 3) + 6 * delta_n2 * self._m2 - 4 * delta_n * self._m3
+        self._m3 += term * delta_n * (n - 2) - 3 * delta_n * self._m2
+        self._m2 += term
+
+        self.min = value if previous_count == 0 else min(self.min, value)
+        self.max = value if previous_count == 0 else max(self.max, value)
+
+    def var(self) -> float:
+        """ Unbiased variance (ddof=1), as computed by pandas. """
+        return self._m2 / (self.count - 1) if self.count > 1 else float("nan")
+
+    def std(self) -> float:
+        return sqrt(self.var()) if self.count > 1 else float("nan")
+
+    def skewness(self) -> float:
+        """ Bias-corrected skewness, as computed by pandas. """
+        n = self.count
+        if n < 3:
+            return float("nan")
+        if self._m2 == 0:
+            return 0.0
+        return n * sqrt(n - 1) / (n - 2) * self._m3 / self._m2 ** 1.5
+
+    def kurtosis(self) -> float:
+        """ Bias-corrected excess kurtosis, as computed by pandas. """
+        n = self.count
+        if n < 4:
+            return float("nan")
+        if self._m2 == 0:
+            return 0.0
+        adjustment = 3 * (n - 1) ** 2 / ((n - 2) * (n - 3))
+        numerator = n * (n + 1) * (n - 1) * self._m4
+        denominator = (n - 2) * (n - 3) * self._m2 ** 2
+        return numerator / denominator - adjustment
+
+
+def _divide(numerator: float, denominator: float) -> float:
+    """ Division returning +/- inf (or NaN for 0 / 0) instead of raising the ZeroDivisionError. """
+    if denominator == 0:
+        return float("nan") if numerator == 0 else copysign(float("inf"), numerator)
+    return numerator / denominator
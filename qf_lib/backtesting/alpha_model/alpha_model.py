@@ -14,8 +14,10 @@
 
 from abc import abstractmethod, ABCMeta
 from datetime import datetime
+from typing import Sequence, Optional
 
 from numpy import nan
+from pandas import DatetimeIndex
 
 from qf_lib.backtesting.alpha_model.exposure_enum import Exposure
 from qf_lib.backtesting.signals.signal import Signal
@@ -24,6 +26,7 @@ from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.common.utils.miscellaneous.average_true_range import average_true_range
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.data_providers.data_provider import DataProvider
 
 
@@ -100,6 +103,35 @@ class AlphaModel(metaclass=ABCMeta):
         """
         pass
 
+    def calculate_exposures(self, tickers: Sequence[Ticker], dates: DatetimeIndex, frequency: Frequency) \
+            -> Optional[QFDataFrame]:
+        """
+        Batch counterpart of the calculate_exposure function, which may be used to calculate the exposures for all
+        dates and tickers at once (e.g. by the FastAlphaModelTester). The exposure for a certain date d and ticker
+        should be equal to calculate_exposure(ticker, current_exposure, d, frequency), which means that it may be
+        based only on the bars available at d (bars with timestamps earlier than d) and it cannot depend on the
+        current exposure.
+
+        Models, which do not support the batch calculation, return None. In that case the calculate_exposure function
+        is called for every date and ticker.
+
+        Parameters
+        ----------
+        tickers: Sequence[Ticker]
+            Tickers for which suggested exposures are calculated.
+        dates: DatetimeIndex
+            sorted times of the exposures calculation
+        frequency: Frequency
+            frequency of data obtained by the data provider for signal calculation
+
+        Returns
+        -------
+        QFDataFrame, None
+            data frame indexed by dates with tickers as columns, containing values of the suggested exposures
+            (e.g. Exposure.LONG.value), or None if the batch calculation is not supported
+        """
+        return None
+
     def calculate_fraction_at_risk(self, ticker: Ticker, current_time: datetime, frequency: Frequency) -> float:
         """
         Returns the float value which determines the risk factor for an AlphaModel and a specified Ticker,
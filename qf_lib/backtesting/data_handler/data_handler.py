@@ -29,6 +29,7 @@ from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
 from qf_lib.containers.qf_data_array import QFDataArray
 from qf_lib.containers.series.prices_series import PricesSeries
 from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.data_providers.data_bundle_cache import DataBundleCache
 from qf_lib.data_providers.data_provider import DataProvider
 from qf_lib.data_providers.helpers import normalize_data_array
 from qf_lib.data_providers.prefetching_data_provider import PrefetchingDataProvider
@@ -64,7 +65,8 @@ class DataHandler(DataProvider):
         self.is_optimised = False
 
     def use_data_bundle(self, tickers: Union[Ticker, Sequence[Ticker]], fields: Union[PriceField, Sequence[PriceField]],
-                        start_date: datetime, end_date: datetime, frequency: Frequency = Frequency.DAILY):
+                        start_date: datetime, end_date: datetime, frequency: Frequency = Frequency.DAILY,
+                        cache: Optional[DataBundleCache] = None):
         """
         Optimises running of the backtest. All the data will be downloaded before the backtest.
         Note that requesting during the backtest any other ticker or price field than the ones in the params
@@ -82,6 +84,8 @@ class DataHandler(DataProvider):
             last date that should be downloaded
         frequency
             frequency of the data
+        cache: Optional[DataBundleCache]
+            optional on-disk cache, which allows to download only the data missing in the cache
         """
         assert not self.is_optimised, "Multiple calls on use_data_bundle() are forbidden"
 
@@ -92,7 +96,7 @@ class DataHandler(DataProvider):
         self.default_frequency = frequency
 
         self.data_provider = PrefetchingDataProvider(self.data_provider, tickers, fields, start_date, end_date,
-                                                     frequency)
+                                                     frequency, cache)
         self.is_optimised = True
 
     def historical_price(self, tickers: Union[Ticker, Sequence[Ticker]],
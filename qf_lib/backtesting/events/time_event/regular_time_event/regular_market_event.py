@@ -24,7 +24,8 @@ from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
 class RegularMarketEvent(RegularTimeEvent, metaclass=ABCMeta):
     """
     Class implementing the logic for all events happening every day such as MarketOpenEvent, MarketCloseEvent etc.
-    The time has to be set up by calling ``set_trigger_time`` before being able to run the backtest.
+    The time has to be set up by calling ``set_trigger_time`` before being able to run the backtest. It should not be
+    changed once the backtest is running, as the Scheduler keeps the already computed next trigger times of the events.
     """
 
     _trigger_time = None   # type: Dict[str, int]
@@ -11,15 +11,16 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
-import operator
+import heapq
 from datetime import datetime
-from typing import Dict, Type, TypeVar, List, Any, Generator, Tuple
+from typing import Dict, Type, TypeVar, List, Any, Tuple, Optional, Sequence
 
 from qf_lib.backtesting.events.time_event.periodic_event.intraday_bar_event import IntradayBarEvent
 from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
 from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
 from qf_lib.backtesting.events.time_event.single_time_event.schedule_order_execution_event import \
     ScheduleOrderExecutionEvent
+from qf_lib.backtesting.events.time_event.single_time_event.single_time_event import SingleTimeEvent
 from qf_lib.backtesting.events.time_event.time_event import TimeEvent
 from qf_lib.common.utils.dateutils.timer import Timer
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
@@ -35,8 +36,25 @@ class Scheduler:
 
     Normally time events are generated whenever the EventManager's queue is empty. The generation will be triggered
     by TimeFlowController.
+
+    The next trigger times of the TimeEvents are kept in a priority queue and only the trigger times of the events,
+    which already occurred, are computed again. It assumes that the next trigger time of a TimeEvent does not change
+    as long as the current time does not reach it (which is true for all RegularTimeEvents and PeriodicEvents).
+    SingleTimeEvents may be scheduled at any moment, so their next trigger times are always computed.
+
+    The trigger times are computed for the first time when the events are requested (get_next_time_events or
+    get_next_trigger_time), not when the events are subscribed to. Thus, the trigger time of a RegularMarketEvent
+    (set_trigger_time) may be set up before or after subscribing to it, but it should not be changed after the
+    Scheduler started generating events - the already computed trigger time would be used until it is reached.
     """
 
+    _time_events_priority = {
+        ScheduleOrderExecutionEvent: 0,
+        IntradayBarEvent: 1,
+        MarketOpenEvent: 1,
+        MarketCloseEvent: 1
+    }
+
     def __init__(self, timer: Timer):
         self.timer = timer
         self.logger = qf_logger.getChild(self.__class__.__name__)
@@ -44,6 +62,13 @@ class Scheduler:
         self._time_event_type_to_subscribers = {}  # type: Dict[TypeOfEvent, List[Any]]
         self._time_event_type_to_object = {}
 
+        # Heap of (next trigger time, priority, subscription number, time event) tuples
+        self._time_events_queue = []  # type: List[Tuple[datetime, float, int, ConcreteTimeEvent]]
+        # (priority, subscription number, time event) tuples of the events, which trigger times need to be computed
+        self._time_events_to_update = []  # type: List[Tuple[float, int, ConcreteTimeEvent]]
+        self._single_time_events = []  # type: List[Tuple[float, int, ConcreteTimeEvent]]
+        self._last_update_time = None  # type: Optional[datetime]
+
     @classmethod
     def events_type(cls):
         return TimeEvent
@@ -70,7 +95,15 @@ class Scheduler:
 
         # Check if it is necessary to initialize a new object of type_of_time_event type
         if type_of_time_event not in self._time_event_type_to_object.keys():
-            self._time_event_type_to_object[type_of_time_event] = type_of_time_event()
+            time_event = type_of_time_event()
+            self._time_event_type_to_object[type_of_time_event] = time_event
+
+            priority = self._time_events_priority.get(type_of_time_event, float('inf'))
+            time_event_entry = (priority, len(self._time_event_type_to_object), time_event)
+            if isinstance(time_event, SingleTimeEvent):
+                self._single_time_events.append(time_event_entry)
+            else:
+                self._time_events_to_update.append(time_event_entry)
 
     def get_next_time_events(self) -> Tuple[List[ConcreteTimeEvent], datetime]:
         """
@@ -85,26 +118,72 @@ class Scheduler:
         time will be already processed and accepted.
         """
         now = self.timer.now()
+        self._update_time_events_queue(now)
+
+        single_times_and_events = []  # type: List[Tuple[datetime, float, int, ConcreteTimeEvent]]
+        for priority, number, time_event in self._single_time_events:
+            trigger_time = time_event.next_trigger_time(now)
+            if trigger_time is not None:
+                single_times_and_events.append((trigger_time, priority, number, time_event))
+
+        next_trigger_times = [trigger_time for trigger_time, _, _, _ in single_times_and_events]
+        if self._time_events_queue:
+            next_trigger_times.append(self._time_events_queue[0][0])
+        if not next_trigger_times:
+            raise ValueError("There are no TimeEvents scheduled after {}".format(now))
+
+        next_trigger_time = min(next_trigger_times)  # type: datetime
+        next_times_and_events = [entry for entry in single_times_and_events if entry[0] == next_trigger_time]
+
+        # The events, which are going to be triggered, need to have their trigger times computed again in the future
+        while self._time_events_queue and self._time_events_queue[0][0] == next_trigger_time:
+            entry = heapq.heappop(self._time_events_queue)
+            next_times_and_events.append(entry)
+            self._time_events_to_update.append(entry[1:])
+
+        next_times_and_events.sort(key=lambda entry: entry[1:3])
+        next_time_events = [time_event for _, _, _, time_event in next_times_and_events]
+        return next_time_events, next_trigger_time
+
+    def get_next_trigger_time(self, excluded_event_types: Sequence[TypeOfEvent] = ()) -> Optional[datetime]:
+        """
+        Returns the time at which the soonest TimeEvent, of any type other than the excluded_event_types, should be
+        triggered, or None if there is no such event. Contrary to get_next_time_events, the event is not considered
+        to be triggered.
+        """
+        now = self.timer.now()
+        self._update_time_events_queue(now)
 
-        times_and_events = [
-            (time_event.next_trigger_time(now), time_event) for time_event in self._time_event_type_to_object.values()
-            if time_event.next_trigger_time(now) is not None
-        ]  # type: Generator[Tuple[datetime, ConcreteTimeEvent]]
+        trigger_times = [trigger_time for trigger_time, _, _, time_event in self._time_events_queue
+                         if type(time_event) not in excluded_event_types]
+        for _, _, time_event in self._single_time_events:
+            if type(time_event) not in excluded_event_types:
+                trigger_time = time_event.next_trigger_time(now)
+                if trigger_time is not None:
+                    trigger_times.append(trigger_time)
 
-        next_trigger_time, _ = min(times_and_events, key=operator.itemgetter(0))  # type: datetime
+        return min(trigger_times, default=None)
 
-        next_time_events = [event for time, event in times_and_events if time == next_trigger_time]
-        # type: List[ConcreteTimeEvent]
+    def _update_time_events_queue(self, now: datetime):
+        """
+        Computes the trigger times of all the events, which occurred or were subscribed to since the last update, and
+        puts them in the queue.
+        """
+        if self._last_update_time is not None and now < self._last_update_time:
+            # The time went back and none of the trigger times can be reused
+            self._time_events_to_update.extend(entry[1:] for entry in self._time_events_queue)
+            self._time_events_queue = []
+        self._last_update_time = now
 
-        time_events_priority = {
-            ScheduleOrderExecutionEvent: 0,
-            IntradayBarEvent: 1,
-            MarketOpenEvent: 1,
-            MarketCloseEvent: 1
-        }
+        while self._time_events_queue and self._time_events_queue[0][0] <= now:
+            self._time_events_to_update.append(heapq.heappop(self._time_events_queue)[1:])
 
-        next_time_events.sort(key=lambda ev: time_events_priority.get(type(ev), float('inf')))
-        return next_time_events, next_trigger_time
+        for priority, number, time_event in self._time_events_to_update:
+            trigger_time = time_event.next_trigger_time(now)
+            if trigger_time is not None:
+                heapq.heappush(self._time_events_queue, (trigger_time, priority, number, time_event))
+
+        self._time_events_to_update = []
 
     def notify_all(self, time_event: ConcreteTimeEvent):
         """
@@ -14,16 +14,26 @@
 
 import time
 from abc import ABCMeta, abstractmethod
-from datetime import datetime
+from datetime import datetime, timedelta
+from typing import List, Optional
 
+import numpy as np
+from pandas import DatetimeIndex, Timestamp
+
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
 from qf_lib.backtesting.events.empty_queue_event.empty_queue_event import EmptyQueueEvent
 from qf_lib.backtesting.events.empty_queue_event.empty_queue_event_listener import EmptyQueueEventListener
 from qf_lib.backtesting.events.empty_queue_event.empty_queue_event_notifier import EmptyQueueEventNotifier
 from qf_lib.backtesting.events.end_trading_event.end_trading_event import EndTradingEvent
 from qf_lib.backtesting.events.event_manager import EventManager
+from qf_lib.backtesting.events.time_event.periodic_event.intraday_bar_event import IntradayBarEvent
 from qf_lib.backtesting.events.time_event.scheduler import Scheduler
+from qf_lib.backtesting.events.time_event.time_event import TimeEvent
+from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.utils.dateutils.timer import SettableTimer, RealTimer
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
+from qf_lib.data_providers.data_provider import DataProvider
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
 
 
 class TimeFlowController(EmptyQueueEventListener, metaclass=ABCMeta):
@@ -59,7 +69,9 @@ class BacktestTimeFlowController(TimeFlowController):
 
     def generate_time_event(self):
         time_events_list, next_time_of_event = self.scheduler.get_next_time_events()
+        self._publish_time_events(time_events_list, next_time_of_event)
 
+    def _publish_time_events(self, time_events_list: List[TimeEvent], next_time_of_event: datetime):
         if next_time_of_event > self.backtest_end_datetime:
             self.event_manager.publish(EndTradingEvent())
         else:
@@ -73,6 +85,104 @@ class BacktestTimeFlowController(TimeFlowController):
         return datetime(end_date.year, end_date.month, end_date.day, 23, 59, 59, 999999)
 
 
+class FastForwardBacktestTimeFlowController(BacktestTimeFlowController):
+    """
+    BacktestTimeFlowController, which skips the IntradayBarEvents for which no ticker has any data, e.g. over weekends,
+    holidays or outside of the trading sessions. The IntradayBarEvent at time T is published only if there is data for
+    the bar, which ends at T, or the bar, which starts at T. In the other case the timer is fast-forwarded to the next
+    bar with data or to the next event of any other type, whichever comes first. All the other TimeEvents are
+    published as usual.
+
+    As the orders are executed only on published events, the orders which would be executed on the skipped bars are
+    executed on the first published event after them.
+
+    Parameters
+    ----------
+    trading_timestamps: Optional[DatetimeIndex]
+        timestamps of all the bars, for which at least one ticker has data (e.g. the result of the
+        PriceCube.get_dates_with_values function). If None, the timestamps are read from the data bundle of the
+        data_handler's data provider
+    frequency: Frequency
+        frequency of the bars
+    data_handler: Optional[DataHandler]
+        data handler, which data provider holds the data bundle. The data provider is read on the first generated
+        time event (and not at the moment of creating the controller), so that the data bundles preloaded after
+        building the trading session (e.g. with the use_data_preloading) are used. If it is not a PresetDataProvider,
+        all the time events are published
+    """
+
+    def __init__(self, scheduler: Scheduler, event_manager: EventManager, settable_timer: SettableTimer,
+                 empty_queue_event_notifier: EmptyQueueEventNotifier, backtest_end_date: datetime,
+                 trading_timestamps: Optional[DatetimeIndex] = None, frequency: Frequency = Frequency.MIN_1,
+                 data_handler: Optional[DataHandler] = None):
+        super().__init__(scheduler, event_manager, settable_timer, empty_queue_event_notifier, backtest_end_date)
+        if trading_timestamps is None and data_handler is None:
+            raise ValueError("Either the trading_timestamps or the data_handler need to be provided")
+
+        self.logger = qf_logger.getChild(self.__class__.__name__)
+        self._frequency = frequency
+        self._data_handler = data_handler
+        self._bar_event_timestamps = None  # type: Optional[np.ndarray]
+        if trading_timestamps is not None:
+            self._bar_event_timestamps = self._to_bar_event_timestamps(trading_timestamps)
+
+    def generate_time_event(self):
+        if self._bar_event_timestamps is None and self._data_handler is not None:
+            self._bar_event_timestamps = self._read_bar_event_timestamps(self._data_handler.data_provider)
+            self._data_handler = None
+
+        if self._bar_event_timestamps is None:
+            super().generate_time_event()
+            return
+
+        time_events_list, next_time_of_event = self.scheduler.get_next_time_events()
+
+        while next_time_of_event <= self.backtest_end_datetime and \
+                self._are_empty_bar_events(time_events_list, next_time_of_event):
+            self.settable_timer.set_current_time(next_time_of_event)
+
+            fast_forward_times = [
+                self._next_bar_event_time(next_time_of_event),
+                self.scheduler.get_next_trigger_time(excluded_event_types=(IntradayBarEvent,)),
+                self.backtest_end_datetime
+            ]
+            fast_forward_time = min(time for time in fast_forward_times if time is not None)
+            # Set the timer right before the fast_forward_time, so that the events scheduled for it are not omitted
+            self.settable_timer.set_current_time(max(next_time_of_event, fast_forward_time - timedelta(microseconds=1)))
+
+            time_events_list, next_time_of_event = self.scheduler.get_next_time_events()
+
+        self._publish_time_events(time_events_list, next_time_of_event)
+
+    def _read_bar_event_timestamps(self, data_provider: DataProvider) -> Optional[np.ndarray]:
+        if not isinstance(data_provider, PresetDataProvider):
+            self.logger.warning("Fast-forward time flow requires the data provider to be a PresetDataProvider (e.g. "
+                                "the data needs to be preloaded). All the time events will be generated.")
+            return None
+
+        return self._to_bar_event_timestamps(data_provider.price_cube.get_dates_with_values())
+
+    def _to_bar_event_timestamps(self, trading_timestamps: DatetimeIndex) -> np.ndarray:
+        trading_timestamps = DatetimeIndex(trading_timestamps)
+        bar_event_times = trading_timestamps.union(trading_timestamps.shift(1, freq=self._frequency.to_pandas_freq()))
+        return bar_event_times.values.view(np.int64)
+
+    def _are_empty_bar_events(self, time_events_list: List[TimeEvent], time: datetime) -> bool:
+        if not all(isinstance(time_event, IntradayBarEvent) for time_event in time_events_list):
+            return False
+
+        timestamp = Timestamp(time).value
+        position = np.searchsorted(self._bar_event_timestamps, timestamp, side="left")
+        return position == len(self._bar_event_timestamps) or self._bar_event_timestamps[position] != timestamp
+
+    def _next_bar_event_time(self, time: datetime) -> Optional[datetime]:
+        """ Returns the first time after the given one, for which the IntradayBarEvent should be published. """
+        position = np.searchsorted(self._bar_event_timestamps, Timestamp(time).value, side="right")
+        if position == len(self._bar_event_timestamps):
+            return None
+        return Timestamp(self._bar_event_timestamps[position]).to_pydatetime()
+
+
 class LiveSessionTimeFlowController(TimeFlowController):
     def __init__(self, scheduler: Scheduler, event_manager: EventManager, real_timer: RealTimer,
                  empty_queue_event_notifier: EmptyQueueEventNotifier):
@@ -12,6 +12,8 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import numpy as np
+
 from qf_lib.backtesting.execution_handler.commission_models.commission_model import CommissionModel
 
 
@@ -33,3 +35,7 @@ class BpsTradeValueCommissionModel(CommissionModel):
         fill_quantity = abs(fill_quantity)
         commission = fill_price * fill_quantity * self.commission / 10000
         return commission
+
+    def calculate_commissions(self, fill_quantities: np.ndarray, fill_prices: np.ndarray) -> np.ndarray:
+        fill_quantities = np.abs(np.asarray(fill_quantities, dtype=np.float64))
+        return np.asarray(fill_prices, dtype=np.float64) * fill_quantities * self.commission / 10000
@@ -14,8 +14,21 @@
 
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 
 class CommissionModel(object, metaclass=ABCMeta):
     @abstractmethod
     def calculate_commission(self, fill_quantity: float, fill_price: float) -> float:
         pass
+
+    def calculate_commissions(self, fill_quantities: np.ndarray, fill_prices: np.ndarray) -> np.ndarray:
+        """
+        Calculates the commissions of multiple fills at once. Each commission corresponds to the fill quantity and
+        fill price at the same position of the given arrays. Commission models should override this function with
+        a vectorised implementation, the default one calls calculate_commission for every fill.
+        """
+        return np.array([
+            self.calculate_commission(fill_quantity, fill_price)
+            for fill_quantity, fill_price in zip(np.asarray(fill_quantities).tolist(), np.asarray(fill_prices).tolist())
+        ], dtype=np.float64)
@@ -12,6 +12,8 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import numpy as np
+
 from qf_lib.backtesting.execution_handler.commission_models.commission_model import CommissionModel
 
 
@@ -28,3 +30,8 @@ class IBCommissionModel(CommissionModel):
         commission = max(1.0, min(0.005 * fill_quantity, 0.01 * fill_price * fill_quantity))
 
         return commission
+
+    def calculate_commissions(self, fill_quantities: np.ndarray, fill_prices: np.ndarray) -> np.ndarray:
+        fill_quantities = np.abs(np.asarray(fill_quantities, dtype=np.float64))
+        fill_prices = np.asarray(fill_prices, dtype=np.float64)
+        return np.maximum(1.0, np.minimum(0.005 * fill_quantities, 0.01 * fill_prices * fill_quantities))
@@ -14,6 +14,8 @@
 
 from typing import List, Sequence
 
+import numpy as np
+
 from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
 from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
 from qf_lib.backtesting.execution_handler.simulated_executor import SimulatedExecutor
@@ -24,7 +26,6 @@ from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.dateutils.date_to_datetime import date_to_datetime
-from qf_lib.common.utils.numberutils.is_finite_number import is_finite_number
 from qf_lib.containers.series.qf_series import QFSeries
 
 
@@ -40,31 +41,22 @@ class MarketOrdersExecutor(SimulatedExecutor):
         return order_id_list
 
     def _get_orders_with_fill_prices_without_slippage(self, market_orders_list, tickers, market_open, market_close):
-        unique_tickers = list(set(tickers))
+        orders_array = self._get_orders_array(market_orders_list)
+        unique_tickers = [self._slots_tickers[slot] for slot in np.unique(orders_array["ticker_slot"])]
         current_prices_series = self._get_current_prices(unique_tickers)
+        security_prices = self._get_values_of_orders(orders_array, current_prices_series).astype(np.float64)
 
-        expired_orders = []  # type: List[int]
-        to_be_executed_orders = []
-        no_slippage_prices = []
+        is_executed = np.isfinite(security_prices)
+        to_be_executed_orders = [market_orders_list[i] for i in np.flatnonzero(is_executed)]
+        no_slippage_prices = security_prices[is_executed].tolist()
 
         # Check at first if at this moment of time, expiry checks should be made or not (optimization reasons)
         if market_open or market_close:
             # In case of market open or market close, some of the orders may expire
-            for order, ticker in zip(market_orders_list, tickers):
-                security_price = current_prices_series.loc[ticker]
-
-                if is_finite_number(security_price):
-                    to_be_executed_orders.append(order)
-                    no_slippage_prices.append(security_price)
-                elif self._order_expires(order, market_open, market_close):
-                    expired_orders.append(order.id)
+            is_expired = ~is_executed & self._orders_expire(orders_array, market_open, market_close)
+            expired_orders = orders_array["order_id"][is_expired].tolist()  # type: List[int]
         else:
-            for order, ticker in zip(market_orders_list, tickers):
-                security_price = current_prices_series.loc[ticker]
-
-                if is_finite_number(security_price):
-                    to_be_executed_orders.append(order)
-                    no_slippage_prices.append(security_price)
+            expired_orders = []  # type: List[int]
 
         return no_slippage_prices, to_be_executed_orders, expired_orders
 
@@ -111,8 +103,8 @@ class MarketOrdersExecutor(SimulatedExecutor):
         assert order.execution_style == MarketOrder(), \
             "Only MarketOrder ExecutionStyle is supported by MarketOrdersExecutor"
 
-    @staticmethod
-    def _order_expires(order: Order, market_open: bool, market_close: bool):
+    @classmethod
+    def _orders_expire(cls, orders_array: np.ndarray, market_open: bool, market_close: bool) -> np.ndarray:
         """
         The orders for the standard market orders executor should not expiry.
 
@@ -120,10 +112,12 @@ class MarketOrdersExecutor(SimulatedExecutor):
         DAY orders will be dropped at this moment.
 
         In case of market open orders execution, the orders should expiry if their TimeInForce is equal to OPG.
+
+        Returns the boolean mask of the expiring orders of the given structured array of orders.
         """
-        if market_open and order.time_in_force == TimeInForce.OPG:
-            return True
-        elif market_close and order.time_in_force != TimeInForce.GTC:
-            return True
-        else:
-            return False
+        time_in_force = orders_array["time_in_force"]
+        # The conditions are checked for every order in the same order as for a single order: OPG orders expire at
+        # the market open and otherwise all the orders, which are not GTC, expire at the market close
+        expires_at_open = market_open & (time_in_force == cls._time_in_force_code(TimeInForce.OPG))
+        expires_at_close = market_close & (time_in_force != cls._time_in_force_code(TimeInForce.GTC))
+        return np.where(expires_at_open, True, expires_at_close)
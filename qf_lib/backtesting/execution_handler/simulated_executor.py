@@ -16,17 +16,32 @@ import abc
 from itertools import count
 from typing import List, Sequence, Optional, Dict, Tuple
 
+import numpy as np
+
 from qf_lib.backtesting.data_handler.data_handler import DataHandler
 from qf_lib.backtesting.execution_handler.commission_models.commission_model import CommissionModel
 from qf_lib.backtesting.execution_handler.slippage.base import Slippage
 from qf_lib.backtesting.monitoring.abstract_monitor import AbstractMonitor
+from qf_lib.backtesting.order.execution_style import StopOrder
 from qf_lib.backtesting.order.order import Order
+from qf_lib.backtesting.order.time_in_force import TimeInForce
 from qf_lib.backtesting.portfolio.portfolio import Portfolio
 from qf_lib.backtesting.portfolio.transaction import Transaction
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.dateutils.timer import Timer
-from qf_lib.common.utils.numberutils.is_finite_number import is_finite_number
+
+ORDERS_DTYPE = np.dtype([
+    ("order_id", np.int64),
+    ("ticker_slot", np.int32),
+    ("quantity", np.float64),
+    ("stop_price", np.float64),
+    ("time_in_force", np.int8),
+])
+""" Type of the structured arrays of open orders. The stop price is NaN for all orders other than the StopOrders and
+the time in force is stored as the index of the TimeInForce in TIME_IN_FORCE_CODES. """
+
+TIME_IN_FORCE_CODES = list(TimeInForce)
 
 
 class SimulatedExecutor(metaclass=abc.ABCMeta):
@@ -48,6 +63,14 @@ class SimulatedExecutor(metaclass=abc.ABCMeta):
         # mappings: order_id -> order
         self._awaiting_orders = {}  # type: Dict[int, Order]
 
+        # awaiting orders, their tickers and their structured array (of ORDERS_DTYPE), kept between the calls of
+        # execute_orders and rebuilt only after the awaiting orders change
+        self._awaiting_orders_cache = None  # type: Optional[Tuple[List[Order], List[Ticker], np.ndarray]]
+
+        # mappings: ticker -> slot, which represents the ticker in the structured arrays of orders
+        self._tickers_slots = {}  # type: Dict[Ticker, int]
+        self._slots_tickers = []  # type: List[Ticker]
+
     @abc.abstractmethod
     def assign_order_ids(self, orders: Sequence[Order]) -> List[int]:
         """
@@ -58,12 +81,14 @@ class SimulatedExecutor(metaclass=abc.ABCMeta):
     def accept_orders(self, orders: Sequence[Order]):
         for order in orders:
             self._awaiting_orders[order.id] = order
+        self._awaiting_orders_cache = None
 
     def cancel_all_open_orders(self):
         """
         Cancels all open orders
         """
         self._awaiting_orders.clear()
+        self._awaiting_orders_cache = None
 
     def cancel_order(self, order_id: int) -> Optional[Order]:
         """
@@ -71,6 +96,8 @@ class SimulatedExecutor(metaclass=abc.ABCMeta):
         of given id.
         """
         cancelled_order = self._awaiting_orders.pop(order_id, None)
+        if cancelled_order is not None:
+            self._awaiting_orders_cache = None
         return cancelled_order
 
     def get_open_orders(self) -> List[Order]:
@@ -83,11 +110,10 @@ class SimulatedExecutor(metaclass=abc.ABCMeta):
         """
         Converts Orders into Transactions. Preserves the dictionary of unexecuted Orders (order_id -> Order)
         """
-        open_orders_list = self.get_open_orders()
-        if not open_orders_list:
+        if not self._awaiting_orders:
             return
 
-        tickers = [order.ticker for order in open_orders_list]
+        open_orders_list, tickers, _ = self._get_awaiting_orders_cache()
         no_slippage_fill_prices_list, to_be_executed_orders, expired_orders_list = \
             self._get_orders_with_fill_prices_without_slippage(open_orders_list, tickers, market_open, market_close)
 
@@ -95,12 +121,16 @@ class SimulatedExecutor(metaclass=abc.ABCMeta):
             current_time = self._timer.now()
             fill_prices, fill_volumes = self._slippage_model.process_orders(current_time, to_be_executed_orders,
                                                                             no_slippage_fill_prices_list)
+            fill_prices = np.asarray(fill_prices, dtype=np.float64)
+            fill_volumes = np.asarray(fill_volumes)
+
+            is_executed = (fill_volumes != 0) & np.isfinite(fill_prices)
+            executed_orders = [order for order, executed in zip(to_be_executed_orders, is_executed) if executed]
+            self._execute_orders(executed_orders, fill_prices[is_executed], fill_volumes[is_executed])
 
-            for order, fill_price, fill_volume in zip(to_be_executed_orders, fill_prices, fill_volumes):
-                if fill_volume != 0 and is_finite_number(fill_price):
-                    self._execute_order(order, fill_price, fill_volume)
-                    # Delete the executed orders from awaiting orders dictionary
-                    del self._awaiting_orders[order.id]
+            # Delete the executed orders from awaiting orders dictionary
+            for order in executed_orders:
+                del self._awaiting_orders[order.id]
 
             # If any orders have been executed - update the portfolio
             self._portfolio.update()
@@ -109,17 +139,81 @@ class SimulatedExecutor(metaclass=abc.ABCMeta):
         for expired_order_id in expired_orders_list:
             del self._awaiting_orders[expired_order_id]
 
-    def _execute_order(self, order: Order, fill_price: float, fill_volume: int):
+        if len(to_be_executed_orders) > 0 or len(expired_orders_list) > 0:
+            self._awaiting_orders_cache = None
+
+    def _execute_orders(self, orders: Sequence[Order], fill_prices: np.ndarray, fill_volumes: np.ndarray):
         """
-        Simulates execution of a single Order by converting the Order into Transaction.
+        Simulates execution of the Orders by converting them into Transactions. All Transactions are created at once
+        and then passed to the monitor and the portfolio, in the order of the Orders.
         """
+        if not orders:
+            return
+
         timestamp = self._timer.now()
-        commission = self._commission_model.calculate_commission(fill_volume, fill_price)
+        commissions = self._commission_model.calculate_commissions(fill_volumes, fill_prices).tolist()
+        fill_prices = fill_prices.tolist()
+        fill_volumes = fill_volumes.tolist()
+
+        transactions = [
+            Transaction(timestamp, order.ticker, fill_volume, fill_price, commission)
+            for order, fill_price, fill_volume, commission in zip(orders, fill_prices, fill_volumes, commissions)
+        ]
+
+        for transaction in transactions:
+            self._monitor.record_transaction(transaction)
+            self._portfolio.transact_transaction(transaction)
+
+    def _get_awaiting_orders_cache(self) -> Tuple[List[Order], List[Ticker], np.ndarray]:
+        if self._awaiting_orders_cache is None:
+            open_orders_list = self.get_open_orders()
+            tickers = [order.ticker for order in open_orders_list]
+            self._awaiting_orders_cache = open_orders_list, tickers, self._create_orders_array(open_orders_list)
 
-        transaction = Transaction(timestamp, order.ticker, fill_volume, fill_price, commission)
+        return self._awaiting_orders_cache
 
-        self._monitor.record_transaction(transaction)
-        self._portfolio.transact_transaction(transaction)
+    def _get_orders_array(self, open_orders_list: Sequence[Order]) -> np.ndarray:
+        """
+        Returns the structured array (of ORDERS_DTYPE) of the given orders. For the list of awaiting orders passed
+        by execute_orders the array is not recreated, unless the awaiting orders changed.
+        """
+        if self._awaiting_orders_cache is not None and self._awaiting_orders_cache[0] is open_orders_list:
+            return self._awaiting_orders_cache[2]
+        return self._create_orders_array(open_orders_list)
+
+    def _create_orders_array(self, orders: Sequence[Order]) -> np.ndarray:
+        orders_array = np.empty(len(orders), dtype=ORDERS_DTYPE)
+        orders_array["order_id"] = [-1 if order.id is None else order.id for order in orders]
+        orders_array["ticker_slot"] = [self._get_ticker_slot(order.ticker) for order in orders]
+        orders_array["quantity"] = [order.quantity for order in orders]
+        orders_array["stop_price"] = [
+            order.execution_style.stop_price if isinstance(order.execution_style, StopOrder) else np.nan
+            for order in orders
+        ]
+        orders_array["time_in_force"] = [TIME_IN_FORCE_CODES.index(order.time_in_force) for order in orders]
+        return orders_array
+
+    def _get_ticker_slot(self, ticker: Ticker) -> int:
+        slot = self._tickers_slots.get(ticker)
+        if slot is None:
+            slot = len(self._slots_tickers)
+            self._tickers_slots[ticker] = slot
+            self._slots_tickers.append(ticker)
+        return slot
+
+    def _get_values_of_orders(self, orders_array: np.ndarray, values_of_tickers) -> np.ndarray:
+        """
+        Maps the values indexed by tickers (QFSeries or QFDataFrame with tickers as index) onto the orders. The rows
+        of the returned array correspond to the orders. Tickers missing in the index are mapped to NaNs.
+        """
+        unique_slots, slots_indices = np.unique(orders_array["ticker_slot"], return_inverse=True)
+        unique_tickers = [self._slots_tickers[slot] for slot in unique_slots]
+        values = values_of_tickers.reindex(index=unique_tickers).values
+        return values[slots_indices]
+
+    @staticmethod
+    def _time_in_force_code(time_in_force: TimeInForce) -> int:
+        return TIME_IN_FORCE_CODES.index(time_in_force)
 
     @abc.abstractmethod
     def _get_orders_with_fill_prices_without_slippage(self, open_orders_list: List[Order], tickers: List[Ticker],
@@ -11,23 +11,27 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
-import math
-
 import numpy as np
 
-from abc import ABCMeta, abstractmethod
+from abc import ABCMeta
 from datetime import datetime
 from itertools import groupby
 from typing import Sequence, Tuple, Optional
 
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
+from qf_lib.backtesting.order.execution_style import MarketOrder
 from qf_lib.backtesting.order.order import Order
+from qf_lib.backtesting.order.time_in_force import TimeInForce
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.enums.security_type import SecurityType
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
+from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
 from qf_lib.data_providers.data_provider import DataProvider
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+from qf_lib.data_providers.price_cube import PriceCube
 
 
 class Slippage(metaclass=ABCMeta):
@@ -39,19 +43,30 @@ class Slippage(metaclass=ABCMeta):
     Parameters
     ----------
     data_provider: DataProvider
-        DataProvider component
+        DataProvider component. If a DataHandler is passed, the slippage model uses the data provider of the
+        DataHandler (the one which is set at the time of the computations, e.g. the provider holding the preloaded
+        data bundle), so that the volumes traded today may be accessed without the look-ahead restrictions.
     max_volume_share_limit: float, None
         number from range [0,1] which denotes how big (volume-wise) the Order can be i.e. if it's 0.5 and a daily
         volume for a given asset is 1,000,000 USD, then max volume of the Order can be 500,000 USD. If not provided, no
         volume checks are performed.
+
+    Slippage models need to implement either _get_fill_prices, which is given the Orders, or its vectorised
+    counterpart _calculate_fill_prices, which is given the tickers and quantities of the orders.
     """
 
     def __init__(self, data_provider: DataProvider, max_volume_share_limit: Optional[float] = None):
         self.max_volume_share_limit = max_volume_share_limit
-        self._data_provider = data_provider
+        self._data_provider_or_handler = data_provider
 
         self._logger = qf_logger.getChild(self.__class__.__name__)
 
+    @property
+    def _data_provider(self) -> DataProvider:
+        if isinstance(self._data_provider_or_handler, DataHandler):
+            return self._data_provider_or_handler.data_provider
+        return self._data_provider_or_handler
+
     def process_orders(self, date: datetime, orders: Sequence[Order], no_slippage_fill_prices: Sequence[float]) -> \
             Tuple[Sequence[float], Sequence[float]]:
         """
@@ -73,7 +88,6 @@ class Slippage(metaclass=ABCMeta):
             sequence of fill prices (order corresponds to the order of orders provided as an argument of the method),
             sequence of fill order quantities
         """
-
         self._check_for_duplicates(date, orders)
 
         # Compute the fill volumes for orders
@@ -85,51 +99,162 @@ class Slippage(metaclass=ABCMeta):
         fill_prices = self._get_fill_prices(date, orders, no_slippage_fill_prices, fill_volumes)
         return fill_prices, fill_volumes
 
-    @abstractmethod
+    def calculate_fill_prices_and_volumes(self, date: datetime, tickers: Sequence[Ticker], quantities: np.ndarray,
+                                          no_slippage_fill_prices: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Calculates fill prices and quantities for a basket of orders given as arrays (the i-th order is defined by
+        the i-th ticker, quantity and no slippage fill price). For orders that can't be executed (missing security
+        price, etc.) float("nan") will be returned.
+
+        Parameters
+        ----------
+        date: datetime
+            time when the slippage is applied
+        tickers: Sequence[Ticker]
+            tickers of the orders
+        quantities: np.ndarray
+            quantities of the orders
+        no_slippage_fill_prices: Sequence[float]
+            fill prices without a slippage applied
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            array of fill prices and array of fill quantities of the orders
+        """
+        quantities = np.asarray(quantities)
+        no_slippage_fill_prices = np.asarray(no_slippage_fill_prices, dtype=np.float64)
+
+        # Compute the fill volumes for orders
+        if self.max_volume_share_limit is None:
+            fill_volumes = quantities
+        elif self._overrides(Slippage._get_fill_volumes):
+            fill_volumes = np.asarray(self._get_fill_volumes(self._create_orders(tickers, quantities), date))
+        else:
+            fill_volumes = self._calculate_fill_volumes(tickers, quantities, date)
+
+        fill_prices = self._calculate_fill_prices(date, tickers, quantities, no_slippage_fill_prices, fill_volumes)
+        return fill_prices, fill_volumes
+
     def _get_fill_prices(self, date: datetime, orders: Sequence[Order], no_slippage_fill_prices: Sequence[float],
                          fill_volumes: Sequence[int]) -> Sequence[float]:
-        raise NotImplementedError()
+        """
+        Computes the fill prices of the Orders. By default, it calls the vectorised _calculate_fill_prices.
+        """
+        tickers = [order.ticker for order in orders]
+        quantities = np.array([order.quantity for order in orders])
+        return self._calculate_fill_prices(date, tickers, quantities,
+                                           np.asarray(no_slippage_fill_prices, dtype=np.float64),
+                                           np.asarray(fill_volumes))
 
-    def _volumes_traded_today(self, date: datetime, tickers: Sequence[Ticker]) -> Sequence[int]:
+    def _calculate_fill_prices(self, date: datetime, tickers: Sequence[Ticker], quantities: np.ndarray,
+                               no_slippage_fill_prices: np.ndarray, fill_volumes: np.ndarray) -> np.ndarray:
+        """
+        Vectorised version of _get_fill_prices. By default, it creates the Orders and calls _get_fill_prices, so that
+        the slippage models which implement only _get_fill_prices may be used with calculate_fill_prices_and_volumes.
+        """
+        if not self._overrides(Slippage._get_fill_prices):
+            raise NotImplementedError("{} needs to implement either _get_fill_prices or _calculate_fill_prices".format(
+                self.__class__.__name__))
+
+        orders = self._create_orders(tickers, quantities)
+        return np.asarray(self._get_fill_prices(date, orders, no_slippage_fill_prices.tolist(), fill_volumes),
+                          dtype=np.float64)
+
+    def _overrides(self, method) -> bool:
+        return getattr(type(self), method.__name__) is not method
+
+    @staticmethod
+    def _create_orders(tickers: Sequence[Ticker], quantities: np.ndarray) -> Sequence[Order]:
+        return [Order(ticker, quantity, MarketOrder(), TimeInForce.GTC)
+                for ticker, quantity in zip(tickers, quantities.tolist())]
+
+    def _volumes_traded_today(self, date: datetime, tickers: Sequence[Ticker]) -> np.ndarray:
         """
         For each ticker return the volume traded today. In case of lacking volume data - 0 is returned.
         """
         start_date = date + RelativeDelta(hour=0, minute=0, second=0, microsecond=0)
         end_date = start_date + RelativeDelta(days=1)
 
-        # Look into the future in order to see the total volume traded today
-        volume_df = self._data_provider.get_price(tickers, PriceField.Volume, start_date, end_date, Frequency.DAILY)
-        volume_df = volume_df.fillna(0.0)
-        try:
-            volumes = volume_df.loc[start_date, tickers].values
-        except KeyError:
-            volumes = np.repeat(0, len(tickers))
+        price_cube = self._get_price_cube_with_volumes(tickers)
+        if price_cube is not None:
+            volumes = self._volumes_from_price_cube(price_cube, start_date, end_date, tickers)
+        else:
+            # Look into the future in order to see the total volume traded today
+            volume_df = self._data_provider.get_price(tickers, PriceField.Volume, start_date, end_date,
+                                                      Frequency.DAILY)
+            volume_df = volume_df.fillna(0.0)
+            try:
+                volumes = volume_df.loc[start_date, tickers].values
+            except KeyError:
+                volumes = np.repeat(0, len(tickers))
 
         # Replace negative values with 0
         volumes[volumes < 0] = 0
         return volumes
 
+    def _get_price_cube_with_volumes(self, tickers: Sequence[Ticker]) -> Optional[PriceCube]:
+        """
+        Returns the PriceCube of the data bundle preloaded by the data provider, if it contains the volumes of all
+        the given tickers. Otherwise, None is returned and the volumes need to be downloaded with get_price.
+        """
+        if not isinstance(self._data_provider, PresetDataProvider) or \
+                PriceField.Volume not in self._data_provider.cached_fields:
+            return None
+
+        cached_tickers = self._data_provider.cached_tickers
+        if any(self._specific_ticker(ticker) not in cached_tickers for ticker in tickers):
+            return None
+
+        return self._data_provider.price_cube
+
+    def _volumes_from_price_cube(self, price_cube: PriceCube, start_date: datetime, end_date: datetime,
+                                 tickers: Sequence[Ticker]) -> np.ndarray:
+        """
+        Sums the volumes of all bars of the preloaded data bundle between start_date (inclusive) and end_date
+        (exclusive), which for a daily data bundle is equivalent to taking the volume of the daily bar.
+        """
+        dates_slice = price_cube.dates_slice(start_date, end_date - RelativeDelta(microseconds=1))
+        specific_tickers = [self._specific_ticker(ticker) for ticker in tickers]
+        volumes = price_cube.get_values(dates_slice, specific_tickers, [PriceField.Volume])[:, :, 0]
+        return np.nansum(volumes.astype(np.float64), axis=0)
+
+    @staticmethod
+    def _specific_ticker(ticker: Ticker) -> Ticker:
+        return ticker.get_current_specific_ticker() if isinstance(ticker, FutureTicker) else ticker
+
     def _get_fill_volumes(self, orders: Sequence[Order], date: datetime) -> Sequence[float]:
         """
         Compute the fill volumes, where the fill volume for each asset should fulfill the following:
         abs(fill_volume) <= self.max_volume_share_limit * volume_traded_today
         """
-        order_volumes = np.array([order.quantity for order in orders])
         tickers = [order.ticker for order in orders]
+        quantities = np.array([order.quantity for order in orders])
+        return self._calculate_fill_volumes(tickers, quantities, date)
+
+    def _calculate_fill_volumes(self, tickers: Sequence[Ticker], quantities: np.ndarray, date: datetime) -> \
+            np.ndarray:
+        """
+        Vectorised version of _get_fill_volumes.
+        """
         market_volumes = self._volumes_traded_today(date, tickers)
 
-        max_abs_order_volumes = [volume * self.max_volume_share_limit for volume in market_volumes]
-        abs_order_volumes = np.absolute(order_volumes)
+        max_abs_order_volumes = market_volumes * self.max_volume_share_limit
+        abs_order_volumes = np.absolute(quantities)
 
         abs_fill_volumes = np.minimum(abs_order_volumes, max_abs_order_volumes)
-        fill_volumes = np.copysign(abs_fill_volumes, order_volumes)
+        fill_volumes = np.copysign(abs_fill_volumes, quantities)
 
-        fill_volumes = np.array([volume if order.ticker.security_type == SecurityType.CRYPTO else float(math.floor(volume))
-                                 for volume, order in zip(fill_volumes, orders)])
+        is_crypto = np.array([ticker.security_type == SecurityType.CRYPTO for ticker in tickers], dtype=bool)
+        fill_volumes = np.where(is_crypto, fill_volumes, np.floor(fill_volumes))
 
         return fill_volumes
 
     def _check_for_duplicates(self, date: datetime, orders: Sequence[Order]):
+        tickers = [order.ticker for order in orders]
+        if len(set(tickers)) == len(tickers):
+            return
+
         sorted_orders = sorted(orders, key=lambda order: order.ticker)
         for ticker, orders_group in groupby(sorted_orders, lambda order: order.ticker):
             orders_list = list(orders_group)
@@ -17,7 +17,7 @@ from typing import Sequence, Optional
 import numpy as np
 
 from qf_lib.backtesting.execution_handler.slippage.base import Slippage
-from qf_lib.backtesting.order.order import Order
+from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.data_providers.data_provider import DataProvider
 
 
@@ -31,9 +31,8 @@ class FixedSlippage(Slippage):
         super().__init__(data_provider, max_volume_share_limit)
         self.slippage_per_share = slippage_per_share
 
-    def _get_fill_prices(self, date: datetime, orders: Sequence[Order], no_slippage_fill_prices: Sequence[float],
-                         fill_volumes: Sequence[int]) -> Sequence[float]:
-        fill_volumes = np.array([order.quantity for order in orders])
-        fill_prices = np.array(no_slippage_fill_prices) + np.copysign(self.slippage_per_share, fill_volumes)
+    def _calculate_fill_prices(self, date: datetime, tickers: Sequence[Ticker], quantities: np.ndarray,
+                               no_slippage_fill_prices: np.ndarray, fill_volumes: np.ndarray) -> np.ndarray:
+        fill_prices = no_slippage_fill_prices + np.copysign(self.slippage_per_share, quantities)
 
         return fill_prices
@@ -12,12 +12,13 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
-import math
 from datetime import datetime
 from typing import Sequence, Optional
 
+import numpy as np
+
 from qf_lib.backtesting.execution_handler.slippage.base import Slippage
-from qf_lib.backtesting.order.order import Order
+from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.data_providers.data_provider import DataProvider
 
 
@@ -31,28 +32,11 @@ class PriceBasedSlippage(Slippage):
         super().__init__(data_provider, max_volume_share_limit)
         self.slippage_rate = slippage_rate
 
-    def _get_fill_prices(self, date: datetime, orders: Sequence[Order], no_slippage_fill_prices: Sequence[float],
-                         fill_volumes: Sequence[float]) -> Sequence[float]:
-
+    def _calculate_fill_prices(self, date: datetime, tickers: Sequence[Ticker], quantities: np.ndarray,
+                               no_slippage_fill_prices: np.ndarray, fill_volumes: np.ndarray) -> np.ndarray:
         if self.slippage_rate == 0.0:
             return no_slippage_fill_prices
 
-        fill_prices = []
-        for order, no_slippage_price in zip(orders, no_slippage_fill_prices):
-            fill_price = self._get_single_fill_price(order, no_slippage_price)
-            fill_prices.append(fill_price)
-
-        return fill_prices
-
-    def _get_single_fill_price(self, order, no_slippage_price):
-        if math.isnan(no_slippage_price):
-            fill_price = float('nan')
-        else:
-            if order.quantity > 0:  # BUY Order
-                multiplier = 1 + self.slippage_rate
-            else:  # SELL Order
-                multiplier = 1 - self.slippage_rate
-
-            fill_price = no_slippage_price * multiplier
-
-        return fill_price
+        # BUY Orders are filled at a higher price, SELL Orders at a lower price. NaN prices remain NaN
+        multipliers = np.where(quantities > 0, 1 + self.slippage_rate, 1 - self.slippage_rate)
+        return no_slippage_fill_prices * multipliers
@@ -17,7 +17,6 @@ from typing import Sequence, Optional
 import numpy as np
 
 from qf_lib.backtesting.execution_handler.slippage.base import Slippage
-from qf_lib.backtesting.order.order import Order
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
@@ -56,11 +55,8 @@ class SquareRootMarketImpactSlippage(Slippage):
         self.price_impact = price_impact
         self._number_of_samples = 20
 
-    def _get_fill_prices(self, date: datetime, orders: Sequence[Order], no_slippage_fill_prices: Sequence[float],
-                         fill_volumes: Sequence[float]) -> Sequence[float]:
-        no_slippage_fill_prices = np.array(no_slippage_fill_prices)
-
-        tickers = [order.ticker for order in orders]
+    def _calculate_fill_prices(self, date: datetime, tickers: Sequence[Ticker], quantities: np.ndarray,
+                               no_slippage_fill_prices: np.ndarray, fill_volumes: np.ndarray) -> np.ndarray:
         market_impact_values = self._compute_market_impact(date, tickers, fill_volumes)
         fill_prices = no_slippage_fill_prices * np.add(market_impact_values, 1.0)
 
@@ -14,6 +14,8 @@
 
 from typing import List, Sequence
 
+import numpy as np
+
 from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
 from qf_lib.backtesting.execution_handler.simulated_executor import SimulatedExecutor
 from qf_lib.backtesting.order.execution_style import StopOrder
@@ -65,35 +67,23 @@ class StopOrdersExecutor(SimulatedExecutor):
         return order_id_list
 
     def _get_orders_with_fill_prices_without_slippage(self, open_orders_list, tickers, market_open, market_close):
-        no_slippage_fill_prices_list = []
-        to_be_executed_orders = []
-        expired_stop_orders = []  # type: List[int]
-
-        unique_tickers = list(set(tickers))
+        orders_array = self._get_orders_array(open_orders_list)
+        unique_tickers = [self._slots_tickers[slot] for slot in np.unique(orders_array["ticker_slot"])]
         # index=tickers, columns=fields
         current_bars_df = self._get_latest_available_bars(unique_tickers)  # type: QFDataFrame
 
+        no_slippage_fill_prices = self._calculate_no_slippage_fill_prices(current_bars_df, orders_array)
+        is_executed = ~np.isnan(no_slippage_fill_prices)
+        to_be_executed_orders = [open_orders_list[i] for i in np.flatnonzero(is_executed)]
+        no_slippage_fill_prices_list = no_slippage_fill_prices[is_executed].tolist()
+
         # Check at first if at this moment of time, expiry checks should be made or not (optimization reasons)
         if market_close:
-            for order, ticker in zip(open_orders_list, tickers):
-                current_bar = current_bars_df.loc[ticker, :]
-                no_slippage_fill_price = self._calculate_no_slippage_fill_price(current_bar, order)
-
-                if no_slippage_fill_price is not None:
-                    to_be_executed_orders.append(order)
-                    no_slippage_fill_prices_list.append(no_slippage_fill_price)
-                else:
-                    # the Order cannot be executed
-                    if self._order_expires(order):
-                        expired_stop_orders.append(order.id)
+            # the Orders, which cannot be executed, may expire
+            is_expired = ~is_executed & self._orders_expire(orders_array)
+            expired_stop_orders = orders_array["order_id"][is_expired].tolist()  # type: List[int]
         else:
-            for order, ticker in zip(open_orders_list, tickers):
-                current_bar = current_bars_df.loc[ticker, :]
-                no_slippage_fill_price = self._calculate_no_slippage_fill_price(current_bar, order)
-
-                if no_slippage_fill_price is not None:
-                    to_be_executed_orders.append(order)
-                    no_slippage_fill_prices_list.append(no_slippage_fill_price)
+            expired_stop_orders = []  # type: List[int]
 
         return no_slippage_fill_prices_list, to_be_executed_orders, expired_stop_orders
 
@@ -131,39 +121,37 @@ class StopOrdersExecutor(SimulatedExecutor):
 
         return self._data_handler.get_price(tickers, PriceField.ohlcv(), start_date, start_date, self._frequency)
 
-    def _calculate_no_slippage_fill_price(self, current_bar, order):
+    def _calculate_no_slippage_fill_prices(self, current_bars_df: QFDataFrame, orders_array: np.ndarray) -> np.ndarray:
         """
-        Returns the price which should be used for calculating the real fill price later on. It can return either:
-        OPEN or stop price. If the market opens at the price which triggers StopOrders instantly, the OPEN price
-        is returned. Otherwise if the LOW price (for Sell Stop) or HIGH price (for Buy Stop) exceeds the stop price,
-        the stop price is returned. If none of the above conditions is met, None is returned (which means that
-        StopOrder shouldn't be executed at any price).
+        Returns the prices which should be used for calculating the real fill prices of the orders later on. Each of
+        them can be either: OPEN or stop price. If the market opens at the price which triggers StopOrders instantly,
+        the OPEN price is returned. Otherwise if the LOW price (for Sell Stop) or HIGH price (for Buy Stop) exceeds
+        the stop price, the stop price is returned. If none of the above conditions is met, NaN is returned (which
+        means that StopOrder shouldn't be executed at any price).
         """
-        # Make sure that at least all values except Volume are available. Volume is not available for currencies.
-        price_bar = tuple(current_bar.loc[[PriceField.Open, PriceField.High, PriceField.Low, PriceField.Close]])
-        if None in price_bar:
-            return None
+        price_fields = [PriceField.Open, PriceField.High, PriceField.Low, PriceField.Close]
+        bars = self._get_values_of_orders(orders_array, current_bars_df.reindex(columns=price_fields))
 
-        open_price, high_price, low_price, close_price = price_bar
+        # Make sure that at least all values except Volume are available. Volume is not available for currencies.
+        if bars.dtype == object:
+            is_bar_available = ~(bars == None).any(axis=1)  # noqa: E711
+        else:
+            is_bar_available = np.ones(len(bars), dtype=bool)
+        bars = bars.astype(np.float64)
+        open_prices, high_prices, low_prices = bars[:, 0], bars[:, 1], bars[:, 2]
 
-        stop_price = order.execution_style.stop_price
-        is_sell_stop = order.quantity < 0
-        no_slippage_fill_price = None
+        stop_prices = orders_array["stop_price"]
+        is_sell_stop = orders_array["quantity"] < 0
 
-        if is_sell_stop:
-            if open_price <= stop_price:
-                no_slippage_fill_price = open_price
-            else:
-                if low_price <= stop_price:
-                    no_slippage_fill_price = stop_price
-        else:  # is buy stop
-            if open_price >= stop_price:
-                no_slippage_fill_price = open_price
-            else:
-                if high_price >= stop_price:
-                    no_slippage_fill_price = stop_price
+        with np.errstate(invalid="ignore"):
+            sell_stop_fill_prices = np.where(open_prices <= stop_prices, open_prices,
+                                             np.where(low_prices <= stop_prices, stop_prices, np.nan))
+            buy_stop_fill_prices = np.where(open_prices >= stop_prices, open_prices,
+                                            np.where(high_prices >= stop_prices, stop_prices, np.nan))
 
-        return no_slippage_fill_price
+        no_slippage_fill_prices = np.where(is_sell_stop, sell_stop_fill_prices, buy_stop_fill_prices)
+        no_slippage_fill_prices[~is_bar_available] = np.nan
+        return no_slippage_fill_prices
 
     def _check_order_validity(self, order):
         assert order.time_in_force == TimeInForce.DAY or order.time_in_force == TimeInForce.GTC, \
@@ -171,12 +159,14 @@ class StopOrdersExecutor(SimulatedExecutor):
         assert isinstance(order.execution_style, StopOrder), \
             "Only StopOrder ExecutionStyle is supported by StopOrdersExecutor"
 
-    @staticmethod
-    def _order_expires(order: Order):
+    @classmethod
+    def _orders_expire(cls, orders_array: np.ndarray) -> np.ndarray:
         """
         The orders for the standard market orders executor should not expiry.
 
         In case of on market close orders execution, the orders should expire if their TimeInForce is not equal to GTC.
         DAY orders will be dropped at this moment.
+
+        Returns the boolean mask of the expiring orders of the given structured array of orders.
         """
-        return order.time_in_force != TimeInForce.GTC
+        return orders_array["time_in_force"] != cls._time_in_force_code(TimeInForce.GTC)
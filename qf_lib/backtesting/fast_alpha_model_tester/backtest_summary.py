@@ -13,9 +13,12 @@
 #     limitations under the License.
 
 from datetime import datetime
-from typing import Tuple, Sequence, Type, List
+from typing import Tuple, Sequence, Type, List, Union
+
+import numpy as np
 
 from qf_lib.backtesting.alpha_model.alpha_model import AlphaModel
+from qf_lib.backtesting.fast_alpha_model_tester.trades_array import trades_array_to_list, trades_list_to_array
 from qf_lib.backtesting.portfolio.trade import Trade
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
@@ -32,19 +35,41 @@ class BacktestSummaryElement:
         Names of the parameters of the model.
     returns_tms: SimpleReturnsSeries
         SimpleReturnsSeries of the Portfolio.
-    trades: Sequence[Trade]
-        Sequence of Trades (groups of Transactions) performed by the tested strategy.
+    trades: Sequence[Trade], np.ndarray
+        Sequence of Trades (groups of Transactions) performed by the tested strategy or the structured array of trades
+        (see trades_array.TRADES_DTYPE), in which tickers are stored as positions in the tickers sequence.
     tickers: Sequence[Ticker]
         Sequence of Tickers for which the single backtest was performed.
     """
     def __init__(self, model_parameters: Tuple, model_parameters_names: Tuple[str], returns_tms: SimpleReturnsSeries,
-                 trades: Sequence[Trade], tickers: Sequence[Ticker]):
+                 trades: Union[Sequence[Trade], np.ndarray], tickers: Sequence[Ticker]):
         self.model_parameters = model_parameters
         self.model_parameters_names = model_parameters_names
         self.returns_tms = returns_tms
-        self.trades = trades
         self.tickers = tickers
 
+        if isinstance(trades, np.ndarray):
+            self._trades_array = trades
+            self._trades = None
+        else:
+            self._trades_array = None
+            self._trades = trades
+
+    @property
+    def trades(self) -> Sequence[Trade]:
+        """ Trades performed by the tested strategy. If the element holds the structured array of trades, the Trade
+        objects are created on first use. """
+        if self._trades is None:
+            self._trades = trades_array_to_list(self._trades_array, self.tickers)
+        return self._trades
+
+    @property
+    def trades_array(self) -> np.ndarray:
+        """ Structured array of trades (see trades_array.TRADES_DTYPE). """
+        if self._trades_array is None:
+            self._trades_array = trades_list_to_array(self._trades, self.tickers)
+        return self._trades_array
+
 
 class BacktestSummary:
     def __init__(self, tickers: Sequence[Ticker], alpha_model_type: Type[AlphaModel],
@@ -11,10 +11,14 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+import os
+import shutil
+import tempfile
 import traceback
+from copy import copy
 from datetime import datetime
 from itertools import count
-from typing import Sequence, Type, List, Union, Dict, Any
+from typing import Sequence, Type, List, Union, Dict, Any, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -22,7 +26,10 @@ from joblib import Parallel, delayed
 
 from qf_lib.backtesting.alpha_model.alpha_model import AlphaModel
 from qf_lib.backtesting.alpha_model.exposure_enum import Exposure
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
 from qf_lib.backtesting.fast_alpha_model_tester.backtest_summary import BacktestSummary, BacktestSummaryElement
+from qf_lib.backtesting.fast_alpha_model_tester.trades_array import TRADES_DTYPE, extract_trades, \
+    trades_array_to_list
 from qf_lib.backtesting.portfolio.trade import Trade
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
@@ -45,6 +52,8 @@ from qf_lib.containers.series.qf_series import QFSeries
 from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
 from qf_lib.data_providers.data_provider import DataProvider
 from qf_lib.data_providers.helpers import cast_data_array_to_proper_type, tickers_dict_to_data_array
+from qf_lib.data_providers.memory_mapped_preset_data_provider import MemoryMappedPresetDataProvider
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
 from qf_lib.portfolio_construction.portfolio_models.portfolio import Portfolio
 
 
@@ -88,7 +97,7 @@ class FastAlphaModelTester:
                  tickers: Sequence[Ticker], start_date: datetime, end_date: datetime,
                  data_provider: DataProvider, timer: Timer = None, n_jobs: int = 1,
                  frequency: Frequency = Frequency.DAILY, start_time: Dict = None, end_time: Dict = None,
-                 close_position_at_the_end_of_day: bool = False):
+                 close_position_at_the_end_of_day: bool = False, bulk_evaluation: bool = False):
         """
         Parameters
         ----------
@@ -124,6 +133,11 @@ class FastAlphaModelTester:
             If True, the last signal of the day will always be set to close the existing position.
             This is to avoid overnight exposure.
             If False (default), position might be carried overnight, and will not be forced to be closed.
+        bulk_evaluation: bool
+            If True, the exposures of all parameters sets are stacked into one (parameters sets x dates x tickers)
+            array and the returns and trades of all backtest summary elements are computed at once with NumPy
+            operations, instead of computing every element separately. The array needs to fit in memory.
+            False by default.
         """
         self.timer = timer
         self.logger = qf_logger.getChild(self.__class__.__name__)
@@ -139,6 +153,7 @@ class FastAlphaModelTester:
         self._start_time = start_time
         self._end_time = end_time
         self._close_position_at_the_end_of_day = close_position_at_the_end_of_day
+        self._bulk_evaluation = bulk_evaluation
 
         # use 1min data frequency for data if signal generation is intra-day.
         # use Daily frequency for any other time frame
@@ -164,13 +179,66 @@ class FastAlphaModelTester:
         self.logger.info("{} parameters sets to be tested".format(len(self._alpha_model_configs)))
 
         prices_data_array = self._get_data_for_backtest()
-        exposure_values_df_list = self._generate_exposures_for_all_params_sets()
-        backtest_summary_elem_list = self._calculate_backtest_summary_elements(exposure_values_df_list,
-                                                                               prices_data_array)
+
+        if self._n_jobs == 1:
+            exposure_values_df_list = self._generate_exposures_for_all_params_sets()
+            backtest_summary_elem_list = self._calculate_backtest_summary_elements(exposure_values_df_list,
+                                                                                   prices_data_array)
+        else:
+            # The prices are placed once in memory-mapped files, which the workers attach to without copying them
+            shared_data_dir = tempfile.mkdtemp(prefix="fast_alpha_model_tester_")
+            original_data_provider = self._data_provider
+            try:
+                self._data_provider = self._share_data_provider(original_data_provider, shared_data_dir)
+                prices_data_array = self._share_data_array(prices_data_array, shared_data_dir, "prices")
+
+                exposure_values_df_list = self._generate_exposures_for_all_params_sets()
+                backtest_summary_elem_list = self._calculate_backtest_summary_elements(exposure_values_df_list,
+                                                                                       prices_data_array)
+            finally:
+                self._data_provider = original_data_provider
+                shutil.rmtree(shared_data_dir, ignore_errors=True)
+
         backtest_summary = BacktestSummary(self._tickers, self._model_type, backtest_summary_elem_list,
                                            self._start_date, self._end_date)
         return backtest_summary
 
+    def _share_data_provider(self, data_provider: DataProvider, directory: str) -> DataProvider:
+        """
+        Returns the data provider, which serves the same data, but keeps the data bundle in a memory-mapped file, so
+        that it is not copied while being passed to the workers. Only PresetDataProviders (possibly wrapped in
+        a DataHandler) can be shared, any other data provider is returned unchanged.
+        """
+        if isinstance(data_provider, DataHandler):
+            shared_data_handler = copy(data_provider)
+            shared_data_handler.data_provider = self._share_data_provider(data_provider.data_provider, directory)
+            return shared_data_handler
+
+        if not isinstance(data_provider, PresetDataProvider) or isinstance(data_provider,
+                                                                           MemoryMappedPresetDataProvider):
+            return data_provider
+
+        data_bundle = self._share_data_array(data_provider.data_bundle, directory, "data_bundle")
+        return data_provider.with_data_bundle(data_bundle)
+
+    @staticmethod
+    def _share_data_array(data_array: QFDataArray, directory: str, name: str) -> QFDataArray:
+        """
+        Copies the values of the data array into a memory-mapped file and returns the data array backed by it. Such
+        array is passed by joblib to the workers as a reference to the file, instead of being pickled.
+        """
+        if data_array.size == 0 or data_array.dtype == object:
+            return data_array
+
+        file_path = os.path.join(directory, "{}.bin".format(name))
+        values = np.memmap(file_path, dtype=data_array.dtype, mode="w+", shape=data_array.shape)
+        values[:] = data_array.values
+        values.flush()
+
+        values = np.memmap(file_path, dtype=data_array.dtype, mode="r", shape=data_array.shape)
+        return QFDataArray.create(data_array.dates.values, data_array.tickers.values, data_array.fields.values,
+                                  data=values, name=data_array.name)
+
     def _get_valid_tickers(self, original_ticker: Sequence[Ticker]) -> List[Ticker]:
         tickers = []
         for ticker in original_ticker:
@@ -214,6 +282,8 @@ class FastAlphaModelTester:
 
     def _calculate_backtest_summary_elements(self, exposure_values_df_list: List[QFDataFrame],
                                              prices_data_array: QFDataArray) -> List[BacktestSummaryElement]:
+        if self._bulk_evaluation:
+            return self._calculate_backtest_summary_elements_in_bulk(exposure_values_df_list, prices_data_array)
 
         open_prices_df = self._get_open_prices(prices_data_array)
         open_to_open_returns_df = open_prices_df.to_simple_returns()
@@ -237,6 +307,124 @@ class FastAlphaModelTester:
 
         return backtest_summary_elem_list
 
+    def _calculate_backtest_summary_elements_in_bulk(self, exposure_values_df_list: List[QFDataFrame],
+                                                     prices_data_array: QFDataArray) -> List[BacktestSummaryElement]:
+        """
+        Computes the same backtest summary elements as _calculate_backtest_summary_elements, but for all the
+        parameters sets at once. The exposures are stacked into the (parameters sets x dates x tickers) array, so that
+        the returns of all strategies are computed with a single broadcasted multiplication.
+        """
+        self.logger.info("\nGenerating backtest summaries in bulk:")
+        if not exposure_values_df_list:
+            return []
+
+        exposures_index = exposure_values_df_list[0].index
+        exposures = np.stack([
+            exposure_values_df.reindex(index=exposures_index, columns=self._tickers).values.astype(np.float64)
+            for exposure_values_df in exposure_values_df_list
+        ])
+
+        open_to_open_returns_df = self._get_open_prices(prices_data_array).to_simple_returns()
+        union_index, returns_of_strategies = self._calculate_returns_of_strategies_in_bulk(
+            open_to_open_returns_df, exposures_index, exposures)
+        is_nan_return = np.isnan(returns_of_strategies)
+
+        # Returns of the portfolios consisting of all the tickers, for all the parameters sets: params x dates
+        weights = np.full(len(self._tickers), 1.0 / len(self._tickers))
+        portfolios_returns = returns_of_strategies.dot(weights)
+        is_portfolio_return_empty = is_nan_return.all(axis=2)
+
+        trades_arrays = self._calculate_trades_in_bulk(prices_data_array, exposures_index, exposures)
+
+        backtest_summary_elem_list = []
+        for i, config in enumerate(self._alpha_model_configs):
+            for j, ticker in enumerate(self._tickers):
+                returns = returns_of_strategies[i, :, j]
+                is_valid = ~is_nan_return[i, :, j]
+                returns_tms = SimpleReturnsSeries(data=returns[is_valid], index=union_index[is_valid])
+
+                trades = trades_arrays[i][j].copy()
+                trades["ticker_index"] = 0
+                backtest_summary_elem_list.append(BacktestSummaryElement(
+                    config.model_parameters(), config.tested_parameters_names, returns_tms, trades, [ticker]))
+
+            if len(self._tickers) > 1:
+                is_valid = ~is_portfolio_return_empty[i]
+                returns_tms = SimpleReturnsSeries(data=portfolios_returns[i, is_valid], index=union_index[is_valid])
+                trades = np.concatenate(trades_arrays[i])
+                backtest_summary_elem_list.append(BacktestSummaryElement(
+                    config.model_parameters(), config.tested_parameters_names, returns_tms, trades, self._tickers))
+
+        return backtest_summary_elem_list
+
+    def _calculate_returns_of_strategies_in_bulk(self, open_to_open_returns_df: QFDataFrame,
+                                                 exposures_index: pd.DatetimeIndex, exposures: np.ndarray) \
+            -> Tuple[pd.DatetimeIndex, np.ndarray]:
+        """
+        Vectorised version of the returns computation of _calculate_portfolio_returns_tms for the stacked
+        (parameters sets x dates x tickers) exposures. Returns the index of the returns and the
+        (parameters sets x dates x tickers) array of returns of every ticker in every strategy.
+        """
+        if self._frequency <= Frequency.DAILY:
+            union_index = open_to_open_returns_df.index.union(exposures_index)
+            exposures_positions = exposures_index.get_indexer(union_index, method="ffill")
+            lag = 2
+        else:
+            # Assume that we implement the signal with the lag of 1min. Requires shifting returns  by 2min.
+            shifted_exposures_index = exposures_index + pd.Timedelta(minutes=2)
+            union_index = open_to_open_returns_df.index.union(shifted_exposures_index)
+            exposures_positions = shifted_exposures_index.get_indexer(union_index, method="ffill")
+            lag = 0
+
+        # Forward fill the exposures on the union index and shift them by the lag
+        exposures_positions = np.concatenate((np.full(lag, -1), exposures_positions[:len(union_index) - lag]))
+        exposures_expanded = exposures[:, exposures_positions, :]
+        exposures_expanded[:, exposures_positions < 0, :] = np.nan
+
+        open_to_open_returns = open_to_open_returns_df.reindex(index=union_index, columns=self._tickers).fillna(0)
+        returns_of_strategies = exposures_expanded * open_to_open_returns.values.astype(np.float64)
+        return union_index, returns_of_strategies
+
+    def _calculate_trades_in_bulk(self, prices_data_array: QFDataArray, exposures_index: pd.DatetimeIndex,
+                                  exposures: np.ndarray) -> List[List[np.ndarray]]:
+        """
+        Returns the structured arrays of trades for every parameters set and every ticker (indexed in this order).
+        The ticker_index field of every trade corresponds to the position of the ticker in the tested tickers.
+        """
+        lag = pd.Timedelta(minutes=1) if self._frequency > Frequency.DAILY else pd.Timedelta(days=1)
+        times = exposures_index + lag
+
+        # Open prices forward filled on the times of the shifted exposures
+        open_prices = prices_data_array.loc[:, self._tickers, PriceField.Open]
+        prices_positions = open_prices.dates.to_index().get_indexer(times, method="ffill")
+        prices = open_prices.values.astype(np.float64)[prices_positions, :]
+        prices[prices_positions < 0, :] = np.nan
+
+        # historical data cropped to the time frame of the backtest (from start date till end date)
+        is_in_backtest = times >= self._start_date
+        times, exposures, prices = times[is_in_backtest], exposures[:, is_in_backtest, :], prices[is_in_backtest, :]
+
+        trades_arrays = [[] for _ in self._alpha_model_configs]
+        for j, ticker in enumerate(self._tickers):
+            # skipping the nan Open prices
+            is_valid_price = ~np.isnan(prices[:, j])
+            for curr_date in times[~is_valid_price]:
+                self.logger.warning("Open price is None, cannot create trade on {} for {}".format(
+                    curr_date.to_pydatetime(), str(ticker)))
+
+            for i in range(len(self._alpha_model_configs)):
+                ticker_times, ticker_exposures, ticker_prices = times.values, exposures[i, :, j], prices[:, j]
+
+                # If the first exposure is nan - skip it
+                is_valid = is_valid_price.copy()
+                if len(ticker_exposures) > 0 and np.isnan(ticker_exposures[0]):
+                    is_valid[0] = False
+
+                trades_arrays[i].append(extract_trades(ticker_times[is_valid], ticker_exposures[is_valid],
+                                                       ticker_prices[is_valid], j))
+
+        return trades_arrays
+
     def _get_open_prices(self, prices_data_array: QFDataArray) -> PricesDataFrame:
         """ Returns PricesDataFrame consisting of only Open prices. """
         open_prices_df = cast_data_array_to_proper_type(prices_data_array.loc[:, :, PriceField.Open],
@@ -249,8 +437,8 @@ class FastAlphaModelTester:
                                     exposure_values_df: QFDataFrame) -> BacktestSummaryElement:
 
         portfolio_rets_tms = self._calculate_portfolio_returns_tms(open_to_open_returns_df, exposure_values_df)
-        trades = self._calculate_trades(prices_data_array, exposure_values_df)
         tickers, _ = convert_to_list(tickers, Ticker)
+        trades = self._calculate_trades(prices_data_array, exposure_values_df, tickers)
 
         element = BacktestSummaryElement(config.model_parameters(), config.tested_parameters_names, portfolio_rets_tms,
                                          trades, tickers)
@@ -315,8 +503,12 @@ class FastAlphaModelTester:
 
         return portfolio_rets_tms
 
-    def _calculate_trades(self, prices_array: QFDataArray, exposure_df: QFDataFrame) -> List[Trade]:
-
+    def _calculate_trades(self, prices_array: QFDataArray, exposure_df: QFDataFrame,
+                          tickers: Sequence[Ticker]) -> np.ndarray:
+        """
+        Returns the structured array of trades (see trades_array.TRADES_DTYPE) of all the tickers from the
+        exposure_df. Tickers are stored as positions in the tickers sequence.
+        """
         if self._frequency > Frequency.DAILY:
             lag = pd.Timedelta(minutes=1)
         else:
@@ -325,16 +517,20 @@ class FastAlphaModelTester:
         shifted_exposure_df = QFDataFrame(data=exposure_df.values, index=exposure_df.index + lag,
                                           columns=exposure_df.columns)
 
-        trade_data_list = []
-        for ticker, exposures_tms in shifted_exposure_df.iteritems():
-            trade_data_partial_list = self.generate_trades_for_ticker(prices_array, exposures_tms, ticker)
-            trade_data_list.extend(trade_data_partial_list)
-
-        return trade_data_list
+        tickers_positions = {ticker: position for position, ticker in enumerate(tickers)}
+        trades_arrays = [
+            self._generate_trades_array_for_ticker(prices_array, exposures_tms, ticker, tickers_positions[ticker])
+            for ticker, exposures_tms in shifted_exposure_df.iteritems()
+        ]
+        return np.concatenate(trades_arrays) if trades_arrays else np.zeros(0, dtype=TRADES_DTYPE)
 
     def generate_trades_for_ticker(self, prices_array: QFDataArray, exposures_tms: pd.Series, ticker: Ticker) \
             -> List[Trade]:
+        trades = self._generate_trades_array_for_ticker(prices_array, exposures_tms, ticker, 0)
+        return trades_array_to_list(trades, [ticker])
 
+    def _generate_trades_array_for_ticker(self, prices_array: QFDataArray, exposures_tms: pd.Series, ticker: Ticker,
+                                          ticker_index: int) -> np.ndarray:
         open_prices_tms = cast_data_array_to_proper_type(prices_array.loc[:, ticker, PriceField.Open],
                                                          use_prices_types=True)
 
@@ -344,65 +540,23 @@ class FastAlphaModelTester:
 
         # historical data cropped to the time frame of the backtest (from start date till end date)
         historical_data = pd.concat((exposures_tms, open_prices_tms), axis=1).loc[self._start_date:]
-
-        prev_exposure = 0.0
-        trades_list = []
-
-        trade_start_date = None
-        trade_exposure = None
-        trade_start_price = None
+        times = historical_data.index.values
+        exposures = historical_data.iloc[:, 0].values.astype(np.float64)
+        prices = historical_data.iloc[:, 1].values.astype(np.float64)
 
         # If the first exposure is nan - skip it
-        first_exposure = historical_data.iloc[0, 0]
-        if np.isnan(first_exposure):
-            historical_data = historical_data.iloc[1:]
+        if len(exposures) > 0 and np.isnan(exposures[0]):
+            times, exposures, prices = times[1:], exposures[1:], prices[1:]
 
-        for curr_date, row in historical_data.iterrows():
-            curr_date = curr_date.to_pydatetime()
-            curr_exposure, curr_price = row.values
-
-            # skipping the nan Open prices
-            if np.isnan(curr_price):
+        # skipping the nan Open prices
+        is_nan_price = np.isnan(prices)
+        if is_nan_price.any():
+            for curr_date in pd.DatetimeIndex(times[is_nan_price]):
                 self.logger.warning("Open price is None, cannot create trade on {} for {}".format(
-                    curr_date, str(ticker)))
-                continue
+                    curr_date.to_pydatetime(), str(ticker)))
+            times, exposures, prices = times[~is_nan_price], exposures[~is_nan_price], prices[~is_nan_price]
 
-            out_of_the_market = trade_exposure is None
-            if out_of_the_market:
-                assert prev_exposure == 0.0
-
-                if curr_exposure != 0.0:
-                    trade_start_date = curr_date
-                    trade_exposure = curr_exposure
-                    trade_start_price = curr_price
-            else:
-                assert prev_exposure != 0.0
-
-                exposure_change = int(curr_exposure - prev_exposure)
-                should_close_position = exposure_change != 0.0
-
-                if should_close_position:
-                    trades_list.append(Trade(
-                        start_time=trade_start_date,
-                        end_time=curr_date,
-                        ticker=ticker,
-                        pnl=(curr_price / trade_start_price - 1) * trade_exposure,
-                        commission=0.0,
-                        direction=int(trade_exposure)
-                    ))
-                    trade_start_date = None
-                    trade_exposure = None
-                    trade_start_price = None
-
-                    going_into_opposite_direction = curr_exposure != 0.0
-                    if going_into_opposite_direction:
-                        trade_start_date = curr_date
-                        trade_exposure = curr_exposure
-                        trade_start_price = curr_price
-
-            prev_exposure = curr_exposure
-
-        return trades_list
+        return extract_trades(times, exposures, prices, ticker_index)
 
     def _generate_exposure_values(self, config: FastAlphaModelTesterConfig, data_provider: DataProvider,
                                   tickers: Sequence[Ticker]):
@@ -413,23 +567,60 @@ class FastAlphaModelTester:
         """
 
         model = config.generate_model(data_provider)
+        backtest_dates = self._get_backtest_dates()
 
+        for ticker in tickers:
+            if isinstance(ticker, FutureTicker):
+                # Even if the tickers were already initialized, during pickling process, the data provider and timer
+                # information is lost
+                ticker.initialize_data_provider(self._timer, data_provider)
+
+        exposure_values_df = self._calculate_exposures_in_batch(model, tickers, backtest_dates)
+        if exposure_values_df is None:
+            exposure_values_df = self._calculate_exposures_for_every_date(model, tickers, backtest_dates)
+
+        if self._close_position_at_the_end_of_day:
+            exposure_out = backtest_dates[backtest_dates == 1]
+            exposure_values_df.loc[exposure_out.index, :] = Exposure.OUT.value
+
+        exposure_values_df = exposure_values_df.dropna(axis=1, how="all")
+        return exposure_values_df
+
+    def _calculate_exposures_in_batch(self, model: AlphaModel, tickers: Sequence[Ticker],
+                                      backtest_dates: QFSeries) -> Optional[QFDataFrame]:
+        """
+        Calculates the exposures for all dates at once using the AlphaModel.calculate_exposures function. Returns None
+        if the model does not support the batch calculation or the calculation failed.
+        """
+        if backtest_dates.empty:
+            return None
+
+        self._timer.set_current_time(backtest_dates.index[-1])
+        try:
+            exposures_df = model.calculate_exposures(tickers, backtest_dates.index, self._data_frequency)
+        except Exception as ex:
+            self.logger.warning(f"Exception {ex} for batch exposure calculations. Exposures will be calculated "
+                                f"separately for every date.")
+            self.logger.warning(traceback.format_exc())
+            return None
+
+        if exposures_df is None:
+            return None
+
+        exposures_df = exposures_df.reindex(index=backtest_dates.index, columns=tickers)
+        return QFDataFrame(data=exposures_df.fillna(Exposure.OUT.value).values, index=backtest_dates.index,
+                           columns=pd.Index(tickers, name=TICKERS))
+
+    def _calculate_exposures_for_every_date(self, model: AlphaModel, tickers: Sequence[Ticker],
+                                            backtest_dates: QFSeries) -> QFDataFrame:
         current_exposures_values = QFSeries(index=pd.Index(tickers, name=TICKERS))
         current_exposures_values[:] = 0.0
 
-        backtest_dates = self._get_backtest_dates()
-
         exposure_values_df = QFDataFrame(
             index=backtest_dates.index,
             columns=pd.Index(tickers, name=TICKERS)
         )
 
-        for ticker in tickers:
-            if isinstance(ticker, FutureTicker):
-                # Even if the tickers were already initialized, during pickling process, the data provider and timer
-                # information is lost
-                ticker.initialize_data_provider(self._timer, data_provider)
-
         for i, curr_datetime in enumerate(backtest_dates.index):
             if i % 1000 == 0:
                 self.logger.info('{} / {} of Exposure dates processed'.format(i, len(backtest_dates)))
@@ -453,11 +644,6 @@ class FastAlphaModelTester:
             current_exposures_values = new_exposures
             exposure_values_df.iloc[i, :] = current_exposures_values
 
-        if self._close_position_at_the_end_of_day:
-            exposure_out = backtest_dates[backtest_dates == 1]
-            exposure_values_df.loc[exposure_out.index, :] = Exposure.OUT.value
-
-        exposure_values_df = exposure_values_df.dropna(axis=1, how="all")
         return exposure_values_df
 
     def _get_backtest_dates(self) -> QFSeries:
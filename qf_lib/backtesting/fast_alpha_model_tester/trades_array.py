@@ -0,0 +1,97 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from typing import Sequence, List
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.backtesting.portfolio.trade import Trade
+from qf_lib.common.tickers.tickers import Ticker
+
+# Compact representation of trades as a NumPy structured array. Every row corresponds to one trade and the ticker is
+# stored as the position in a separate sequence of tickers.
+TRADES_DTYPE = np.dtype([
+    ("start_time", "datetime64[ns]"),
+    ("end_time", "datetime64[ns]"),
+    ("ticker_index", np.int32),
+    ("pnl", np.float64),
+    ("commission", np.float64),
+    ("direction", np.int8),
+])
+
+
+def extract_trades(times: np.ndarray, exposures: np.ndarray, prices: np.ndarray, ticker_index: int) -> np.ndarray:
+    """
+    Extracts the trades resulting from following the given exposures of a single ticker. A trade is opened whenever
+    the exposure changes to a non-zero value and closed at the next change of the exposure. The trade, which is still
+    open after the last exposure, is not returned.
+
+    Parameters
+    ----------
+    times: np.ndarray
+        sorted datetime64 array of times, at which the exposures are set
+    exposures: np.ndarray
+        exposures values (e.g. Exposure.LONG.value) corresponding to the times
+    prices: np.ndarray
+        prices at which the positions are opened and closed, corresponding to the times. None of them can be nan
+    ticker_index: int
+        value of the ticker_index field of all the trades
+
+    Returns
+    -------
+    np.ndarray
+        structured array of TRADES_DTYPE type
+    """
+    previous_exposures = np.concatenate(([0.0], exposures[:-1]))
+    change_positions = np.flatnonzero(exposures != previous_exposures)
+
+    start_positions, end_positions = change_positions[:-1], change_positions[1:]
+    is_trade = exposures[start_positions] != 0.0
+    start_positions, end_positions = start_positions[is_trade], end_positions[is_trade]
+
+    trade_exposures = exposures[start_positions]
+    trades = np.zeros(len(start_positions), dtype=TRADES_DTYPE)
+    trades["start_time"] = times[start_positions]
+    trades["end_time"] = times[end_positions]
+    trades["ticker_index"] = ticker_index
+    trades["pnl"] = (prices[end_positions] / prices[start_positions] - 1) * trade_exposures
+    trades["direction"] = trade_exposures.astype(np.int8)
+    return trades
+
+
+def trades_array_to_list(trades: np.ndarray, tickers: Sequence[Ticker]) -> List[Trade]:
+    """ Creates Trade objects out of the structured array of trades. """
+    start_times = pd.to_datetime(trades["start_time"]).to_pydatetime()
+    end_times = pd.to_datetime(trades["end_time"]).to_pydatetime()
+
+    return [
+        Trade(start_time=start_time, end_time=end_time, ticker=tickers[ticker_index], pnl=float(pnl),
+              commission=float(commission), direction=int(direction))
+        for start_time, end_time, ticker_index, pnl, commission, direction in zip(
+            start_times, end_times, trades["ticker_index"], trades["pnl"], trades["commission"], trades["direction"])
+    ]
+
+
+def trades_list_to_array(trades: Sequence[Trade], tickers: Sequence[Ticker]) -> np.ndarray:
+    """ Creates the structured array of trades out of the Trade objects. All traded tickers need to be in tickers. """
+    tickers_positions = {ticker: position for position, ticker in enumerate(tickers)}
+
+    trades_array = np.zeros(len(trades), dtype=TRADES_DTYPE)
+    trades_array["start_time"] = [np.datetime64(t.start_time, "ns") for t in trades]
+    trades_array["end_time"] = [np.datetime64(t.end_time, "ns") for t in trades]
+    trades_array["ticker_index"] = [tickers_positions[t.ticker] for t in trades]
+    trades_array["pnl"] = [t.pnl for t in trades]
+    trades_array["commission"] = [t.commission for t in trades]
+    trades_array["direction"] = [t.direction for t in trades]
+    return trades_array
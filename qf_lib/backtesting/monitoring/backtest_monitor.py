@@ -290,7 +290,7 @@ class BacktestMonitor(AbstractMonitor):
             exposure_generator = ExposureGenerator(self._settings, self._monitor_settings.exposure_settings.data_provider)
 
             # setting ExposureGenerator parameters
-            exposure_generator.set_positions_history(self.backtest_result.portfolio.positions_history())
+            exposure_generator.set_positions_history(self.backtest_result.portfolio.positions_history_columns())
             exposure_generator.set_portfolio_nav_history(self.backtest_result.portfolio.portfolio_eod_series())
             exposure_generator.set_sector_exposure_tickers(self._monitor_settings.exposure_settings.sector_exposure_tickers)
             exposure_generator.set_factor_exposure_tickers(self._monitor_settings.exposure_settings.factor_exposure_tickers)
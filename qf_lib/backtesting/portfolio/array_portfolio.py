@@ -0,0 +1,87 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import numpy as np
+
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
+from qf_lib.backtesting.portfolio.backtest_position import BacktestPosition
+from qf_lib.backtesting.portfolio.portfolio import Portfolio
+from qf_lib.backtesting.portfolio.positions_store import PositionsStore
+from qf_lib.backtesting.portfolio.transaction import Transaction
+from qf_lib.common.utils.dateutils.timer import Timer
+
+
+class ArrayPortfolio(Portfolio):
+    """
+    Portfolio, which keeps the state of all open positions in the parallel NumPy arrays of the PositionsStore, so that
+    the revaluation of all the positions in the update function is performed with a few vectorised operations instead
+    of calling the functions of every position. The open positions (open_positions_dict) and closed positions are still
+    available as BacktestPositions, which read and write their state from and to the store.
+
+    Parameters
+    ----------
+    data_handler: DataHandler
+        data handler used to get the most recent prices of the assets
+    initial_cash: float
+        initial cash of the portfolio
+    timer: Timer
+        timer used to record the time of the portfolio updates
+    initial_capacity: int
+        initial number of positions, which may be open at the same time without enlarging the arrays of the store
+    """
+
+    def __init__(self, data_handler: DataHandler, initial_cash: float, timer: Timer, initial_capacity: int = 64):
+        super().__init__(data_handler, initial_cash, timer)
+        self._positions_store = PositionsStore(initial_capacity)
+        self._open_positions_slots = None
+
+    def update(self, record=False):
+        self.net_liquidation = self.current_cash
+        self.gross_exposure_of_positions = 0
+
+        market_values = total_exposures = np.empty(0)
+        slots = self._get_open_positions_slots()
+
+        if self.open_positions_dict:
+            tickers = list(self.open_positions_dict.keys())
+            current_prices = self.data_handler.get_last_available_price(tickers=tickers)
+            current_prices = np.asarray(current_prices.loc[tickers].values, dtype=np.float64)
+
+            market_values, total_exposures = self._positions_store.revalue(slots, current_prices)
+            self.net_liquidation += market_values.sum()
+            self.gross_exposure_of_positions += np.abs(total_exposures).sum()
+
+        if record:
+            self._record_state(quantities=self._positions_store.column("quantity")[slots],
+                               market_values=market_values, total_exposures=total_exposures,
+                               total_pnls=self._positions_store.total_pnls(slots),
+                               directions=self._positions_store.column("direction")[slots])
+
+    def _get_open_positions_slots(self) -> np.ndarray:
+        """ Slots of the open positions in the order of the open_positions_dict. """
+        if self._open_positions_slots is None:
+            self._open_positions_slots = np.fromiter(
+                (position.slot for position in self.open_positions_dict.values()), dtype=np.intp,
+                count=len(self.open_positions_dict))
+        return self._open_positions_slots
+
+    def _create_new_position(self, transaction: Transaction):
+        new_position = self._positions_store.create_position(transaction.ticker)
+        self.open_positions_dict[transaction.ticker] = new_position
+        self._open_positions_slots = None
+        return new_position
+
+    def _remove_closed_position(self, position: BacktestPosition):
+        super()._remove_closed_position(position)
+        self._positions_store.release_position(position)
+        self._open_positions_slots = None
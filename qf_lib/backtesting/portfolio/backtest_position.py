@@ -221,3 +221,15 @@ class BacktestPositionSummary:
         self.market_values = backtest_position.market_value()
         self.total_pnl = backtest_position.total_pnl
         self.direction = backtest_position.direction()
+
+    @classmethod
+    def from_values(cls, ticker: Ticker, total_exposure: float, market_value: float, total_pnl: float,
+                    direction: int) -> "BacktestPositionSummary":
+        """ Creates the summary out of the values recorded e.g. in the PositionsHistory. """
+        summary = cls.__new__(cls)
+        summary.ticker = ticker
+        summary.total_exposure = total_exposure
+        summary.market_values = market_value
+        summary.total_pnl = total_pnl
+        summary.direction = direction
+        return summary
@@ -12,11 +12,12 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Sequence
 
 from qf_lib.backtesting.data_handler.data_handler import DataHandler
-from qf_lib.backtesting.portfolio.backtest_position import BacktestPosition, BacktestPositionSummary
+from qf_lib.backtesting.portfolio.backtest_position import BacktestPosition
 from qf_lib.backtesting.portfolio.position_factory import BacktestPositionFactory
+from qf_lib.backtesting.portfolio.positions_history import PositionsHistory
 from qf_lib.backtesting.portfolio.transaction import Transaction
 from qf_lib.backtesting.portfolio.utils import split_transaction_if_needed
 from qf_lib.common.tickers.tickers import Ticker
@@ -55,9 +56,9 @@ class Portfolio:
         self._portfolio_values = []  # type: List[float]
         self._leverage_list = []  # type: List[float]
 
-        self._positions_history = []  # type: List[Dict[Ticker, BacktestPositionSummary]]
-        """ A list containing dictionaries with summarized assets information in form of BacktestPositionSummary
-        objects, which provide information about open positions at a certain point of time. """
+        self._positions_history = PositionsHistory()
+        """ Columnar history of the quantities, market values, total exposures, total pnls and directions of the open
+        positions at a certain point of time. """
 
         self._closed_positions = []  # type: List[BacktestPosition]
         """ List of all closed positions created throughout the backtest. """
@@ -82,9 +83,7 @@ class Portfolio:
 
             transaction_cost += existing_position.transact_transaction(basic_transaction)
             if existing_position.is_closed():
-                ticker = transaction.ticker
-                self.open_positions_dict.pop(ticker)
-                self._closed_positions.append(existing_position)
+                self._remove_closed_position(existing_position)
 
             if results_in_opposite_direction:  # means we were going from Long to Short in one transaction
                 new_position = self._create_new_position(remaining_transaction)
@@ -105,7 +104,8 @@ class Portfolio:
         tickers = list(self.open_positions_dict.keys())
         current_prices_series = self.data_handler.get_last_available_price(tickers=tickers)
 
-        current_positions = {}
+        market_values = []
+        total_exposures = []
         for ticker, position in self.open_positions_dict.items():
             security_price = current_prices_series[ticker]
             position.update_price(bid_price=security_price, ask_price=security_price)
@@ -113,14 +113,28 @@ class Portfolio:
             position_exposure = position.total_exposure()
             self.net_liquidation += position_value
             self.gross_exposure_of_positions += abs(position_exposure)
-            if record:
-                current_positions[ticker] = BacktestPositionSummary(position)
+            market_values.append(position_value)
+            total_exposures.append(position_exposure)
 
         if record:
-            self._dates.append(self.timer.now())
-            self._portfolio_values.append(self.net_liquidation)
-            self._leverage_list.append(self.gross_exposure_of_positions / self.net_liquidation)
-            self._positions_history.append(current_positions)
+            positions = self.open_positions_dict.values()
+            self._record_state(quantities=[position.quantity() for position in positions],
+                               market_values=market_values, total_exposures=total_exposures,
+                               total_pnls=[position.total_pnl for position in positions],
+                               directions=[position.direction() for position in positions])
+
+    def _record_state(self, quantities: Sequence[float], market_values: Sequence[float],
+                      total_exposures: Sequence[float], total_pnls: Sequence[float], directions: Sequence[int]):
+        """
+        Records the current portfolio value, leverage and the state of the open positions. The values of the
+        positions should be given in the order of the open_positions_dict.
+        """
+        now = self.timer.now()
+        self._dates.append(now)
+        self._portfolio_values.append(self.net_liquidation)
+        self._leverage_list.append(self.gross_exposure_of_positions / self.net_liquidation)
+        self._positions_history.append(now, list(self.open_positions_dict.keys()), quantities, market_values,
+                                       total_exposures, total_pnls, directions)
 
     def portfolio_eod_series(self) -> PricesSeries:
         """
@@ -138,9 +152,25 @@ class Portfolio:
 
     def positions_history(self) -> QFDataFrame:
         """
-        Returns a QFDataFrame containing summary of the positions in the portfolio for each day.
+        Returns a QFDataFrame containing summary of the positions in the portfolio for each day. The values of
+        the dataframe are BacktestPositionSummary objects (NaN if the position was not open at the given date).
+        To get the history of a single field without creating the summaries use positions_history_frame.
+        """
+        return self._positions_history.to_summaries_frame()
+
+    def positions_history_frame(self, field: str) -> QFDataFrame:
+        """
+        Returns a QFDataFrame containing the values of the given field ("quantity", "market_value", "total_exposure",
+        "total_pnl" or "direction") of the positions in the portfolio for each day (NaN if the position was not open at
+        the given date).
         """
-        return QFDataFrame(data=self._positions_history, index=self._dates)
+        return self._positions_history.to_frame(field)
+
+    def positions_history_columns(self) -> PositionsHistory:
+        """
+        Returns the columnar history of the positions in the portfolio.
+        """
+        return self._positions_history
 
     def closed_positions(self) -> List[BacktestPosition]:
         return self._closed_positions
@@ -149,3 +179,7 @@ class Portfolio:
         new_position = BacktestPositionFactory.create_position(transaction.ticker)
         self.open_positions_dict[transaction.ticker] = new_position
         return new_position
+
+    def _remove_closed_position(self, position: BacktestPosition):
+        self.open_positions_dict.pop(position.ticker())
+        self._closed_positions.append(position)
@@ -0,0 +1,151 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from typing import List, Sequence
+
+import numpy as np
+from pandas import DatetimeIndex
+
+from qf_lib.backtesting.portfolio.backtest_position import BacktestPositionSummary
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+
+POSITIONS_HISTORY_DTYPE = np.dtype([
+    ("date_index", np.int32),
+    ("ticker_id", np.int32),
+    ("quantity", np.float64),
+    ("market_value", np.float64),
+    ("total_exposure", np.float64),
+    ("total_pnl", np.float64),
+    ("direction", np.int8),
+])
+
+
+class PositionsHistory:
+    """
+    Append-only history of the open positions of the portfolio. Every recorded position is stored as one record of
+    the POSITIONS_HISTORY_DTYPE structured array (index of the date, id of the ticker, quantity, market value, total
+    exposure, total pnl and direction of the position). The records are kept in fixed-size NumPy chunks, so that
+    recording does not create any Python objects per position and does not require copying the whole history.
+
+    Parameters
+    ----------
+    chunk_size: int
+        number of records stored in a single chunk
+    """
+
+    fields = ["quantity", "market_value", "total_exposure", "total_pnl", "direction"]
+
+    def __init__(self, chunk_size: int = 4096):
+        self._chunk_size = chunk_size
+        self._full_chunks = []  # type: List[np.ndarray]
+        self._current_chunk = np.empty(chunk_size, dtype=POSITIONS_HISTORY_DTYPE)
+        self._current_chunk_length = 0
+
+        self._dates = []  # type: List[datetime]
+        self._tickers = []  # type: List[Ticker]
+        self._ticker_ids = {}
+
+    @property
+    def dates(self) -> List[datetime]:
+        """ Dates, at which the positions were recorded. """
+        return self._dates
+
+    @property
+    def tickers(self) -> List[Ticker]:
+        """ All tickers, which appeared in the history, ordered by their ids. """
+        return self._tickers
+
+    def __len__(self):
+        return len(self._full_chunks) * self._chunk_size + self._current_chunk_length
+
+    def append(self, date: datetime, tickers: Sequence[Ticker], quantities: Sequence[float],
+               market_values: Sequence[float], total_exposures: Sequence[float], total_pnls: Sequence[float],
+               directions: Sequence[int]):
+        """
+        Records the state of the open positions at the given date. All sequences should have the same length as the
+        list of tickers. The date is recorded even if there are no open positions.
+        """
+        date_index = len(self._dates)
+        self._dates.append(date)
+
+        number_of_positions = len(tickers)
+        if number_of_positions == 0:
+            return
+
+        records = np.empty(number_of_positions, dtype=POSITIONS_HISTORY_DTYPE)
+        records["date_index"] = date_index
+        records["ticker_id"] = [self._get_ticker_id(ticker) for ticker in tickers]
+        records["quantity"] = quantities
+        records["market_value"] = market_values
+        records["total_exposure"] = total_exposures
+        records["total_pnl"] = total_pnls
+        records["direction"] = directions
+
+        written = 0
+        while written < number_of_positions:
+            if self._current_chunk_length == self._chunk_size:
+                self._full_chunks.append(self._current_chunk)
+                self._current_chunk = np.empty(self._chunk_size, dtype=POSITIONS_HISTORY_DTYPE)
+                self._current_chunk_length = 0
+
+            size = min(number_of_positions - written, self._chunk_size - self._current_chunk_length)
+            self._current_chunk[self._current_chunk_length:self._current_chunk_length + size] = \
+                records[written:written + size]
+            self._current_chunk_length += size
+            written += size
+
+    def records(self) -> np.ndarray:
+        """ Returns all the records as a single structured array of POSITIONS_HISTORY_DTYPE. """
+        return np.concatenate(self._full_chunks + [self._current_chunk[:self._current_chunk_length]])
+
+    def nbytes(self) -> int:
+        """ Number of bytes allocated for the records. """
+        return (len(self._full_chunks) + 1) * self._chunk_size * POSITIONS_HISTORY_DTYPE.itemsize
+
+    def to_frame(self, field: str) -> QFDataFrame:
+        """
+        Returns a QFDataFrame indexed by the recorded dates, with tickers as columns and the values of the given field
+        (one of the PositionsHistory.fields). The value is NaN if there was no open position for the ticker at the
+        given date.
+        """
+        if field not in self.fields:
+            raise ValueError("Unknown field {}. The available fields: {}".format(field, ", ".join(self.fields)))
+
+        records = self.records()
+        values = np.full((len(self._dates), len(self._tickers)), np.nan)
+        values[records["date_index"], records["ticker_id"]] = records[field]
+        return QFDataFrame(data=values, index=DatetimeIndex(self._dates), columns=self._tickers)
+
+    def to_summaries_frame(self) -> QFDataFrame:
+        """
+        Returns a QFDataFrame indexed by the recorded dates, with tickers as columns and the BacktestPositionSummary
+        of every open position as values (NaN if there was no open position for the ticker at the given date).
+        """
+        records = self.records()
+        values = np.full((len(self._dates), len(self._tickers)), np.nan, dtype=object)
+        for record in records:
+            values[record["date_index"], record["ticker_id"]] = BacktestPositionSummary.from_values(
+                ticker=self._tickers[record["ticker_id"]], total_exposure=float(record["total_exposure"]),
+                market_value=float(record["market_value"]), total_pnl=float(record["total_pnl"]),
+                direction=int(record["direction"]))
+        return QFDataFrame(data=values, index=DatetimeIndex(self._dates), columns=self._tickers)
+
+    def _get_ticker_id(self, ticker: Ticker) -> int:
+        ticker_id = self._ticker_ids.get(ticker)
+        if ticker_id is None:
+            ticker_id = len(self._tickers)
+            self._ticker_ids[ticker] = ticker_id
+            self._tickers.append(ticker)
+        return ticker_id
@@ -0,0 +1,208 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from typing import List, Tuple, Optional, Any, Callable
+
+import numpy as np
+
+from qf_lib.backtesting.portfolio.backtest_crypto_position import BacktestCryptoPosition
+from qf_lib.backtesting.portfolio.backtest_equity_position import BacktestEquityPosition
+from qf_lib.backtesting.portfolio.backtest_future_position import BacktestFuturePosition
+from qf_lib.backtesting.portfolio.backtest_position import BacktestPosition
+from qf_lib.common.enums.security_type import SecurityType
+from qf_lib.common.tickers.tickers import Ticker
+
+
+class PositionsStore:
+    """
+    Keeps the state of positions (quantities, average prices, point values, directions, realised PnL, commissions
+    and current prices) in parallel NumPy arrays. Every open position occupies one slot of the arrays and is accessed
+    through a BacktestPosition view, created by the create_position function. The slot is released and reused after
+    the position is closed.
+
+    Parameters
+    ----------
+    initial_capacity: int
+        initial number of slots. The arrays are enlarged if more positions are opened at the same time.
+    """
+
+    _columns_dtypes = {
+        "quantity": np.float64,
+        "avg_price": np.float64,
+        "direction": np.float64,
+        "realised_pnl": np.float64,
+        "commission": np.float64,
+        "current_price": np.float64,
+        "point_value": np.float64,
+        "is_margin": np.bool_,
+    }
+
+    def __init__(self, initial_capacity: int = 64):
+        self._columns = {
+            column: np.zeros(initial_capacity, dtype=dtype) for column, dtype in self._columns_dtypes.items()
+        }
+        self._free_slots = list(reversed(range(initial_capacity)))  # type: List[int]
+
+    @classmethod
+    def columns(cls) -> List[str]:
+        return list(cls._columns_dtypes.keys())
+
+    @property
+    def capacity(self) -> int:
+        return len(self._columns["quantity"])
+
+    def column(self, column: str) -> np.ndarray:
+        return self._columns[column]
+
+    def create_position(self, ticker: Ticker) -> BacktestPosition:
+        """
+        Creates the position view of the type corresponding to the security type of the ticker, which stores its
+        state in a free slot of the arrays.
+        """
+        sec_type = ticker.security_type
+        if sec_type == SecurityType.STOCK:
+            position_type = StoredEquityPosition
+        elif sec_type == SecurityType.FUTURE:
+            position_type = StoredFuturePosition
+        elif sec_type == SecurityType.CRYPTO:
+            position_type = StoredCryptoPosition
+        else:
+            raise ValueError("Ticker security type: '{}' is not currently supported.".format(sec_type))
+
+        if not self._free_slots:
+            self._enlarge()
+        slot = self._free_slots.pop()
+
+        is_future = sec_type == SecurityType.FUTURE
+        self._columns["point_value"][slot] = ticker.point_value if is_future else 1.0
+        self._columns["is_margin"][slot] = is_future
+
+        return position_type(ticker, self, slot)
+
+    def release_position(self, position: "StoredPosition"):
+        """ Copies the state of the (closed) position into the position object and frees its slot. """
+        slot = position.slot
+        position.detach()
+        self._free_slots.append(slot)
+
+    def revalue(self, slots: np.ndarray, prices: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Updates the current prices of the positions in the given slots (the same way as BacktestPosition.update_price,
+        with bid and ask prices equal to the given prices) and returns the arrays of their market values and total
+        exposures.
+        """
+        quantities = self._columns["quantity"][slots]
+        current_prices = self._columns["current_price"][slots]
+        current_prices = np.where(np.isfinite(prices) & (quantities != 0), prices, current_prices)
+        self._columns["current_price"][slots] = current_prices
+
+        current_prices = np.nan_to_num(current_prices, nan=0.0)
+        total_exposures = quantities * self._columns["point_value"][slots] * current_prices
+        # Market value of the margin securities (futures) is equal to their unrealised pnl
+        market_values = np.where(self._columns["is_margin"][slots], self._unrealised_pnls(slots),
+                                 quantities * current_prices)
+        return market_values, total_exposures
+
+    def total_pnls(self, slots: np.ndarray) -> np.ndarray:
+        """ Returns the total pnls (including all commissions and fees) of the positions in the given slots. """
+        return self._columns["realised_pnl"][slots] + self._unrealised_pnls(slots) - self._columns["commission"][slots]
+
+    def _unrealised_pnls(self, slots: np.ndarray) -> np.ndarray:
+        current_prices = self._columns["current_price"][slots]
+        quantities = self._columns["quantity"][slots] * self._columns["point_value"][slots]
+        unrealised_pnls = (current_prices - self._columns["avg_price"][slots]) * quantities
+        return np.where(np.isnan(current_prices), 0.0, unrealised_pnls)
+
+    def _enlarge(self):
+        old_capacity = self.capacity
+        new_capacity = 2 * old_capacity if old_capacity > 0 else 1
+        for column, values in self._columns.items():
+            new_values = np.zeros(new_capacity, dtype=values.dtype)
+            new_values[:old_capacity] = values
+            self._columns[column] = new_values
+        self._free_slots.extend(reversed(range(old_capacity, new_capacity)))
+
+
+def _stored_attribute(column: str, to_python: Callable[[Any, float], Any], from_python: Callable[[Any], float] = float):
+    """ Creates the property, which reads and writes the attribute of the position from and to the PositionsStore. """
+
+    def get_value(position: "StoredPosition"):
+        if position.detached_state is not None:
+            value = position.detached_state[column]
+        else:
+            value = position.store.column(column)[position.slot]
+        return to_python(position, value)
+
+    def set_value(position: "StoredPosition", value):
+        if position.detached_state is not None:
+            position.detached_state[column] = from_python(value)
+        else:
+            position.store.column(column)[position.slot] = from_python(value)
+
+    return property(get_value, set_value)
+
+
+def _to_quantity(position: "StoredPosition", value: float):
+    value = float(value)
+    return int(value) if position.integer_quantity and value.is_integer() else value
+
+
+def _to_optional_float(_, value: float) -> Optional[float]:
+    return None if np.isnan(value) else float(value)
+
+
+def _from_optional_float(value: Optional[float]) -> float:
+    return np.nan if value is None else float(value)
+
+
+class StoredPosition:
+    """
+    Mixin of BacktestPosition, which keeps the state of the position in a slot of the PositionsStore instead of
+    the attributes of the object. After the position is detached from the store (once it is closed), its state is
+    kept in the detached_state dictionary.
+    """
+
+    integer_quantity = True
+
+    def __init__(self, ticker: Ticker, store: PositionsStore, slot: int):
+        self.store = store  # type: Optional[PositionsStore]
+        self.slot = slot  # type: Optional[int]
+        self.detached_state = None
+        super().__init__(ticker)
+
+    _quantity = _stored_attribute("quantity", _to_quantity)
+    _avg_price_per_unit = _stored_attribute("avg_price", lambda _, value: float(value))
+    _direction = _stored_attribute("direction", lambda _, value: int(value))
+    _realised_pnl_without_commissions = _stored_attribute("realised_pnl", lambda _, value: float(value))
+    _commission = _stored_attribute("commission", lambda _, value: float(value))
+    _current_price = _stored_attribute("current_price", _to_optional_float, _from_optional_float)
+
+    def detach(self):
+        """ Copies the state of the position out of the store. """
+        self.detached_state = {
+            column: self.store.column(column)[self.slot].item() for column in PositionsStore.columns()
+        }
+        self.store = None
+        self.slot = None
+
+
+class StoredEquityPosition(StoredPosition, BacktestEquityPosition):
+    pass
+
+
+class StoredFuturePosition(StoredPosition, BacktestFuturePosition):
+    pass
+
+
+class StoredCryptoPosition(StoredPosition, BacktestCryptoPosition):
+    integer_quantity = False
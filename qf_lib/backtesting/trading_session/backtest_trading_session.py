@@ -11,7 +11,7 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
-from typing import Union, Sequence
+from typing import Union, Sequence, Optional
 
 from qf_lib.backtesting.broker.backtest_broker import BacktestBroker
 from qf_lib.backtesting.contract.contract_to_ticker_conversion.base import ContractTickerMapper
@@ -33,6 +33,7 @@ from qf_lib.common.utils.dateutils.timer import SettableTimer
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
 from qf_lib.containers.helpers import compute_container_hash
+from qf_lib.data_providers.data_bundle_cache import DataBundleCache
 
 
 class BacktestTradingSession(TradingSession):
@@ -74,7 +75,8 @@ class BacktestTradingSession(TradingSession):
 
         self._hash_of_data_bundle = None
 
-    def use_data_preloading(self, tickers: Union[Ticker, Sequence[Ticker]], time_delta: RelativeDelta = None):
+    def use_data_preloading(self, tickers: Union[Ticker, Sequence[Ticker]], time_delta: RelativeDelta = None,
+                            cache: Optional[DataBundleCache] = None):
         if time_delta is None:
             time_delta = RelativeDelta(years=1)
         data_start = self.start_date - time_delta
@@ -83,7 +85,7 @@ class BacktestTradingSession(TradingSession):
         # the same set of tickers and fields
         tickers, _ = convert_to_list(tickers, Ticker)
         self.data_handler.use_data_bundle(sorted(tickers), sorted(PriceField.ohlcv()), data_start, self.end_date,
-                                          self.frequency)
+                                          self.frequency, cache)
         self._hash_of_data_bundle = compute_container_hash(self.data_handler.data_provider.data_bundle)
         self.logger.info("Preloaded data hash value {}".format(self._hash_of_data_bundle))
 
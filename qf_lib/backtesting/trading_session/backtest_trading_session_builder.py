@@ -24,7 +24,8 @@ from qf_lib.backtesting.events.event_manager import EventManager
 from qf_lib.backtesting.events.notifiers import Notifiers
 from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
 from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
-from qf_lib.backtesting.events.time_flow_controller import BacktestTimeFlowController
+from qf_lib.backtesting.events.time_flow_controller import BacktestTimeFlowController, \
+    FastForwardBacktestTimeFlowController
 from qf_lib.backtesting.execution_handler.commission_models.commission_model import CommissionModel
 from qf_lib.backtesting.execution_handler.commission_models.fixed_commission_model import FixedCommissionModel
 from qf_lib.backtesting.execution_handler.simulated_execution_handler import SimulatedExecutionHandler
@@ -35,6 +36,7 @@ from qf_lib.backtesting.monitoring.backtest_result import BacktestResult
 from qf_lib.backtesting.order.order_factory import OrderFactory
 from qf_lib.backtesting.order.order_rounder import OrderRounder
 from qf_lib.backtesting.orders_filter.orders_filter import OrdersFilter
+from qf_lib.backtesting.portfolio.array_portfolio import ArrayPortfolio
 from qf_lib.backtesting.portfolio.portfolio import Portfolio
 from qf_lib.backtesting.position_sizer.position_sizer import PositionSizer
 from qf_lib.backtesting.position_sizer.simple_position_sizer import SimplePositionSizer
@@ -106,6 +108,8 @@ class BacktestTradingSessionBuilder:
 
         self._frequency = None
         self._scheduling_time_delay = RelativeDelta(minutes=1)
+        self._fast_forward_time_flow = False
+        self._array_portfolio = False
 
         self._default_daily_market_open_time = {"hour": 13, "minute": 30, "second": 0, "microsecond": 0}
         self._default_daily_market_close_time = {"hour": 20, "minute": 0, "second": 0, "microsecond": 0}
@@ -186,6 +190,34 @@ class BacktestTradingSessionBuilder:
         """
         self._scheduling_time_delay = time_delay
 
+    @ConfigExporter.update_config
+    def set_fast_forward_time_flow(self, fast_forward_time_flow: bool):
+        """Enables or disables skipping the intraday bars, for which no ticker has any data (e.g. weekends, holidays
+        or the time outside of trading sessions). It is only possible for intraday backtests (Frequency.MIN_1, the only
+        intraday frequency supported by the backtester). The timestamps of bars are taken from the data bundle, so
+        the data provider needs to be a PresetDataProvider or the data needs to be preloaded (use_data_preloading
+        of the BacktestTradingSession). Orders cannot be executed on the skipped bars. Disabled by default.
+
+        Parameters
+        -----------
+        fast_forward_time_flow: bool
+            True if the bars without data should be skipped
+        """
+        self._fast_forward_time_flow = fast_forward_time_flow
+
+    @ConfigExporter.update_config
+    def set_array_portfolio(self, array_portfolio: bool):
+        """Enables or disables the ArrayPortfolio, which keeps the state of all open positions in NumPy arrays and
+        revalues them with vectorised operations. It speeds up backtests with a large number of open positions.
+        Disabled by default.
+
+        Parameters
+        -----------
+        array_portfolio: bool
+            True if the ArrayPortfolio should be used instead of the Portfolio
+        """
+        self._array_portfolio = array_portfolio
+
     @ConfigExporter.update_config
     def set_initial_cash(self, initial_cash: int):
         """Sets the initial cash value.
@@ -408,7 +440,8 @@ class BacktestTradingSessionBuilder:
         self._data_handler = self._create_data_handler(self._data_provider, self._timer)
         signals_register = self._signals_register if self._signals_register else BacktestSignalsRegister()
 
-        self._portfolio = Portfolio(self._data_handler, self._initial_cash, self._timer)
+        portfolio_type = ArrayPortfolio if self._array_portfolio else Portfolio
+        self._portfolio = portfolio_type(self._data_handler, self._initial_cash, self._timer)
 
         self._backtest_result = BacktestResult(self._portfolio, signals_register, self._backtest_name, start_date,
                                                end_date, self._initial_risk)
@@ -421,9 +454,7 @@ class BacktestTradingSessionBuilder:
             self._portfolio, self._slippage_model,
             scheduling_time_delay=self._scheduling_time_delay, frequency=self._frequency)
 
-        self._time_flow_controller = BacktestTimeFlowController(
-            self._notifiers.scheduler, self._events_manager, self._timer,
-            self._notifiers.empty_queue_event_notifier, end_date)
+        self._time_flow_controller = self._time_flow_controller_setup(end_date)
 
         self._broker = BacktestBroker(self._contract_ticker_mapper, self._portfolio, self._execution_handler)
         self._order_factory = OrderFactory(self._broker, self._data_handler)
@@ -486,6 +517,23 @@ class BacktestTradingSessionBuilder:
 
         return ts
 
+    def _time_flow_controller_setup(self, end_date: datetime) -> BacktestTimeFlowController:
+        if self._fast_forward_time_flow:
+            if self._frequency != Frequency.MIN_1:
+                self._logger.warning("Fast-forward time flow can only be used in intraday (Frequency.MIN_1) "
+                                     "backtests. All the time events will be generated.")
+            else:
+                # The timestamps are read from the data handler's data provider on the first time event, as the data
+                # may be preloaded (and the data provider replaced) after the session is built
+                return FastForwardBacktestTimeFlowController(
+                    self._notifiers.scheduler, self._events_manager, self._timer,
+                    self._notifiers.empty_queue_event_notifier, end_date, frequency=self._frequency,
+                    data_handler=self._data_handler)
+
+        return BacktestTimeFlowController(
+            self._notifiers.scheduler, self._events_manager, self._timer,
+            self._notifiers.empty_queue_event_notifier, end_date)
+
     def _monitor_setup(self) -> BacktestMonitor:
         monitor = BacktestMonitor(self._backtest_result, self._settings, self._pdf_exporter,
                                   self._excel_exporter, self._monitor_settings, self._benchmark_tms)
@@ -503,7 +551,9 @@ class BacktestTradingSessionBuilder:
         return orders_filters
 
     def _slippage_model_setup(self):
-        return self._slippage_model_type(data_provider=self._data_provider, **self._slippage_model_kwargs)
+        # The data handler is passed in order to use the data provider holding the preloaded data (if data preloading
+        # is used), which is set up in the data handler after the trading session is built
+        return self._slippage_model_type(data_provider=self._data_handler, **self._slippage_model_kwargs)
 
     def _commission_model_setup(self):
         return self._commission_model_type(**self._commission_model_kwargs)
@@ -11,22 +11,30 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+from typing import Union, Tuple
+
+import numpy as np
+from scipy.signal import lfilter
 
 from qf_lib.common.enums.frequency import Frequency
-from qf_lib.common.utils.volatility.get_volatility import get_volatility
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.series.qf_series import QFSeries
 
 
-def rolling_volatility(qf_series: QFSeries, frequency: Frequency = None, annualise: bool = True,
-                       window_size: int = None) -> QFSeries:
+def rolling_volatility(qf_series: Union[QFSeries, QFDataFrame], frequency: Frequency = None, annualise: bool = True,
+                       window_size: int = None, min_periods: int = None, decay: float = None,
+                       numerically_stable: bool = False) -> Union[QFSeries, QFDataFrame]:
     """
     Calculates the rolling volatility for the given series of returns. If the annualise parameter is set to be True,
     then it is obligatory to specify frequency.
 
+    The volatility (standard deviation of log returns) of all windows is computed at once, in O(n) for each column,
+    from the rolling sums of returns and squared returns. Missing returns are skipped (they do not count as samples).
+
     Parameters
     ----------
-    qf_series: QFSeries
-        series of returns or prices
+    qf_series: QFSeries, QFDataFrame
+        series of returns or prices (or a data frame, in which case the volatility is computed for each column)
     frequency: Frequency
         the frequency of samples in the returns series; it is only obligatory to specify frequency if the annualise
         parameter is set to True, which is a default value
@@ -36,28 +44,136 @@ def rolling_volatility(qf_series: QFSeries, frequency: Frequency = None, annuali
     window_size: int
         number of samples from which the rolling volatility will be calculated. If it is not set, then only overall
         volatility (of the whole series) will be calculated
+    min_periods: int
+        minimal number of (not missing) returns required to compute the volatility. If it is set, the result starts at
+        the min_periods-th return and the first windows are shorter than window_size. By default the result starts
+        at the window_size-th return and at least 2 returns in the window are required.
+    decay: float
+        if set, the returns are exponentially weighted: the weight of the return observed k samples before the end
+        of the window is equal to decay^k (e.g. 0.94 as in RiskMetrics). The weighted variance is unbiased (as in
+        the pandas ewm(adjust=True).std()).
+    numerically_stable: bool
+        if True, the variance of equally weighted windows is updated with the Welford algorithm (adding the new
+        return and removing the oldest one), instead of being derived from the rolling sums. It is slower, but does not
+        lose precision for series of large values with small variance. It can't be used together with decay.
 
     Returns
     -------
-    QFSeries
+    QFSeries, QFDataFrame
         Series of volatility values for each day concerning last window_size days.
     """
-    returns_tms = qf_series.to_log_returns()
     if annualise:
         assert frequency is not None
+    if numerically_stable and decay is not None:
+        raise ValueError("The numerically stable variant can be used only for equally weighted windows")
+
+    returns_tms = qf_series.to_log_returns()
+    values = returns_tms.values.astype(np.float64)
+    if values.ndim == 1:
+        values = values[:, np.newaxis]
+
+    if window_size is None:
+        window_size = len(values)
+    first_position = (window_size if min_periods is None else min_periods) - 1
+    min_number_of_samples = max(2, min_periods or 2)
+
+    if numerically_stable:
+        variance, number_of_samples = _rolling_variance_welford(values, window_size)
+    else:
+        variance, number_of_samples = _rolling_variance(values, window_size, decay)
+
+    volatility = np.sqrt(variance)
+    volatility[number_of_samples < min_number_of_samples] = np.nan
+    if annualise:
+        volatility = volatility * np.sqrt(frequency.occurrences_in_year)
+
+    dates = returns_tms.index[first_position:]
+    volatility = volatility[first_position:]
+    if isinstance(returns_tms, QFDataFrame):
+        return QFDataFrame(data=volatility, index=dates, columns=returns_tms.columns)
+    return QFSeries(data=volatility[:, 0], index=dates)
+
+
+def _rolling_variance(values: np.ndarray, window_size: int, decay: float = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the variance of all windows (ending at each row) for every column of values from the rolling
+    (weighted) sums of the values and squared values. Returns the variance and the number of samples in each window.
+    """
+    is_valid = ~np.isnan(values)
+    valid_indicators = is_valid.astype(np.float64)
+    number_of_samples = _rolling_sum(valid_indicators, window_size, 1.0)
+
+    # shifting the values by the mean of each column reduces the loss of precision in the sum of squares
+    with np.errstate(all="ignore"):
+        shift = np.nanmean(values, axis=0)
+    shifted_values = np.where(is_valid, values - np.nan_to_num(shift), 0.0)
+
+    decay = 1.0 if decay is None else decay
+    sum_of_weights = _rolling_sum(valid_indicators, window_size, decay)
+    sum_of_squared_weights = _rolling_sum(valid_indicators, window_size, decay ** 2)
+    weighted_sum = _rolling_sum(shifted_values, window_size, decay)
+    weighted_sum_of_squares = _rolling_sum(shifted_values ** 2, window_size, decay)
+
+    with np.errstate(all="ignore"):
+        sum_of_squared_deviations = weighted_sum_of_squares - weighted_sum ** 2 / sum_of_weights
+        variance = sum_of_squared_deviations / (sum_of_weights - sum_of_squared_weights / sum_of_weights)
+
+    # rounding errors may produce slightly negative values for windows of equal values
+    return np.maximum(variance, 0.0), number_of_samples
+
+
+def _rolling_sum(values: np.ndarray, window_size: int, decay: float) -> np.ndarray:
+    """
+    Calculates the sum of values (weighted by the powers of decay) in all windows of the given size, along the first
+    axis. The exponentially weighted sum from the beginning of the series is computed recursively and the contribution
+    of the values, which are outside of the window, is subtracted from it.
+    """
+    if decay == 1.0:
+        cumulative_sums = np.cumsum(values, axis=0)
+    else:
+        cumulative_sums = lfilter([1.0], [1.0, -decay], values, axis=0)
+
+    rolling_sums = cumulative_sums.copy()
+    rolling_sums[window_size:] -= decay ** window_size * cumulative_sums[:-window_size]
+    return rolling_sums
+
+
+def _rolling_variance_welford(values: np.ndarray, window_size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calculates the variance of all windows (ending at each row) for every column of values using the Welford
+    algorithm. In every step the new value is added to the window and the value which leaves the window is removed.
+    """
+    is_valid = ~np.isnan(values)
+    number_of_columns = values.shape[1]
+
+    count = np.zeros(number_of_columns)
+    mean = np.zeros(number_of_columns)
+    sum_of_squared_deviations = np.zeros(number_of_columns)
 
-    volatility_values = []
-    for i in range(window_size - 1, len(returns_tms)):
-        start_index = i - window_size + 1
-        end_index = i + 1
+    variance = np.empty_like(values)
+    number_of_samples = np.empty_like(values)
 
-        returns_from_window = returns_tms[start_index:end_index]
-        volatility = get_volatility(returns_from_window, frequency, annualise)
+    for i in range(len(values)):
+        if i >= window_size:
+            removed_value = values[i - window_size]
+            removed = is_valid[i - window_size]
+            count = count - removed
+            delta = np.where(removed, removed_value - mean, 0.0)
+            with np.errstate(all="ignore"):
+                mean = np.where(count > 0, mean - delta / count, 0.0)
+            sum_of_squared_deviations = np.where(
+                count > 0, sum_of_squared_deviations - np.where(removed, delta * (removed_value - mean), 0.0), 0.0)
 
-        volatility_values.append(volatility)
+        added_value = values[i]
+        added = is_valid[i]
+        count = count + added
+        delta = np.where(added, added_value - mean, 0.0)
+        with np.errstate(all="ignore"):
+            mean = mean + np.where(added, delta / count, 0.0)
+        sum_of_squared_deviations = sum_of_squared_deviations + np.where(added, delta * (added_value - mean), 0.0)
 
-    first_date_idx = window_size - 1
-    dates = returns_tms.index[first_date_idx::]
-    volatility_tms = QFSeries(data=volatility_values, index=dates)
+        with np.errstate(all="ignore"):
+            variance[i] = sum_of_squared_deviations / (count - 1)
+        number_of_samples[i] = count
 
-    return volatility_tms
+    return np.maximum(variance, 0.0), number_of_samples
@@ -11,12 +11,19 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+from typing import Optional, Tuple, Union
 
+import numpy as np
 from arch.univariate import ConstantMean, Normal
+from arch.univariate.base import ARCHModel
 from arch.univariate.volatility import VolatilityProcess
 
 from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.common.utils.miscellaneous.annualise_with_sqrt import annualise_with_sqrt
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.series.log_returns_series import LogReturnsSeries
 from qf_lib.containers.series.qf_series import QFSeries
 
@@ -61,13 +68,21 @@ class VolatilityForecast:
 
         self.returns_tms = returns_tms.to_log_returns()
         self.forecasted_volatility = None  # will be assigned after calling one of the calculation methods
+        self.number_of_fits = 0  # number of the optimisations of the model parameters done by the calculation methods
 
-    def calculate_timeseries(self, window_len: int, multiplier: int = 1) -> QFSeries:
+    def calculate_timeseries(self, window_len: int, multiplier: int = 1, refit_every: int = 1,
+                             warm_start: bool = False) -> QFSeries:
         """
         Calculates volatility forecast for single asset. It is expressed in the frequency of returns.
         Value is calculated based on the configuration as in the object attributes. The result of the calculation
         is returned as well as assigned as self.forecasted_volatility object attribute.
 
+        The parameters of the model are fitted on the rolling windows of returns. If warm_start is True, the
+        optimisation of each window starts from the parameters fitted on the previous window (which are usually very
+        close to the optimal ones), so the results may differ slightly from the ones of independent fits. The model may
+        be also fitted only on every refit_every-th window, in which case the forecasts for the windows in between are
+        computed by filtering the window with the last fitted parameters.
+
         Parameters
         ----------
         window_len: int
@@ -76,6 +91,12 @@ class VolatilityForecast:
             ex. 100 (should be > 1)
             improves the optimization performance, as for very small values the results may be faulty;
             after optimization the results are scaled back (division by multiplier value)
+        refit_every: int
+            the parameters of the model are fitted on every refit_every-th window; 1 (default) means that the model is
+            fitted on every window
+        warm_start: bool
+            if True the optimisation starts from the parameters fitted on the previous window, otherwise (default)
+            it starts from the default starting values of the model
 
         Returns
         -------
@@ -87,9 +108,20 @@ class VolatilityForecast:
         assert window_len is not None, "For timeseries calculation the rolling window length must be specified."
         self.window_len = window_len
         assert multiplier >= 1
+        assert refit_every >= 1
 
         returns_tms = self.returns_tms * multiplier
-        volatility_tms = returns_tms.rolling_window(window_len, self._calculate_single_value)
+        end_positions = range(window_len, len(returns_tms) + 1)
+        forecasted_values = np.full(len(end_positions), np.nan)
+
+        params = None
+        for i, end_position in enumerate(end_positions):
+            model = self._get_ARCH_model(returns_tms.iloc[end_position - window_len:end_position], self.vol_process)
+            if params is None or i % refit_every == 0:
+                params = self._fit_model(model, params if warm_start else None)
+            forecasted_values[i] = self._forecast_volatility(model, params)
+
+        volatility_tms = QFSeries(data=forecasted_values, index=returns_tms.index[window_len - 1:])
         volatility_tms = volatility_tms.dropna()
         volatility_tms = volatility_tms / multiplier
 
@@ -133,8 +165,23 @@ class VolatilityForecast:
 
     def _calculate_single_value(self, returns: LogReturnsSeries) -> float:
         am = self._get_ARCH_model(returns, self.vol_process)
-        res = am.fit(disp='off', show_warning=False)  # options={'maxiter': 10000, 'ftol': 1e-2})
-        forecasts = res.forecast(horizon=self.horizon, method=self.method)
+        params = self._fit_model(am)
+        return self._forecast_volatility(am, params)
+
+    def _fit_model(self, am: ARCHModel, starting_values: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Fits the parameters of the model. If the optimisation started from the given starting values does not
+        converge, the model is fitted again from its default starting values.
+        """
+        self.number_of_fits += 1
+        res = am.fit(disp='off', show_warning=False, starting_values=starting_values)
+        if starting_values is not None and res.convergence_flag != 0:
+            self.number_of_fits += 1
+            res = am.fit(disp='off', show_warning=False)
+        return res.params.values
+
+    def _forecast_volatility(self, am: ARCHModel, params: np.ndarray) -> float:
+        forecasts = am.forecast(params, horizon=self.horizon, method=self.method)
         column_str = 'h.{}'.format(self.horizon)  # take value for the selected horizon
         forecasts_series = forecasts.variance[column_str]
         # take the last value (most recent forecast)
@@ -148,3 +195,77 @@ class VolatilityForecast:
         am.volatility = vol_process
         am.distribution = Normal()
         return am
+
+
+def forecast_volatilities(returns_df: QFDataFrame, vol_process: VolatilityProcess, method: str = 'analytic',
+                          horizon: int = 1, annualise: bool = True, frequency: Frequency = Frequency.DAILY,
+                          window_len: int = None, number_of_processes: Optional[int] = 1,
+                          **calculation_kwargs) -> Union[QFSeries, QFDataFrame]:
+    """
+    Calculates the volatility forecasts for all assets (columns) of the data frame, using one VolatilityForecast per
+    asset. The assets are distributed across a pool of processes.
+
+    Parameters
+    ----------
+    returns_df: QFDataFrame
+        returns of the assets
+    vol_process: VolatilityProcess
+        volatility process used for forecasting. For example EGARCH(p=p, o=o, q=q)
+    method: str
+        method of forecast calculation. Possible: 'analytic', 'simulation' or 'bootstrap'
+    horizon: int
+        horizon for the volatility forecast. It is expressed in the frequency of the returns provided
+    annualise: bool
+        flag indicating whether the result is annualised; True by default
+    frequency: Frequency
+        frequency of the returns (used only if annualise is True)
+    window_len: int
+        size of the rolling window. If it is None, a single forecast (VolatilityForecast.calculate_single_forecast)
+        is calculated for each asset, otherwise the timeseries of forecasts (VolatilityForecast.calculate_timeseries)
+    number_of_processes: int
+        number of worker processes. 1 (default) means that all the forecasts are calculated in the current process,
+        None means that the number of processes is equal to the number of CPUs
+    calculation_kwargs
+        additional arguments passed to calculate_single_forecast or calculate_timeseries (e.g. multiplier or
+        refit_every)
+
+    Returns
+    -------
+    QFSeries, QFDataFrame
+        series of the forecasted volatility indexed by assets if window_len is None, otherwise data frame with
+        the timeseries of forecasts for each asset
+    """
+    logger = qf_logger.getChild("forecast_volatilities")
+    tasks = [
+        (returns_df[asset], vol_process, method, horizon, annualise, frequency, window_len, calculation_kwargs)
+        for asset in returns_df.columns
+    ]
+
+    start_time = perf_counter()
+    if number_of_processes == 1:
+        results = [_forecast_asset_volatility(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+            results = list(executor.map(_forecast_asset_volatility, *zip(*tasks)))
+    elapsed_time = perf_counter() - start_time
+
+    number_of_fits = sum(fits for _, fits in results)
+    logger.info("Volatility forecasts for {} assets: {} fits in {:.2f} s ({:.1f} fits/s)".format(
+        len(tasks), number_of_fits, elapsed_time, number_of_fits / elapsed_time if elapsed_time > 0 else np.inf))
+
+    forecasts = [forecast for forecast, _ in results]
+    if window_len is None:
+        return QFSeries(data=forecasts, index=returns_df.columns)
+    return QFDataFrame(dict(zip(returns_df.columns, forecasts)), columns=returns_df.columns)
+
+
+def _forecast_asset_volatility(returns_tms: QFSeries, vol_process: VolatilityProcess, method: str, horizon: int,
+                               annualise: bool, frequency: Frequency, window_len: Optional[int],
+                               calculation_kwargs: dict) -> Tuple[Union[float, QFSeries], int]:
+    """ Calculates the forecast for a single asset (in a worker process). Returns the forecast and number of fits. """
+    vol_forecast = VolatilityForecast(returns_tms, vol_process, method, horizon, annualise, frequency)
+    if window_len is None:
+        forecast = vol_forecast.calculate_single_forecast(**calculation_kwargs)
+    else:
+        forecast = vol_forecast.calculate_timeseries(window_len, **calculation_kwargs)
+    return forecast, vol_forecast.number_of_fits
@@ -11,9 +11,11 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+from typing import Union
 
 from qf_lib.common.enums.frequency import Frequency
-from qf_lib.common.utils.volatility.get_volatility import get_volatility
+from qf_lib.common.utils.volatility.rolling_volatility import rolling_volatility
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.series.qf_series import QFSeries
 from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
 
@@ -26,13 +28,13 @@ class VolatilityManager:
 
     Parameters
     ----------
-    series: QFSeries
-        series to be volatility managed
+    series: QFSeries, QFDataFrame
+        series to be volatility managed (or a data frame, in which case every column is managed separately)
     frequency: Frequency
         frequency of the series that is passed
     """
 
-    def __init__(self, series: QFSeries, frequency: Frequency = Frequency.DAILY):
+    def __init__(self, series: Union[QFSeries, QFDataFrame], frequency: Frequency = Frequency.DAILY):
         self.returns_tms = series.to_simple_returns()
         self.frequency = frequency
 
@@ -58,11 +60,7 @@ class VolatilityManager:
             SimpleReturnsSeries containing returns of the series based on the input series passed in the constructor
             that is volatility managed according to the above parameters
         """
-
-        def volatility_fun(window):
-            return get_volatility(SimpleReturnsSeries(window), self.frequency)
-
-        rolling_vol_tms = self.returns_tms.rolling_window(window_size=window_size, func=volatility_fun)
+        rolling_vol_tms = rolling_volatility(self.returns_tms, self.frequency, window_size=window_size)
 
         # weights that we would need to make the series have constant volatility
         target_weights_tms = vol_level / rolling_vol_tms
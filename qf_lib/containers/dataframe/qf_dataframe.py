@@ -183,15 +183,9 @@ class QFDataFrame(pd.DataFrame, TimeIndexedContainer):
 
         """
         lambda_coefficients = self._prepare_value_per_column_list(lambda_coeff)
-        lambda_coefficients_iter = self._get_iterator_for_pandas(lambda_coefficients)
+        smoothed_values = self._exponential_average_values(self.values, lambda_coefficients)
 
-        def exponential_avg_func(column, lambda_coeff_iter=lambda_coefficients_iter):
-            lambda_coefficient = next(lambda_coeff_iter)
-            smoothed_column = column.exponential_average(lambda_coefficient)
-            return smoothed_column
-
-        smoothed_df = self.apply(exponential_avg_func, axis=0)
-        smoothed_df = cast_dataframe(smoothed_df, self._constructor)
+        smoothed_df = self._constructor(data=smoothed_values, index=self.index.copy(), columns=self.columns.copy())
         return smoothed_df
 
     def total_cumulative_return(self) -> "QFSeries":
@@ -237,7 +231,7 @@ class QFDataFrame(pd.DataFrame, TimeIndexedContainer):
             raise ValueError(error_msg)
 
     def rolling_window(self, window_size: int, func: Callable[[Union["QFSeries", np.ndarray]], float], step: int = 1,
-                       optimised: bool = False) -> "QFDataFrame":
+                       optimised: bool = False, raw: bool = False) -> "QFDataFrame":
         """
         Looks at a number of windows of size ``window_size`` and transforms the data in those windows based on the
         specified ``func``. This is performed for each column inside this data frame.
@@ -262,6 +256,9 @@ class QFDataFrame(pd.DataFrame, TimeIndexedContainer):
             Whether the more efficient pandas algorithm should be used for the rolling window application.
             Note: This has some limitations: The ``step`` must be 1 and ``func`` will get an ``ndarray``
             parameter which only contains values and no index.
+        raw
+            If True, ``func`` gets an ``ndarray`` with the values of each window instead of a ``QFSeries``.
+            Contrary to the ``optimised`` mode, any ``step`` may be used.
 
         Returns
         -------
@@ -272,11 +269,11 @@ class QFDataFrame(pd.DataFrame, TimeIndexedContainer):
             assert step == 1, "Optimised rolling is only possible with a step of 1."
             return self.rolling(window=window_size, center=False).apply(func=func)
 
-        result = QFDataFrame()
-        for col in self:
-            transformed_data = self[col].rolling_window(window_size, func, step=step)
-            result[col] = transformed_data
-        return result
+        # All columns have the same windows, thus the transformed columns share the same index
+        transformed_columns = {
+            col: self[col].rolling_window(window_size, func, step=step, raw=raw) for col in self
+        }
+        return QFDataFrame(transformed_columns, columns=self.columns)
 
     def rolling_time_window(
             self, window_length: int, step: int, func: Callable[[Union["QFDataFrame", np.ndarray]], "QFSeries"]) \
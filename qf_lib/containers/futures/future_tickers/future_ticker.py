@@ -12,16 +12,14 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 import abc
-from datetime import datetime
 from typing import Optional, Type
 
-import pandas as pd
-
 from qf_lib.common.enums.security_type import SecurityType
 from qf_lib.common.exceptions.future_contracts_exceptions import NoValidTickerException
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
 from qf_lib.common.utils.dateutils.timer import Timer
+from qf_lib.containers.futures.roll_calendar import RollCalendar
 from qf_lib.containers.series.qf_series import QFSeries
 
 
@@ -82,9 +80,8 @@ class FutureTicker(Ticker, metaclass=abc.ABCMeta):
         self._data_provider = None  # type: "DataProvider"
         self._ticker_initialized = False  # type: bool
 
-        # Date used for optimization purposes
-        self._ticker = None  # type: Ticker
-        self._last_cached_datetime = None
+        # Roll calendar built from the expiration dates, used for optimization purposes
+        self._roll_calendar = None  # type: Optional[RollCalendar]
         self._expiration_hour = RelativeDelta(hour=0, minute=0, second=0, microsecond=0)
 
     def initialize_data_provider(self, timer: Timer, data_provider: "DataProvider"):
@@ -108,6 +105,7 @@ class FutureTicker(Ticker, metaclass=abc.ABCMeta):
         exp_dates = self._get_futures_chain_tickers()
         self._validate_expiration_dates(exp_dates)
         self._exp_dates = exp_dates
+        self._roll_calendar = None
 
         self._ticker_initialized = True
 
@@ -136,11 +134,13 @@ class FutureTicker(Ticker, metaclass=abc.ABCMeta):
         """
         Method which returns the currently valid, specific Ticker.
 
-        In order to optimize the computation of ticker value the ticker value is being cached.
         The ticker is assumed to expire at a given expiration hour (which can be adjusted using the set_expiration_hour,
         by default it points to midnight), which means that on the expiration date the old contract is returned till
         the expiration hour and the new contract is returned since the expiration hour (inclusive).
 
+        The ticker is found with a binary search in the roll calendar (see get_roll_calendar), which is built once
+        from the expiration dates.
+
         Returns
         -------
         Ticker
@@ -152,54 +152,29 @@ class FutureTicker(Ticker, metaclass=abc.ABCMeta):
             raise ValueError(f"Set up the timer and data provider by calling initialize_data_provider() "
                              f"before using the future ticker {self._name}")
         try:
-            def _get_current_specific_ticker() -> Ticker:
-                """
-                Returns the ticker of N-th Future Contract for the provided date, assuming that days_before_exp_date
-                days before the original expiration the ticker of the next contract will be returned.
-                E.g. if days_before_exp_date = 4 and the expiry date = 16th July, then the old contract will be returned
-                up to 16 - 4 = 12th July (inclusive).
-                """
-                # Shift the index and data according to the start time and end time values
-                _exp_dates = self.get_expiration_dates()
-                _exp_dates = _exp_dates.sort_index()
-                date_index = _exp_dates.index - pd.Timedelta(days=self._days_before_exp_date - 1)
-                date_index = pd.DatetimeIndex([dt + self._expiration_hour for dt in date_index])
-                date_index_loc = date_index.get_loc(self._timer.now(), method="pad")
-                return _exp_dates.iloc[date_index_loc:].iloc[self.N]
-
-            def cached_ticker_still_valid(caching_time: datetime, current_time: datetime,
-                                          expiration_hour: RelativeDelta) -> bool:
-                """
-                Checks if the precomputed specific ticker value is still valid or should be computed once again.
-                The cached value is valid for 24h starting at the expiration_hour (e.g. if the expiration hour is
-                set to 8:00, a specific ticker is valid starting 8:00 am (inclusive) till 8.00 am the next day).
-                """
-                if caching_time is None:
-                    return False
-
-                if caching_time >= caching_time + expiration_hour:
-                    cached_time_start = caching_time + expiration_hour
-                    cached_time_end = cached_time_start + RelativeDelta(days=1)
-                else:
-                    cached_time_end = caching_time + expiration_hour
-                    cached_time_start = cached_time_end - RelativeDelta(days=1)
-
-                return cached_time_start <= current_time < cached_time_end
-
-            if not cached_ticker_still_valid(self._last_cached_datetime, self._timer.now(), self._expiration_hour):
-                self._ticker = _get_current_specific_ticker()
-                self._last_cached_datetime = self._timer.now()
-            return self._ticker
-
-        except (LookupError, ValueError):
-            # Function "get_loc(self.timer.now(), method="pad")" may raise KeyError in case if e.g. the current time
-            # precedes the first date in the shifted_index.
-            # Function "iloc" may rise IndexError if the requested indexer is out-of-bonds (e.g. a high value of self.N)
-            # Therefore, in case if the data with expiration dates is not available for the current date, the
-            # _get_current_specific_ticker function will raise a LookupError.
+            # Returns the ticker of N-th Future Contract for the current time, assuming that days_before_exp_date
+            # days before the original expiration the ticker of the next contract will be returned.
+            # E.g. if days_before_exp_date = 4 and the expiry date = 16th July, then the old contract will be returned
+            # up to 16 - 4 = 12th July (inclusive).
+            return self.get_roll_calendar().specific_ticker(self._timer.now(), self.N)
+        except LookupError:
+            # The roll calendar raises a LookupError in case if e.g. the current time precedes the first roll time or
+            # there are not enough contracts after it (e.g. a high value of self.N). Therefore, in case if the data
+            # with expiration dates is not available for the current date, no valid ticker exists.
             raise NoValidTickerException(f"No valid ticker for the FutureTicker {self._name} found on "
                                          f"{self._timer.now()}") from None
 
+    def get_roll_calendar(self) -> RollCalendar:
+        """
+        Returns the roll calendar of the futures family, built from the expiration dates, the days_before_exp_date and
+        the expiration hour. The calendar is built once and rebuilt only after the expiration dates or the expiration
+        hour change.
+        """
+        if self._roll_calendar is None:
+            self._roll_calendar = RollCalendar(self.get_expiration_dates(), self._days_before_exp_date,
+                                               self._expiration_hour)
+        return self._roll_calendar
+
     def get_expiration_dates(self) -> QFSeries:
         """
         Returns QFSeries containing the list of specific future contracts Tickers, indexed by their expiration
@@ -236,6 +211,7 @@ class FutureTicker(Ticker, metaclass=abc.ABCMeta):
         microsecond: int
         """
         self._expiration_hour = RelativeDelta(hour=hour, minute=minute, second=second, microsecond=microsecond)
+        self._roll_calendar = None
 
     @abc.abstractmethod
     def _get_futures_chain_tickers(self) -> QFSeries:
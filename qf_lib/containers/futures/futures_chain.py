@@ -12,7 +12,8 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 from datetime import datetime
-from typing import Union, Sequence, Optional, Tuple
+from typing import Union, Sequence, Optional, Tuple, List
+import numpy as np
 import pandas as pd
 from numpy import nan
 
@@ -44,6 +45,13 @@ class FuturesChain(pd.Series):
         In case of backtests, the DataHandler wrapper should be used to avoid looking into the future.
     method: FuturesAdjustmentMethod
         FuturesAdjustmentMethod corresponding to one of two available methods of chaining the futures contracts.
+
+    Notes
+    ------
+    The generated chain is stored in preallocated arrays (see ChainedPrices). Prices downloaded for the consecutive
+    dates are appended to these arrays and the results of get_price are slices of them. After the expiration of
+    a contract the chain is generated again, but only the prices of the new contracts and the prices of the still
+    traded contracts since the last download are requested from the data provider.
     """
     def __init__(self, future_ticker: FutureTicker, data_provider: "DataProvider", method: FuturesAdjustmentMethod =
                  FuturesAdjustmentMethod.NTH_NEAREST):
@@ -57,11 +65,15 @@ class FuturesChain(pd.Series):
 
         # Used for optimization purposes
         self._specific_ticker = None  # type: str
-        self._chain = None  # type: PricesDataFrame
+        self._chain = None  # type: Optional[ChainedPrices]
         self._first_cached_date = None  # type: datetime
         self._futures_adjustment_method = method
         self._cached_fields = set()
 
+        # Fields and the last date of the prices of the contracts, which were downloaded from the data provider
+        self._loaded_fields = set()
+        self._last_loaded_date = None  # type: Optional[datetime]
+
     def get_price(self, fields: Union[PriceField, Sequence[PriceField]], start_date: datetime, end_date: datetime,
                   frequency: Frequency = Frequency.DAILY) -> Union[PricesDataFrame, PricesSeries]:
         """Combines consecutive specific FutureContracts data, in order to obtain a chain of prices.
@@ -91,8 +103,8 @@ class FuturesChain(pd.Series):
         # otherwise - store the last and first available dates from the chain
         fields_list, _ = convert_to_list(fields, PriceField)
 
-        if self._chain is not None and not self._chain.empty:
-            last_date_in_chain = self._chain.index[-1]
+        if self._chain is not None and len(self._chain) > 0:
+            last_date_in_chain = self._chain.last_date
             first_date_in_chain = self._first_cached_date
         else:
             return self._preload_data_and_generate_chain(fields, start_date, end_date, frequency).squeeze()
@@ -105,7 +117,7 @@ class FuturesChain(pd.Series):
 
         # 3 - Download the prices since the last date available in the chain
         if last_date_in_chain == end_date:
-            return self._chain[fields_list].loc[start_date:end_date].squeeze()
+            return self._chain.get_prices(fields_list, start_date, end_date).squeeze()
 
         prices_df: PricesDataFrame = self._data_provider.get_price(self._future_ticker.get_current_specific_ticker(),
                                                                    fields_list, last_date_in_chain, end_date)
@@ -113,11 +125,11 @@ class FuturesChain(pd.Series):
 
         # If no changes to the PricesDataFrame should be applied return the existing chain
         if prices_df.empty:
-            return self._chain[fields_list].loc[start_date:end_date].squeeze()
+            return self._chain.get_prices(fields_list, start_date, end_date).squeeze()
 
         prices_after_last_date_in_chain = prices_df.iloc[1:] if prices_df.index[0] == last_date_in_chain else prices_df
         if prices_after_last_date_in_chain.empty:
-            return self._chain[fields_list].loc[start_date:end_date].squeeze()
+            return self._chain.get_prices(fields_list, start_date, end_date).squeeze()
 
         # 4 - Check if between last_date_in_chain and end_date an expiration date occurred
         def expiration_day_occurred() -> bool:
@@ -133,8 +145,8 @@ class FuturesChain(pd.Series):
             different_ticker = self._specific_ticker != self._future_ticker.ticker
 
             if last_date_in_chain in prices_df.index:
-                different_prices = not self._chain[fields_list].loc[last_date_in_chain].equals(
-                    prices_df[fields_list].loc[last_date_in_chain])
+                different_prices = not self._chain.get_prices(fields_list, last_date_in_chain, last_date_in_chain)\
+                    .iloc[0].equals(prices_df[fields_list].loc[last_date_in_chain])
             else:
                 different_prices = True
 
@@ -153,10 +165,10 @@ class FuturesChain(pd.Series):
             # to the chain and the chain should be regenerated.
             return self._preload_data_and_generate_chain(fields, start_date, end_date, frequency).squeeze()
         else:
-            # Append the new prices to the existing PricesDataFrame chain
-            self._chain = self._chain.append(prices_after_last_date_in_chain, sort=False)
+            # Append the new prices to the existing chain
+            self._chain.append(prices_after_last_date_in_chain)
             self._specific_ticker = self._future_ticker.ticker
-            return self._chain[fields_list].loc[start_date:end_date].squeeze()
+            return self._chain.get_prices(fields_list, start_date, end_date).squeeze()
 
     def _preload_data_and_generate_chain(self, fields: Union[PriceField, Sequence[PriceField]], start_date: datetime,
                                          end_date: datetime, frequency: Frequency) -> \
@@ -181,13 +193,13 @@ class FuturesChain(pd.Series):
         self._initialize_futures_chain(necessary_fields, start_date, end_date, frequency)
 
         # Generate the PricesDataFrame (PricesSeries)
-        self._chain = self._generate_chain(fields, start_date, end_date)
+        self._chain = ChainedPrices(self._generate_chain(fields, start_date, end_date))
 
         # Update the specific ticker
         self._specific_ticker = self._future_ticker.ticker
         self._cached_fields = set(fields_list)
 
-        return self._chain[fields_list].loc[start_date:end_date].squeeze()
+        return self._chain.get_prices(fields_list, start_date, end_date).squeeze()
 
     def _generate_chain(self, fields, start_time: datetime, end_time: datetime) -> PricesDataFrame:
         """ Returns a chain of futures combined together using a certain method. """
@@ -383,13 +395,57 @@ class FuturesChain(pd.Series):
         last_ticker_position = min(future_tickers_exp_dates_series.size, current_contract_index + 1)
         future_tickers_exp_dates_series = future_tickers_exp_dates_series.iloc[0:last_ticker_position]
 
-        # Download the historical prices
-        future_tickers_list = list(future_tickers_exp_dates_series.values)
-        futures_data = self._data_provider.get_price(future_tickers_list, fields, start_date, end_date, frequency)
+        # Download the historical prices. If the contracts were already downloaded before (with the same fields and
+        # since the same or earlier start date), only the prices since the last download are requested for them
+        # (and only for the contracts, which might have been traded since then).
+        reuse_loaded_data = self._last_loaded_date is not None and set(fields) == self._loaded_fields and \
+            self._first_cached_date <= start_date
+        loaded_futures = {
+            exp_date: future for exp_date, future in self.items() if reuse_loaded_data and
+            exp_date in future_tickers_exp_dates_series.index and
+            future.ticker == future_tickers_exp_dates_series.loc[exp_date]
+        }
+
+        new_futures_exp_dates = future_tickers_exp_dates_series[
+            ~future_tickers_exp_dates_series.index.isin(list(loaded_futures.keys()))]
+        last_dates = [self._add_futures_data(new_futures_exp_dates, fields, start_date, end_date, frequency,
+                                             got_single_field)]
+
+        if loaded_futures:
+            updated_futures_exp_dates = future_tickers_exp_dates_series[
+                future_tickers_exp_dates_series.index.isin(
+                    [exp_date for exp_date in loaded_futures.keys() if exp_date >= self._last_loaded_date])]
+            last_dates.append(self._add_futures_data(updated_futures_exp_dates, fields, self._last_loaded_date,
+                                                     end_date, frequency, got_single_field, loaded_futures))
 
         # Store the start_date used for the purpose of FuturesChain initialization
         self._first_cached_date = start_date
 
+        # Store the last date of the downloaded prices (which may precede the end_date, e.g. if the data provider does
+        # not return the prices from the future), since which the prices should be downloaded the next time
+        last_dates = [date for date in last_dates if date is not None]
+        if reuse_loaded_data:
+            last_dates.append(self._last_loaded_date)
+        self._last_loaded_date = max(last_dates) if last_dates else None
+        self._loaded_fields = set(fields)
+
+        self.sort_index(inplace=True)
+
+    def _add_futures_data(self, future_tickers_exp_dates_series: QFSeries, fields: List[PriceField],
+                          start_date: datetime, end_date: datetime, frequency: Frequency, got_single_field: bool,
+                          loaded_futures: Optional[dict] = None) -> Optional[datetime]:
+        """
+        Downloads the prices of the given contracts and adds the contracts to the Futures Chain. If the contract is in
+        the loaded_futures dictionary (exp_date -> FutureContract), the downloaded prices replace its prices since the
+        start_date. Returns the last date of the downloaded prices (None if no prices were downloaded).
+        """
+        last_date = None
+        if future_tickers_exp_dates_series.empty:
+            return last_date
+
+        future_tickers_list = list(future_tickers_exp_dates_series.values)
+        futures_data = self._data_provider.get_price(future_tickers_list, fields, start_date, end_date, frequency)
+
         for exp_date, future_ticker in future_tickers_exp_dates_series.items():
 
             # Create a data frame and cast it into PricesDataFrame or PricesSeries
@@ -399,6 +455,13 @@ class FuturesChain(pd.Series):
                 data = futures_data.loc[:, future_ticker, :]
                 data = cast_data_array_to_proper_type(data, use_prices_types=True)
 
+            if not data.empty:
+                last_date = data.index[-1] if last_date is None else max(last_date, data.index[-1])
+
+            if loaded_futures is not None and exp_date in loaded_futures:
+                loaded_data = loaded_futures[exp_date].data
+                data = pd.concat([loaded_data.loc[loaded_data.index < start_date], data], sort=False)
+
             # Check if data is empty (some contract may have no price within the given time range) - if so do not
             # add it to the FuturesChain
             if not data.empty:
@@ -410,4 +473,62 @@ class FuturesChain(pd.Series):
 
                 self.loc[exp_date] = future
 
-        self.sort_index(inplace=True)
+        return last_date
+
+
+class ChainedPrices:
+    """
+    Chain of prices of the futures contracts, stored in preallocated arrays (dates x fields), which grow geometrically
+    when new prices are appended. The prices for any range of dates are a slice of these arrays, found with a binary
+    search in the dates.
+
+    Parameters
+    ----------
+    prices_df: PricesDataFrame
+        initial chain of prices, indexed by dates (in ascending order), with one column per field
+    """
+
+    def __init__(self, prices_df: PricesDataFrame):
+        self.fields = list(prices_df.columns)
+        self._fields_positions = {field: i for i, field in enumerate(self.fields)}
+        self._columns_name = prices_df.columns.name
+
+        self._length = len(prices_df)
+        capacity = max(2 * self._length, 16)
+        self._dates = np.empty(capacity, dtype="datetime64[ns]")
+        self._dates[:self._length] = pd.DatetimeIndex(prices_df.index).values
+        self._values = np.full((capacity, len(self.fields)), nan)
+        self._values[:self._length] = prices_df.values
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def last_date(self) -> datetime:
+        return pd.Timestamp(self._dates[self._length - 1])
+
+    def append(self, prices_df: PricesDataFrame):
+        """ Appends the prices of the dates following the last date in the chain. Missing fields are set to nan. """
+        new_length = self._length + len(prices_df)
+        if new_length > len(self._dates):
+            capacity = max(2 * len(self._dates), new_length)
+            self._dates = np.concatenate([self._dates[:self._length],
+                                          np.empty(capacity - self._length, dtype="datetime64[ns]")])
+            self._values = np.concatenate([self._values[:self._length],
+                                           np.full((capacity - self._length, len(self.fields)), nan)])
+
+        self._dates[self._length:new_length] = pd.DatetimeIndex(prices_df.index).values
+        self._values[self._length:new_length] = prices_df.reindex(columns=self.fields).values
+        self._length = new_length
+
+    def get_prices(self, fields: Sequence[PriceField], start_date: datetime, end_date: datetime) -> PricesDataFrame:
+        """ Returns the prices of the given fields between the start_date and end_date (inclusive). """
+        dates = self._dates[:self._length]
+        start_position = np.searchsorted(dates, np.datetime64(pd.Timestamp(start_date)), side="left")
+        end_position = np.searchsorted(dates, np.datetime64(pd.Timestamp(end_date)), side="right")
+
+        columns = [self._fields_positions[field] for field in fields]
+        prices_df = PricesDataFrame(data=self._values[start_position:end_position, columns],
+                                    index=pd.DatetimeIndex(dates[start_position:end_position]), columns=fields)
+        prices_df.columns.name = self._columns_name
+        return prices_df
@@ -0,0 +1,76 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
+from qf_lib.containers.series.qf_series import QFSeries
+
+
+class RollCalendar:
+    """
+    Roll calendar of a family of futures contracts, built once from the expiration dates of the contracts. For every
+    contract it stores the roll time - the time since which the contract is considered to be expired and the next
+    contract in the chain becomes the current one. The roll time is equal to the expiration date shifted by
+    days_before_exp_date - 1 days back, at the expiration hour.
+
+    The contract, which is current at a given time, is found with a binary search in the sorted roll times.
+
+    Parameters
+    ----------
+    exp_dates: QFSeries
+        series of specific Tickers, indexed by their expiration dates
+    days_before_exp_date: int
+        number of days before the expiration date of each contract, when the contract should be substituted with
+        the next one
+    expiration_hour: RelativeDelta
+        time of the day, at which the contracts roll
+    """
+
+    def __init__(self, exp_dates: QFSeries, days_before_exp_date: int, expiration_hour: RelativeDelta):
+        exp_dates = exp_dates.sort_index()
+        self.expiration_dates = pd.DatetimeIndex(exp_dates.index)
+        self.tickers = list(exp_dates.values)
+
+        shifted_dates = self.expiration_dates - pd.Timedelta(days=days_before_exp_date - 1)
+        self.roll_times = pd.DatetimeIndex([date + expiration_hour for date in shifted_dates])
+        self._roll_times_values = self.roll_times.values
+
+    def __len__(self):
+        return len(self.tickers)
+
+    def expired_contracts_number(self, time: datetime) -> int:
+        """
+        Returns the number of contracts, which rolled before or at the given time. The position of the current front
+        contract in the calendar is equal to this number.
+        """
+        return int(np.searchsorted(self._roll_times_values, np.datetime64(pd.Timestamp(time)), side="right"))
+
+    def specific_ticker(self, time: datetime, N: int) -> Ticker:
+        """
+        Returns the N-th contract (N = 1 is the front contract), which is current at the given time. Raises
+        LookupError if the calendar does not contain the contract (e.g. the time precedes the first roll time
+        in the calendar or there are not enough contracts after it).
+        """
+        expired_contracts_number = self.expired_contracts_number(time)
+        if expired_contracts_number == 0:
+            raise LookupError(f"No roll time found in the calendar before {time}")
+
+        position = expired_contracts_number - 1 + N
+        if position >= len(self.tickers):
+            raise LookupError(f"The calendar does not contain the contract number {N} current at {time}")
+        return self.tickers[position]
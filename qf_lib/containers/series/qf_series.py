@@ -141,16 +141,8 @@ class QFSeries(pd.Series, TimeIndexedContainer):
             exponential average of the series
 
         """
-        smoothed_series = self.copy(deep=True)
-
-        for i in range(1, len(self)):
-            current_value_weighted = lambda_coeff * self.iloc[i]
-            prev_value_weighted = (1 - lambda_coeff) * smoothed_series.iloc[i - 1]
-
-            smoothed_value = current_value_weighted + prev_value_weighted
-            smoothed_series.iloc[i] = smoothed_value
-
-        return smoothed_series
+        smoothed_values = self._exponential_average_values(self.values, lambda_coeff)
+        return self._constructor(data=smoothed_values, index=self.index.copy(), name=self.name).__finalize__(self)
 
     def rolling_window_with_benchmark(self, benchmark: "QFSeries", window_size: int,
                                       func: Callable[["QFSeries"], float], step: int = 1) -> "QFSeries":
@@ -180,8 +172,6 @@ class QFSeries(pd.Series, TimeIndexedContainer):
             A ``QFSeries`` containing the transformed data.
         """
 
-        result = QFSeries()
-
         # Intersect the two series' indexes.
         self_series = QFSeries(self)
         benchmark_series = QFSeries(benchmark)
@@ -190,32 +180,26 @@ class QFSeries(pd.Series, TimeIndexedContainer):
         intersected = pd.concat([self_series, benchmark_series], axis=1, join="inner")
         assert isinstance(intersected, pd.DataFrame)  # Just to make PyCharm silent.
 
-        # Apply a rolling window transformation on the QFSeries.
+        # Apply a rolling window transformation on the QFSeries. Each window contains window_size + 1 data points.
         # Based on https://github.com/quantopian/pyfolio/blob/master/pyfolio/timeseries.py#L616.
-        window_start = 0
-        while window_start + window_size < len(intersected):
-            # Calculate the position of the window's end.
-            window_end = window_start + window_size
-            # Get the start and end dates at the current window indexes.
-            start = intersected.index[window_start]
-            end = intersected.index[window_end]
-
-            # Return the data for the current window.
-            strategy_slice = QFSeries(intersected.iloc[:, 0].loc[start:end])
-            benchmark_slice = QFSeries(intersected.iloc[:, 1].loc[start:end])
-            result[end] = func(strategy_slice, benchmark_slice)
+        strategy_series = QFSeries(intersected.iloc[:, 0])
+        benchmark_series = QFSeries(intersected.iloc[:, 1])
+        end_positions = range(window_size, len(intersected), step)
 
-            window_start += step
-
-        return result
+        values = [
+            func(strategy_series.iloc[end - window_size:end + 1], benchmark_series.iloc[end - window_size:end + 1])
+            for end in end_positions
+        ]
+        return QFSeries(data=values, index=intersected.index[list(end_positions)])
 
     def rolling_window(self, window_size: int, func: Callable[[Union["QFSeries", np.ndarray]], float], step: int = 1,
-                       optimised: bool = False) -> "QFSeries":
+                       optimised: bool = False, raw: bool = False) -> "QFSeries":
         """
         Looks at a number of windows of size ``window_size`` and transforms the data in those windows based on the
         specified ``func``.
 
-        The window indices are stepped at a rate specified by ``step``.
+        The window indices are stepped at a rate specified by ``step``. If ``func`` is a RollingKernel (see
+        qf_lib.containers.series.rolling_kernels), the values for all windows are computed at once.
 
         Parameters
         ----------
@@ -232,36 +216,34 @@ class QFSeries(pd.Series, TimeIndexedContainer):
             Whether the more efficient pandas algorithm should be used for the rolling window application.
             Note: This has some limitations: The ``step`` must be 1 and ``func`` will get an ``ndarray``
             parameter which only contains values and no index.
+        raw
+            If True, ``func`` gets an ``ndarray`` with the values of each window (a view created without copying the
+            data) instead of a ``QFSeries``. Contrary to the ``optimised`` mode, any ``step`` may be used.
 
         Returns
         -------
         QFSeries
             A ``QFSeries`` containing the transformed data.
         """
+        from qf_lib.containers.series.rolling_kernels import RollingKernel, strided_windows
+        if isinstance(func, RollingKernel):
+            return func.apply(self, window_size, step)
+
         if optimised:
             from qf_lib.containers.series.cast_series import cast_series
             assert step == 1, "Optimised rolling is only possible with a step of 1."
             uncasted_result = self.rolling(window=window_size, center=False).apply(func=func)
             return cast_series(uncasted_result, self._constructor)
 
-        result = QFSeries()
-
         # Apply a rolling window transformation on the QFSeries.
         # Based on https://github.com/quantopian/pyfolio/blob/master/pyfolio/timeseries.py#L616.
-        window_start = 0
-        while window_start + window_size <= len(self):
-            # Calculate the position of the window's end.
-            window_end = window_start + window_size - 1
-            # Get the start and end dates at the current window indexes.
-            start = self.index[window_start]
-            end = self.index[window_end]
-
-            # Return the data for the current window.
-            result[end] = func(self.loc[start:end])
-
-            window_start += step
+        end_positions = range(window_size - 1, len(self), step)
+        if raw:
+            values = [func(window) for window in strided_windows(self.values, window_size, step)]
+        else:
+            values = [func(self.iloc[end - window_size + 1:end + 1]) for end in end_positions]
 
-        return result
+        return QFSeries(data=values, index=self.index[list(end_positions)])
 
     def get_frequency(self) -> Frequency:
         """
@@ -0,0 +1,152 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from typing import Callable, Optional
+
+import numpy as np
+from pandas import Timedelta
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.miscellaneous.constants import DAYS_PER_YEAR_AVG
+from qf_lib.containers.series.log_returns_series import LogReturnsSeries
+from qf_lib.containers.series.prices_series import PricesSeries
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.returns_series import ReturnsSeries
+
+
+def strided_windows(values: np.ndarray, window_size: int, step: int = 1) -> np.ndarray:
+    """
+    Returns a read-only (number_of_windows x window_size) view of the given 1D array, in which the i-th row is
+    the window of values starting at the position i * step. No values are copied.
+    """
+    values = np.asarray(values)
+    number_of_windows = (len(values) - window_size) // step + 1 if len(values) >= window_size else 0
+    stride = values.strides[0]
+    return np.lib.stride_tricks.as_strided(values, shape=(number_of_windows, window_size),
+                                           strides=(stride * step, stride), writeable=False)
+
+
+class RollingKernel:
+    """
+    Statistic computed at once for all rolling windows of a series, used by the QFSeries.rolling_window instead of
+    calling a Python function for every window.
+
+    The kernel works on windows of log returns, which are created from the series depending on its type. For a
+    PricesSeries, every window of prices is turned into the window_size - 1 log returns between them. For
+    a ReturnsSeries, every window contains window_size returns (as log returns). Kernels, which need it, get also
+    the length of every window in years, computed in the same way as in the cagr function (for returns it includes
+    the period before the first return of the window). Other kernels get None instead.
+
+    The kernel may be also called as a regular function with a single window (series) as argument.
+
+    Parameters
+    ----------
+    kernel: Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray]
+        function which takes the (number_of_windows x length_of_window) array of log returns and the array with
+        the length of each window expressed in years and returns the array of values computed for each window
+    uses_periods_lengths: bool
+        True if the kernel needs the lengths of the windows in years
+    frequency: Frequency
+        frequency of the series, used to compute the length of the windows of returns. If it is None it is inferred
+        from the series.
+    """
+
+    def __init__(self, kernel: Callable[[np.ndarray, Optional[np.ndarray]], np.ndarray],
+                 uses_periods_lengths: bool = False, frequency: Frequency = None):
+        self._kernel = kernel
+        self._uses_periods_lengths = uses_periods_lengths
+        self._frequency = frequency
+
+    def __call__(self, window: QFSeries) -> float:
+        return self.apply(window, len(window), step=1).iloc[0]
+
+    def apply(self, series: QFSeries, window_size: int, step: int = 1) -> QFSeries:
+        """
+        Computes the values of the statistic for all windows of the given size, stepped by the given number of data
+        points. The values are indexed by the last date of each window.
+        """
+        if isinstance(series, PricesSeries):
+            log_returns = np.log(series.values[1:] / series.values[:-1])
+            log_returns_windows = strided_windows(log_returns, window_size - 1, step)
+        elif isinstance(series, ReturnsSeries):
+            values = series.values
+            log_returns = values if isinstance(series, LogReturnsSeries) else np.log1p(values)
+            log_returns_windows = strided_windows(log_returns, window_size, step)
+        else:
+            raise ValueError("Rolling kernels can be applied only to PricesSeries or ReturnsSeries, {} given".format(
+                type(series).__name__))
+
+        number_of_windows = log_returns_windows.shape[0]
+        end_positions = np.arange(number_of_windows) * step + window_size - 1
+
+        periods_lengths_in_years = None
+        if self._uses_periods_lengths:
+            periods_lengths_in_years = self._periods_lengths_in_years(series, end_positions - window_size + 1,
+                                                                      end_positions)
+
+        values = self._kernel(log_returns_windows, periods_lengths_in_years)
+        return QFSeries(data=values, index=series.index[end_positions])
+
+    def _periods_lengths_in_years(self, series: QFSeries, start_positions: np.ndarray,
+                                  end_positions: np.ndarray) -> np.ndarray:
+        timestamps = series.index.values.astype(np.int64)
+        periods_lengths = timestamps[end_positions] - timestamps[start_positions]
+
+        if isinstance(series, ReturnsSeries):
+            # the period also includes the interval before the first return of the window
+            frequency = self._frequency if self._frequency is not None else series.get_frequency()
+            periods_lengths = periods_lengths + Timedelta(days=frequency.nr_of_calendar_days()).value
+
+        return periods_lengths / Timedelta(days=1).value / DAYS_PER_YEAR_AVG
+
+
+def total_cumulative_return_kernel() -> RollingKernel:
+    """ Kernel computing the total cumulative return of every window. """
+    def kernel(log_returns: np.ndarray, _: np.ndarray) -> np.ndarray:
+        return np.expm1(np.nansum(log_returns, axis=1))
+
+    return RollingKernel(kernel)
+
+
+def volatility_kernel(frequency: Frequency = None, annualise: bool = True) -> RollingKernel:
+    """ Kernel computing the volatility (std of log returns) of every window, equivalent to get_volatility. """
+    assert not annualise or frequency is not None
+
+    def kernel(log_returns: np.ndarray, _: np.ndarray) -> np.ndarray:
+        volatility = np.nanstd(log_returns, axis=1, ddof=1)
+        return volatility * np.sqrt(frequency.occurrences_in_year) if annualise else volatility
+
+    return RollingKernel(kernel)
+
+
+def sharpe_ratio_kernel(frequency: Frequency, risk_free: float = 0) -> RollingKernel:
+    """ Kernel computing the Sharpe Ratio of every window, equivalent to sharpe_ratio. """
+    def kernel(log_returns: np.ndarray, periods_lengths_in_years: np.ndarray) -> np.ndarray:
+        # log of the CAGR + 1 is equal to the total log return divided by the length of the period in years
+        annual_log_return = np.nansum(log_returns, axis=1) / periods_lengths_in_years
+        annual_volatility = np.nanstd(log_returns, axis=1, ddof=1) * np.sqrt(frequency.occurrences_in_year)
+        return (annual_log_return - risk_free) / annual_volatility
+
+    return RollingKernel(kernel, uses_periods_lengths=True, frequency=frequency)
+
+
+def max_drawdown_kernel() -> RollingKernel:
+    """ Kernel computing the maximal drawdown of every window, equivalent to max_drawdown. """
+    def kernel(log_returns: np.ndarray, _: np.ndarray) -> np.ndarray:
+        # logarithms of prices within the windows, starting with the initial price equal to 1.0
+        log_prices = np.zeros((log_returns.shape[0], log_returns.shape[1] + 1))
+        np.cumsum(np.nan_to_num(log_returns), axis=1, out=log_prices[:, 1:])
+        max_log_prices = np.maximum.accumulate(log_prices, axis=1)
+        return np.max(-np.expm1(log_prices - max_log_prices), axis=1)
+
+    return RollingKernel(kernel)
@@ -11,7 +11,11 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+from typing import Sequence, Union
+
+import numpy as np
 import pandas as pd
+from scipy.signal import lfilter
 
 
 class TimeIndexedContainer:
@@ -60,3 +64,40 @@ class TimeIndexedContainer:
         combined_relative_frequency = len(top_frequent_deltas) * relative_frequency
 
         return top_frequent_delta, combined_relative_frequency
+
+    @staticmethod
+    def _exponential_average_values(values: np.ndarray, lambda_coeff: Union[float, Sequence[float]]) -> np.ndarray:
+        """
+        Calculates the exponential average along the first axis of the 1-D or 2-D array of values:
+
+            smoothed[0] = values[0]
+            smoothed[i] = lambda_coeff * values[i] + (1 - lambda_coeff) * smoothed[i - 1]
+
+        The recursion is computed with the linear filter, which performs the same floating point operations as the
+        element by element calculation. For the 2-D array lambda_coeff may be also a sequence of coefficients
+        (one per column), in which case the filter is run once for all columns sharing the same coefficient.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if values.shape[0] <= 1:
+            return values.copy()
+
+        if np.ndim(lambda_coeff) == 0:
+            return TimeIndexedContainer._exponential_average_filter(values, float(lambda_coeff))
+
+        lambda_coefficients = np.asarray(lambda_coeff, dtype=np.float64)
+        smoothed_values = np.empty_like(values)
+        for coefficient in np.unique(lambda_coefficients):
+            columns = np.flatnonzero(lambda_coefficients == coefficient)
+            smoothed_values[:, columns] = TimeIndexedContainer._exponential_average_filter(values[:, columns],
+                                                                                           coefficient)
+        return smoothed_values
+
+    @staticmethod
+    def _exponential_average_filter(values: np.ndarray, lambda_coeff: float) -> np.ndarray:
+        # the first smoothed value is equal to the first value and it is the initial state of the filter
+        smoothed_values = np.empty_like(values)
+        smoothed_values[0] = values[0]
+        initial_state = (1 - lambda_coeff) * values[:1]
+        smoothed_values[1:], _ = lfilter([lambda_coeff], [1.0, -(1 - lambda_coeff)], values[1:], axis=0,
+                                         zi=initial_state)
+        return smoothed_values
@@ -15,9 +15,10 @@
 import json
 import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Union, Sequence, Dict, List, Optional, Tuple
+from typing import Union, Sequence, Dict, List, Optional, Tuple, Callable, Any
 from urllib.parse import urljoin
 
 import pandas as pd
@@ -46,6 +47,7 @@ from qf_lib.common.tickers.tickers import BloombergTicker
 from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.futures.future_tickers.bloomberg_future_ticker import BloombergFutureTicker
+from qf_lib.containers.dimension_names import TICKERS
 from qf_lib.containers.qf_data_array import QFDataArray
 from qf_lib.containers.series.qf_series import QFSeries
 from qf_lib.data_providers.abstract_price_data_provider import AbstractPriceDataProvider
@@ -76,15 +78,35 @@ class BloombergBeapHapiDataProvider(AbstractPriceDataProvider, TickersUniversePr
     account; the User value can be obtained by running IAM <GO> in the Bloomberg terminal)
     - hapi_crenetials.sn (parameter to link the Data License to a Bloomberg Professional account;
     the S/N value can be obtained by running IAM <GO> in the Bloomberg terminal)
+
+    Historical data of large universes is requested in chunks of tickers_per_request tickers. The requests are
+    pipelined: all of them are submitted concurrently (using a pool of max_concurrent_requests threads sharing
+    the connection pool of a single requests.Session) and every reply is downloaded and parsed as soon as its
+    delivery notification arrives, while the replies to the remaining requests are still awaited.
+
+    Parameters
+    ----------
+    settings: Settings
+        settings containing the credentials and the output directory
+    reply_timeout: int
+        time (in minutes) of waiting for the replies
+    tickers_per_request: Optional[int]
+        maximal number of tickers in the universe of a single history request. If None, all the tickers are
+        requested at once
+    max_concurrent_requests: int
+        maximal number of requests submitted, downloaded or parsed at the same time
     """
 
-    def __init__(self, settings: Settings, reply_timeout: int = 5):
+    def __init__(self, settings: Settings, reply_timeout: int = 5, tickers_per_request: Optional[int] = 1000,
+                 max_concurrent_requests: int = 4):
         super().__init__()
 
         self.parser = BloombergBeapHapiParser()
 
         host = 'https://api.bloomberg.com'
         self.reply_timeout = timedelta(minutes=reply_timeout)  # reply_timeout - time in minutes
+        self.tickers_per_request = tickers_per_request
+        self.max_concurrent_requests = max_concurrent_requests
 
         output_folder = "hapi_responses"
         self.downloads_path = Path(get_starting_dir_abs_path()) / settings.output_directory / output_folder
@@ -188,7 +210,8 @@ class BloombergBeapHapiDataProvider(AbstractPriceDataProvider, TickersUniversePr
         Raises
         -------
         BloombergError
-            When unexpected response from Bloomberg HAPI happened
+            When unexpected response from Bloomberg HAPI happened or the replies to the requests were not delivered
+            before the reply timeout
         """
         self._assert_is_connected()
 
@@ -201,21 +224,39 @@ class BloombergBeapHapiDataProvider(AbstractPriceDataProvider, TickersUniversePr
         tickers, got_single_ticker = convert_to_list(tickers, BloombergTicker)
         fields, got_single_field = convert_to_list(fields, str)
 
-        tickers_str = [t.as_string() for t in tickers]
-        universe_id = self._get_universe_id(tickers, universe_creation_time)
-        universe_url = self.universe_hapi_provider.get_universe_url(universe_id, tickers_str, False)
-
         fields_list_id = self._get_fields_id(fields)
         fields_list_url, field_to_type = self.fields_hapi_provider.get_fields_history_url(fields_list_id, fields)
 
+        chunk_size = self.tickers_per_request or max(len(tickers), 1)
+        tickers_chunks = [tickers[i:i + chunk_size] for i in range(0, len(tickers), chunk_size)]
         # for requests - always create a new request with current time
         request_id = f'hReq{datetime.now():%m%d%H%M%S%f}'
-        self.request_hapi_provider.create_request_history(request_id, universe_url, fields_list_url, start_date,
-                                                          end_date, frequency, currency)
-        self.logger.info(f'universe_id: {universe_id} fields_list_id: {fields_list_id} request_id: {request_id}')
-
-        out_path = self._download_response(request_id)
-        data_array = self.parser.get_history(out_path, field_to_type)
+        request_ids = [request_id] if len(tickers_chunks) == 1 else \
+            [f'{request_id}c{i}' for i in range(len(tickers_chunks))]
+
+        def create_request(chunk_index: int):
+            tickers_chunk = tickers_chunks[chunk_index]
+            universe_id = self._get_universe_id(tickers_chunk, universe_creation_time)
+            if len(tickers_chunks) > 1:
+                # universes of all the chunks are created at the same time and need distinct ids
+                universe_id = f'{universe_id}c{chunk_index}'
+
+            tickers_str = [t.as_string() for t in tickers_chunk]
+            universe_url = self.universe_hapi_provider.get_universe_url(universe_id, tickers_str, False)
+            self.request_hapi_provider.create_request_history(request_ids[chunk_index], universe_url, fields_list_url,
+                                                              start_date, end_date, frequency, currency)
+            self.logger.info(f'universe_id: {universe_id} fields_list_id: {fields_list_id} '
+                             f'request_id: {request_ids[chunk_index]}')
+
+        data_arrays = self._pipeline_requests(
+            request_ids, create_request, lambda out_path: self.parser.get_history(out_path, field_to_type))
+
+        if not data_arrays:
+            data_array = QFDataArray.create(dates=[], tickers=[], fields=fields)
+        elif len(data_arrays) == 1:
+            data_array = data_arrays[0]
+        else:
+            data_array = QFDataArray.concat(data_arrays, dim=TICKERS)
 
         def current_ticker(t: BloombergTicker):
             return t.get_current_specific_ticker() if isinstance(t, BloombergFutureTicker) else t
@@ -429,43 +470,119 @@ class BloombergBeapHapiDataProvider(AbstractPriceDataProvider, TickersUniversePr
     def _download_response(self, request_id: str):
         expiration_timestamp = datetime.utcnow() + self.reply_timeout
         while datetime.utcnow() < expiration_timestamp:
-            # Read the next available event
-            event = self.sse_client.read_event()
-
-            if event.is_heartbeat():
-                self.logger.debug('Received heartbeat event, keep waiting for events')
+            distribution = self._read_distribution_event()
+            if distribution is None:
                 continue
 
-            self.logger.info('Received reply delivery notification event: %s', event)
-            event_data = json.loads(event.data)
-
-            try:
-                distribution = event_data['generated']
-                reply_url = distribution['@id']
-
-                distribution_id = distribution['identifier']
-                catalog = distribution['snapshot']['dataset']['catalog']
-                reply_catalog_id = catalog['identifier']
-            except KeyError:
-                self.logger.info("Received other event type, continue waiting")
-            else:
-                is_required_reply = '{}.bbg'.format(request_id) == distribution_id
-                is_same_catalog = reply_catalog_id == self.catalog_id
-
-                if not is_required_reply or not is_same_catalog:
-                    self.logger.info("Some other delivery occurred - continue waiting. "
-                                     "Reply catalog id: {}".format(reply_catalog_id))
-                    continue
+            reply_url, distribution_id = distribution
+            if '{}.bbg'.format(request_id) != distribution_id:
+                self.logger.info("Some other delivery occurred - continue waiting.")
+                continue
 
-                output_file_path = os.path.join(self.downloads_path, distribution_id)
-                out_path = self._download_distribution(reply_url, output_file_path)
+            output_file_path = os.path.join(self.downloads_path, distribution_id)
+            out_path = self._download_distribution(reply_url, output_file_path)
 
-                self.logger.info('Reply was downloaded, exit now')
+            self.logger.info('Reply was downloaded, exit now')
 
-                return out_path
+            return out_path
         else:
             self.logger.warning('Reply NOT delivered, try to increase waiter loop timeout')
 
+    def _pipeline_requests(self, request_ids: Sequence[str], create_request: Callable[[int], None],
+                           parse_reply: Callable[[str], Any]) -> List[Any]:
+        """
+        Creates all the requests concurrently and waits for their replies. Each reply is downloaded and parsed in
+        the pool of threads as soon as its delivery notification is received, while the notifications of the
+        remaining replies are awaited. All the threads share the connection pool of the session.
+
+        Parameters
+        ----------
+        request_ids: Sequence[str]
+            ids of the requests
+        create_request: Callable[[int], None]
+            function creating the request with the given position in the request_ids (e.g. creating its universe and
+            submitting it)
+        parse_reply: Callable[[str], Any]
+            function parsing the downloaded reply file
+
+        Returns
+        -------
+        List[Any]
+            parsed replies in the order of request_ids
+
+        Raises
+        -------
+        BloombergError
+            When the replies to some of the requests were not delivered before the reply timeout
+        """
+        pending_distributions = {'{}.bbg'.format(request_id): i for i, request_id in enumerate(request_ids)}
+        replies = {}
+
+        def download_and_parse(reply_url: str, distribution_id: str):
+            out_path = self._download_distribution(reply_url, os.path.join(self.downloads_path, distribution_id))
+            return parse_reply(out_path)
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrent_requests) as executor:
+            created_requests = [executor.submit(create_request, i) for i in range(len(request_ids))]
+
+            expiration_timestamp = datetime.utcnow() + self.reply_timeout
+            while pending_distributions and datetime.utcnow() < expiration_timestamp:
+                for created_request in created_requests:
+                    if created_request.done() and created_request.exception() is not None:
+                        raise created_request.exception()
+
+                distribution = self._read_distribution_event()
+                if distribution is None:
+                    continue
+
+                reply_url, distribution_id = distribution
+                if distribution_id not in pending_distributions:
+                    self.logger.info("Some other delivery occurred - continue waiting.")
+                    continue
+
+                position = pending_distributions.pop(distribution_id)
+                replies[position] = executor.submit(download_and_parse, reply_url, distribution_id)
+                self.logger.info(f'Reply {distribution_id} delivered, {len(pending_distributions)} replies pending')
+
+            if pending_distributions:
+                undelivered_request_ids = [request_ids[i] for i in sorted(pending_distributions.values())]
+                raise BloombergError(f'Replies to the requests {undelivered_request_ids} were NOT delivered before '
+                                     f'the reply timeout, try to increase the reply_timeout')
+
+            return [replies[i].result() for i in range(len(request_ids))]
+
+    def _read_distribution_event(self) -> Optional[Tuple[str, str]]:
+        """
+        Reads the next event from the SSE client. Returns the url and the id of the delivered distribution or None
+        if the event is not a delivery notification of the scheduled catalog.
+        """
+        event = self.sse_client.read_event()
+
+        if event.is_heartbeat():
+            self.logger.debug('Received heartbeat event, keep waiting for events')
+            return None
+
+        self.logger.info('Received reply delivery notification event: %s', event)
+        event_data = json.loads(event.data)
+
+        try:
+            distribution = event_data['generated']
+            reply_url = distribution['@id']
+
+            distribution_id = distribution['identifier']
+            catalog = distribution['snapshot']['dataset']['catalog']
+            reply_catalog_id = catalog['identifier']
+        except KeyError:
+            self.logger.info("Received other event type, continue waiting")
+            return None
+
+        if reply_catalog_id != self.catalog_id:
+            self.logger.info("Some other delivery occurred - continue waiting. "
+                             "Reply catalog id: {}".format(reply_catalog_id))
+            return None
+
+        return reply_url, distribution_id
+
     def _download_distribution(self, url: str, out_path: str, chunk_size: int = 2048, stream: bool = True,
                                headers: Dict = None):
         """
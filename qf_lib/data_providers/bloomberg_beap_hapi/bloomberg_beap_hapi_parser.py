@@ -12,16 +12,18 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 import gzip
-import re
-from io import StringIO
-from typing import Tuple, List, Dict
+from contextlib import contextmanager
+from io import StringIO, TextIOWrapper
+from typing import List, Dict, Iterator, Optional, TextIO
+
+import pandas as pd
+from numpy import float64
+
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.qf_data_array import QFDataArray
 from qf_lib.data_providers.bloomberg_beap_hapi.helpers import BloombergDataLicenseTypeConverter
 from qf_lib.data_providers.helpers import tickers_dict_to_data_array
-import numpy as np
-import csv
 
 
 class BloombergBeapHapiParser:
@@ -46,11 +48,19 @@ class BloombergBeapHapiParser:
     TIMEFINISHED=Mon Jan 01 00:00:00 GMT 2020
 
     END-OF-FILE
+
+    The response is decompressed and parsed incrementally, in chunks of chunk_size rows of data.
+
+    Parameters
+    ----------
+    chunk_size: int
+        maximal number of rows of data parsed at once
     """
 
-    def __init__(self):
+    def __init__(self, chunk_size: int = 100000):
         self.logger = qf_logger.getChild(self.__class__.__name__)
         self.type_converter = BloombergDataLicenseTypeConverter()
+        self.chunk_size = chunk_size
 
     def get_current_values(self, filepath: str, field_to_type: Dict[str, str]) -> QFDataFrame:
         """
@@ -70,13 +80,19 @@ class BloombergBeapHapiParser:
         """
         column_names = ["Ticker", "Error code", "Num flds"]
         field_to_type = {**field_to_type, "Ticker": "String"}
-        fields, content = self._get_fields_and_data_content(filepath, field_to_type, column_names, header_row=True)
 
+        with self._open(filepath) as lines:
+            fields = self._read_fields(lines)
+            chunks = list(self._read_data_chunks(lines, field_to_type, column_names + fields, header_row=True))
+
+        content = QFDataFrame(pd.concat(chunks)) if chunks else \
+            QFDataFrame(columns=column_names + fields)
         return content.set_index("Ticker")[fields]
 
     def get_history(self, filepath: str, field_to_type: Dict[str, str]) -> QFDataArray:
         """
-        Method to parse hapi response and get history data
+        Method to parse hapi response and get history data. The response is read in chunks of rows, so that
+        the memory needed to parse it does not depend on the size of the response (apart from the parsed values).
 
         Parameters
         ----------
@@ -91,59 +107,105 @@ class BloombergBeapHapiParser:
             QFDataArray with history data
         """
         column_names = ["Ticker", "Error code", "Num flds", "Pricing Source", "Dates"]
-        field_to_type = {**field_to_type, "Ticker": "String", "Error code": "String", "Num flds": "String",
-                         "Pricing Source": "String", "Dates": "Date"}
-        fields, content = self._get_fields_and_data_content(filepath, field_to_type, column_names)
+        field_to_type = {**field_to_type, "Ticker": "String", "Dates": "Date"}
+
+        tickers_frames = {}  # type: Dict[str, List[QFDataFrame]]
+        with self._open(filepath) as lines:
+            fields = self._read_fields(lines)
+            for chunk in self._read_data_chunks(lines, field_to_type, column_names + fields,
+                                                used_columns=["Ticker", "Dates"] + fields):
+                for ticker, df in chunk.groupby(by="Ticker", sort=False):
+                    tickers_frames.setdefault(ticker, []).append(df.set_index("Dates")[fields].dropna(how="all"))
+
+        tickers_dict = {}
+        for ticker in sorted(tickers_frames.keys()):
+            df = QFDataFrame(pd.concat(tickers_frames[ticker]))
+            df.index = pd.DatetimeIndex(df.index, name="Dates")
+            tickers_dict[ticker] = df
 
-        tickers_dict = {
-            ticker: df.set_index("Dates")[fields].dropna(how="all") for ticker, df in content.groupby(by="Ticker")
-        }
         return tickers_dict_to_data_array(tickers_dict, list(tickers_dict.keys()), fields)
 
-    def _get_fields_and_data_content(self, filepath: str, field_to_type: Dict, column_names: List,
-                                     header_row: bool = False) -> Tuple[List, QFDataFrame]:
+    @staticmethod
+    @contextmanager
+    def _open(filepath: str) -> Iterator[TextIO]:
+        """ Opens the gzipped response as a stream of lines (decompressed incrementally). """
+        with gzip.open(filepath, 'rb') as binary_file, TextIOWrapper(binary_file, encoding="utf-8") as text_file:
+            yield text_file
+
+    @staticmethod
+    def _skip_to(lines: TextIO, marker: str):
+        for line in lines:
+            if line.rstrip("\r\n") == marker:
+                return
+        raise ValueError("The response does not contain the {} line".format(marker))
+
+    def _read_fields(self, lines: TextIO) -> List[str]:
+        """ Reads the fields between START-OF-FIELDS and END-OF-FIELDS. """
+        self._skip_to(lines, "START-OF-FIELDS")
+        fields = []
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if line == "END-OF-FIELDS":
+                return fields
+            fields.append(line)
+        raise ValueError("The response does not contain the END-OF-FIELDS line")
+
+    def _read_data_chunks(self, lines: TextIO, field_to_type: Dict[str, str], column_names: List[str],
+                          header_row: bool = False, used_columns: Optional[List[str]] = None) \
+            -> Iterator[QFDataFrame]:
         """
-        Helper function to extract fields and content of the hapi response between following (including headers):
-        fields: START-OF-FIELDS - END-OF-FIELDS
-        content: START-OF-DATA - END-OF-DATA
+        Reads the rows between START-OF-DATA and END-OF-DATA and yields them in chunks of at most chunk_size rows.
+        Each row is split on the "|" delimiter (trailing delimiters are removed) and the rows, which do not contain
+        a value for each of the column_names, are skipped. Every chunk is parsed by the C parser of pandas: numeric
+        fields are read directly as floats, whitespace-only and "N.A." values are read as nans. The values of
+        the remaining columns are converted according to their types with the BloombergDataLicenseTypeConverter.
 
         Parameters
         ----------
-        filepath: str
-            The full filepath with downloaded response
+        lines: TextIO
+            stream of lines of the response
         field_to_type: Dict[str, str]
-            dictionary mapping requested, correct fields into their corresponding types
+            dictionary mapping columns into their corresponding types
         column_names: List[str]
-            list of names to be used as column names of the dataframe
+            list of names of all the columns of the rows
         header_row: bool
             indicated whether header is present in the response file (current values response) or not (historical
             data response)
-
-        Returns
-        -------
-        fields, content: Tuple[List[str], QFDataFrame]
-            Extracted fields and content from the response, each item in the list represent one value
-            Fields contains all fields
-            Content contains the list of all rows separated by "|", which need to be proceed further
+        used_columns: Optional[List[str]]
+            columns, which should be returned (by default all the columns)
         """
-        f = gzip.open(filepath, 'rb')
-        data = f.read().decode("utf-8")
-        # Without re.DOTALL, each line of the input text matches the pattern separately
-        fields = re.search(r'START-OF-FIELDS\n(.*?)\nEND-OF-FIELDS', data, re.DOTALL).group(1).split('\n')
-        content = re.search(r'START-OF-DATA\n(.*?)\nEND-OF-DATA', data, re.DOTALL).group(1)
-        content = self._read_csv(content, column_names + fields, header_row=header_row)
-
-        for col, _type in field_to_type.items():
-            content.loc[:, col] = self.type_converter.infer_type(content.loc[:, col], _type)
-
-        return fields, content
-
-    @staticmethod
-    def _read_csv(content: str, column_names: List[str], delimiter: str = "|", header_row: bool = False):
-        # Remove trailing delimiters
-        content = "\n".join(line.rstrip("|") for line in content.split("\n"))
-        lines = csv.reader(StringIO(content), delimiter=delimiter)
-        records = list(lines) if not header_row else list(lines)[1:]
-        records = [line for line in records if len(line) == len(column_names)]
-        df = QFDataFrame.from_records(records, columns=column_names)
-        return df.replace(r'^\s+$', np.nan, regex=True)
+        used_columns = used_columns or column_names
+        number_of_delimiters = len(column_names) - 1
+        dtypes = {column: self.type_converter.parsing_dtype(field_to_type.get(column)) for column in used_columns}
+
+        def parse(rows: List[str]) -> QFDataFrame:
+            chunk = pd.read_csv(StringIO("\n".join(rows)), sep="|", header=None, names=column_names,
+                                usecols=used_columns, dtype=dtypes, engine="c", skipinitialspace=True,
+                                keep_default_na=False, na_values=["", "N.A."])
+            chunk = QFDataFrame(chunk[used_columns])
+            for col in used_columns:
+                if col in field_to_type and dtypes[col] is not float64:
+                    chunk[col] = self.type_converter.infer_type(chunk[col], field_to_type[col])
+            return chunk
+
+        self._skip_to(lines, "START-OF-DATA")
+        rows = []
+        is_header = header_row
+        for line in lines:
+            line = line.rstrip("\r\n")
+            if line == "END-OF-DATA":
+                break
+            if is_header:
+                is_header = False
+                continue
+
+            # Remove trailing delimiters
+            line = line.rstrip("|")
+            if line.count("|") == number_of_delimiters:
+                rows.append(line)
+                if len(rows) == self.chunk_size:
+                    yield parse(rows)
+                    rows = []
+
+        if rows:
+            yield parse(rows)
@@ -11,7 +11,7 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
-from typing import List
+from typing import List, Optional
 
 from numpy import float64
 from pandas import to_datetime, notna
@@ -22,6 +22,15 @@ from qf_lib.containers.series.qf_series import QFSeries
 
 class BloombergDataLicenseTypeConverter:
 
+    float_types = ("Integer", "Integer/Real", "Real", "Price")
+
+    def parsing_dtype(self, bbg_data_type: Optional[str]) -> type:
+        """
+        Returns the type, in which the values of the given Bloomberg data type should be read from a response:
+        float64 for the types converted to floats, str for all the other types (converted afterwards with infer_type).
+        """
+        return float64 if bbg_data_type in self.float_types else str
+
     def infer_type(self, series: QFSeries, bbg_data_type: str) -> QFSeries:
         field_types = {
             "String": self._string_conversion,
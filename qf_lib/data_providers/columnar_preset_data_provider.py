@@ -0,0 +1,180 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from typing import Union, Sequence, Any, Dict, Optional
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
+from qf_lib.containers.dataframe.prices_dataframe import PricesDataFrame
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.containers.series.prices_series import PricesSeries
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.data_providers.helpers import squeeze_data_array_and_cast_to_proper_type, normalize_data_array
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+from qf_lib.data_providers.price_cube import PriceCube
+
+
+class ColumnarPresetDataProvider(PresetDataProvider):
+    """
+    PresetDataProvider which stores the data bundle in a PriceCube - a contiguous (dates x tickers x fields)
+    NumPy array with precomputed tickers and fields positions and a sorted int64 dates index. Date ranges are
+    resolved using binary search and labelled containers are created only at the moment of returning the result,
+    which makes the get_price, historical_price and get_history calls significantly faster than the label-based
+    selection on the QFDataArray used by the PresetDataProvider.
+
+    Queries, which require aggregating the data to a lower frequency, aggregate only the selected part of the cube.
+
+    The results have the same index as the results of the PresetDataProvider: the dates, for which none of the
+    requested tickers has a value of any of the requested fields, are not returned (as in normalize_data_array), while
+    the dates, for which only some of the tickers or fields are missing, are returned with nans.
+
+    Parameters
+    ----------
+    data
+        data to be wrapped, indexed by date, (specific) tickers and fields. If a PriceCube is passed (e.g. the
+        MemoryMappedPriceCube), the data bundle is materialised only if the data_bundle property is accessed
+    start_date
+        beginning of the cached period (not necessarily the first date in the `data`)
+    end_date
+        end of the cached period (not necessarily the last date in the `data`)
+    frequency
+        frequency of the data
+    exp_dates
+        dictionary mapping FutureTickers to QFDataFrame of contracts expiration dates, belonging to the certain
+        future ticker family
+    """
+
+    def __init__(self, data: Union[QFDataArray, PriceCube], start_date: datetime, end_date: datetime,
+                 frequency: Frequency, exp_dates: Dict[FutureTicker, QFDataFrame] = None):
+        super().__init__(data, start_date, end_date, frequency, exp_dates)
+        if isinstance(data, PriceCube):
+            self._price_cube = data
+            self._data_bundle = None
+        else:
+            self._price_cube = PriceCube.from_data_array(data)
+
+    @classmethod
+    def from_preset_data_provider(cls, data_provider: PresetDataProvider) -> "ColumnarPresetDataProvider":
+        """
+        Creates the ColumnarPresetDataProvider using the data bundle of any PresetDataProvider (e.g. the
+        PrefetchingDataProvider or the CSVDataProvider).
+        """
+        return cls(data_provider.data_bundle, data_provider.start_date, data_provider.end_date,
+                   data_provider.frequency, data_provider.exp_dates)
+
+    def with_data_bundle(self, data_bundle: QFDataArray) -> "ColumnarPresetDataProvider":
+        data_provider = super().with_data_bundle(data_bundle)
+        data_provider._price_cube = PriceCube.from_data_array(data_bundle)
+        return data_provider
+
+    @property
+    def data_bundle(self) -> QFDataArray:
+        if self._data_bundle is None:
+            self._data_bundle = self._price_cube.get_data_array(
+                slice(None), self._price_cube.tickers, self._price_cube.fields, drop_empty_dates=False)
+        return self._data_bundle
+
+    def get_price(self, tickers: Union[Ticker, Sequence[Ticker]], fields: Union[PriceField, Sequence[PriceField]],
+                  start_date: datetime, end_date: datetime = None, frequency: Frequency = Frequency.DAILY) -> \
+            Union[None, PricesSeries, PricesDataFrame, QFDataArray]:
+        assert frequency <= self._frequency, "The passed data frequency should be at most equal to the frequency of " \
+                                             "the initially loaded data"
+        aggregate_bars = frequency < self._frequency
+        if aggregate_bars and frequency <= Frequency.DAILY:
+            self.logger.warning("aggregating intraday data to frequency Daily or lower is based on the time of "
+                                "underlying intrady data and might not be identical to getting daily data form the "
+                                "data provider.")
+
+        start_date = self._adjust_start_date(start_date, frequency)
+        end_date = self._adjust_end_date(end_date)
+
+        tickers, specific_tickers, tickers_mapping, got_single_ticker = self._tickers_mapping(tickers)
+        fields, got_single_field = convert_to_list(fields, PriceField)
+        got_single_date = self._got_single_date(start_date, end_date, frequency)
+
+        self._check_if_cached_data_available(specific_tickers, fields, start_date, end_date)
+        dates_slice = self._price_cube.dates_slice(start_date, end_date)
+        data_array = self._price_cube.get_data_array(dates_slice, specific_tickers, fields,
+                                                     drop_empty_dates=not aggregate_bars)
+
+        if aggregate_bars:
+            if data_array.shape[0] > 0:
+                data_array = self._aggregate_bars(data_array, fields, frequency)
+            normalized_result = normalize_data_array(
+                data_array, specific_tickers, fields, got_single_date, got_single_ticker, got_single_field,
+                use_prices_types=True)
+        else:
+            normalized_result = squeeze_data_array_and_cast_to_proper_type(
+                data_array, got_single_date, got_single_ticker, got_single_field, use_prices_types=True)
+        return self._map_normalized_result(normalized_result, tickers_mapping, tickers)
+
+    def historical_price(self, tickers: Union[Ticker, Sequence[Ticker]],
+                         fields: Union[PriceField, Sequence[PriceField]],
+                         nr_of_bars: int, end_date: Optional[datetime] = None,
+                         frequency: Frequency = None) -> Union[PricesSeries, PricesDataFrame, QFDataArray]:
+        assert nr_of_bars > 0, "Numbers of data samples should be a positive integer"
+        end_date = datetime.now() if end_date is None else end_date
+
+        tickers, specific_tickers, tickers_mapping, got_single_ticker = self._tickers_mapping(tickers)
+        fields, got_single_field = convert_to_list(fields, PriceField)
+        got_single_date = nr_of_bars == 1
+
+        start_date = self._compute_start_date(nr_of_bars, end_date, frequency)
+        dates_slice = self._price_cube.dates_slice(start_date, end_date)
+        data_array = self._price_cube.get_data_array(dates_slice, specific_tickers, fields)
+
+        aggregate_bars = frequency < self._frequency
+        if aggregate_bars and data_array.shape[0] > 0:
+            data_array = self._aggregate_bars(data_array, fields, frequency)
+
+        self._check_data_availibility(data_array, end_date, nr_of_bars, tickers)
+        data_array = data_array.isel(dates=slice(-nr_of_bars, None))
+
+        if aggregate_bars:
+            normalized_result = normalize_data_array(
+                data_array, specific_tickers, fields, got_single_date, got_single_ticker, got_single_field,
+                use_prices_types=True)
+        else:
+            normalized_result = squeeze_data_array_and_cast_to_proper_type(
+                data_array, got_single_date, got_single_ticker, got_single_field, use_prices_types=True)
+
+        normalized_result = self._map_normalized_result(normalized_result, tickers_mapping, tickers)
+        self._check_data_availibility(normalized_result, end_date, nr_of_bars, tickers)
+        return normalized_result
+
+    def get_history(self, tickers: Union[Ticker, Sequence[Ticker]],
+                    fields: Union[Any, Sequence[Any]],
+                    start_date: datetime, end_date: datetime = None, frequency: Frequency = Frequency.DAILY, **kwargs
+                    ) -> Union[QFSeries, QFDataFrame, QFDataArray]:
+
+        assert frequency == self._frequency, "Currently, for the get history does not support data sampling"
+
+        start_date = self._adjust_start_date(start_date, frequency)
+        end_date = self._adjust_end_date(end_date)
+
+        tickers, specific_tickers, tickers_mapping, got_single_ticker = self._tickers_mapping(tickers)
+        fields, got_single_field = convert_to_list(fields, type(fields) if not isinstance(fields, Sequence) else str)
+        got_single_date = self._got_single_date(start_date, end_date, frequency)
+
+        self._check_if_cached_data_available(specific_tickers, fields, start_date, end_date)
+        dates_slice = self._price_cube.dates_slice(start_date, end_date)
+        data_array = self._price_cube.get_data_array(dates_slice, specific_tickers, fields)
+
+        normalized_result = squeeze_data_array_and_cast_to_proper_type(
+            data_array, got_single_date, got_single_ticker, got_single_field, use_prices_types=False)
+        return self._map_normalized_result(normalized_result, tickers_mapping, tickers)
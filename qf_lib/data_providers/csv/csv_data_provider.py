@@ -13,8 +13,9 @@
 #     limitations under the License.
 from datetime import datetime
 from pathlib import Path
-from typing import Sequence, Union, List, Dict, Optional
+from typing import Sequence, Union, List, Dict, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 
 from qf_lib.common.enums.frequency import Frequency
@@ -22,9 +23,9 @@ from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
 from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
-from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
-from qf_lib.data_providers.helpers import normalize_data_array, tickers_dict_to_data_array
+from qf_lib.data_providers.csv.csv_files_loader import CSVFilesLoader, ParsedCSVFile, parsed_files_to_data_array
+from qf_lib.data_providers.helpers import normalize_data_array
 from qf_lib.data_providers.preset_data_provider import PresetDataProvider
 
 
@@ -65,6 +66,14 @@ class CSVDataProvider(PresetDataProvider):
         try to infer the dates format from the data. By default None.
     ticker_col: Optional[str]
         column name with the tickers
+    number_of_processes: Optional[int]
+        number of processes used to parse the files. 1 (default) means that all the files are parsed in the current
+        process, None means that the number of processes is equal to the number of CPUs. If ticker_col is used,
+        the single file is always parsed in the current process (the dates of all its rows are parsed at once)
+    snapshot_dir: Optional[str]
+        directory, in which binary snapshots of the parsed files are stored. If it is provided, the files, which were
+        not modified since the last run, are loaded from their snapshots instead of being parsed again
+        (see CSVFilesLoader). By default None (no snapshots are used)
 
     Notes
     -----
@@ -103,7 +112,8 @@ class CSVDataProvider(PresetDataProvider):
                  field_to_price_field_dict: Optional[Dict[str, PriceField]] = None,
                  fields: Optional[Union[str, List[str]]] = None, start_date: Optional[datetime] = None,
                  end_date: Optional[datetime] = None, frequency: Optional[Frequency] = Frequency.DAILY,
-                 dateformat: Optional[str] = None, ticker_col: Optional[str] = None):
+                 dateformat: Optional[str] = None, ticker_col: Optional[str] = None,
+                 number_of_processes: Optional[int] = 1, snapshot_dir: Optional[str] = None):
 
         self.logger = qf_logger.getChild(self.__class__.__name__)
 
@@ -118,7 +128,8 @@ class CSVDataProvider(PresetDataProvider):
 
         data_array, start_date, end_date, available_fields = self._get_data(path, tickers, fields, start_date, end_date,
                                                                             frequency, field_to_price_field_dict,
-                                                                            index_col, dateformat, ticker_col)
+                                                                            index_col, dateformat, ticker_col,
+                                                                            number_of_processes, snapshot_dir)
 
         normalized_data_array = normalize_data_array(data_array, tickers, available_fields, False, False, False)
 
@@ -129,76 +140,136 @@ class CSVDataProvider(PresetDataProvider):
 
     def _get_data(self, path: str, tickers: Sequence[Ticker], fields: Optional[Sequence[str]], start_date: datetime,
                   end_date: datetime, frequency: Frequency, field_to_price_field_dict: Optional[Dict[str, PriceField]],
-                  index_col: str, dateformat: str, ticker_col):
+                  index_col: str, dateformat: str, ticker_col, number_of_processes: Optional[int],
+                  snapshot_dir: Optional[str]):
 
         tickers_str_mapping = {ticker.as_string(): ticker for ticker in tickers}
-        tickers_prices_dict = {}
-        available_fields = set()
-
-        def _process_df(df, ticker_str):
-            df.index = pd.to_datetime(df[index_col], format=dateformat)
-            df = df[~df.index.duplicated(keep='first')]
-            df = df.drop(index_col, axis=1)
-            if Frequency.infer_freq(df.index) != frequency:
-                self.logger.info(f"Inferred frequency for the file {path} is different than requested. "
-                                 f"Skipping {path}.")
-            else:
+        tickers_parsed_files = {}  # type: Dict[Ticker, ParsedCSVFile]
 
-                start_time = start_date or df.index[0]
-                end_time = end_date or df.index[-1]
+        columns = None
+        if fields:
+            columns = list(dict.fromkeys(list(fields) + list((field_to_price_field_dict or {}).keys())))
 
+        if ticker_col:
+            loader = CSVFilesLoader(_read_csv_file_with_tickers, number_of_processes, snapshot_dir,
+                                    index_col=index_col, ticker_col=ticker_col, dateformat=dateformat, columns=columns)
+            parsed_file, = loader.load([Path(path)])
+            available_tickers, parsed_files = _split_by_tickers(parsed_file, ticker_col, frequency)
+            paths = [path] * len(available_tickers)
+        else:
+            tickers_paths = [list(Path(path).glob('**/{}.csv'.format(ticker.as_string()))) for ticker in tickers]
+            paths = [item for sublist in tickers_paths for item in sublist]
+            available_tickers = [file_path.resolve().name.replace('.csv', '') for file_path in paths]
+
+            loader = CSVFilesLoader(_read_csv_file, number_of_processes, snapshot_dir, index_col=index_col,
+                                    dateformat=dateformat, frequency=frequency, columns=columns)
+            parsed_files = loader.load(paths)
+
+        available_fields = {}
+        for file_path, ticker_str, parsed_file in zip(paths, available_tickers, parsed_files):
+            if parsed_file is None:
+                self.logger.info(f"Inferred frequency for the file {file_path} is different than requested. "
+                                 f"Skipping {file_path}.")
+            elif ticker_str not in tickers_str_mapping:
+                self.logger.info(f'Ticker {ticker_str} was not requested in the list of tickers. Skipping.')
+            else:
                 if fields:
-                    df = df.loc[start_time:end_time, df.columns.isin(fields)]
-                    fields_diff = set(fields).difference(df.columns)
+                    fields_diff = set(fields).difference(parsed_file.all_columns())
                     if fields_diff:
-                        self.logger.info(f"Not all fields are available for {path}. Difference: {fields_diff}")
+                        self.logger.info(f"Not all fields are available for {file_path}. Difference: {fields_diff}")
                 else:
-                    df = df.loc[start_time:end_time, :]
-                    available_fields.update(df.columns.tolist())
+                    available_fields.update(dict.fromkeys(parsed_file.all_columns()))
 
-                if field_to_price_field_dict:
-                    for key, value in field_to_price_field_dict.items():
-                        df[value] = df[key]
+                tickers_parsed_files[tickers_str_mapping[ticker_str]] = parsed_file
 
-                if ticker_str in tickers_str_mapping:
-                    tickers_prices_dict[tickers_str_mapping[ticker_str]] = df
-                else:
-                    self.logger.info(f'Ticker {ticker_str} was not requested in the list of tickers. Skipping.')
+        if not tickers_parsed_files:
+            raise ImportError("No data was found. Check the correctness of all data")
 
-        if ticker_col:
-            df = QFDataFrame(pd.read_csv(path, dtype={index_col: str}))
-            available_tickers = df[ticker_col].dropna().unique().tolist()
+        available_fields = list(fields) if fields else list(available_fields)
+        fields_to_columns = {}
+        if field_to_price_field_dict:
+            available_fields.extend(list(field_to_price_field_dict.values()))
+            fields_to_columns = {value: [key] for key, value in field_to_price_field_dict.items()}
 
-            for ticker_str in available_tickers:
-                sliced_df = df[df[ticker_col] == ticker_str]
-                _process_df(sliced_df, ticker_str)
+        data_array = parsed_files_to_data_array(tickers_parsed_files, available_fields, fields_to_columns, start_date,
+                                                end_date)
+        if not start_date:
+            start_date = data_array.dates.to_index().min()
+        if not end_date:
+            end_date = data_array.dates.to_index().max()
 
-        else:
-            tickers_paths = [list(Path(path).glob('**/{}.csv'.format(ticker.as_string()))) for ticker in tickers]
-            joined_tickers_paths = [item for sublist in tickers_paths for item in sublist]
+        return data_array, start_date, end_date, available_fields
 
-            for path in joined_tickers_paths:
-                ticker_str = path.resolve().name.replace('.csv', '')
-                df = QFDataFrame(pd.read_csv(path, dtype={index_col: str}))
-                _process_df(df, ticker_str)
 
-        if not tickers_prices_dict.values():
-            raise ImportError("No data was found. Check the correctness of all data")
+def _read_csv_file(path: Path, index_col: str, dateformat: Optional[str], frequency: Frequency,
+                   columns: Optional[Sequence[str]]) -> Optional[ParsedCSVFile]:
+    """
+    Parses a single csv file (possibly in a worker process). Only the index column and the given columns
+    (or all columns if columns is None) are read. Returns None if the frequency of the data is different than the
+    requested one.
+    """
+    def is_used(column: str) -> bool:
+        return column == index_col or column in columns_set
 
-        if fields:
-            available_fields = list(fields)
+    columns_set = set(columns) if columns is not None else None
+    df = pd.read_csv(path, dtype={index_col: str}, usecols=is_used if columns is not None else None)
+    return _parse_csv_frame(df, index_col, dateformat, frequency)
+
+
+def _read_csv_file_with_tickers(path: Path, index_col: str, ticker_col: str, dateformat: Optional[str],
+                                columns: Optional[Sequence[str]]) -> ParsedCSVFile:
+    """
+    Parses a single csv file, which contains the data of many tickers (the tickers are stored in the ticker_col
+    column). The dates of all the rows are parsed at once. Only the index column, the ticker column and the given
+    columns (or all columns if columns is None) are read.
+    """
+    def is_used(column: str) -> bool:
+        return column in (index_col, ticker_col) or column in columns_set
+
+    columns_set = set(columns) if columns is not None else None
+    df = pd.read_csv(path, dtype={index_col: str, ticker_col: str}, usecols=is_used if columns is not None else None)
+    df = df[df[ticker_col].notna()]
+
+    dates = pd.DatetimeIndex(pd.to_datetime(df[index_col], format=dateformat, infer_datetime_format=dateformat is None))
+    return ParsedCSVFile.from_frame(df.drop(index_col, axis=1), dates)
+
+
+def _split_by_tickers(parsed_file: ParsedCSVFile, ticker_col: str,
+                      frequency: Frequency) -> Tuple[List[str], List[Optional[ParsedCSVFile]]]:
+    """
+    Splits the content of the file with many tickers into the content of each ticker and removes duplicated dates.
+    None is returned for the tickers, which frequency of the data is different than the requested one.
+    """
+    ticker_values = parsed_file.text_columns[ticker_col]
+    available_tickers = pd.unique(ticker_values).tolist()
+
+    parsed_files = []
+    for ticker_str in available_tickers:
+        positions = np.flatnonzero(ticker_values == ticker_str)
+        # Dates are sorted (stable), thus the first occurrence of every date comes first
+        dates = parsed_file.dates[positions]
+        positions = positions[np.concatenate([[True], dates[1:] != dates[:-1]])]
+
+        if Frequency.infer_freq(pd.DatetimeIndex(parsed_file.dates[positions])) != frequency:
+            parsed_files.append(None)
         else:
-            available_fields = list(available_fields)
+            parsed_files.append(parsed_file.take(positions))
 
-        if field_to_price_field_dict:
-            available_fields.extend(list(field_to_price_field_dict.values()))
+    return available_tickers, parsed_files
 
-        if not start_date:
-            start_date = min(list(df.index.min() for df in tickers_prices_dict.values()))
 
-        if not end_date:
-            end_date = max(list(df.index.max() for df in tickers_prices_dict.values()))
+def _parse_csv_frame(df: pd.DataFrame, index_col: str, dateformat: Optional[str],
+                     frequency: Frequency) -> Optional[ParsedCSVFile]:
+    """
+    Parses the dates of the data frame (with the explicit format if it is given, otherwise the format is inferred
+    from the first date and then used for all the dates) and removes duplicated dates.
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(df[index_col], format=dateformat, infer_datetime_format=dateformat is None))
+    first_occurrences = ~dates.duplicated(keep='first')
+    dates = dates[first_occurrences]
+
+    if Frequency.infer_freq(dates) != frequency:
+        return None
 
-        result = tickers_dict_to_data_array(tickers_prices_dict, list(tickers_prices_dict.keys()), available_fields), \
-            start_date, end_date, available_fields
-        return result
+    df = df.drop(index_col, axis=1)[first_occurrences]
+    return ParsedCSVFile.from_frame(df, dates)
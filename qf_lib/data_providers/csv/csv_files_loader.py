@@ -0,0 +1,311 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from os import makedirs
+from os.path import exists, join
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Sequence, Optional, Dict, Any, List
+
+import numpy as np
+import pandas as pd
+from pandas import DatetimeIndex
+
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
+from qf_lib.containers.qf_data_array import QFDataArray
+
+
+class ParsedCSVFile:
+    """
+    Content of a single parsed file with prices: sorted dates, the values of all numeric columns stored in one
+    (dates x columns) array and the values of all remaining (text) columns stored as separate object arrays.
+    The dtypes of the numeric columns in the source file are kept, so that e.g. integer columns stay integer when
+    the data array is assembled (the values array itself has the common dtype of all the numeric columns).
+
+    Parameters
+    ----------
+    dates: np.ndarray
+        sorted datetime64[ns] array of dates
+    columns: Sequence[str]
+        names of the numeric columns
+    values: np.ndarray
+        (dates x columns) array of values of the numeric columns
+    text_columns: Dict[str, np.ndarray]
+        mapping of the names of the non numeric columns onto their values
+    dtypes: Optional[Sequence[np.dtype]]
+        dtypes of the numeric columns in the source file. By default, the dtype of the values array is used for all
+        the columns
+    """
+
+    def __init__(self, dates: np.ndarray, columns: Sequence[str], values: np.ndarray,
+                 text_columns: Optional[Dict[str, np.ndarray]] = None, dtypes: Optional[Sequence[np.dtype]] = None):
+        self.dates = dates
+        self.columns = list(columns)
+        self.values = values
+        self.text_columns = text_columns or {}
+        self.dtypes = [np.dtype(dtype) for dtype in dtypes] if dtypes is not None else [values.dtype] * len(columns)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, dates: DatetimeIndex) -> "ParsedCSVFile":
+        """ Creates the ParsedCSVFile from the data frame with the file content and the parsed dates of its rows. """
+        order = np.argsort(dates.values, kind="stable")
+        df = df.iloc[order]
+
+        numeric_df = df.select_dtypes(include=np.number)
+        text_columns = {str(column): df[column].to_numpy(dtype=object) for column in df.columns
+                        if column not in numeric_df.columns}
+
+        dtypes = numeric_df.dtypes.tolist()
+        dtype = np.result_type(*dtypes) if dtypes else np.float64
+        return cls(dates.values[order], numeric_df.columns.astype(str), numeric_df.to_numpy(dtype=dtype),
+                   text_columns, dtypes)
+
+    def all_columns(self) -> List[str]:
+        """ Returns the names of all the columns (numeric and text ones). """
+        return self.columns + list(self.text_columns.keys())
+
+    def slice(self, start_date: Optional[datetime], end_date: Optional[datetime]) -> "ParsedCSVFile":
+        """ Returns the rows between start_date and end_date (inclusive). None means that the range is not bounded. """
+        start, end = 0, len(self.dates)
+        if start_date is not None:
+            start = np.searchsorted(self.dates, np.datetime64(start_date), side="left")
+        if end_date is not None:
+            end = np.searchsorted(self.dates, np.datetime64(end_date), side="right")
+        if start == 0 and end == len(self.dates):
+            return self
+
+        text_columns = {column: values[start:end] for column, values in self.text_columns.items()}
+        return ParsedCSVFile(self.dates[start:end], self.columns, self.values[start:end], text_columns, self.dtypes)
+
+    def take(self, positions: np.ndarray) -> "ParsedCSVFile":
+        """ Returns the rows with the given (sorted) positions. """
+        text_columns = {column: values[positions] for column, values in self.text_columns.items()}
+        return ParsedCSVFile(self.dates[positions], self.columns, self.values[positions], text_columns, self.dtypes)
+
+    def save(self, path: str):
+        """ Saves the file content in the NumPy .npz format (the text columns are pickled). """
+        arrays = {
+            "dates": self.dates.view(np.int64),
+            "columns": np.array(self.columns, dtype=str),
+            "values": self.values,
+            "dtypes": np.array([dtype.str for dtype in self.dtypes], dtype=str),
+            "text_columns": np.array(list(self.text_columns.keys()), dtype=str)
+        }
+        for i, values in enumerate(self.text_columns.values()):
+            arrays["text_{}".format(i)] = values
+
+        with open(path, "wb") as file:
+            np.savez(file, **arrays)
+
+    @classmethod
+    def load(cls, path: str) -> "ParsedCSVFile":
+        with np.load(path, allow_pickle=True) as arrays:
+            text_columns = {str(column): arrays["text_{}".format(i)] for i, column in enumerate(arrays["text_columns"])}
+            return cls(arrays["dates"].view("datetime64[ns]"), arrays["columns"].tolist(), arrays["values"],
+                       text_columns, arrays["dtypes"].tolist())
+
+
+class CSVFilesLoader:
+    """
+    Loads a large number of files with prices. The files are parsed by the read_function in a pool of processes
+    and the result of parsing of every file may be stored as a binary snapshot (in the .npz format) in the
+    snapshot_dir. The snapshot of a file is used instead of parsing the file as long as the file is not modified
+    (its size and modification time do not change) and the read function is called with the same arguments.
+
+    As the snapshot of every file is saved as soon as the file is parsed, loading is resumable - after an interrupted
+    run only the files, which were not parsed yet, are parsed.
+
+    Parameters
+    ----------
+    read_function: Callable[..., Optional[ParsedCSVFile]]
+        module level function, which parses the file with the given path and returns the ParsedCSVFile or None if
+        the file should be skipped. It is called with the path as the first argument and the read_kwargs as keyword
+        arguments
+    number_of_processes: Optional[int]
+        number of worker processes. 1 (default) means that all the files are parsed in the current process,
+        None means that the number of processes is equal to the number of CPUs
+    snapshot_dir: Optional[str]
+        directory, in which the snapshots of the parsed files are stored. If None, no snapshots are used
+    read_kwargs
+        keyword arguments passed to the read_function. Their representation (repr) is a part of the snapshots keys
+    """
+
+    skipped_file_key = "skipped"
+
+    def __init__(self, read_function: Callable[..., Optional[ParsedCSVFile]], number_of_processes: Optional[int] = 1,
+                 snapshot_dir: Optional[str] = None, **read_kwargs):
+        self.read_function = read_function
+        self.number_of_processes = number_of_processes
+        self.snapshot_dir = snapshot_dir
+        self.read_kwargs = read_kwargs
+        self.logger = qf_logger.getChild(self.__class__.__name__)
+
+        if snapshot_dir is not None and not exists(snapshot_dir):
+            makedirs(snapshot_dir)
+
+    def load(self, paths: Sequence[Path]) -> List[Optional[ParsedCSVFile]]:
+        """
+        Returns the parsed content of the files with the given paths (in the same order). None is returned for
+        the files skipped by the read function.
+        """
+        start_time = perf_counter()
+        results = [None] * len(paths)  # type: List[Optional[ParsedCSVFile]]
+        snapshot_paths = [self._snapshot_path(path) for path in paths]
+
+        missing_positions = []
+        for position, snapshot_path in enumerate(snapshot_paths):
+            if snapshot_path is not None and exists(snapshot_path):
+                results[position] = self._load_snapshot(snapshot_path)
+            else:
+                missing_positions.append(position)
+
+        read_file = partial(self.read_function, **self.read_kwargs)
+        missing_paths = [paths[position] for position in missing_positions]
+        if self.number_of_processes == 1 or len(missing_paths) <= 1:
+            parsed_files = map(read_file, missing_paths)
+            self._collect(parsed_files, missing_positions, snapshot_paths, results)
+        else:
+            number_of_processes = self.number_of_processes or os.cpu_count() or 1
+            chunk_size = max(1, len(missing_paths) // (4 * number_of_processes))
+            with ProcessPoolExecutor(max_workers=number_of_processes) as executor:
+                parsed_files = executor.map(read_file, missing_paths, chunksize=chunk_size)
+                self._collect(parsed_files, missing_positions, snapshot_paths, results)
+
+        self.logger.info("Loaded {} files ({} from snapshots, {} parsed) in {:.2f} s".format(
+            len(paths), len(paths) - len(missing_paths), len(missing_paths), perf_counter() - start_time))
+        return results
+
+    def _collect(self, parsed_files, positions: Sequence[int], snapshot_paths: Sequence[Optional[str]],
+                 results: List[Optional[ParsedCSVFile]]):
+        """ Stores the parsed files in the results and saves their snapshots as soon as they are available. """
+        for position, parsed_file in zip(positions, parsed_files):
+            results[position] = parsed_file
+            if snapshot_paths[position] is not None:
+                self._save_snapshot(snapshot_paths[position], parsed_file)
+
+    def _snapshot_path(self, path: Path) -> Optional[str]:
+        if self.snapshot_dir is None:
+            return None
+
+        path = Path(path).resolve()
+        stat = path.stat()
+        read_kwargs = sorted((key, repr(value)) for key, value in self.read_kwargs.items())
+        key = (str(path), stat.st_size, stat.st_mtime_ns, self.read_function.__module__,
+               self.read_function.__qualname__, read_kwargs)
+        return join(self.snapshot_dir, hashlib.sha1(repr(key).encode()).hexdigest() + ".npz")
+
+    def _save_snapshot(self, snapshot_path: str, parsed_file: Optional[ParsedCSVFile]):
+        if parsed_file is None:
+            with open(snapshot_path + ".tmp", "wb") as file:
+                np.savez(file, **{self.skipped_file_key: np.array(True)})
+        else:
+            parsed_file.save(snapshot_path + ".tmp")
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+
+    def _load_snapshot(self, snapshot_path: str) -> Optional[ParsedCSVFile]:
+        with np.load(snapshot_path) as arrays:
+            if self.skipped_file_key in arrays.files:
+                return None
+        return ParsedCSVFile.load(snapshot_path)
+
+
+def parsed_files_to_data_array(parsed_files: Dict[Ticker, ParsedCSVFile], fields: Sequence[Any],
+                               fields_to_columns: Optional[Dict[Any, Sequence[str]]] = None,
+                               start_date: Optional[datetime] = None,
+                               end_date: Optional[datetime] = None) -> QFDataArray:
+    """
+    Assembles the QFDataArray (dates x tickers x fields) directly from the parsed files. The union of dates of all
+    files is computed once, the values array is preallocated and the values of every file are scattered into it
+    at once. The dtype of the result is the common dtype of all the used columns (upcasted to float64 if there are
+    missing values, which are represented by nans).
+
+    Parameters
+    ----------
+    parsed_files: Dict[Ticker, ParsedCSVFile]
+        mapping of tickers onto the content of their files
+    fields: Sequence[Any]
+        fields of the result
+    fields_to_columns: Optional[Dict[Any, Sequence[str]]]
+        mapping of fields onto names of the columns, which contain their values (the first column available in
+        the file is used). By default, the values of a field are taken from the column with the same name
+    start_date: Optional[datetime]
+        first date of the result (if None, the range is not bounded)
+    end_date: Optional[datetime]
+        last date of the result (if None, the range is not bounded)
+
+    Returns
+    -------
+    QFDataArray
+        the data array with all the tickers of parsed_files. Tickers without data are filled with nans
+    """
+    fields_to_columns = fields_to_columns or {}
+    tickers = list(parsed_files.keys())
+    parsed_files = [parsed_file.slice(start_date, end_date) for parsed_file in parsed_files.values()]
+
+    non_empty_files = [parsed_file for parsed_file in parsed_files if len(parsed_file) > 0]
+    if not non_empty_files:
+        return QFDataArray.create(dates=[], tickers=tickers, fields=fields)
+
+    def source_column(parsed_file: ParsedCSVFile, field) -> Optional[str]:
+        columns = fields_to_columns.get(field, [field])
+        return next((column for column in columns if column in parsed_file.columns
+                     or column in parsed_file.text_columns), None)
+
+    sources = [[source_column(parsed_file, field) for field in fields] for parsed_file in parsed_files]
+    contains_text = any(column in parsed_file.text_columns for parsed_file, columns in zip(parsed_files, sources)
+                        for column in columns if column is not None)
+
+    dates = np.unique(np.concatenate([parsed_file.dates for parsed_file in non_empty_files]))
+
+    is_dense = False
+    if contains_text:
+        dtype = object
+    else:
+        dtypes = [parsed_file.dtypes[parsed_file.columns.index(column)]
+                  for parsed_file, columns in zip(parsed_files, sources) if len(parsed_file) > 0
+                  for column in columns if column is not None]
+        dtype = np.result_type(*dtypes) if dtypes else np.float64
+
+        is_dense = all(len(parsed_file) == len(dates) and None not in columns
+                       for parsed_file, columns in zip(parsed_files, sources))
+        if not is_dense:
+            dtype = np.result_type(dtype, np.float64)
+
+    shape = (len(dates), len(tickers), len(fields))
+    values = np.empty(shape, dtype=dtype) if is_dense else np.full(shape, np.nan, dtype=dtype)
+
+    for ticker_index, (parsed_file, columns) in enumerate(zip(parsed_files, sources)):
+        if len(parsed_file) == 0:
+            continue
+
+        rows = np.searchsorted(dates, parsed_file.dates)
+        numeric_fields = [i for i, column in enumerate(columns) if column in parsed_file.columns]
+        if numeric_fields:
+            numeric_columns = [parsed_file.columns.index(columns[i]) for i in numeric_fields]
+            values[rows[:, np.newaxis], ticker_index, numeric_fields] = \
+                parsed_file.values[:, numeric_columns].astype(dtype, copy=False)
+
+        for field_index, column in enumerate(columns):
+            if column in parsed_file.text_columns:
+                values[rows, ticker_index, field_index] = parsed_file.text_columns[column]
+
+    return QFDataArray.create(DatetimeIndex(dates), tickers, fields, values)
@@ -0,0 +1,299 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import hashlib
+import os
+import pickle
+import shutil
+from datetime import datetime
+from os import makedirs, listdir
+from os.path import join, exists, isdir
+from typing import Sequence, Dict, Tuple, List, Optional, Union, Any
+
+import numpy as np
+
+from qf_lib.common.enums.expiration_date_field import ExpirationDateField
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
+from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.data_provider import DataProvider
+
+
+class DataBundleCacheStatistics:
+    """
+    Statistics of the DataBundleCache usage.
+
+    hits - number of requests served entirely from the cache,
+    partial_hits - number of requests for which only the missing tickers or dates were downloaded,
+    misses - number of requests for which all the data had to be downloaded,
+    downloads - number of requests sent to the underlying data provider.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.partial_hits = 0
+        self.misses = 0
+        self.downloads = 0
+
+    def __str__(self):
+        return "Hits: {}, partial hits: {}, misses: {}, downloads: {}".format(
+            self.hits, self.partial_hits, self.misses, self.downloads)
+
+
+class DataBundleCache:
+    """
+    Persistent, on-disk cache of data bundles downloaded by the PrefetchingDataProvider.
+
+    Data bundles are grouped into entries by the class of the data provider, the frequency and the set of fields.
+    Each entry keeps a dense (dates x tickers x fields) array of values stored in the NumPy .npy format
+    (loaded as a memory-mapped file) along with the index and the date range, which was already downloaded for
+    each of the tickers. When a data bundle is requested only the missing tickers and the missing head or tail of the
+    date range are downloaded from the data provider and merged into the entry. Futures expiration dates are cached
+    in a similar way, separately for each future ticker family.
+
+    Parameters
+    ----------
+    cache_dir: str
+        directory in which the cached data bundles should be stored
+    """
+
+    values_file_name = "values.npy"
+    index_file_name = "index.pkl"
+    exp_dates_file_name = "exp_dates.pkl"
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+        self.statistics = DataBundleCacheStatistics()
+        self.logger = qf_logger.getChild(self.__class__.__name__)
+
+        if not exists(cache_dir):
+            makedirs(cache_dir)
+
+    def get_price(self, data_provider: DataProvider, tickers: Sequence[Ticker], fields: Sequence[PriceField],
+                  start_date: datetime, end_date: datetime, frequency: Frequency) -> QFDataArray:
+        """
+        Returns the prices of given tickers in form of a QFDataArray (dates x tickers x fields). Only the data, which
+        is not available in the cache, is downloaded using the data_provider.
+
+        Parameters
+        ----------
+        data_provider: DataProvider
+            data provider used to download the data, which is missing in the cache
+        tickers: Sequence[Ticker]
+            tickers of the securities which prices should be returned
+        fields: Sequence[PriceField]
+            fields that should be returned
+        start_date: datetime
+            first date of the data bundle
+        end_date: datetime
+            last date of the data bundle
+        frequency: Frequency
+            frequency of the data
+
+        Returns
+        -------
+        QFDataArray
+        """
+        tickers, _ = convert_to_list(tickers, Ticker)
+        fields, _ = convert_to_list(fields, PriceField)
+
+        entry_dir = join(self.cache_dir, self._entry_key(data_provider, fields, frequency))
+        data_array, coverage = self._load_entry(entry_dir)
+
+        missing_date_ranges = self._missing_date_ranges(tickers, coverage, start_date, end_date, frequency)
+        self._update_statistics(tickers, coverage, missing_date_ranges)
+
+        for (range_start, range_end), range_tickers in missing_date_ranges.items():
+            self.logger.info("Downloading {} tickers for the period {} - {}".format(
+                len(range_tickers), range_start, range_end))
+            downloaded_data = data_provider.get_price(range_tickers, fields, range_start, range_end, frequency)
+            data_array = self._merge(data_array, downloaded_data)
+            self.statistics.downloads += 1
+
+        if missing_date_ranges:
+            for ticker in tickers:
+                cached_start, cached_end = coverage.get(ticker, (start_date, end_date))
+                coverage[ticker] = (min(cached_start, start_date), max(cached_end, end_date))
+            self._save_entry(entry_dir, data_array, coverage)
+
+        if data_array is None:
+            return QFDataArray.create(dates=[], tickers=tickers, fields=fields)
+
+        data_array = data_array.loc[start_date:end_date].reindex(tickers=tickers, fields=fields)
+        return QFDataArray.create(data_array.dates.to_index(), tickers, fields, np.array(data_array.values))
+
+    def get_futures_chain_tickers(self, data_provider: DataProvider, tickers: Sequence[FutureTicker],
+                                  expiration_date_fields: Sequence[ExpirationDateField], end_date: datetime) \
+            -> Dict[FutureTicker, QFDataFrame]:
+        """
+        Returns the expiration dates of futures contracts belonging to the families of given future tickers. The
+        expiration dates are downloaded from the data provider only if they are not cached or if they were cached for an
+        earlier end date (in which case new contracts may be missing).
+
+        See Also
+        --------
+        DataProvider.get_futures_chain_tickers
+        """
+        tickers, _ = convert_to_list(tickers, FutureTicker)
+        exp_dates_path = join(self.cache_dir, self.exp_dates_file_name)
+        cached_exp_dates = self._load_pickle(exp_dates_path) or {}
+
+        def key(_ticker: FutureTicker) -> Tuple[str, str, str]:
+            return data_provider.__class__.__name__, str(_ticker), str(expiration_date_fields)
+
+        missing_tickers = [t for t in tickers if key(t) not in cached_exp_dates or
+                           cached_exp_dates[key(t)][0] < end_date]
+        if missing_tickers:
+            downloaded_exp_dates = data_provider.get_futures_chain_tickers(missing_tickers, expiration_date_fields)
+            for ticker, exp_dates in downloaded_exp_dates.items():
+                cached_exp_dates[key(ticker)] = (end_date, exp_dates)
+            self._dump_pickle(cached_exp_dates, exp_dates_path)
+
+        return {ticker: cached_exp_dates[key(ticker)][1] for ticker in tickers}
+
+    def invalidate(self, tickers: Union[Ticker, Sequence[Ticker]]):
+        """
+        Removes all the cached data of the given tickers. In case of FutureTickers, the cached expiration dates and
+        the prices of all specific contracts belonging to the futures family are removed.
+        """
+        tickers, _ = convert_to_list(tickers, Ticker)
+        future_tickers = [t for t in tickers if isinstance(t, FutureTicker)]
+
+        def is_invalidated(_ticker: Ticker) -> bool:
+            return _ticker in tickers or any(ft.belongs_to_family(_ticker) for ft in future_tickers)
+
+        for entry_dir in self._entries_dirs():
+            data_array, coverage = self._load_entry(entry_dir)
+            invalidated_tickers = [t for t in coverage.keys() if is_invalidated(t)]
+            if invalidated_tickers:
+                remaining_tickers = [t for t in data_array.tickers.values if not is_invalidated(t)]
+                data_array = data_array.loc[:, remaining_tickers, :]
+                for ticker in invalidated_tickers:
+                    del coverage[ticker]
+                self._save_entry(entry_dir, data_array, coverage)
+
+        exp_dates_path = join(self.cache_dir, self.exp_dates_file_name)
+        cached_exp_dates = self._load_pickle(exp_dates_path)
+        if cached_exp_dates:
+            future_tickers_str = [str(t) for t in future_tickers]
+            cached_exp_dates = {k: v for k, v in cached_exp_dates.items() if k[1] not in future_tickers_str}
+            self._dump_pickle(cached_exp_dates, exp_dates_path)
+
+    def clear(self):
+        """ Removes all the cached data. """
+        for entry_dir in self._entries_dirs():
+            shutil.rmtree(entry_dir)
+
+        exp_dates_path = join(self.cache_dir, self.exp_dates_file_name)
+        if exists(exp_dates_path):
+            os.remove(exp_dates_path)
+
+    @staticmethod
+    def _entry_key(data_provider: DataProvider, fields: Sequence[PriceField], frequency: Frequency) -> str:
+        key = (data_provider.__class__.__name__, str(frequency), sorted(str(field) for field in fields))
+        return hashlib.sha1(repr(key).encode()).hexdigest()
+
+    @staticmethod
+    def _missing_date_ranges(tickers: Sequence[Ticker], coverage: Dict[Ticker, Tuple[datetime, datetime]],
+                             start_date: datetime, end_date: datetime, frequency: Frequency) \
+            -> Dict[Tuple[datetime, datetime], List[Ticker]]:
+        """
+        Groups the tickers by the date ranges which need to be downloaded. Each range spans at least one bar,
+        so that the data provider never squeezes the dates dimension of the result.
+        """
+        missing_date_ranges = {}  # type: Dict[Tuple[datetime, datetime], List[Ticker]]
+        time_delta = frequency.time_delta()
+
+        for ticker in tickers:
+            if ticker not in coverage:
+                ranges = [(start_date, end_date)]
+            else:
+                cached_start, cached_end = coverage[ticker]
+                ranges = []
+                if start_date < cached_start:
+                    ranges.append((start_date, max(cached_start, start_date + time_delta)))
+                if end_date > cached_end:
+                    ranges.append((min(cached_end, end_date - time_delta), end_date))
+
+            for date_range in ranges:
+                missing_date_ranges.setdefault(date_range, []).append(ticker)
+
+        return missing_date_ranges
+
+    def _update_statistics(self, tickers: Sequence[Ticker], coverage: Dict[Ticker, Any],
+                           missing_date_ranges: Dict[Tuple[datetime, datetime], List[Ticker]]):
+        if not missing_date_ranges:
+            self.statistics.hits += 1
+        elif any(ticker in coverage for ticker in tickers):
+            self.statistics.partial_hits += 1
+        else:
+            self.statistics.misses += 1
+
+    @staticmethod
+    def _merge(cached_data_array: Optional[QFDataArray], downloaded_data_array: QFDataArray) -> QFDataArray:
+        if cached_data_array is None:
+            return downloaded_data_array
+
+        # The downloaded values take precedence, as the previously cached last bar might have been incomplete
+        merged_data_array = downloaded_data_array.combine_first(cached_data_array)
+        return QFDataArray.from_xr_data_array(merged_data_array)
+
+    def _entries_dirs(self) -> List[str]:
+        return [join(self.cache_dir, name) for name in listdir(self.cache_dir)
+                if isdir(join(self.cache_dir, name)) and exists(join(self.cache_dir, name, self.index_file_name))]
+
+    def _load_entry(self, entry_dir: str) -> Tuple[Optional[QFDataArray], Dict[Ticker, Tuple[datetime, datetime]]]:
+        index = self._load_pickle(join(entry_dir, self.index_file_name))
+        if index is None:
+            return None, {}
+
+        values = np.load(join(entry_dir, self.values_file_name), mmap_mode='r')
+        data_array = QFDataArray.create(index["dates"], index["tickers"], index["fields"], values)
+        return data_array, index["coverage"]
+
+    def _save_entry(self, entry_dir: str, data_array: QFDataArray,
+                    coverage: Dict[Ticker, Tuple[datetime, datetime]]):
+        if not exists(entry_dir):
+            makedirs(entry_dir)
+
+        values_path = join(entry_dir, self.values_file_name)
+        with open(values_path + ".tmp", "wb") as file:
+            np.save(file, np.ascontiguousarray(data_array.values), allow_pickle=False)
+        os.replace(values_path + ".tmp", values_path)
+
+        index = {
+            "dates": data_array.dates.to_index(),
+            "tickers": data_array.tickers.values.tolist(),
+            "fields": data_array.fields.values.tolist(),
+            "coverage": coverage
+        }
+        self._dump_pickle(index, join(entry_dir, self.index_file_name))
+
+    @staticmethod
+    def _load_pickle(path: str):
+        if not exists(path):
+            return None
+
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+    @staticmethod
+    def _dump_pickle(value, path: str):
+        with open(path + ".tmp", "wb") as file:
+            pickle.dump(value, file, protocol=3)
+        os.replace(path + ".tmp", path)
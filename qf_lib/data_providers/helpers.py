@@ -14,6 +14,8 @@
 import warnings
 from datetime import datetime
 from typing import Union, Dict, Sequence, Any
+
+import numpy as np
 import pandas as pd
 from pandas import DatetimeIndex
 from xarray import DataArray
@@ -174,7 +176,11 @@ def tickers_dict_to_data_array(tickers_data_dict: Dict[Ticker, QFDataFrame],
                                requested_fields: Union[Any, Sequence[Any]]) -> QFDataArray:
     """
     Converts a dictionary mapping tickers to DateFrame onto a QFDataArray,
-    by applying a filter on the tickers and fields that are needed
+    by applying a filter on the tickers and fields that are needed.
+
+    If all the data frames are indexed by unique, timezone-naive dates and all the requested fields are numeric,
+    the union of dates is computed once and the values of every data frame are scattered directly into a preallocated
+    (dates x tickers x fields) array. Otherwise, the data frames are converted into DataArrays and concatenated.
 
     Parameters
     ----------
@@ -196,6 +202,65 @@ def tickers_dict_to_data_array(tickers_data_dict: Dict[Ticker, QFDataFrame],
     if not tickers_data_dict:
         return QFDataArray.create(dates=[], tickers=requested_tickers, fields=requested_fields)
 
+    if all(_supports_direct_assembly(df, requested_fields) for df in tickers_data_dict.values()):
+        return _assemble_data_array(tickers_data_dict, requested_tickers, requested_fields)
+    return _concat_data_arrays(tickers_data_dict, requested_tickers, requested_fields)
+
+
+def _supports_direct_assembly(df: QFDataFrame, requested_fields: Sequence[Any]) -> bool:
+    if df.empty:
+        return True
+
+    if not isinstance(df.index, DatetimeIndex) or df.index.tz is not None or not df.index.is_unique \
+            or not df.columns.is_unique:
+        return False
+
+    requested_columns = df.columns[df.columns.isin(requested_fields)]
+    return all(df[column].dtype.kind in "biuf" for column in requested_columns)
+
+
+def _assemble_data_array(tickers_data_dict: Dict[Ticker, QFDataFrame], requested_tickers: Sequence[Ticker],
+                         requested_fields: Sequence[Any]) -> QFDataArray:
+    """ Fills a preallocated (dates x tickers x fields) array with the values of all the data frames. """
+    data_frames = [tickers_data_dict.get(ticker) for ticker in requested_tickers]
+    non_empty_data_frames = [df for df in tickers_data_dict.values() if not df.empty]
+    if not non_empty_data_frames:
+        return QFDataArray.create(dates=[], tickers=requested_tickers, fields=requested_fields)
+
+    # the dates of all data frames (also the ones, which were not requested) are included, as in case of concatenation
+    dates = DatetimeIndex(np.unique(np.concatenate([df.index.values for df in non_empty_data_frames])))
+
+    columns_positions = [None if df is None or df.empty else df.columns.get_indexer(requested_fields)
+                         for df in data_frames]
+    is_dense = all(positions is not None and len(df.index) == len(dates) and (positions >= 0).all()
+                   for df, positions in zip(data_frames, columns_positions))
+    dtypes = [df.dtypes.iloc[positions[positions >= 0]] for df, positions in zip(data_frames, columns_positions)
+              if positions is not None and (positions >= 0).any()]
+    dtype = np.result_type(*[dtype for df_dtypes in dtypes for dtype in df_dtypes]) if dtypes else np.float64
+    if not is_dense:
+        # missing values are represented by nans
+        dtype = np.result_type(dtype, np.float64)
+
+    shape = (len(dates), len(requested_tickers), len(requested_fields))
+    values = np.empty(shape, dtype=dtype) if is_dense else np.full(shape, np.nan, dtype=dtype)
+    for ticker_index, (df, positions) in enumerate(zip(data_frames, columns_positions)):
+        if positions is None:
+            continue
+
+        fields_indices = np.flatnonzero(positions >= 0)
+        if len(fields_indices) == 0:
+            continue
+
+        rows = dates.get_indexer(df.index)
+        values[rows[:, np.newaxis], ticker_index, fields_indices] = \
+            df.iloc[:, positions[fields_indices]].to_numpy(dtype=dtype)
+
+    return QFDataArray.create(dates, requested_tickers, requested_fields, values)
+
+
+def _concat_data_arrays(tickers_data_dict: Dict[Ticker, QFDataFrame], requested_tickers: Sequence[Ticker],
+                        requested_fields: Sequence[Any]) -> QFDataArray:
+    """ Converts all the data frames into DataArrays and concatenates them along the tickers dimension. """
     tickers = []
     data_arrays = []
     for ticker, df in tickers_data_dict.items():
@@ -0,0 +1,57 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from typing import Dict, Optional
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
+from qf_lib.data_providers.columnar_preset_data_provider import ColumnarPresetDataProvider
+from qf_lib.data_providers.memory_mapped_price_cube import MemoryMappedPriceCube
+
+
+class MemoryMappedPresetDataProvider(ColumnarPresetDataProvider):
+    """
+    PresetDataProvider, which serves the data from a MemoryMappedPriceCube stored on disk. Only the bars touched by
+    the queries are paged in, so it is suitable for long intraday backtests, in which the whole data bundle does not
+    fit in memory. The cube may be created using the MemoryMappedPriceCube.create or MemoryMappedPriceCube.download
+    functions.
+
+    Parameters
+    ----------
+    directory
+        path to the directory containing the MemoryMappedPriceCube
+    start_date
+        beginning of the cached period. By default the first date of the cube is used
+    end_date
+        end of the cached period. By default the last date of the cube is used
+    frequency
+        frequency of the data
+    exp_dates
+        dictionary mapping FutureTickers to QFDataFrame of contracts expiration dates, belonging to the certain
+        future ticker family
+    max_paged_in_dates
+        number of dates, after reading which the memory-mapped files are remapped in order to release the pages read
+        so far from the resident set of the process. If None, the files are never remapped
+    """
+
+    def __init__(self, directory: str, start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                 frequency: Frequency = Frequency.MIN_1, exp_dates: Dict[FutureTicker, QFDataFrame] = None,
+                 max_paged_in_dates: Optional[int] = None):
+        price_cube = MemoryMappedPriceCube(directory, max_paged_in_dates)
+        if len(price_cube.dates) > 0:
+            start_date = start_date or price_cube.dates[0].to_pydatetime()
+            end_date = end_date or price_cube.dates[-1].to_pydatetime()
+
+        super().__init__(price_cube, start_date, end_date, frequency, exp_dates)
@@ -0,0 +1,290 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import os
+import pickle
+from datetime import datetime
+from itertools import chain
+from typing import Sequence, Any, Dict, Hashable, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DatetimeIndex
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.tickers.tickers import Ticker
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
+from qf_lib.common.utils.logging.qf_parent_logger import qf_logger
+from qf_lib.containers.dimension_names import DATES
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.data_provider import DataProvider
+from qf_lib.data_providers.price_cube import PriceCube
+
+
+class MemoryMappedPriceCube(PriceCube):
+    """
+    PriceCube, which keeps the values on disk instead of in memory. Every field is stored in a separate binary
+    file as a (dates x tickers) array in the row-major order, so that all bars of a certain date lie next to each
+    other. The files are memory-mapped, thus a query touching a range of dates pages in only the corresponding rows
+    and the resident set size does not depend on the length of the whole bundle.
+
+    Each field may be stored with its own dtype (e.g. float32 for the OHLC prices and int64 for the volume). By default
+    the fields are stored with the dtype of the data bundle. Missing values of the integer fields are represented by
+    the minimal value of the dtype. The values are returned with the common dtype of the requested fields - integer
+    fields with missing values are returned as float64 with missing values set to nan.
+
+    The cube is created with the create (or download) class method and opened with the constructor.
+
+    Pages of a memory-mapped file, once read, are accounted to the resident set of the process until they are
+    reclaimed by the operating system. In order to keep the resident set size bounded during a long backtest, the
+    files may be remapped (which releases all the pages read so far) after a given number of dates is read.
+
+    Parameters
+    ----------
+    directory: str
+        path to the directory containing the cube
+    max_paged_in_dates: Optional[int]
+        number of dates (rows), after reading which the files are remapped. If None, the files are never remapped
+    """
+
+    index_file_name = "index.pkl"
+    last_valid_positions_file_name = "last_valid_positions_{}_{}.bin"
+
+    def __init__(self, directory: str, max_paged_in_dates: Optional[int] = None):
+        self._directory = directory
+        self._max_paged_in_dates = max_paged_in_dates
+        self._paged_in_dates = 0
+
+        with open(os.path.join(directory, self.index_file_name), "rb") as index_file:
+            index = pickle.load(index_file)
+
+        self._values = None
+        self._init_index(index["dates"], index["tickers"], index["fields"])
+
+        self._dtypes = [np.dtype(dtype) for dtype in index["dtypes"]]
+        self._field_arrays = []
+        self._open_memory_maps()
+
+    @classmethod
+    def create(cls, directory: str, data_arrays: Iterable[QFDataArray], tickers: Sequence[Hashable],
+               fields: Sequence[Hashable], dtypes: Dict[Hashable, Any] = None) -> "MemoryMappedPriceCube":
+        """
+        Writes the data to disk and opens the created cube. The data is consumed chunk by chunk, so only one chunk
+        needs to fit in memory at a time.
+
+        Parameters
+        ----------
+        directory: str
+            path to the directory, in which the cube should be stored. It is created if it does not exist
+        data_arrays: Iterable[QFDataArray]
+            chunks of data in the chronological order. Dates of every chunk should be later than the dates of all
+            previous chunks - dates, which are not, are skipped
+        tickers: Sequence[Hashable]
+            tickers of the cube
+        fields: Sequence[Hashable]
+            fields of the cube
+        dtypes: Dict[Hashable, Any]
+            dtypes in which the fields should be stored, e.g. {PriceField.Volume: np.int64}. Fields, which are not
+            present in the dictionary are stored with the dtype of the first chunk of data (float64 if it is not
+            numeric)
+
+        Returns
+        -------
+        MemoryMappedPriceCube
+            cube opened in the read-only mode
+        """
+        tickers, fields = list(tickers), list(fields)
+        dtypes = dtypes or {}
+
+        data_arrays = iter(data_arrays)
+        first_data_array = next(data_arrays, None)
+        default_dtype = np.float64
+        if first_data_array is not None and first_data_array.dtype.kind in "iuf":
+            default_dtype = first_data_array.dtype
+        fields_dtypes = [np.dtype(dtypes.get(field, default_dtype)) for field in fields]
+        os.makedirs(directory, exist_ok=True)
+        for file_name in os.listdir(directory):
+            if file_name.startswith("last_valid_positions_"):
+                os.remove(os.path.join(directory, file_name))
+
+        dates = []
+        last_timestamp = None
+        field_files = [open(cls._field_file_path(directory, position), "wb") for position in range(len(fields))]
+        try:
+            for data_array in chain([first_data_array] if first_data_array is not None else [], data_arrays):
+                chunk_dates = data_array.dates.to_index()
+                if not chunk_dates.is_monotonic_increasing:
+                    data_array = data_array.sortby(DATES)
+                    chunk_dates = data_array.dates.to_index()
+                if last_timestamp is not None:
+                    new_dates = chunk_dates > last_timestamp
+                    data_array = data_array[new_dates]
+                    chunk_dates = chunk_dates[new_dates]
+                if len(chunk_dates) == 0:
+                    continue
+
+                values = data_array.reindex(tickers=tickers, fields=fields).values
+                for position, (field_file, dtype) in enumerate(zip(field_files, fields_dtypes)):
+                    cls._to_dtype(values[:, :, position], dtype).tofile(field_file)
+
+                dates.append(chunk_dates)
+                last_timestamp = chunk_dates[-1]
+        finally:
+            for field_file in field_files:
+                field_file.close()
+
+        dates = DatetimeIndex(np.concatenate([d.values for d in dates]) if dates else [])
+        index = {"dates": dates, "tickers": tickers, "fields": fields, "dtypes": [dtype.str for dtype in fields_dtypes]}
+        with open(os.path.join(directory, cls.index_file_name), "wb") as index_file:
+            pickle.dump(index, index_file)
+
+        return cls(directory)
+
+    @classmethod
+    def download(cls, directory: str, data_provider: DataProvider, tickers: Sequence[Ticker],
+                 fields: Sequence[Hashable], start_date: datetime, end_date: datetime, frequency: Frequency,
+                 dtypes: Dict[Hashable, Any] = None, chunk_length: RelativeDelta = RelativeDelta(months=1)) \
+            -> "MemoryMappedPriceCube":
+        """
+        Downloads the prices from the data provider in consecutive chunks of dates and writes them to disk using the
+        create function. The chunk_length should be chosen so that the prices of all tickers within one chunk fit
+        in memory.
+        """
+        logger = qf_logger.getChild(cls.__name__)
+
+        def data_arrays() -> Iterator[QFDataArray]:
+            chunk_start = start_date
+            while chunk_start <= end_date:
+                next_chunk_start = chunk_start + chunk_length
+                chunk_end = min(next_chunk_start - RelativeDelta(microseconds=1), end_date)
+                logger.info("Downloading prices: {} - {}".format(chunk_start, chunk_end))
+                yield data_provider.get_price(tickers, fields, chunk_start, chunk_end, frequency)
+                chunk_start = next_chunk_start
+
+        return cls.create(directory, data_arrays(), tickers, fields, dtypes)
+
+    def __reduce__(self):
+        # Only the location of the cube is pickled and the files are mapped again after unpickling (e.g. in another
+        # process), so that the values are never copied
+        return self.__class__, (self._directory, self._max_paged_in_dates)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def values(self) -> np.ndarray:
+        """ Loads all the values of the cube into memory. """
+        return self.get_values(slice(None), self._tickers, self._fields)
+
+    def release_pages(self):
+        """
+        Remaps all the files of the cube, which releases the pages read so far from the resident set of the process.
+        """
+        self._paged_in_dates = 0
+        self._open_memory_maps()
+
+    def get_values(self, dates_slice: slice, tickers: Sequence[Any], fields: Sequence[Any]) -> np.ndarray:
+        ticker_positions = self.ticker_positions(tickers)
+        field_positions = self.field_positions(fields)
+
+        nr_of_dates = len(range(*dates_slice.indices(len(self._dates))))
+        self._page_in(nr_of_dates)
+
+        fields_values = [self._from_dtype(self._field_arrays[field_position][dates_slice, ticker_positions])
+                         for field_position in field_positions]
+        dtype = np.result_type(*fields_values) if fields_values else np.float64
+
+        values = np.empty((nr_of_dates, len(ticker_positions), len(field_positions)), dtype=dtype)
+        for i, field_values in enumerate(fields_values):
+            values[:, :, i] = field_values
+        return values
+
+    def _get_field_values(self, field_position: int, dates_slice: slice) -> np.ndarray:
+        self._page_in(len(range(*dates_slice.indices(len(self._dates)))))
+        return self._from_dtype(self._field_arrays[field_position][dates_slice])
+
+    def _gather_field_values(self, field_position: int, date_positions: np.ndarray,
+                             ticker_positions: np.ndarray) -> np.ndarray:
+        self._page_in(len(date_positions))
+        return self._from_dtype(self._field_arrays[field_position][date_positions, ticker_positions])
+
+    def _get_last_valid_positions(self, open_position: int, close_position: int) -> np.ndarray:
+        """
+        The table of the last valid positions is as large as a single field, so it is stored on disk next to the
+        fields and reused by all instances opening the cube.
+        """
+        key = (open_position, close_position)
+        if key not in self._last_valid_positions:
+            file_path = self._last_valid_positions_file_path(open_position, close_position)
+            if not os.path.exists(file_path):
+                positions = super()._get_last_valid_positions(open_position, close_position)
+                if isinstance(positions, np.memmap):
+                    positions.flush()
+            self._last_valid_positions[key] = self._memmap(file_path, np.int32, self._shape())
+
+        return self._last_valid_positions[key]
+
+    def _allocate_last_valid_positions(self, open_position: int, close_position: int) -> np.ndarray:
+        file_path = self._last_valid_positions_file_path(open_position, close_position)
+        return self._memmap(file_path, np.int32, self._shape(), mode="w+")
+
+    def _open_memory_maps(self):
+        self._field_arrays = [
+            self._memmap(self._field_file_path(self._directory, position), dtype, self._shape())
+            for position, dtype in enumerate(self._dtypes)
+        ]
+        self._last_valid_positions = {
+            key: self._memmap(self._last_valid_positions_file_path(*key), np.int32, self._shape())
+            for key in self._last_valid_positions
+        }
+
+    def _page_in(self, nr_of_dates: int):
+        self._paged_in_dates += nr_of_dates
+        if self._max_paged_in_dates is not None and self._paged_in_dates > self._max_paged_in_dates:
+            self.release_pages()
+            self._paged_in_dates = nr_of_dates
+
+    def _shape(self) -> Tuple[int, int]:
+        return len(self._dates), len(self._tickers)
+
+    def _last_valid_positions_file_path(self, open_position: int, close_position: int) -> str:
+        return os.path.join(self._directory, self.last_valid_positions_file_name.format(open_position,
+                                                                                        close_position))
+
+    @staticmethod
+    def _field_file_path(directory: str, field_position: int) -> str:
+        return os.path.join(directory, "field_{}.bin".format(field_position))
+
+    @staticmethod
+    def _memmap(file_path: str, dtype: np.dtype, shape: Tuple[int, int], mode: str = "r") -> np.ndarray:
+        # Empty files cannot be memory-mapped
+        if shape[0] == 0 or shape[1] == 0:
+            return np.empty(shape, dtype=dtype)
+        return np.memmap(file_path, dtype=dtype, mode=mode, shape=shape)
+
+    @staticmethod
+    def _to_dtype(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+        if np.issubdtype(dtype, np.integer):
+            values = np.where(pd.isnull(values), np.iinfo(dtype).min, np.round(values))
+        return np.ascontiguousarray(values, dtype=dtype)
+
+    @staticmethod
+    def _from_dtype(values: np.ndarray) -> np.ndarray:
+        if np.issubdtype(values.dtype, np.integer):
+            is_missing = values == np.iinfo(values.dtype).min
+            if is_missing.any():
+                result = np.array(values, dtype=np.float64)
+                result[is_missing] = np.nan
+                return result
+        return np.array(values)
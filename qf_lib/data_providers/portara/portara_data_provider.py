@@ -13,7 +13,7 @@
 #     limitations under the License.
 
 from datetime import datetime
-from typing import Sequence, Union, List
+from typing import Sequence, Union, List, Optional
 from pathlib import Path
 
 import pandas as pd
@@ -27,9 +27,12 @@ from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
 from qf_lib.containers.series.qf_series import QFSeries
-from qf_lib.data_providers.helpers import tickers_dict_to_data_array, chain_tickers_within_range, normalize_data_array
+from qf_lib.data_providers.csv.csv_files_loader import CSVFilesLoader, ParsedCSVFile, parsed_files_to_data_array
+from qf_lib.data_providers.helpers import chain_tickers_within_range, normalize_data_array
 from qf_lib.data_providers.preset_data_provider import PresetDataProvider
 
+PORTARA_COLUMNS_DTYPES = {"Date": str, "Time": str, "Date_Time": str, "Contract": str}
+
 
 class PortaraDataProvider(PresetDataProvider):
     """
@@ -55,6 +58,13 @@ class PortaraDataProvider(PresetDataProvider):
         last date to be downloaded
     frequency: Frequency
         frequency of the data (1-minute bar and daily frequencies are supported)
+    number_of_processes: Optional[int]
+        number of processes used to parse the pricing data files. 1 (default) means that all the files are parsed in
+        the current process, None means that the number of processes is equal to the number of CPUs
+    snapshot_dir: Optional[str]
+        directory, in which binary snapshots of the parsed pricing data files are stored. If it is provided, the
+        files, which were not modified since the last run, are loaded from their snapshots instead of being parsed
+        again (see CSVFilesLoader). By default None (no snapshots are used)
 
     Notes
     -----
@@ -74,7 +84,8 @@ class PortaraDataProvider(PresetDataProvider):
     """
 
     def __init__(self, path: str, tickers: Union[Ticker, Sequence[Ticker]], fields: Union[PriceField, List[PriceField]],
-                 start_date: datetime, end_date: datetime, frequency: Frequency):
+                 start_date: datetime, end_date: datetime, frequency: Frequency,
+                 number_of_processes: Optional[int] = 1, snapshot_dir: Optional[str] = None):
 
         self.logger = qf_logger.getChild(self.__class__.__name__)
 
@@ -101,7 +112,8 @@ class PortaraDataProvider(PresetDataProvider):
                 all_tickers.extend(chain_tickers_within_range(ft, exp_dates[ft], start_date, end_date))
 
         data_array, contracts_df = self._get_price_and_contracts(path, all_tickers, fields, start_date,
-                                                                 end_date, frequency)
+                                                                 end_date, frequency, number_of_processes,
+                                                                 snapshot_dir)
         normalized_data_array = normalize_data_array(data_array, all_tickers, fields, False, False, False)
 
         self._contracts_df = contracts_df
@@ -150,58 +162,71 @@ class PortaraDataProvider(PresetDataProvider):
         return tickers_dates_dict
 
     def _get_price_and_contracts(self, path: str, tickers: Sequence[Ticker], fields: Sequence[PriceField],
-                                 start_date: datetime, end_date: datetime, freq: Frequency):
-
-        field_to_price_field_dict = {
-            'Open': PriceField.Open,
-            'High': PriceField.High,
-            'Low': PriceField.Low,
-            'Close': PriceField.Close,
-            'LastPrice': PriceField.Close,
-            'Date': 'dates',
-            'Date_Time': 'dates'
+                                 start_date: datetime, end_date: datetime, freq: Frequency,
+                                 number_of_processes: Optional[int], snapshot_dir: Optional[str]):
+
+        price_field_to_columns = {
+            PriceField.Open: ['Open'],
+            PriceField.High: ['High'],
+            PriceField.Low: ['Low'],
+            PriceField.Close: ['Close', 'LastPrice'],
+            # it is required to distinguish intraday and daily volume
+            PriceField.Volume: ['TradeVolume'] if freq == Frequency.MIN_1 else ['Volume']
         }
 
-        # it is required to distinguish intraday and daily volume
-        if freq == Frequency.MIN_1:
-            field_to_price_field_dict['TradeVolume'] = PriceField.Volume  # for intraday
-        elif freq == Frequency.DAILY:
-            field_to_price_field_dict['Volume'] = PriceField.Volume  # for daily
-
         tickers_strings_to_tickers = {
             ticker.as_string(): ticker for ticker in tickers if not isinstance(ticker, FutureTicker)
         }
         tickers_paths = [list(Path(path).glob('**/{}.csv'.format(ticker_str)))
                          for ticker_str in tickers_strings_to_tickers.keys()]
-        joined_tickers_paths = [item for sublist in tickers_paths for item in sublist]
+        joined_tickers_paths = [item.resolve() for sublist in tickers_paths for item in sublist]
 
-        tickers_prices_dict = {}
+        loader = CSVFilesLoader(_read_portara_file, number_of_processes, snapshot_dir, frequency=freq)
+        parsed_files = loader.load(joined_tickers_paths)
+
+        tickers_parsed_files = {}
         contracts_data = {}
 
-        for path in joined_tickers_paths:
-            path = path.resolve()
+        for path, parsed_file in zip(joined_tickers_paths, parsed_files):
             ticker_str = path.name.replace('.csv', '')
             ticker = tickers_strings_to_tickers[ticker_str]
-            # It is important to save the Time and Date as strings, in order to correctly infer the date format
-            df = QFDataFrame(pd.read_csv(path, dtype={"Time": str, "Date": str, "Date_Time": str}))
-
-            if 'Time' in df and freq == Frequency.MIN_1:
-                df.index = pd.to_datetime(df["Date"] + ' ' + df["Time"])
-            elif 'Time' not in df and 'Date' in df and freq == Frequency.DAILY:
-                df.index = pd.to_datetime(df['Date'])
-            else:
+            if parsed_file is None:
                 self.logger.info(f"Ticker {ticker} does not satisfy timing requirements. File path: {path}")
                 continue
 
-            contracts_data[ticker] = df['Contract'] if 'Contract' in df.columns else QFSeries()
+            contracts = parsed_file.text_columns.get('Contract')
+            contracts_data[ticker] = QFSeries(contracts, index=parsed_file.dates) if contracts is not None \
+                else QFSeries()
 
-            df = df.rename(columns=field_to_price_field_dict)
-            df = df.loc[start_date:end_date, df.columns.isin(fields)]
-            fields_diff = set(fields).difference(df.columns)
+            available_fields = [field for field in fields
+                                if any(column in parsed_file.columns for column in price_field_to_columns[field])]
+            fields_diff = set(fields).difference(available_fields)
             if fields_diff:
                 self.logger.info("Not all fields are available for {}. Difference: {}".format(ticker, fields_diff))
 
-            tickers_prices_dict[ticker] = QFDataFrame(df)
+            tickers_parsed_files[ticker] = parsed_file
 
         contracts_df = QFDataFrame(contracts_data)
-        return tickers_dict_to_data_array(tickers_prices_dict, list(tickers_prices_dict.keys()), fields), contracts_df
+        data_array = parsed_files_to_data_array(tickers_parsed_files, fields, price_field_to_columns, start_date,
+                                                end_date)
+        return data_array, contracts_df
+
+
+def _read_portara_file(path: Path, frequency: Frequency) -> Optional[ParsedCSVFile]:
+    """
+    Parses a single Portara file (possibly in a worker process). Returns None if the file does not satisfy the timing
+    requirements of the given frequency (1-minute bars need both the Date and Time columns, daily bars only the Date
+    column).
+    """
+    # It is important to save the Time and Date as strings, in order to correctly infer the date format
+    df = pd.read_csv(path, dtype=PORTARA_COLUMNS_DTYPES)
+
+    if 'Time' in df and frequency == Frequency.MIN_1:
+        dates = pd.to_datetime(df["Date"] + ' ' + df["Time"], infer_datetime_format=True)
+    elif 'Time' not in df and 'Date' in df and frequency == Frequency.DAILY:
+        dates = pd.to_datetime(df['Date'], infer_datetime_format=True)
+    else:
+        return None
+
+    df = df.drop(columns=[column for column in ('Date', 'Time', 'Date_Time') if column in df])
+    return ParsedCSVFile.from_frame(df, pd.DatetimeIndex(dates))
@@ -12,7 +12,7 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 from datetime import datetime
-from typing import Sequence, Union
+from typing import Sequence, Union, Optional
 
 from qf_lib.common.enums.expiration_date_field import ExpirationDateField
 
@@ -21,6 +21,7 @@ from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import Ticker
 from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
 from qf_lib.containers.futures.future_tickers.future_ticker import FutureTicker
+from qf_lib.data_providers.data_bundle_cache import DataBundleCache
 from qf_lib.data_providers.helpers import chain_tickers_within_range
 from qf_lib.data_providers.preset_data_provider import PresetDataProvider
 from qf_lib.data_providers.data_provider import DataProvider
@@ -49,13 +50,16 @@ class PrefetchingDataProvider(PresetDataProvider):
         last date to be downloaded
     frequency: Frequency
         frequency of the data
+    cache: Optional[DataBundleCache]
+        optional on-disk cache of data bundles. If provided, only the data which is missing in the cache is
+        downloaded using the data_provider and the downloaded data is stored in the cache for further use
     """
 
     def __init__(self, data_provider: DataProvider,
                  tickers: Union[Ticker, Sequence[Ticker]],
                  fields: Union[PriceField, Sequence[PriceField]],
                  start_date: datetime, end_date: datetime,
-                 frequency: Frequency):
+                 frequency: Frequency, cache: Optional[DataBundleCache] = None):
         # Convert fields into list in order to return a QFDataArray as the result of get_price function
         fields, _ = convert_to_list(fields, PriceField)
 
@@ -70,16 +74,26 @@ class PrefetchingDataProvider(PresetDataProvider):
         all_tickers = non_future_tickers
 
         if future_tickers:
-            exp_dates = data_provider.get_futures_chain_tickers(future_tickers, ExpirationDateField.all_dates())
+            if cache is None:
+                exp_dates = data_provider.get_futures_chain_tickers(future_tickers, ExpirationDateField.all_dates())
+            else:
+                exp_dates = cache.get_futures_chain_tickers(data_provider, future_tickers,
+                                                            ExpirationDateField.all_dates(), end_date)
 
             # Filter out all theses specific future contracts, which expired before start_date
             for ft in future_tickers:
                 all_tickers.extend(chain_tickers_within_range(ft, exp_dates[ft], start_date, end_date))
 
-        data_array = data_provider.get_price(all_tickers, fields, start_date, end_date, frequency)
+        if cache is None:
+            data_array = data_provider.get_price(all_tickers, fields, start_date, end_date, frequency)
+        else:
+            data_array = cache.get_price(data_provider, all_tickers, fields, start_date, end_date, frequency)
 
         super().__init__(data=data_array,
                          exp_dates=exp_dates,
                          start_date=start_date,
                          end_date=end_date,
                          frequency=frequency)
+
+        if cache is not None:
+            self.logger.info("Data bundle cache statistics: {}".format(cache.statistics))
@@ -12,6 +12,7 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+from copy import copy
 from datetime import datetime
 from typing import Union, Sequence, Any, Set, Type, Dict, FrozenSet, Optional, Tuple
 
@@ -33,6 +34,7 @@ from qf_lib.containers.series.prices_series import PricesSeries
 from qf_lib.containers.series.qf_series import QFSeries
 from qf_lib.data_providers.data_provider import DataProvider
 from qf_lib.data_providers.helpers import normalize_data_array
+from qf_lib.data_providers.price_cube import PriceCube
 
 
 class PresetDataProvider(DataProvider):
@@ -68,11 +70,19 @@ class PresetDataProvider(DataProvider):
         self._end_date = end_date
 
         self._ticker_types = {type(ticker) for ticker in data.tickers.values}
+        self._price_cube = None  # type: Optional[PriceCube]
 
     @property
     def data_bundle(self) -> QFDataArray:
         return self._data_bundle
 
+    @property
+    def price_cube(self) -> PriceCube:
+        """ Integer-indexed view on the data bundle, created on first use. """
+        if self._price_cube is None:
+            self._price_cube = PriceCube.from_data_array(self._data_bundle)
+        return self._price_cube
+
     @property
     def frequency(self) -> Frequency:
         return self._frequency
@@ -104,6 +114,17 @@ class PresetDataProvider(DataProvider):
     def supported_ticker_types(self) -> Set[Type[Ticker]]:
         return self._ticker_types
 
+    def with_data_bundle(self, data_bundle: QFDataArray) -> "PresetDataProvider":
+        """
+        Returns a shallow copy of the data provider (of the same type, so that all the overridden behaviour is
+        preserved), which serves the values of the given data bundle. The data bundle should have the same dates,
+        tickers and fields as the current one (e.g. it may be its copy stored in a memory-mapped file).
+        """
+        data_provider = copy(self)
+        data_provider._data_bundle = data_bundle
+        data_provider._price_cube = None
+        return data_provider
+
     def get_price(self, tickers: Union[Ticker, Sequence[Ticker]], fields: Union[PriceField, Sequence[PriceField]],
                   start_date: datetime, end_date: datetime = None, frequency: Frequency = Frequency.DAILY) -> \
             Union[None, PricesSeries, PricesDataFrame, QFDataArray]:
@@ -183,31 +204,13 @@ class PresetDataProvider(DataProvider):
             return nan if got_single_ticker else PricesSeries()
 
         start_time = end_time - RelativeDelta(days=7)  # 7 days to know if an asset disappears
-        data_array = self._data_bundle.loc[start_time:end_time, specific_tickers, [PriceField.Open, PriceField.Close]]
-
-        # Get the Close price of latest bar if available for all the tickers
-        last_close = data_array.isel(dates=slice(-1, None)).loc[:, :, [PriceField.Close]]
-        if not last_close.isnull().any():
-            normalized_result = normalize_data_array(last_close, specific_tickers, [PriceField.Close],
-                                                     got_single_date=True, got_single_ticker=got_single_ticker,
-                                                     got_single_field=True, use_prices_types=True)
-            normalized_result = self._map_normalized_result(normalized_result, tickers_mapping, tickers)
-            return normalized_result
-
-        open_prices = data_array.loc[:, :, [PriceField.Open]].squeeze(axis=2).to_pandas()
-        close_prices = data_array.loc[:, :, [PriceField.Close]].squeeze(axis=2).to_pandas()
-
-        first_indices = [df.first_valid_index().to_pydatetime() for df in [open_prices, close_prices] if
-                         df.first_valid_index() is not None]
-        if not first_indices:
-            return nan if got_single_ticker else PricesSeries(index=tickers)
-
-        start_date = min(first_indices)
-        latest_available_prices_series = self._get_valid_latest_available_prices(start_date, specific_tickers,
-                                                                                 open_prices, close_prices)
-
-        latest_available_prices_series = self._map_normalized_result(latest_available_prices_series, tickers_mapping, tickers)
-        return latest_available_prices_series.iloc[0] if got_single_ticker else latest_available_prices_series
+        latest_available_prices = self.price_cube.get_last_available_values(
+            specific_tickers, start_time, end_time, PriceField.Open, PriceField.Close)
+
+        if got_single_ticker:
+            return latest_available_prices[0]
+
+        return PricesSeries(data=latest_available_prices, index=[tickers_mapping[t] for t in specific_tickers])
 
     def _tickers_mapping(self, tickers: Union[Ticker, Sequence[Ticker]]) -> \
             Tuple[Sequence[Ticker], Sequence[Ticker], Dict, bool]:
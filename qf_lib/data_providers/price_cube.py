@@ -0,0 +1,283 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from datetime import datetime
+from typing import Sequence, Any, List, Hashable
+
+import numpy as np
+import pandas as pd
+from pandas import DatetimeIndex, Timestamp
+
+from qf_lib.containers.dimension_names import DATES, TICKERS, FIELDS
+from qf_lib.containers.qf_data_array import QFDataArray
+
+
+class PriceCube:
+    """
+    Integer-indexed storage of a (dates x tickers x fields) data bundle. The values are kept in one contiguous
+    NumPy array, tickers and fields are resolved into positions using precomputed dictionaries and date ranges
+    are resolved with a binary search over the sorted int64 representation of the dates index. Labelled containers
+    (QFDataArray) are created only when the data is returned to the caller.
+
+    Parameters
+    ----------
+    values: np.ndarray
+        3-D array of values with dimensions: dates, tickers, fields
+    dates: DatetimeIndex
+        sorted dates index corresponding to the first dimension of values
+    tickers: Sequence[Hashable]
+        tickers corresponding to the second dimension of values
+    fields: Sequence[Hashable]
+        fields corresponding to the third dimension of values
+    """
+
+    chunk_length = 2 ** 16  # number of dates processed at once while building tables over the whole dates index
+
+    def __init__(self, values: np.ndarray, dates: DatetimeIndex, tickers: Sequence[Hashable],
+                 fields: Sequence[Hashable]):
+        assert values.ndim == 3, "The values of the PriceCube should have 3 dimensions: dates, tickers and fields"
+        assert values.shape == (len(dates), len(tickers), len(fields)), \
+            "The shape of the values does not match the length of the dates, tickers and fields indices"
+        self._values = values
+        self._init_index(dates, tickers, fields)
+
+    def _init_index(self, dates: DatetimeIndex, tickers: Sequence[Hashable], fields: Sequence[Hashable]):
+        assert dates.is_monotonic_increasing, "The dates index of the PriceCube should be sorted"
+
+        self._dates = DatetimeIndex(dates, name=DATES)
+        self._timestamps = self._dates.values.view(np.int64)
+        self._tickers = pd.Index(tickers, name=TICKERS, dtype=object)
+        self._fields = pd.Index(fields, name=FIELDS, dtype=object)
+
+        self._ticker_positions = {ticker: position for position, ticker in enumerate(self._tickers)}
+        self._field_positions = {field: position for position, field in enumerate(self._fields)}
+
+        # (open position, close position) -> forward-filled positions of the last valid prices, built on first use
+        self._last_valid_positions = {}
+
+    @classmethod
+    def from_data_array(cls, data_array: QFDataArray) -> "PriceCube":
+        """
+        Creates the PriceCube out of a QFDataArray. The underlying values are not copied unless it is necessary to
+        sort the dates or to make the array contiguous.
+        """
+        dates = data_array.dates.to_index()
+        if not dates.is_monotonic_increasing:
+            data_array = data_array.sortby(DATES)
+            dates = data_array.dates.to_index()
+
+        values = np.ascontiguousarray(data_array.values)
+        return cls(values, dates, data_array.tickers.values, data_array.fields.values)
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values
+
+    @property
+    def dates(self) -> DatetimeIndex:
+        return self._dates
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._timestamps
+
+    @property
+    def tickers(self) -> pd.Index:
+        return self._tickers
+
+    @property
+    def fields(self) -> pd.Index:
+        return self._fields
+
+    def dates_slice(self, start_date: datetime, end_date: datetime) -> slice:
+        """
+        Returns the slice of positions of all dates d, such that start_date <= d <= end_date.
+        """
+        start_position = np.searchsorted(self._timestamps, Timestamp(start_date).value, side='left')
+        end_position = np.searchsorted(self._timestamps, Timestamp(end_date).value, side='right')
+        return slice(start_position, max(start_position, end_position))
+
+    def date_position(self, date: datetime) -> int:
+        """
+        Returns the position of the last date d, such that d <= date, or -1 if there is no such date.
+        """
+        return int(np.searchsorted(self._timestamps, Timestamp(date).value, side='right')) - 1
+
+    def ticker_positions(self, tickers: Sequence[Any]) -> List[int]:
+        try:
+            return [self._ticker_positions[ticker] for ticker in tickers]
+        except KeyError:
+            uncached_tickers = [t for t in tickers if t not in self._ticker_positions]
+            tickers_str = [t.as_string() if hasattr(t, "as_string") else str(t) for t in uncached_tickers]
+            raise ValueError("Tickers: {} are not available in the Data Bundle".format(tickers_str)) from None
+
+    def field_positions(self, fields: Sequence[Any]) -> List[int]:
+        try:
+            return [self._field_positions[field] for field in fields]
+        except KeyError:
+            uncached_fields = [f for f in fields if f not in self._field_positions]
+            raise ValueError("Fields: {} are not available in the Data Bundle".format(uncached_fields)) from None
+
+    def get_values(self, dates_slice: slice, tickers: Sequence[Any], fields: Sequence[Any]) -> np.ndarray:
+        """
+        Returns the (dates x tickers x fields) array of values for the given slice of dates positions and
+        the given tickers and fields labels.
+        """
+        ticker_positions = self.ticker_positions(tickers)
+        field_positions = self.field_positions(fields)
+        return self._values[dates_slice][:, ticker_positions][:, :, field_positions]
+
+    def _get_field_values(self, field_position: int, dates_slice: slice) -> np.ndarray:
+        """ Returns the (dates x tickers) array of values of a single field for the given slice of dates positions. """
+        return self._values[dates_slice, :, field_position]
+
+    def _gather_field_values(self, field_position: int, date_positions: np.ndarray,
+                             ticker_positions: np.ndarray) -> np.ndarray:
+        """ Returns the values of a single field for the given pairs of dates and tickers positions. """
+        return self._values[date_positions, ticker_positions, field_position]
+
+    def get_dates_with_values(self) -> DatetimeIndex:
+        """
+        Returns the dates, for which at least one value (of any ticker and any field) is available. The values are
+        processed in chunks of dates.
+        """
+        has_values = np.zeros(len(self._dates), dtype=bool)
+        for chunk_start in range(0, len(self._dates), self.chunk_length):
+            chunk = slice(chunk_start, min(chunk_start + self.chunk_length, len(self._dates)))
+            for field_position in range(len(self._fields)):
+                has_values[chunk] |= ~pd.isnull(self._get_field_values(field_position, chunk)).all(axis=1)
+
+        return self._dates[has_values]
+
+    def get_data_array(self, dates_slice: slice, tickers: Sequence[Any], fields: Sequence[Any],
+                       drop_empty_dates: bool = True, nr_of_last_dates: int = None) -> QFDataArray:
+        """
+        Materialises the values for the given dates, tickers and fields as a QFDataArray.
+
+        Parameters
+        ----------
+        dates_slice: slice
+            slice of positions in the dates index
+        tickers: Sequence[Any]
+            tickers labels, which define the order of the tickers in the result
+        fields: Sequence[Any]
+            fields labels, which define the order of the fields in the result
+        drop_empty_dates: bool
+            if True, all dates for which there are no values for any of the tickers and fields will be dropped
+        nr_of_last_dates: int
+            if given, only the last nr_of_last_dates dates (after dropping the empty dates) will be returned
+
+        Returns
+        -------
+        QFDataArray
+        """
+        values = self.get_values(dates_slice, tickers, fields)
+        dates = self._dates[dates_slice]
+
+        if drop_empty_dates and values.shape[0] > 0:
+            non_empty_dates = ~pd.isnull(values).all(axis=(1, 2))
+            if not non_empty_dates.all():
+                values = values[non_empty_dates]
+                dates = dates[non_empty_dates]
+
+        if nr_of_last_dates is not None:
+            values = values[-nr_of_last_dates:]
+            dates = dates[-nr_of_last_dates:]
+
+        return QFDataArray.create(dates=dates, tickers=list(tickers), fields=list(fields), data=values)
+
+    def get_last_available_values(self, tickers: Sequence[Any], start_date: datetime, end_date: datetime,
+                                  open_field: Hashable, close_field: Hashable) -> np.ndarray:
+        """
+        Returns the latest available prices of the given tickers as of end_date. The Open and Close prices of all bars
+        are considered in the chronological order (Open of a bar precedes its Close) and the latest valid one is
+        returned. If the latest valid price is older than start_date, nan is returned for the ticker.
+
+        The first call builds a forward-filled table of positions of the last valid prices for the whole cube, so that
+        every subsequent call is a binary search over the dates followed by a gather of the requested tickers.
+
+        Parameters
+        ----------
+        tickers: Sequence[Any]
+            tickers for which the prices should be returned
+        start_date: datetime
+            prices older than start_date are not considered to be available
+        end_date: datetime
+            date as of which the prices should be returned
+        open_field: Hashable
+            field corresponding to the Open price
+        close_field: Hashable
+            field corresponding to the Close price
+
+        Returns
+        -------
+        np.ndarray
+            array of the latest available prices, corresponding to the given tickers
+        """
+        ticker_positions = np.array(self.ticker_positions(tickers), dtype=np.intp)
+        open_position, close_position = self.field_positions([open_field, close_field])
+        latest_available_values = np.full(len(ticker_positions), np.nan)
+
+        date_position = self.date_position(end_date)
+        if date_position < 0 or len(ticker_positions) == 0:
+            return latest_available_values
+
+        last_valid_positions = self._get_last_valid_positions(open_position, close_position)
+        price_positions = last_valid_positions[date_position, ticker_positions]
+        bar_positions = price_positions // 2
+
+        is_available = (price_positions >= 0) & (self._timestamps[bar_positions] >= Timestamp(start_date).value)
+        bar_positions = bar_positions[is_available]
+        ticker_positions = ticker_positions[is_available]
+        is_close = price_positions[is_available] % 2 == 1
+
+        latest_available_values[is_available] = np.where(
+            is_close, self._gather_field_values(close_position, bar_positions, ticker_positions),
+            self._gather_field_values(open_position, bar_positions, ticker_positions))
+        return latest_available_values
+
+    def _get_last_valid_positions(self, open_position: int, close_position: int) -> np.ndarray:
+        """
+        For every (date, ticker) pair computes the position of the last valid price available after the bar closes.
+        Prices are numbered in the chronological order: 2 * i is the Open and 2 * i + 1 is the Close of the i-th bar.
+        The value -1 denotes that no valid price is available.
+
+        The table is computed in chunks of dates, so that the temporary arrays do not depend on the length of the
+        whole cube.
+        """
+        key = (open_position, close_position)
+        if key not in self._last_valid_positions:
+            positions = self._allocate_last_valid_positions(open_position, close_position)
+            last_positions = np.full(len(self._tickers), -1, dtype=np.int32)
+
+            for chunk_start in range(0, len(self._dates), self.chunk_length):
+                chunk = slice(chunk_start, min(chunk_start + self.chunk_length, len(self._dates)))
+                bars = np.arange(chunk.start, chunk.stop, dtype=np.int32)[:, np.newaxis]
+                open_is_valid = ~pd.isnull(self._get_field_values(open_position, chunk))
+                close_is_valid = ~pd.isnull(self._get_field_values(close_position, chunk))
+
+                chunk_positions = np.where(close_is_valid, 2 * bars + 1, np.where(open_is_valid, 2 * bars, -1))
+                chunk_positions = chunk_positions.astype(np.int32, copy=False)
+                chunk_positions[0] = np.maximum(chunk_positions[0], last_positions)
+                np.maximum.accumulate(chunk_positions, axis=0, out=chunk_positions)
+
+                positions[chunk] = chunk_positions
+                last_positions = chunk_positions[-1]
+
+            self._last_valid_positions[key] = positions
+
+        return self._last_valid_positions[key]
+
+    def _allocate_last_valid_positions(self, open_position: int, close_position: int) -> np.ndarray:
+        """ Allocates the (dates x tickers) int32 array, which will store the table of the last valid positions. """
+        return np.empty((len(self._dates), len(self._tickers)), dtype=np.int32)
@@ -11,11 +11,12 @@
 #     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
+from typing import Optional
 
 import numpy as np
 from arch.univariate.volatility import VolatilityProcess
 
-from qf_lib.common.utils.volatility.volatility_forecast import VolatilityForecast
+from qf_lib.common.utils.volatility.volatility_forecast import forecast_volatilities
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 
 
@@ -28,10 +29,15 @@ class RobustCovariance:
     ----------
     simple_returns: QFDataFrame
         QFDataFrame of simple returns of the assets
+    number_of_processes: int
+        number of processes across which the volatility forecasts of the assets are distributed. 1 (default) means
+        that all the forecasts are calculated in the current process, None means that the number of processes is
+        equal to the number of CPUs
     """
 
-    def __init__(self, simple_returns: QFDataFrame):
+    def __init__(self, simple_returns: QFDataFrame, number_of_processes: Optional[int] = 1):
         self.returns = simple_returns
+        self.number_of_processes = number_of_processes
 
     def calculate_covariance(self, vol_process: VolatilityProcess, horizon: int, method: str = 'analytic') -> QFDataFrame:
         """
@@ -58,17 +64,10 @@ class RobustCovariance:
         vol_forecast_array = self._calculate_expected_volatilities(vol_process, horizon, method)
         # use spearman rank correlation instead of simple pearson correlation
         corr_matrix = self.returns.corr(method='spearman')
-        cov_matrix = corr_matrix.copy()
-
-        for i, _ in enumerate(vol_forecast_array):
-            for j, _ in enumerate(vol_forecast_array):
-                cov_matrix.iloc[i, j] = corr_matrix.iloc[i, j] * vol_forecast_array[i] * vol_forecast_array[j]
+        cov_matrix = corr_matrix * np.outer(vol_forecast_array, vol_forecast_array)
         return cov_matrix
 
     def _calculate_expected_volatilities(self, vol_process, horizon, method):
-        vol_forecast_array = np.zeros(self.returns.shape[1])  # size = nr o assets
-        for i, asset in enumerate(self.returns):
-            asset_returns = self.returns[asset]
-            vol_forecast = VolatilityForecast(asset_returns, vol_process, method, horizon, annualise=False)
-            vol_forecast_array[i] = vol_forecast.calculate_single_forecast()
-        return vol_forecast_array
+        vol_forecasts = forecast_volatilities(self.returns, vol_process, method, horizon, annualise=False,
+                                              number_of_processes=self.number_of_processes)
+        return vol_forecasts.values
@@ -12,9 +12,11 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import tempfile
 import unittest
 from datetime import datetime
 from itertools import cycle, islice
+from typing import Sequence
 from unittest import TestCase
 
 import numpy as np
@@ -34,11 +36,14 @@ from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import QuandlTicker, Ticker
 from qf_lib.common.utils.dateutils.string_to_date import str_to_date
 from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.qf_data_array import QFDataArray
 from qf_lib.containers.series.qf_series import QFSeries
 from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
+from qf_lib.data_providers.columnar_preset_data_provider import ColumnarPresetDataProvider
 from qf_lib.data_providers.preset_data_provider import PresetDataProvider
-from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_series_equal
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_series_equal, assert_dataframes_equal, \
+    assert_dataarrays_equal
 
 
 class TestFastAlphaModelsTester(TestCase):
@@ -172,6 +177,129 @@ class TestFastAlphaModelsTester(TestCase):
         ])
         assert_series_equal(expected_returns, second_elem.returns_tms)
 
+    def test_alpha_models_tester_with_multiple_jobs(self):
+        params = [FastAlphaModelTesterConfig(self.alpha_model_type,
+                                             {"period_length": period_length, "first_suggested_exposure": Exposure.LONG,
+                                              "risk_estimation_factor": None},
+                                             ("period_length", "first_suggested_exposure"))
+                  for period_length in (5, 10)]
+
+        expected_summary = FastAlphaModelTester(params, self.tickers, self.test_start_date, self.test_end_date,
+                                                self.data_handler, self.timer).test_alpha_models()
+        tester = FastAlphaModelTester(params, self.tickers, self.test_start_date, self.test_end_date,
+                                      self.data_handler, self.timer, n_jobs=2)
+        actual_summary = tester.test_alpha_models()
+
+        self.assertIs(self.data_handler, tester._data_provider)
+        for expected_elem, actual_elem in zip(expected_summary.elements_list, actual_summary.elements_list):
+            self.assertEqual(expected_elem.model_parameters, actual_elem.model_parameters)
+            assert_series_equal(expected_elem.returns_tms, actual_elem.returns_tms)
+            self.assertCountEqual([(t.ticker, t.start_time, t.end_time, t.pnl) for t in expected_elem.trades],
+                                  [(t.ticker, t.start_time, t.end_time, t.pnl) for t in actual_elem.trades])
+
+    def test_bulk_evaluation_same_as_evaluation_of_every_element(self):
+        params = [FastAlphaModelTesterConfig(self.alpha_model_type,
+                                             {"period_length": period_length, "first_suggested_exposure": exposure,
+                                              "risk_estimation_factor": None},
+                                             ("period_length", "first_suggested_exposure"))
+                  for period_length, exposure in ((5, Exposure.SHORT), (10, Exposure.LONG), (3, Exposure.LONG))]
+
+        expected_summary = FastAlphaModelTester(params, self.tickers, self.test_start_date, self.test_end_date,
+                                                self.data_handler, self.timer).test_alpha_models()
+        actual_summary = FastAlphaModelTester(params, self.tickers, self.test_start_date, self.test_end_date,
+                                              self.data_handler, self.timer, bulk_evaluation=True).test_alpha_models()
+
+        self.assertEqual(len(expected_summary.elements_list), len(actual_summary.elements_list))
+        for expected_elem, actual_elem in zip(expected_summary.elements_list, actual_summary.elements_list):
+            self.assertEqual(expected_elem.model_parameters, actual_elem.model_parameters)
+            self.assertEqual(expected_elem.tickers, actual_elem.tickers)
+            assert_series_equal(expected_elem.returns_tms, actual_elem.returns_tms, check_names=False)
+            self.assertCountEqual([(t.ticker, t.start_time, t.end_time, t.pnl) for t in expected_elem.trades],
+                                  [(t.ticker, t.start_time, t.end_time, t.pnl) for t in actual_elem.trades])
+
+    def _create_alpha_models_tester(self) -> FastAlphaModelTester:
+        config = FastAlphaModelTesterConfig(self.alpha_model_type,
+                                            {"period_length": 5, "first_suggested_exposure": Exposure.LONG,
+                                             "risk_estimation_factor": None},
+                                            ("period_length", "first_suggested_exposure"))
+        return FastAlphaModelTester([config], self.tickers, self.test_start_date, self.test_end_date,
+                                    self.data_handler, self.timer)
+
+    def test_shared_data_provider_is_backed_by_memory_mapped_file(self):
+        tester = self._create_alpha_models_tester()
+        with tempfile.TemporaryDirectory() as directory:
+            shared_data_handler = tester._share_data_provider(self.data_handler, directory)
+            shared_data_bundle = shared_data_handler.data_provider.data_bundle
+
+            self.assertIsNot(self.data_handler, shared_data_handler)
+            self.assertIs(self.timer, shared_data_handler.timer)
+            self.assertIsInstance(shared_data_bundle.values.base, np.memmap)
+            assert_dataarrays_equal(self._mocked_prices_arr, shared_data_bundle)
+            del shared_data_handler, shared_data_bundle
+
+    def test_shared_data_provider_keeps_data_provider_type(self):
+        tester = self._create_alpha_models_tester()
+        data_provider = OneTickerPresetDataProvider(self._mocked_prices_arr, self.data_start_date,
+                                                    self.data_end_date, self.frequency)
+        columnar_data_provider = ColumnarPresetDataProvider.from_preset_data_provider(data_provider)
+
+        with tempfile.TemporaryDirectory() as directory, tempfile.TemporaryDirectory() as columnar_directory:
+            shared_data_provider = tester._share_data_provider(data_provider, directory)
+            shared_columnar_data_provider = tester._share_data_provider(columnar_data_provider, columnar_directory)
+
+            self.assertIs(OneTickerPresetDataProvider, type(shared_data_provider))
+            self.assertIs(ColumnarPresetDataProvider, type(shared_columnar_data_provider))
+            self.assertIsInstance(shared_data_provider.data_bundle.values.base, np.memmap)
+
+            expected_prices = data_provider.get_price(self.tickers, PriceField.ohlcv(), self.test_start_date,
+                                                      self.test_end_date)
+            actual_prices = shared_data_provider.get_price(self.tickers, PriceField.ohlcv(), self.test_start_date,
+                                                           self.test_end_date)
+            assert_series_equal(expected_prices, actual_prices)
+
+            expected_prices = columnar_data_provider.get_price(self.tickers, PriceField.ohlcv(),
+                                                               self.test_start_date, self.test_end_date)
+            actual_prices = shared_columnar_data_provider.get_price(self.tickers, PriceField.ohlcv(),
+                                                                    self.test_start_date, self.test_end_date)
+            assert_dataarrays_equal(expected_prices, actual_prices)
+            del shared_data_provider, shared_columnar_data_provider, actual_prices
+
+    def test_batch_exposures_same_as_exposures_calculated_for_every_date(self):
+        kwargs = {"period_length": 5, "first_suggested_exposure": Exposure.SHORT, "risk_estimation_factor": None}
+        config = FastAlphaModelTesterConfig(DummyAlphaModel, kwargs, ("period_length", "first_suggested_exposure"))
+        batch_config = FastAlphaModelTesterConfig(BatchDummyAlphaModel, kwargs,
+                                                  ("period_length", "first_suggested_exposure"))
+
+        tester = FastAlphaModelTester([config], self.tickers, self.test_start_date, self.test_end_date,
+                                      self.data_handler, self.timer)
+        expected_exposures = tester._generate_exposure_values(config, self.data_handler, self.tickers)
+
+        batch_tester = FastAlphaModelTester([batch_config], self.tickers, self.test_start_date, self.test_end_date,
+                                            self.data_handler, self.timer)
+        batch_exposures = batch_tester._generate_exposure_values(batch_config, self.data_handler, self.tickers)
+
+        assert_dataframes_equal(expected_exposures.astype(float), batch_exposures)
+
+    def test_batch_exposures_fall_back_to_exposures_calculated_for_every_date(self):
+        kwargs = {"period_length": 5, "first_suggested_exposure": Exposure.SHORT, "risk_estimation_factor": None,
+                  "fail_batch_calculation": True}
+        config = FastAlphaModelTesterConfig(BatchDummyAlphaModel, kwargs,
+                                            ("period_length", "first_suggested_exposure"))
+
+        tester = FastAlphaModelTester([config], self.tickers, self.test_start_date, self.test_end_date,
+                                      self.data_handler, self.timer)
+        exposures = tester._generate_exposure_values(config, self.data_handler, self.tickers)
+
+        self.assertEqual(exposures.loc[str_to_date("2015-01-05"), self.apple_ticker], Exposure.SHORT.value)
+        self.assertEqual(exposures.loc[str_to_date("2015-01-12"), self.apple_ticker], Exposure.OUT.value)
+
+
+class OneTickerPresetDataProvider(PresetDataProvider):
+    """ PresetDataProvider, which always returns the close prices of the first of the requested tickers. """
+
+    def get_price(self, tickers, fields, start_date, end_date=None, frequency=Frequency.DAILY):
+        return super().get_price(tickers[0], PriceField.Close, start_date, end_date, frequency)
+
 
 class DummyAlphaModel(AlphaModel):
     def __init__(self, period_length: int, first_suggested_exposure: Exposure,
@@ -206,5 +334,23 @@ class DummyAlphaModel(AlphaModel):
         return exposure
 
 
+class BatchDummyAlphaModel(DummyAlphaModel):
+    def __init__(self, period_length: int, first_suggested_exposure: Exposure,
+                 risk_estimation_factor: float, data_provider: DataHandler = None,
+                 fail_batch_calculation: bool = False):
+        super().__init__(period_length, first_suggested_exposure, risk_estimation_factor, data_provider)
+        self.fail_batch_calculation = fail_batch_calculation
+
+    def calculate_exposures(self, tickers: Sequence[Ticker], dates: pd.DatetimeIndex,
+                            frequency: Frequency) -> QFDataFrame:
+        if self.fail_batch_calculation:
+            raise ValueError("Batch calculation failed")
+
+        # On the dates without the predefined exposure, the current exposure is kept
+        exposures_tms = self._exposures.map(lambda exposure: exposure.value).reindex(dates, method="ffill")
+        exposures_tms = exposures_tms.fillna(Exposure.OUT.value)
+        return QFDataFrame({ticker: exposures_tms.values for ticker in tickers}, index=dates)
+
+
 if __name__ == '__main__':
     unittest.main()
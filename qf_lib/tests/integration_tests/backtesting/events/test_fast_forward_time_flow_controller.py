@@ -0,0 +1,174 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from datetime import datetime
+from typing import List, Tuple, Type, Optional
+from unittest import TestCase
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
+from qf_lib.backtesting.events.end_trading_event.end_trading_event import EndTradingEvent
+from qf_lib.backtesting.events.end_trading_event.end_trading_event_listener import EndTradingEventListener
+from qf_lib.backtesting.events.event_base import Event
+from qf_lib.backtesting.events.event_manager import EventManager
+from qf_lib.backtesting.events.notifiers import Notifiers
+from qf_lib.backtesting.events.time_event.periodic_event.intraday_bar_event import IntradayBarEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
+from qf_lib.backtesting.events.time_flow_controller import FastForwardBacktestTimeFlowController, \
+    BacktestTimeFlowController
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.common.utils.dateutils.date_format import DateFormat
+from qf_lib.common.utils.dateutils.string_to_date import str_to_date
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.data_provider import DataProvider
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+
+
+class EventsRecorder(EndTradingEventListener):
+    def __init__(self, notifiers: Notifiers, timer: SettableTimer):
+        self.timer = timer
+        self.registered_events = []  # type: List[Tuple[Type[Event], datetime]]
+
+        notifiers.end_trading_event_notifier.subscribe(self)
+        notifiers.scheduler.subscribe(MarketOpenEvent, self)
+        notifiers.scheduler.subscribe(MarketCloseEvent, self)
+        notifiers.scheduler.subscribe(IntradayBarEvent, self)
+
+    def on_end_trading_event(self, event: EndTradingEvent):
+        self._register_event(event)
+
+    def on_market_open(self, event: MarketOpenEvent):
+        self._register_event(event)
+
+    def on_market_close(self, event: MarketCloseEvent):
+        self._register_event(event)
+
+    def on_new_bar(self, event: IntradayBarEvent):
+        self._register_event(event)
+
+    def _register_event(self, event: Event):
+        self.registered_events.append((type(event), self.timer.now()))
+
+
+class TestFastForwardBacktestTimeFlowController(TestCase):
+    start_date = str_to_date("2018-04-06")  # Friday
+    end_date = str_to_date("2018-04-09")
+
+    def setUp(self):
+        MarketOpenEvent.set_trigger_time({"hour": 13, "minute": 30, "second": 0, "microsecond": 0})
+        MarketCloseEvent.set_trigger_time({"hour": 20, "minute": 0, "second": 0, "microsecond": 0})
+
+    def _run_events_loop(self, fast_forward: bool, trading_timestamps: Optional[pd.DatetimeIndex],
+                         data_handler: Optional[DataHandler] = None,
+                         preloaded_data_provider: Optional[DataProvider] = None) -> List[Tuple[Type[Event], datetime]]:
+        timer = SettableTimer(initial_time=self.start_date)
+        notifiers = Notifiers(timer)
+        event_manager = EventManager(timer)
+        event_manager.register_notifiers([
+            notifiers.empty_queue_event_notifier,
+            notifiers.end_trading_event_notifier,
+            notifiers.scheduler
+        ])
+
+        if fast_forward:
+            FastForwardBacktestTimeFlowController(notifiers.scheduler, event_manager, timer,
+                                                  notifiers.empty_queue_event_notifier, self.end_date,
+                                                  trading_timestamps, data_handler=data_handler)
+        else:
+            BacktestTimeFlowController(notifiers.scheduler, event_manager, timer, notifiers.empty_queue_event_notifier,
+                                       self.end_date)
+
+        if preloaded_data_provider is not None:
+            # the data is preloaded after the trading session was built, but before the backtest is run
+            data_handler.data_provider = preloaded_data_provider
+
+        recorder = EventsRecorder(notifiers, timer)
+        while not recorder.registered_events or recorder.registered_events[-1][0] != EndTradingEvent:
+            event_manager.dispatch_next_event()
+
+        return recorder.registered_events
+
+    @staticmethod
+    def _trading_timestamps() -> pd.DatetimeIndex:
+        friday_timestamps = pd.date_range(str_to_date("2018-04-06 14:00:00.000000", DateFormat.FULL_ISO),
+                                          periods=3, freq="T")
+        monday_timestamps = pd.date_range(str_to_date("2018-04-09 13:30:00.000000", DateFormat.FULL_ISO),
+                                          periods=2, freq="T")
+        return friday_timestamps.append(monday_timestamps)
+
+    @staticmethod
+    def _expected_events() -> List[Tuple[Type[Event], datetime]]:
+        def time(time_str: str) -> datetime:
+            return str_to_date(time_str, DateFormat.FULL_ISO)
+
+        return [
+            (MarketOpenEvent, time("2018-04-06 13:30:00.000000")),
+            (IntradayBarEvent, time("2018-04-06 14:00:00.000000")),
+            (IntradayBarEvent, time("2018-04-06 14:01:00.000000")),
+            (IntradayBarEvent, time("2018-04-06 14:02:00.000000")),
+            (IntradayBarEvent, time("2018-04-06 14:03:00.000000")),
+            (MarketCloseEvent, time("2018-04-06 20:00:00.000000")),
+            (MarketOpenEvent, time("2018-04-07 13:30:00.000000")),
+            (MarketCloseEvent, time("2018-04-07 20:00:00.000000")),
+            (MarketOpenEvent, time("2018-04-08 13:30:00.000000")),
+            (MarketCloseEvent, time("2018-04-08 20:00:00.000000")),
+            (MarketOpenEvent, time("2018-04-09 13:30:00.000000")),
+            (IntradayBarEvent, time("2018-04-09 13:31:00.000000")),
+            (IntradayBarEvent, time("2018-04-09 13:32:00.000000")),
+            (MarketCloseEvent, time("2018-04-09 20:00:00.000000")),
+        ]
+
+    def test_bar_events_without_data_are_skipped(self):
+        events = self._run_events_loop(True, self._trading_timestamps())
+
+        self.assertEqual(self._expected_events(), events[:-1])
+        self.assertEqual(EndTradingEvent, events[-1][0])
+
+    def test_bar_events_skipped_using_data_preloaded_after_creating_controller(self):
+        trading_timestamps = self._trading_timestamps()
+        data_array = QFDataArray.create(trading_timestamps, [BloombergTicker("Example Equity")], PriceField.ohlcv(),
+                                        np.ones((len(trading_timestamps), 1, 5)))
+
+        data_handler = Mock(spec=DataHandler)
+        data_handler.data_provider = Mock(spec=DataProvider)
+        preloaded_data_provider = PresetDataProvider(data_array, self.start_date, self.end_date, Frequency.MIN_1)
+
+        events = self._run_events_loop(True, None, data_handler, preloaded_data_provider)
+        self.assertEqual(self._expected_events(), events[:-1])
+
+    def test_all_events_published_if_data_provider_has_no_data_bundle(self):
+        data_handler = Mock(spec=DataHandler)
+        data_handler.data_provider = Mock(spec=DataProvider)
+
+        expected_events = self._run_events_loop(False, None)
+        actual_events = self._run_events_loop(True, None, data_handler)
+        self.assertEqual(expected_events, actual_events)
+
+    def test_all_events_published_if_all_bars_have_data(self):
+        trading_timestamps = pd.date_range(self.start_date, self.end_date + pd.Timedelta(days=1), freq="T")
+
+        expected_events = self._run_events_loop(False, trading_timestamps)
+        actual_events = self._run_events_loop(True, trading_timestamps)
+        self.assertEqual(expected_events, actual_events)
+
+
+if __name__ == '__main__':
+    unittest.main()
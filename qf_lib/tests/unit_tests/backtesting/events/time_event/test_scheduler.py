@@ -18,6 +18,9 @@ from unittest import TestCase
 from unittest.mock import Mock
 
 from qf_lib.backtesting.events.time_event.periodic_event.periodic_event import PeriodicEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
+from qf_lib.backtesting.events.time_event.single_time_event.schedule_order_execution_event import \
+    ScheduleOrderExecutionEvent
 from qf_lib.backtesting.events.time_event.single_time_event.single_time_event import SingleTimeEvent
 from qf_lib.backtesting.events.time_event.scheduler import Scheduler
 from qf_lib.backtesting.events.time_event.time_event import TimeEvent
@@ -191,6 +194,60 @@ class TestScheduler(TestCase):
         time_events_list_types = [type(event) for event in time_events_list]
         self.assertCountEqual(time_events_list_types, [self.PeriodicEvent15Minutes, SingleTimeEvent])
 
+    def test_schedule_order_execution_events_returned_before_market_open_events(self):
+        self.addCleanup(self._restore_trigger_time, MarketOpenEvent, MarketOpenEvent._trigger_time,
+                        MarketOpenEvent._trigger_time_rule)
+        self.addCleanup(ScheduleOrderExecutionEvent.clear)
+
+        MarketOpenEvent.set_trigger_time({"hour": 13, "minute": 30, "second": 0, "microsecond": 0})
+        self.timer.set_current_time(str_to_date("2018-01-01 10:00:00.000000", DateFormat.FULL_ISO))
+
+        self.scheduler.subscribe(MarketOpenEvent, Mock())
+        self.scheduler.subscribe(self.PeriodicEvent15Minutes, Mock())
+        self.scheduler.subscribe(ScheduleOrderExecutionEvent, Mock())
+
+        market_open_time = str_to_date("2018-01-01 13:30:00.000000", DateFormat.FULL_ISO)
+        ScheduleOrderExecutionEvent.schedule_new_event(market_open_time, {Mock(): [Mock()]})
+        self.timer.set_current_time(str_to_date("2018-01-01 11:15:00.000000", DateFormat.FULL_ISO))
+
+        time_events_list, time = self.scheduler.get_next_time_events()
+        self.assertEqual(market_open_time, time)
+        self.assertEqual([ScheduleOrderExecutionEvent, MarketOpenEvent], [type(event) for event in time_events_list])
+
+    @staticmethod
+    def _restore_trigger_time(event_type, trigger_time, trigger_time_rule):
+        event_type._trigger_time = trigger_time
+        event_type._trigger_time_rule = trigger_time_rule
+
+    def test_single_time_event_scheduled_before_already_computed_trigger_times(self):
+        self.timer.set_current_time(str_to_date("2018-01-01 10:00:00.000000", DateFormat.FULL_ISO))
+
+        self.scheduler.subscribe(self.PeriodicEvent30Minutes, Mock())
+        self.scheduler.subscribe(SingleTimeEvent, Mock())
+        _, time = self.scheduler.get_next_time_events()
+        self.assertEqual(str_to_date("2018-01-01 10:30:00.000000", DateFormat.FULL_ISO), time)
+
+        trigger_time = str_to_date("2018-01-01 10:10:00.000000", DateFormat.FULL_ISO)
+        SingleTimeEvent.schedule_new_event(trigger_time, {})
+
+        time_events_list, time = self.scheduler.get_next_time_events()
+        self.assertEqual(trigger_time, time)
+        self.assertEqual([SingleTimeEvent()], time_events_list)
+        SingleTimeEvent.clear()
+
+    def test_trigger_times_computed_again_after_time_went_back(self):
+        self.timer.set_current_time(str_to_date("2018-01-01 10:00:00.000000", DateFormat.FULL_ISO))
+        self.scheduler.subscribe(self.PeriodicEvent15Minutes, Mock())
+
+        for expected_time in ("2018-01-01 10:15:00.000000", "2018-01-01 10:30:00.000000"):
+            _, time = self.scheduler.get_next_time_events()
+            self.assertEqual(str_to_date(expected_time, DateFormat.FULL_ISO), time)
+            self.timer.set_current_time(time)
+
+        self.timer.set_current_time(str_to_date("2018-01-01 09:00:00.000000", DateFormat.FULL_ISO))
+        _, time = self.scheduler.get_next_time_events()
+        self.assertEqual(str_to_date("2018-01-01 09:45:00.000000", DateFormat.FULL_ISO), time)
+
 
 if __name__ == '__main__':
     unittest.main()
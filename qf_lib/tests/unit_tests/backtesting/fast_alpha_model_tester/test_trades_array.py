@@ -0,0 +1,62 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.backtesting.fast_alpha_model_tester.trades_array import extract_trades, trades_array_to_list, \
+    trades_list_to_array
+from qf_lib.backtesting.portfolio.trade import Trade
+from qf_lib.common.tickers.tickers import BloombergTicker
+
+
+class TestTradesArray(unittest.TestCase):
+    def setUp(self):
+        self.tickers = [BloombergTicker("Example Index"), BloombergTicker("Other Index")]
+        self.times = pd.bdate_range(datetime(2021, 1, 4), periods=8).values
+        self.prices = np.array([10.0, 11.0, 12.0, 11.0, 10.0, 12.0, 13.0, 14.0])
+
+    def test_extract_trades(self):
+        exposures = np.array([0.0, 1.0, 1.0, -1.0, -1.0, 0.0, 1.0, 1.0])
+        trades = trades_array_to_list(extract_trades(self.times, exposures, self.prices, 1), self.tickers)
+
+        expected_trades = [
+            Trade(datetime(2021, 1, 5), datetime(2021, 1, 7), self.tickers[1], 11.0 / 11.0 - 1, 0.0, 1),
+            Trade(datetime(2021, 1, 7), datetime(2021, 1, 11), self.tickers[1], -(12.0 / 11.0 - 1), 0.0, -1),
+        ]
+        self.assertEqual(len(expected_trades), len(trades))
+        for expected_trade, trade in zip(expected_trades, trades):
+            self.assertEqual(expected_trade.start_time, trade.start_time)
+            self.assertEqual(expected_trade.end_time, trade.end_time)
+            self.assertEqual(expected_trade.ticker, trade.ticker)
+            self.assertAlmostEqual(expected_trade.pnl, trade.pnl)
+            self.assertEqual(expected_trade.direction, trade.direction)
+
+    def test_extract_trades_without_changes_of_exposure(self):
+        self.assertEqual(0, len(extract_trades(self.times, np.ones(8), self.prices, 0)))
+        self.assertEqual(0, len(extract_trades(self.times[:0], np.ones(0), self.prices[:0], 0)))
+
+    def test_trades_list_to_array(self):
+        exposures = np.array([1.0, -1.0, -1.0, 1.0, 0.0, 0.0, -1.0, 0.0])
+        trades_array = extract_trades(self.times, exposures, self.prices, 0)
+
+        trades = trades_array_to_list(trades_array, self.tickers)
+        self.assertEqual(4, len(trades))
+        np.testing.assert_array_equal(trades_array, trades_list_to_array(trades, self.tickers))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+
+import unittest
+from unittest.mock import Mock
+
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
+from qf_lib.backtesting.portfolio.array_portfolio import ArrayPortfolio
+from qf_lib.backtesting.portfolio.transaction import Transaction
+from qf_lib.common.enums.security_type import SecurityType
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.tests.unit_tests.backtesting.portfolio import test_portfolio
+from qf_lib.tests.unit_tests.backtesting.portfolio.dummy_ticker import DummyTicker
+
+
+class TestArrayPortfolio(test_portfolio.TestPortfolio):
+    """ Runs all the Portfolio tests on the ArrayPortfolio. """
+
+    def get_portfolio_and_data_handler(self):
+        data_handler = Mock(spec=DataHandler)
+        data_handler.get_last_available_price.side_effect = lambda tickers: self.data_handler_prices[tickers] \
+            if tickers else None
+
+        timer = SettableTimer()
+        timer.set_current_time(self.start_time)
+
+        portfolio = ArrayPortfolio(data_handler, self.initial_cash, timer, initial_capacity=1)
+        return portfolio, data_handler, timer
+
+    def test_closed_position_keeps_its_state_after_slot_is_reused(self):
+        portfolio, _, timer = self.get_portfolio_and_data_handler()
+        self.data_handler_prices = self.prices_series
+
+        new_time = timer.time + RelativeDelta(days=1)
+        portfolio.transact_transaction(Transaction(new_time, self.ticker, 20, 120, 7))
+        portfolio.transact_transaction(Transaction(new_time, self.ticker, -20, 130, 7))
+        portfolio.transact_transaction(Transaction(new_time, self.fut_ticker, 10, 250, 5))
+        portfolio.update()
+
+        closed_position = portfolio.closed_positions()[0]
+        self.assertTrue(closed_position.is_closed())
+        self.assertEqual(closed_position.quantity(), 0)
+        self.assertEqual(closed_position.direction(), 1)
+        self.assertEqual(closed_position.total_commission(), 14)
+        self.assertEqual(closed_position.total_pnl, 20 * 10 - 14)
+
+        open_position = portfolio.open_positions_dict[self.fut_ticker]
+        self.assertEqual(open_position.quantity(), 10)
+        self.assertEqual(open_position.total_commission(), 5)
+
+    def test_many_open_positions(self):
+        portfolio, _, timer = self.get_portfolio_and_data_handler()
+        tickers = [DummyTicker("Ticker{} US Equity".format(i), SecurityType.STOCK) for i in range(10)]
+        self.data_handler_prices = QFSeries(data=[10.0 * (i + 1) for i in range(10)], index=tickers)
+
+        new_time = timer.time + RelativeDelta(days=1)
+        for i, ticker in enumerate(tickers):
+            portfolio.transact_transaction(Transaction(new_time, ticker, i + 1, 5.0 * (i + 1), 0.0))
+        portfolio.update()
+
+        expected_exposure = sum(10.0 * (i + 1) ** 2 for i in range(10))
+        expected_cash = self.initial_cash - sum(5.0 * (i + 1) ** 2 for i in range(10))
+        self.assertAlmostEqual(portfolio.gross_exposure_of_positions, expected_exposure)
+        self.assertAlmostEqual(portfolio.net_liquidation, expected_cash + expected_exposure)
+        for i, ticker in enumerate(tickers):
+            self.assertEqual(portfolio.open_positions_dict[ticker].current_price, 10.0 * (i + 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
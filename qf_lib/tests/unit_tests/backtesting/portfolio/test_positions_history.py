@@ -0,0 +1,70 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+import numpy as np
+
+from qf_lib.backtesting.portfolio.positions_history import PositionsHistory
+from qf_lib.common.utils.dateutils.string_to_date import str_to_date
+from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataframes_equal
+from qf_lib.tests.unit_tests.backtesting.portfolio.dummy_ticker import DummyTicker
+
+
+class TestPositionsHistory(TestCase):
+    def setUp(self):
+        self.tickers = [DummyTicker("AAA"), DummyTicker("BBB"), DummyTicker("CCC")]
+        self.dates = [str_to_date("2021-05-03"), str_to_date("2021-05-04"), str_to_date("2021-05-05")]
+
+        # chunk size smaller than the number of records, so that the records are spread over several chunks
+        self.positions_history = PositionsHistory(chunk_size=2)
+        self.positions_history.append(self.dates[0], self.tickers[:2], [10, -5], [1000, -250], [1000, -250],
+                                      [-1, -2], [1, -1])
+        self.positions_history.append(self.dates[1], [], [], [], [], [], [])
+        self.positions_history.append(self.dates[2], [self.tickers[2], self.tickers[0]], [3, 10], [30, 1100],
+                                      [30, 1100], [-1, 99], [1, 1])
+
+    def test_records(self):
+        records = self.positions_history.records()
+        self.assertEqual(len(self.positions_history), 4)
+        self.assertEqual(records["date_index"].tolist(), [0, 0, 2, 2])
+        self.assertEqual(records["ticker_id"].tolist(), [0, 1, 2, 0])
+        self.assertEqual(records["quantity"].tolist(), [10, -5, 3, 10])
+        self.assertEqual(self.positions_history.tickers, self.tickers)
+        self.assertEqual(self.positions_history.dates, self.dates)
+
+    def test_to_frame(self):
+        expected_frame = QFDataFrame(data=[[1000, -250, np.nan], [np.nan, np.nan, np.nan], [1100, np.nan, 30]],
+                                     index=self.dates, columns=self.tickers)
+        assert_dataframes_equal(expected_frame, self.positions_history.to_frame("total_exposure"))
+
+        with self.assertRaises(ValueError):
+            self.positions_history.to_frame("unknown field")
+
+    def test_to_summaries_frame(self):
+        summaries = self.positions_history.to_summaries_frame()
+        self.assertEqual(summaries.shape, (3, 3))
+        self.assertEqual(summaries.notna().values.sum(), 4)
+
+        summary = summaries.loc[self.dates[0], self.tickers[1]]
+        self.assertEqual(summary.ticker, self.tickers[1])
+        self.assertEqual(summary.total_exposure, -250)
+        self.assertEqual(summary.market_values, -250)
+        self.assertEqual(summary.total_pnl, -2)
+        self.assertEqual(summary.direction, -1)
+
+
+if __name__ == '__main__':
+    unittest.main()
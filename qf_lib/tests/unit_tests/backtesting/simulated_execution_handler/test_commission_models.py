@@ -0,0 +1,54 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+import numpy as np
+
+from qf_lib.backtesting.execution_handler.commission_models.bps_trade_value_commission_model import \
+    BpsTradeValueCommissionModel
+from qf_lib.backtesting.execution_handler.commission_models.commission_model import CommissionModel
+from qf_lib.backtesting.execution_handler.commission_models.fixed_commission_model import FixedCommissionModel
+from qf_lib.backtesting.execution_handler.commission_models.ib_commission_model import IBCommissionModel
+
+
+class TestCommissionModels(TestCase):
+    def setUp(self):
+        self.fill_quantities = np.array([1, -10, 150, -3000, 100000])
+        self.fill_prices = np.array([0.5, 20.0, 1.25, 300.0, 2.0])
+
+    def test_calculate_commissions(self):
+        """ Vectorised commissions should be equal to the commissions calculated for each fill separately. """
+        commission_models = [FixedCommissionModel(5.0), BpsTradeValueCommissionModel(2.0), IBCommissionModel()]
+
+        for commission_model in commission_models:
+            expected_commissions = [
+                commission_model.calculate_commission(fill_quantity, fill_price)
+                for fill_quantity, fill_price in zip(self.fill_quantities.tolist(), self.fill_prices.tolist())
+            ]
+            actual_commissions = commission_model.calculate_commissions(self.fill_quantities, self.fill_prices)
+            self.assertEqual(len(actual_commissions), len(self.fill_quantities))
+            np.testing.assert_allclose(actual_commissions, expected_commissions)
+
+    def test_default_calculate_commissions(self):
+        class QuantityCommissionModel(CommissionModel):
+            def calculate_commission(self, fill_quantity: float, fill_price: float) -> float:
+                return abs(fill_quantity) * 0.01
+
+        commissions = QuantityCommissionModel().calculate_commissions(self.fill_quantities, self.fill_prices)
+        np.testing.assert_allclose(commissions, [0.01, 0.1, 1.5, 30.0, 1000.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
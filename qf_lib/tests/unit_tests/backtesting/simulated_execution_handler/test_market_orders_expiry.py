@@ -0,0 +1,125 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+from unittest import TestCase
+from unittest.mock import Mock
+
+from qf_lib.backtesting.data_handler.data_handler import DataHandler
+from qf_lib.backtesting.events.time_event.regular_time_event.market_close_event import MarketCloseEvent
+from qf_lib.backtesting.events.time_event.regular_time_event.market_open_event import MarketOpenEvent
+from qf_lib.backtesting.events.time_event.scheduler import Scheduler
+from qf_lib.backtesting.events.time_event.single_time_event.schedule_order_execution_event import \
+    ScheduleOrderExecutionEvent
+from qf_lib.backtesting.execution_handler.commission_models.fixed_commission_model import FixedCommissionModel
+from qf_lib.backtesting.execution_handler.simulated_execution_handler import SimulatedExecutionHandler
+from qf_lib.backtesting.execution_handler.slippage.price_based_slippage import PriceBasedSlippage
+from qf_lib.backtesting.monitoring.abstract_monitor import AbstractMonitor
+from qf_lib.backtesting.order.execution_style import MarketOrder
+from qf_lib.backtesting.order.order import Order
+from qf_lib.backtesting.order.time_in_force import TimeInForce
+from qf_lib.backtesting.portfolio.portfolio import Portfolio
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
+from qf_lib.common.utils.dateutils.string_to_date import str_to_date
+from qf_lib.common.utils.dateutils.timer import SettableTimer
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.data_providers.data_provider import DataProvider
+
+
+class TestMarketOrdersExpiry(TestCase):
+    MarketOpenEvent.set_trigger_time({"hour": 13, "minute": 30, "second": 0, "microsecond": 0})
+    MarketCloseEvent.set_trigger_time({"hour": 20, "minute": 0, "second": 0, "microsecond": 0})
+
+    def setUp(self):
+        self.start_date = str_to_date("2018-02-05")
+        self.timer = SettableTimer(initial_time=self.start_date + MarketOpenEvent.trigger_time())
+
+        self.msft_ticker = BloombergTicker("MSFT US Equity")
+        self.aapl_ticker = BloombergTicker("AAPL US Equity")
+
+        self.data_handler = Mock(spec=DataHandler)
+        self.data_handler.frequency = Frequency.DAILY
+        self.data_handler.data_provider = Mock(spec=DataProvider)
+
+        self.monitor = Mock(spec=AbstractMonitor)
+        self.portfolio = Mock(spec=Portfolio)
+        self.portfolio.open_positions_dict = {}
+
+        slippage_model = PriceBasedSlippage(0.0, self.data_handler)
+        self.exec_handler = SimulatedExecutionHandler(self.data_handler, self.timer, Mock(spec=Scheduler),
+                                                      self.monitor, FixedCommissionModel(0.0), self.portfolio,
+                                                      slippage_model, RelativeDelta(minutes=1))
+
+        self.day_orders = [
+            Order(self.msft_ticker, quantity=10, execution_style=MarketOrder(), time_in_force=TimeInForce.DAY),
+            Order(self.aapl_ticker, quantity=-3, execution_style=MarketOrder(), time_in_force=TimeInForce.DAY)
+        ]
+        self.gtc_orders = [
+            Order(self.msft_ticker, quantity=5, execution_style=MarketOrder(), time_in_force=TimeInForce.GTC),
+            Order(self.aapl_ticker, quantity=-7, execution_style=MarketOrder(), time_in_force=TimeInForce.GTC)
+        ]
+
+    def test_mixed_day_and_gtc_orders_over_day_boundary(self):
+        self.exec_handler.assign_order_ids(self.day_orders[:1] + self.gtc_orders[:1] + self.day_orders[1:] +
+                                           self.gtc_orders[1:])
+        self._accept_orders()
+
+        # No prices at the market close - DAY orders expire, GTC orders stay open
+        self._set_time(self.start_date + MarketCloseEvent.trigger_time())
+        self._set_current_prices(None, None)
+        self.exec_handler.on_market_close(...)
+
+        self.monitor.record_transaction.assert_not_called()
+        self.assertCountEqual(self.gtc_orders, self.exec_handler.get_open_orders())
+
+        # No prices at the market open of the next day - GTC orders do not expire
+        next_day = self.start_date + RelativeDelta(days=1)
+        self._set_time(next_day + MarketOpenEvent.trigger_time())
+        self.exec_handler.on_market_open(...)
+
+        self.monitor.record_transaction.assert_not_called()
+        self.assertCountEqual(self.gtc_orders, self.exec_handler.get_open_orders())
+
+        # Price of only one of the tickers at the market close - the other GTC order is still open
+        self._set_time(next_day + MarketCloseEvent.trigger_time())
+        self._set_current_prices(101.0, None)
+        self.exec_handler.on_market_close(...)
+
+        self.monitor.record_transaction.assert_called_once()
+        self.assertEqual(self.gtc_orders[0].quantity, self.monitor.record_transaction.call_args[0][0].quantity)
+        self.assertCountEqual(self.gtc_orders[1:], self.exec_handler.get_open_orders())
+
+    def test_orders_expire_checks_conditions_for_every_order(self):
+        opg_order = Order(self.msft_ticker, quantity=1, execution_style=MarketOrder(), time_in_force=TimeInForce.OPG)
+        orders = [opg_order, self.day_orders[0], self.gtc_orders[0]]
+        self.exec_handler.assign_order_ids(orders)
+
+        executor = self.exec_handler._market_orders_executor
+        orders_array = executor._get_orders_array(orders)
+
+        self.assertEqual([False, False, False], executor._orders_expire(orders_array, False, False).tolist())
+        self.assertEqual([True, False, False], executor._orders_expire(orders_array, True, False).tolist())
+        self.assertEqual([True, True, False], executor._orders_expire(orders_array, False, True).tolist())
+        self.assertEqual([True, True, False], executor._orders_expire(orders_array, True, True).tolist())
+
+    def _accept_orders(self):
+        self._set_time(self.timer.now() + RelativeDelta(minutes=1))
+        self.exec_handler.on_orders_accept(ScheduleOrderExecutionEvent())
+
+    def _set_time(self, time):
+        self.timer.set_current_time(time)
+
+    def _set_current_prices(self, msft_price, aapl_price):
+        prices = QFSeries(data=[msft_price, aapl_price], index=[self.msft_ticker, self.aapl_ticker], dtype=float)
+        self.data_handler.data_provider.get_price.side_effect = lambda tickers, *_: prices.loc[tickers]
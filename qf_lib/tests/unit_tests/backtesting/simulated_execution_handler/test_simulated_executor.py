@@ -15,6 +15,8 @@ import unittest
 from itertools import count
 from unittest.mock import MagicMock, patch
 
+import numpy as np
+
 from qf_lib.backtesting.execution_handler.commission_models.commission_model import CommissionModel
 from qf_lib.backtesting.execution_handler.market_orders_executor import MarketOrdersExecutor
 from qf_lib.backtesting.execution_handler.simulated_executor import SimulatedExecutor
@@ -138,11 +140,11 @@ class TestSimulatedExecutor(unittest.TestCase):
         slippage_model = MagicMock()
         slippage_model.process_orders.side_effect = mock_apply_slippage
 
-        def mock_calculate_commission(fill_quantity, fill_price):
-            return 0.0
+        def mock_calculate_commissions(fill_quantities, fill_prices):
+            return np.zeros(len(fill_quantities))
 
         commission_model: CommissionModel = MagicMock()
-        commission_model.calculate_commission.side_effect = mock_calculate_commission
+        commission_model.calculate_commissions.side_effect = mock_calculate_commissions
 
         def mock_record_transaction(transaction: Transaction):
             self.recorded_transactions.append(transaction)
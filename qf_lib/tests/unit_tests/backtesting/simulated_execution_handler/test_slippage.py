@@ -14,23 +14,34 @@
 import math
 import unittest
 from unittest import TestCase
-from unittest.mock import MagicMock, Mock
+from unittest.mock import MagicMock, Mock, patch
 
 import pandas as pd
 import numpy as np
 
+from qf_lib.backtesting.execution_handler.slippage.base import Slippage
 from qf_lib.backtesting.execution_handler.slippage.fixed_slippage import FixedSlippage
 from qf_lib.backtesting.execution_handler.slippage.price_based_slippage import PriceBasedSlippage
 from qf_lib.backtesting.execution_handler.slippage.square_root_market_impact_slippage import SquareRootMarketImpactSlippage
+from qf_lib.backtesting.monitoring.backtest_monitor import BacktestMonitorSettings
 from qf_lib.backtesting.order.execution_style import MarketOrder, MarketOnCloseOrder
 from qf_lib.backtesting.order.order import Order
 from qf_lib.backtesting.order.time_in_force import TimeInForce
+from qf_lib.backtesting.trading_session.backtest_trading_session_builder import BacktestTradingSessionBuilder
+from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.enums.price_field import PriceField
 from qf_lib.common.tickers.tickers import BloombergTicker, Ticker
+from qf_lib.common.utils.dateutils.relative_delta import RelativeDelta
 from qf_lib.common.utils.dateutils.string_to_date import str_to_date
 from qf_lib.common.utils.miscellaneous.to_list_conversion import convert_to_list
 from qf_lib.containers.dimension_names import TICKERS, FIELDS
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.data_provider import DataProvider
 from qf_lib.data_providers.helpers import tickers_dict_to_data_array, normalize_data_array
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+from qf_lib.documents_utils.document_exporting.pdf_exporter import PDFExporter
+from qf_lib.documents_utils.excel.excel_exporter import ExcelExporter
+from qf_lib.settings import Settings
 from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_lists_equal
 
 
@@ -320,6 +331,100 @@ class TestSlippage(TestCase):
                                                                                 prices_without_slippage)
         assert_lists_equal(expected_fill_prices, actual_fill_prices)
 
+    def test_calculate_fill_prices_and_volumes__arrays(self):
+        """The array API should give the same results as processing the orders one by one."""
+        slippage_model = FixedSlippage(slippage_per_share=0.5, data_provider=self.data_provider,
+                                       max_volume_share_limit=0.1)
+
+        quantities = np.array([order.quantity for order in self.orders])
+        prices_without_slippage = np.array([20.0, np.nan, 40.0])
+
+        actual_fill_prices, actual_fill_volumes = slippage_model.calculate_fill_prices_and_volumes(
+            str_to_date("2020-01-01"), self.tickers, quantities, prices_without_slippage)
+
+        # Volume traded today is equal to 50 for every ticker, thus max volume share is equal to 5
+        assert_lists_equal([20.5, float('nan'), 40.5], list(actual_fill_prices))
+        assert_lists_equal([5, -5, 1], list(actual_fill_volumes))
+
+        for i, order in enumerate(self.orders):
+            fill_prices, fill_volumes = slippage_model.process_orders(str_to_date("2020-01-01"), [order],
+                                                                      [prices_without_slippage[i]])
+            assert_lists_equal([actual_fill_prices[i]], list(fill_prices))
+            assert_lists_equal([actual_fill_volumes[i]], list(fill_volumes))
+
+    def test_volumes_traded_today_taken_from_preloaded_data(self):
+        dates_index = pd.bdate_range(str_to_date("2020-01-01"), str_to_date("2020-01-03"))
+        volumes = {
+            ticker: pd.DataFrame(index=dates_index, columns=[PriceField.Volume], data=[100.0, volume, np.nan])
+            for ticker, volume in zip(self.tickers, [20.0, np.nan, -10.0])
+        }
+        data_array = tickers_dict_to_data_array(volumes, self.tickers, [PriceField.Volume])
+        data_provider = PresetDataProvider(data_array, dates_index[0], dates_index[-1], Frequency.DAILY)
+
+        slippage_model = PriceBasedSlippage(slippage_rate=0.0, data_provider=data_provider,
+                                            max_volume_share_limit=0.5)
+
+        with patch.object(PresetDataProvider, "get_price") as get_price_mock:
+            actual_fill_prices, actual_fill_volumes = slippage_model.process_orders(str_to_date("2020-01-02"),
+                                                                                    self.orders,
+                                                                                    [20.0, 30.0, 40.0])
+            get_price_mock.assert_not_called()
+
+        # Missing and negative volumes are treated as if nothing was traded on the given day
+        assert_lists_equal([10, 0, 0], list(actual_fill_volumes))
+        assert_lists_equal([20.0, 30.0, 40.0], list(actual_fill_prices))
+
+    def test_volumes_traded_today_taken_from_data_preloaded_in_backtest_trading_session(self):
+        dates_index = pd.bdate_range(str_to_date("2020-01-01"), str_to_date("2020-01-10"))
+        data_array = QFDataArray.create(dates_index, self.tickers, PriceField.ohlcv(),
+                                        data=np.full((len(dates_index), len(self.tickers), 5), 50.0))
+        data_provider = Mock(spec=DataProvider, wraps=PresetDataProvider(data_array, dates_index[0], dates_index[-1],
+                                                                         Frequency.DAILY))
+        data_provider.frequency = Frequency.DAILY
+
+        session_builder = BacktestTradingSessionBuilder(Mock(spec=Settings), Mock(spec=PDFExporter),
+                                                        Mock(spec=ExcelExporter))
+        session_builder.set_data_provider(data_provider)
+        session_builder.set_frequency(Frequency.DAILY)
+        session_builder.set_monitor_settings(BacktestMonitorSettings.no_stats())
+        session_builder.set_slippage_model(PriceBasedSlippage, slippage_rate=0.0, max_volume_share_limit=0.1)
+
+        trading_session = session_builder.build(dates_index[5], dates_index[-1])
+        trading_session.use_data_preloading(self.tickers, RelativeDelta(days=7))
+        data_provider.reset_mock()
+
+        slippage_model = session_builder._slippage_model
+        with patch.object(PresetDataProvider, "get_price") as get_price_mock:
+            actual_fill_prices, actual_fill_volumes = slippage_model.process_orders(str_to_date("2020-01-08"),
+                                                                                    self.orders,
+                                                                                    [20.0, 30.0, 40.0])
+            get_price_mock.assert_not_called()
+        data_provider.get_price.assert_not_called()
+
+        # Volume traded today is equal to 50 for every ticker, thus max volume share is equal to 5
+        assert_lists_equal([5, -5, 1], list(actual_fill_volumes))
+        assert_lists_equal([20.0, 30.0, 40.0], list(actual_fill_prices))
+
+    def test_slippage_implementing_only_orders_based_fill_prices(self):
+        class OrdersBasedSlippage(Slippage):
+            def _get_fill_prices(self, date, orders, no_slippage_fill_prices, fill_volumes):
+                return [price + 1.0 if order.quantity > 0 else price - 1.0
+                        for order, price in zip(orders, no_slippage_fill_prices)]
+
+        slippage_model = OrdersBasedSlippage(data_provider=self.data_provider, max_volume_share_limit=0.1)
+        prices_without_slippage = [20.0, 30.0, 40.0]
+
+        fill_prices, fill_volumes = slippage_model.process_orders(str_to_date("2020-01-01"), self.orders,
+                                                                  prices_without_slippage)
+        assert_lists_equal([21.0, 29.0, 41.0], list(fill_prices))
+        assert_lists_equal([5, -5, 1], list(fill_volumes))
+
+        quantities = np.array([order.quantity for order in self.orders])
+        fill_prices, fill_volumes = slippage_model.calculate_fill_prices_and_volumes(
+            str_to_date("2020-01-01"), self.tickers, quantities, prices_without_slippage)
+        assert_lists_equal([21.0, 29.0, 41.0], list(fill_prices))
+        assert_lists_equal([5, -5, 1], list(fill_volumes))
+
 
 if __name__ == '__main__':
     unittest.main()
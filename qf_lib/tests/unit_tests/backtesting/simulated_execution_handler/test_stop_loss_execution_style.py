@@ -228,6 +228,31 @@ class TestStopLossExecutionStyle(TestCase):
         self.assertEqual(self.monitor.record_transaction.call_count, 3)
         self.assertEqual(self.portfolio.transact_transaction.call_count, 3)
 
+    def test_many_stop_orders_executed_when_stop_prices_hit(self):
+        sell_stop_orders = [Order(self.msft_ticker, quantity=-1, execution_style=StopOrder(stop_price),
+                                  time_in_force=TimeInForce.GTC) for stop_price in range(91, 100)]
+        buy_stop_orders = [Order(self.msft_ticker, quantity=2, execution_style=StopOrder(stop_price),
+                                 time_in_force=TimeInForce.DAY) for stop_price in range(101, 110)]
+        self.exec_handler.assign_order_ids(sell_stop_orders + buy_stop_orders)
+
+        self._set_bar_for_today(open_price=100.0, high_price=105.0, low_price=95.0, close_price=100.0,
+                                volume=100000000.0)
+        self._trigger_single_time_event()
+        self.exec_handler.on_market_close(...)
+
+        expected_open_orders = [self.stop_loss_order_2] + sell_stop_orders[:4]
+        assert_lists_equal(expected_open_orders, self.exec_handler.get_open_orders())
+
+        expected_transactions = [Transaction(self.timer.now(), self.msft_ticker, -1, 95.0, 0)]
+        expected_transactions += [Transaction(self.timer.now(), self.msft_ticker, -1, stop_price, 0)
+                                  for stop_price in range(95, 100)]
+        expected_transactions += [Transaction(self.timer.now(), self.msft_ticker, 2, stop_price, 0)
+                                  for stop_price in range(101, 106)]
+        self.assertCountEqual(expected_transactions,
+                              [args[0] for args, _ in self.monitor.record_transaction.call_args_list])
+        self.assertCountEqual(expected_transactions,
+                              [args[0] for args, _ in self.portfolio.transact_transaction.call_args_list])
+
     def _set_last_available_price(self, price):
         def result(tickers):
             if tickers:
@@ -0,0 +1,69 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.analysis.backtests_overfitting.overfitting_analysis import OverfittingAnalysis
+from qf_lib.analysis.backtests_overfitting.ranking_functions import SharpeRatioRankingFunction, \
+    SorinoRatioRankingFunction, OmegaRatioRankingFunction, TotalReturnRankingFunction
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.returns.cagr import cagr
+from qf_lib.containers.dataframe.simple_returns_dataframe import SimpleReturnsDataFrame
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataframes_equal
+
+
+class TestOverfittingAnalysis(TestCase):
+    def setUp(self):
+        dates = pd.bdate_range(start='2015-01-01', periods=123)
+        returns = np.random.default_rng(3).normal(0.0005, 0.01, (len(dates), 6))
+        self.returns_df = SimpleReturnsDataFrame(data=returns, index=dates, columns=["A", "B", "C", "D", "E", "F"])
+
+    def test_slices_ranking_functions_equal_to_ranking_of_sets(self):
+        ranking_functions = [SharpeRatioRankingFunction(Frequency.DAILY), SorinoRatioRankingFunction(Frequency.DAILY),
+                             OmegaRatioRankingFunction(), TotalReturnRankingFunction()]
+
+        for ranking_function in ranking_functions:
+            # chunks smaller than the number of combinations (20 for 6 slices)
+            analysis = OverfittingAnalysis(self.returns_df, ranking_function, num_of_slices=6,
+                                           combinations_chunk_size=7)
+            # the wrapper is not a SlicesRankingFunction, so the function is called for every set and strategy
+            expected_analysis = OverfittingAnalysis(self.returns_df, lambda series: ranking_function(series),
+                                                    num_of_slices=6)
+
+            self.assertAlmostEqual(expected_analysis.calculate_overfitting_probability(),
+                                   analysis.calculate_overfitting_probability(), places=10)
+            self.assertEqual(expected_analysis.best_is_strategies_names, analysis.best_is_strategies_names)
+            assert_dataframes_equal(expected_analysis.is_qualities, analysis.is_qualities, absolute_tolerance=1e-10)
+            assert_dataframes_equal(expected_analysis.oos_qualities, analysis.oos_qualities, absolute_tolerance=1e-10)
+
+            for expected_ranking, actual_ranking in zip(expected_analysis.oos_ranking, analysis.oos_ranking):
+                self.assertEqual(expected_ranking["rank"].tolist(), actual_ranking["rank"].tolist())
+
+    def test_best_strategies_returns(self):
+        analysis = OverfittingAnalysis(self.returns_df, lambda series: series.mean(), num_of_slices=4)
+        analysis.create_is_oos_rankings()
+
+        expected_returns = [cagr(oos_set[best_strategy], Frequency.DAILY) for oos_set, best_strategy
+                            in zip(analysis._oos_set, analysis.best_is_strategies_names)]
+        np.testing.assert_allclose(analysis._get_best_strategies_returns(), expected_returns, rtol=1e-10)
+
+        expected_pol = np.mean(np.array(expected_returns) < 0)
+        self.assertAlmostEqual(expected_pol, analysis.calculate_probability_of_loss())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.analysis.timeseries_analysis.incremental_timeseries_analysis import IncrementalTimeseriesAnalysis
+from qf_lib.analysis.timeseries_analysis.timeseries_analysis import TimeseriesAnalysis
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
+
+
+class TestIncrementalTimeseriesAnalysis(TestCase):
+    fields = ["total_return", "cagr", "annualised_vol", "annualised_upside_vol", "annualised_downside_vol",
+              "sharpe_ratio", "omega_ratio", "calmar_ratio", "gain_to_pain_ratio", "sorino_ratio", "cvar",
+              "annualised_cvar", "max_drawdown", "avg_drawdown", "avg_drawdown_duration", "best_return",
+              "worst_return", "avg_positive_return", "avg_negative_return", "skewness", "kurtosis", "kelly"]
+
+    def setUp(self):
+        dates = pd.bdate_range(start='2015-01-01', periods=500)
+        returns = np.random.default_rng(5).normal(0.0005, 0.01, len(dates))
+        self.returns_tms = SimpleReturnsSeries(data=returns, index=dates)
+
+    def test_statistics_equal_to_timeseries_analysis(self):
+        incremental_analysis = IncrementalTimeseriesAnalysis(Frequency.DAILY)
+
+        # add the returns one by one and in batches
+        for date, value in self.returns_tms.iloc[:100].items():
+            incremental_analysis.add_return(date, value)
+        incremental_analysis.add_returns(self.returns_tms.iloc[100:300])
+        self._assert_statistics_equal(TimeseriesAnalysis(self.returns_tms.iloc[:300], Frequency.DAILY),
+                                      incremental_analysis)
+
+        incremental_analysis.add_returns(self.returns_tms.iloc[300:])
+        self._assert_statistics_equal(TimeseriesAnalysis(self.returns_tms, Frequency.DAILY), incremental_analysis)
+
+        self.assertEqual(incremental_analysis.number_of_samples, len(self.returns_tms))
+        self.assertEqual(incremental_analysis.start_date, self.returns_tms.index[0])
+        self.assertEqual(incremental_analysis.end_date, self.returns_tms.index[-1])
+
+    def test_returns_not_in_chronological_order(self):
+        incremental_analysis = IncrementalTimeseriesAnalysis(Frequency.DAILY)
+        incremental_analysis.add_returns(self.returns_tms.iloc[10:20])
+
+        with self.assertRaises(ValueError):
+            incremental_analysis.add_return(self.returns_tms.index[0], 0.01)
+
+    def _assert_statistics_equal(self, expected_analysis, actual_analysis):
+        for field in self.fields:
+            self.assertAlmostEqual(getattr(expected_analysis, field), getattr(actual_analysis, field), places=8,
+                                   msg="Values of {} differ".format(field))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -14,11 +14,13 @@
 
 from unittest import TestCase
 
+import numpy as np
 from pandas import date_range
 
 from qf_lib.common.enums.frequency import Frequency
 from qf_lib.common.utils.volatility.get_volatility import get_volatility
 from qf_lib.common.utils.volatility.rolling_volatility import rolling_volatility
+from qf_lib.containers.dataframe.log_returns_dataframe import LogReturnsDataFrame
 from qf_lib.containers.series.log_returns_series import LogReturnsSeries
 from qf_lib.containers.series.qf_series import QFSeries
 from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_series_equal
@@ -44,3 +46,117 @@ class TestVolatilityUtils(TestCase):
         actual_series = rolling_volatility(self.log_returns_tms, annualise=False, window_size=3)
 
         assert_series_equal(expected_series, actual_series)
+
+    def test_rolling_volatility_of_dataframe(self):
+        values = self.log_returns_tms.values
+        returns_df = LogReturnsDataFrame(data={"a": values, "b": values[::-1]}, index=self.log_returns_tms.index)
+        actual_frame = rolling_volatility(returns_df, annualise=False, window_size=3)
+
+        for column_name in returns_df.columns:
+            expected_series = rolling_volatility(LogReturnsSeries(returns_df[column_name]), annualise=False,
+                                                 window_size=3)
+            assert_series_equal(expected_series, actual_frame[column_name], check_names=False)
+
+    def test_rolling_volatility_numerically_stable(self):
+        # large values with a small variance lose precision in the sums of squares
+        values = 1e4 + np.sin(np.arange(50))
+        returns_tms = LogReturnsSeries(data=values, index=date_range('1991-05-14', periods=50, freq='D'))
+
+        actual_series = rolling_volatility(returns_tms, annualise=False, window_size=10, numerically_stable=True)
+        expected_values = [np.std(values[i - 9:i + 1], ddof=1) for i in range(9, 50)]
+
+        np.testing.assert_allclose(actual_series.values, expected_values, rtol=1e-10)
+        assert_series_equal(rolling_volatility(returns_tms, annualise=False, window_size=10), actual_series,
+                            absolute_tolerance=1e-8)
+
+    def test_rolling_volatility_with_min_periods(self):
+        returns_tms = self.log_returns_tms.copy()
+        returns_tms.iloc[4] = np.nan
+
+        actual_series = rolling_volatility(returns_tms, annualise=False, window_size=4, min_periods=2)
+
+        expected_values = [
+            np.nanstd(returns_tms.values[max(0, i - 3):i + 1], ddof=1) for i in range(1, len(returns_tms))
+        ]
+        expected_series = QFSeries(data=expected_values, index=returns_tms.index[1:])
+        assert_series_equal(expected_series, actual_series)
+
+        # windows with less than 3 valid returns are skipped
+        actual_series = rolling_volatility(returns_tms, annualise=False, window_size=3, min_periods=3)
+        self.assertEqual(actual_series.index[0], returns_tms.index[2])
+        self.assertEqual(actual_series.isna().sum(), 3)
+
+    def test_exponentially_weighted_rolling_volatility(self):
+        decay = 0.9
+        actual_series = rolling_volatility(self.log_returns_tms, frequency=Frequency.DAILY, window_size=7,
+                                           min_periods=2, decay=decay)
+
+        expected_series = self.log_returns_tms.ewm(alpha=1 - decay).std()
+        expected_series = expected_series * np.sqrt(Frequency.DAILY.occurrences_in_year)
+        assert_series_equal(QFSeries(expected_series.iloc[1:]), actual_series, absolute_tolerance=1e-10,
+                            check_names=False)
+
+    def test_exponentially_weighted_rolling_volatility_of_windows(self):
+        decay = 0.9
+        returns_tms = self._log_returns_with_missing_values()
+        values = returns_tms.values
+
+        actual_series = rolling_volatility(returns_tms, annualise=False, window_size=5, decay=decay)
+
+        expected_values = [self._weighted_volatility(values[i - 4:i + 1], decay) for i in range(4, len(values))]
+        expected_series = QFSeries(data=expected_values, index=returns_tms.index[4:])
+        assert_series_equal(expected_series, actual_series, absolute_tolerance=1e-12)
+
+    def test_exponentially_weighted_rolling_volatility_with_min_periods(self):
+        decay = 0.9
+        returns_tms = self._log_returns_with_missing_values()
+        values = returns_tms.values
+
+        actual_series = rolling_volatility(returns_tms, annualise=False, window_size=5, min_periods=3, decay=decay)
+
+        expected_values = [
+            self._weighted_volatility(values[max(0, i - 4):i + 1], decay, min_periods=3) for i in range(2, len(values))
+        ]
+        expected_series = QFSeries(data=expected_values, index=returns_tms.index[2:])
+        assert_series_equal(expected_series, actual_series, absolute_tolerance=1e-12)
+
+        # the window ending at the last missing return contains only 2 valid returns
+        self.assertTrue(np.isnan(actual_series.loc[returns_tms.index[14]]))
+
+    def test_rolling_volatility_numerically_stable_with_min_periods(self):
+        returns_tms = self._log_returns_with_missing_values()
+        values = returns_tms.values
+
+        actual_series = rolling_volatility(returns_tms, annualise=False, window_size=5, min_periods=3,
+                                           numerically_stable=True)
+
+        expected_values = [
+            self._weighted_volatility(values[max(0, i - 4):i + 1], 1.0, min_periods=3) for i in range(2, len(values))
+        ]
+        expected_series = QFSeries(data=expected_values, index=returns_tms.index[2:])
+        assert_series_equal(expected_series, actual_series, absolute_tolerance=1e-12)
+        assert_series_equal(rolling_volatility(returns_tms, annualise=False, window_size=5, min_periods=3),
+                            actual_series, absolute_tolerance=1e-12)
+
+        with self.assertRaises(ValueError):
+            rolling_volatility(returns_tms, annualise=False, window_size=5, decay=0.9, numerically_stable=True)
+
+    @staticmethod
+    def _log_returns_with_missing_values() -> LogReturnsSeries:
+        values = np.random.default_rng(1991).normal(0.0, 0.01, 40)
+        values[12:15] = np.nan
+        return LogReturnsSeries(data=values, index=date_range('1991-05-14', periods=40, freq='D'))
+
+    @staticmethod
+    def _weighted_volatility(window: np.ndarray, decay: float, min_periods: int = 2) -> float:
+        """ Unbiased volatility of the window, where the k-th return from the end of the window has weight decay^k. """
+        weights = decay ** np.arange(len(window) - 1, -1, -1)
+        is_valid = ~np.isnan(window)
+        if is_valid.sum() < min_periods:
+            return np.nan
+
+        weights, window = weights[is_valid], window[is_valid]
+        sum_of_weights = np.sum(weights)
+        mean = np.sum(weights * window) / sum_of_weights
+        variance = np.sum(weights * (window - mean) ** 2) / (sum_of_weights - np.sum(weights ** 2) / sum_of_weights)
+        return np.sqrt(variance)
@@ -0,0 +1,125 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+import numpy as np
+from arch.univariate import ConstantMean, Normal, GARCH
+from pandas import bdate_range
+
+from qf_lib.common.utils.volatility.volatility_forecast import VolatilityForecast, forecast_volatilities
+from qf_lib.containers.dataframe.log_returns_dataframe import LogReturnsDataFrame
+from qf_lib.containers.series.log_returns_series import LogReturnsSeries
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_series_equal, assert_dataframes_equal
+
+
+class TestVolatilityForecast(TestCase):
+    window_len = 200
+    multiplier = 100
+
+    def setUp(self):
+        rng = np.random.default_rng(2016)
+        dates = bdate_range('2015-01-01', periods=260)
+        self.returns_df = LogReturnsDataFrame(
+            data={asset: self._garch_returns(rng, len(dates)) for asset in ["A", "B", "C"]}, index=dates)
+        self.returns_tms = LogReturnsSeries(self.returns_df["A"])
+
+    def test_calculate_timeseries_without_warm_start_same_as_rolling_fits(self):
+        vol_forecast = VolatilityForecast(self.returns_tms, GARCH(p=1, q=1), annualise=False)
+        actual_series = vol_forecast.calculate_timeseries(self.window_len, self.multiplier)
+
+        expected_series = self._rolling_fits_forecasts()
+        assert_series_equal(expected_series, actual_series, absolute_tolerance=1e-12)
+        self.assertEqual(vol_forecast.number_of_fits, len(expected_series))
+
+    def test_calculate_timeseries_with_warm_start(self):
+        vol_forecast = VolatilityForecast(self.returns_tms, GARCH(p=1, q=1), annualise=False)
+        actual_series = vol_forecast.calculate_timeseries(self.window_len, self.multiplier, warm_start=True)
+
+        expected_series = self._rolling_fits_forecasts()
+        self.assertTrue(expected_series.index.equals(actual_series.index))
+        np.testing.assert_allclose(actual_series.values, expected_series.values, rtol=1e-3)
+
+    def test_calculate_timeseries_refit_every(self):
+        refit_every = 5
+        vol_forecast = VolatilityForecast(self.returns_tms, GARCH(p=1, q=1), annualise=False)
+        actual_series = vol_forecast.calculate_timeseries(self.window_len, self.multiplier, refit_every=refit_every)
+
+        # The parameters fitted on every 5th window are used to filter the windows in between
+        windows = self._rolling_windows()
+        expected_values = []
+        for i, window in enumerate(windows):
+            if i % refit_every == 0:
+                params = self._arch_model(window).fit(disp='off', show_warning=False).params
+            forecast = self._arch_model(window).forecast(params, horizon=1, method='analytic')
+            expected_values.append(np.sqrt(forecast.variance['h.1'].iloc[-1]) / self.multiplier)
+
+        expected_series = QFSeries(data=expected_values, index=self.returns_tms.index[self.window_len - 1:])
+        assert_series_equal(expected_series, actual_series, absolute_tolerance=1e-12)
+        self.assertEqual(vol_forecast.number_of_fits, int(np.ceil(len(windows) / refit_every)))
+
+        rolling_fits_forecasts = self._rolling_fits_forecasts()
+        assert_series_equal(rolling_fits_forecasts.iloc[::refit_every], actual_series.iloc[::refit_every],
+                            absolute_tolerance=1e-12)
+
+    def test_forecast_volatilities_in_processes_same_as_sequential(self):
+        sequential_forecasts = forecast_volatilities(self.returns_df, GARCH(p=1, q=1), annualise=False)
+        parallel_forecasts = forecast_volatilities(self.returns_df, GARCH(p=1, q=1), annualise=False,
+                                                   number_of_processes=2)
+        assert_series_equal(sequential_forecasts, parallel_forecasts, absolute_tolerance=1e-12)
+
+        for asset in self.returns_df.columns:
+            vol_forecast = VolatilityForecast(self.returns_df[asset], GARCH(p=1, q=1), annualise=False)
+            self.assertAlmostEqual(vol_forecast.calculate_single_forecast(), sequential_forecasts[asset], places=12)
+
+        sequential_forecasts = forecast_volatilities(self.returns_df, GARCH(p=1, q=1), annualise=False,
+                                                     window_len=self.window_len, refit_every=10)
+        parallel_forecasts = forecast_volatilities(self.returns_df, GARCH(p=1, q=1), annualise=False,
+                                                   window_len=self.window_len, number_of_processes=2, refit_every=10)
+        assert_dataframes_equal(sequential_forecasts, parallel_forecasts, absolute_tolerance=1e-12)
+
+    def _rolling_fits_forecasts(self) -> QFSeries:
+        """ Forecasts of the independent fits of all rolling windows (computed as in rolling_window). """
+        forecasts = []
+        for window in self._rolling_windows():
+            result = self._arch_model(window).fit(disp='off', show_warning=False)
+            forecast = result.forecast(horizon=1, method='analytic')
+            forecasts.append(np.sqrt(forecast.variance['h.1'].iloc[-1]) / self.multiplier)
+
+        return QFSeries(data=forecasts, index=self.returns_tms.index[self.window_len - 1:])
+
+    def _rolling_windows(self):
+        returns_tms = self.returns_tms * self.multiplier
+        return [returns_tms.iloc[end - self.window_len:end] for end in range(self.window_len, len(returns_tms) + 1)]
+
+    @staticmethod
+    def _arch_model(returns_tms):
+        am = ConstantMean(returns_tms)
+        am.volatility = GARCH(p=1, q=1)
+        am.distribution = Normal()
+        return am
+
+    @staticmethod
+    def _garch_returns(rng, number_of_returns, omega=2e-6, alpha=0.1, beta=0.85):
+        returns = np.empty(number_of_returns)
+        variance = omega / (1 - alpha - beta)
+        for i in range(number_of_returns):
+            returns[i] = np.sqrt(variance) * rng.standard_normal()
+            variance = omega + alpha * returns[i] ** 2 + beta * variance
+        return returns
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -156,6 +156,21 @@ class TestDataFrames(TestCase):
         assert_dataframes_equal(expected_dataframe, actual_dataframe)
         self.assertEqual({dtype("float64")}, set(actual_dataframe.dtypes))
 
+    def test_exponential_average_with_lambda_per_column(self):
+        lambda_coefficients = [0.94, 0.5, 0.94, 1.0, 0.1]
+        actual_dataframe = self.test_prices_df.exponential_average(lambda_coefficients)
+
+        for column, lambda_coeff in zip(self.column_names, lambda_coefficients):
+            # element by element calculation of the exponential average
+            expected_values = [self.test_prices_df[column].iloc[0]]
+            for value in self.test_prices_df[column].iloc[1:]:
+                expected_values.append(lambda_coeff * value + (1 - lambda_coeff) * expected_values[-1])
+
+            self.assertEqual(expected_values, actual_dataframe[column].tolist())
+            self.assertEqual(expected_values, self.test_prices_df[column].exponential_average(lambda_coeff).tolist())
+
+        self.assertEqual(PricesDataFrame, type(actual_dataframe))
+
     def test_aggregate_by_year(self):
         dates = pd.DatetimeIndex(['2015-06-01', '2015-12-30', '2016-01-01', '2016-05-01'])
         test_dataframe = SimpleReturnsDataFrame(data=self.simple_returns_values, index=dates)
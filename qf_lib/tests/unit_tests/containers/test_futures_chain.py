@@ -139,6 +139,25 @@ class TestFuturesChain(unittest.TestCase):
         difference_between_prices = 138.0 - 30.0  # Close price on the 21st, close price on the 19th
         self._assert_adjustment_difference_is_correct(data_provider, difference_between_prices)
 
+    def test_updated_chain_equal_to_newly_generated_chain(self):
+        """ Prices returned by the chain updated day by day (also on the expiration date) should be equal to the prices
+        of the chain generated at once. The ticker does not have a valid contract before the first roll time, which
+        (with days_before_exp_date = 1) is the expiration date of EXZ1, so the timer starts then. """
+        data_provider = self._mock_data_provider(self.data_array)
+
+        for method in (FuturesAdjustmentMethod.NTH_NEAREST, FuturesAdjustmentMethod.BACK_ADJUSTED):
+            timer = SettableTimer(self.expiration_date)
+            self.future_ticker.initialize_data_provider(timer, data_provider)
+            futures_chain = FuturesChain(self.future_ticker, data_provider, method)
+
+            for date in date_range(self.expiration_date, self.end_date):
+                timer.set_current_time(date)
+                prices = futures_chain.get_price(PriceField.ohlcv(), self.start_date, date)
+
+                new_futures_chain = FuturesChain(self.future_ticker, data_provider, method)
+                expected_prices = new_futures_chain.get_price(PriceField.ohlcv(), self.start_date, date)
+                assert_dataframes_equal(expected_prices, prices, check_names=False)
+
     def _assert_adjustment_is_consistent(self, data_provider: DataProvider):
         """ Computes the adjusted futures chains on the expiration date and at the end date and compares if the
         adjustment is computed in the same way. """
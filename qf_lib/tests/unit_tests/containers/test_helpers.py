@@ -151,6 +151,32 @@ class TestSeries(TestCase):
         expected_data_array = QFDataArray.create(index, [ticker_1], [fields], data)
         assert_equal(data_array, expected_data_array)
 
+    def test_tickers_dict_to_data_array_with_different_dates(self):
+        ticker_1 = BloombergTicker("Example 1")
+        ticker_2 = BloombergTicker("Example 2")
+        ticker_3 = BloombergTicker("Example 3")
+        fields = [PriceField.Open, PriceField.Close]
+
+        prices_df_1 = QFDataFrame(data={PriceField.Close: [1, 2], PriceField.Open: [4, 5]}, index=self.index[1:3])
+        prices_df_2 = QFDataFrame(data={PriceField.Close: [5., 7.]}, index=self.index[[0, 2]])
+        prices_df_3 = QFDataFrame(data={PriceField.Close: [9.]}, index=self.index[[3]])
+
+        data_array = tickers_dict_to_data_array({
+            ticker_1: prices_df_1,
+            ticker_2: prices_df_2,
+            ticker_3: prices_df_3
+        }, [ticker_2, ticker_1], fields)
+
+        self.assertEqual(dtype("float64"), data_array.dtype)
+
+        data = [[[nan, 5.], [nan, nan]],
+                [[nan, nan], [4., 1.]],
+                [[nan, 7.], [5., 2.]],
+                [[nan, nan], [nan, nan]]]
+
+        expected_data_array = QFDataArray.create(self.index[:4], [ticker_2, ticker_1], fields, data)
+        assert_equal(data_array, expected_data_array)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,80 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.utils.ratios.sharpe_ratio import sharpe_ratio
+from qf_lib.common.utils.returns.max_drawdown import max_drawdown
+from qf_lib.common.utils.volatility.get_volatility import get_volatility
+from qf_lib.containers.dataframe.prices_dataframe import PricesDataFrame
+from qf_lib.containers.series.qf_series import QFSeries
+from qf_lib.containers.series.rolling_kernels import total_cumulative_return_kernel, volatility_kernel, \
+    sharpe_ratio_kernel, max_drawdown_kernel, strided_windows
+from qf_lib.containers.series.simple_returns_series import SimpleReturnsSeries
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_series_equal
+
+
+class TestRollingKernels(TestCase):
+    def setUp(self):
+        dates = pd.bdate_range(start='2015-01-01', periods=300)
+        returns = np.random.default_rng(7).normal(0.0005, 0.01, len(dates))
+        self.returns_tms = SimpleReturnsSeries(data=returns, index=dates)
+        self.prices_tms = self.returns_tms.to_prices()
+
+        self.window_size = 60
+        self.step = 7
+
+    def test_strided_windows(self):
+        windows = strided_windows(np.arange(10), window_size=4, step=3)
+        self.assertEqual(windows.tolist(), [[0, 1, 2, 3], [3, 4, 5, 6], [6, 7, 8, 9]])
+        self.assertEqual(strided_windows(np.arange(3), window_size=4).shape, (0, 4))
+
+    def test_kernels_equal_to_functions(self):
+        kernels_and_functions = [
+            (total_cumulative_return_kernel(), lambda window: window.total_cumulative_return()),
+            (volatility_kernel(Frequency.DAILY), lambda window: get_volatility(window, Frequency.DAILY)),
+            (sharpe_ratio_kernel(Frequency.DAILY), lambda window: sharpe_ratio(window, Frequency.DAILY)),
+            (max_drawdown_kernel(), lambda window: max_drawdown(window)),
+        ]
+
+        for series in (self.returns_tms, self.prices_tms):
+            for kernel, function in kernels_and_functions:
+                expected_series = series.rolling_window(self.window_size, function, step=self.step)
+                actual_series = series.rolling_window(self.window_size, kernel, step=self.step)
+                assert_series_equal(expected_series, actual_series, absolute_tolerance=1e-10)
+
+                window = series.iloc[:self.window_size]
+                self.assertAlmostEqual(function(window), kernel(window), places=10)
+
+    def test_kernels_on_dataframe(self):
+        prices_df = PricesDataFrame({"a": self.prices_tms, "b": self.prices_tms * 2})
+        rolling_df = prices_df.rolling_window(self.window_size, total_cumulative_return_kernel(), step=self.step)
+
+        expected_series = self.prices_tms.rolling_window(self.window_size, total_cumulative_return_kernel(),
+                                                         step=self.step)
+        assert_series_equal(expected_series, QFSeries(rolling_df["a"]), check_names=False, absolute_tolerance=1e-10)
+        assert_series_equal(expected_series, QFSeries(rolling_df["b"]), check_names=False, absolute_tolerance=1e-10)
+
+    def test_kernel_applied_to_plain_series(self):
+        with self.assertRaises(ValueError):
+            QFSeries(self.returns_tms.values, self.returns_tms.index).rolling_window(
+                self.window_size, total_cumulative_return_kernel())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -134,3 +134,18 @@ class TestSeries(TestCase):
         benchmark = SimpleReturnsSeries(data=[0.50, 0.01, 0.01], index=benchmark_dates)
         rolling = strategy.rolling_window_with_benchmark(benchmark, 1, lambda x, y: x.mean() + y.mean())
         self.assertEqual(rolling.iloc[0], 0.02)
+
+    def test_rolling_window_with_step(self):
+        rolling = self.test_simple_returns_tms.rolling_window(5, lambda x: x.sum(), step=3)
+        raw_rolling = self.test_simple_returns_tms.rolling_window(5, lambda x: x.sum(), step=3, raw=True)
+
+        expected_dates = self.test_simple_returns_tms.index[[4, 7, 10, 13, 16, 19]]
+        expected_values = [self.test_simple_returns_tms.iloc[end - 4:end + 1].sum() for end in [4, 7, 10, 13, 16, 19]]
+        expected_series = QFSeries(data=expected_values, index=expected_dates)
+
+        assert_series_equal(expected_series, rolling)
+        assert_series_equal(expected_series, raw_rolling)
+
+        # Each window should keep the type of the series
+        rolling_types = self.test_simple_returns_tms.rolling_window(5, lambda x: isinstance(x, SimpleReturnsSeries))
+        self.assertTrue(rolling_types.all())
@@ -0,0 +1,42 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import gzip
+from typing import Sequence
+
+import numpy as np
+from pandas import DatetimeIndex
+
+
+def write_history_response(filepath: str, tickers: Sequence[str], fields: Sequence[str], dates: DatetimeIndex,
+                           values: np.ndarray):
+    """
+    Writes a gzipped BEAP HAPI history response with the given (dates x tickers x fields) values. Missing values
+    (nans) are written as "N.A." and the dates, on which all the values of a ticker are missing, are written
+    as rows without a date. The response is written row by row, so that large responses may be generated.
+    """
+    with gzip.open(filepath, "wt", encoding="utf-8") as file:
+        file.write("START-OF-FILE\nPROGRAMNAME=gethistory\n\nSTART-OF-FIELDS\n")
+        file.write("".join("{}\n".format(field) for field in fields))
+        file.write("END-OF-FIELDS\n\nTIMESTARTED=Mon Jan 01 00:00:00 GMT 2020\nSTART-OF-DATA\n")
+
+        for ticker_index, ticker in enumerate(tickers):
+            for date_index, date in enumerate(dates):
+                row_values = values[date_index, ticker_index]
+                if np.isnan(row_values).all():
+                    cells = [" "] * (len(fields) + 1)
+                else:
+                    cells = [date.strftime("%Y%m%d")] + ["N.A." if np.isnan(v) else repr(float(v)) for v in row_values]
+                file.write("{}|0|{}|EX|{}|\n".format(ticker, len(fields), "|".join(cells)))
+
+        file.write("END-OF-DATA\nTIMEFINISHED=Mon Jan 01 00:00:00 GMT 2020\nEND-OF-FILE\n")
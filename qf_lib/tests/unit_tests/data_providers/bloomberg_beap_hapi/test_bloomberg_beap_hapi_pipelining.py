@@ -0,0 +1,177 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import json
+import os
+import queue
+import tempfile
+import threading
+import unittest
+from datetime import timedelta
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+import numpy as np
+import requests
+from pandas import bdate_range
+
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.bloomberg.exceptions import BloombergError
+from qf_lib.data_providers.bloomberg_beap_hapi.bloomberg_beap_hapi_data_provider import BloombergBeapHapiDataProvider
+from qf_lib.data_providers.bloomberg_beap_hapi.bloomberg_beap_hapi_parser import BloombergBeapHapiParser
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataarrays_equal
+from qf_lib.tests.unit_tests.data_providers.bloomberg_beap_hapi.hapi_response_generator import write_history_response
+
+
+class _Event:
+    def __init__(self, data: str = None):
+        self.data = data
+
+    def is_heartbeat(self):
+        return self.data is None
+
+
+class TestBloombergBeapHapiPipelining(TestCase):
+    """
+    Runs get_history against a local HTTP server, which serves the replies of the requests. The delivery
+    notifications of all the requests are sent only after all the requests were created, in the reverse order.
+    """
+
+    def setUp(self) -> None:
+        self.tickers = [BloombergTicker(f"Example{i} Equity") for i in range(5)]
+        self.fields = ["PX_LAST"]
+        self.dates = bdate_range("2021-01-01", periods=20)
+        self.values = np.random.default_rng(2021).normal(100.0, 1.0, (len(self.dates), len(self.tickers), 1))
+        self.values[:5, 3, :] = np.nan
+
+        self.downloads_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.downloads_dir.cleanup)
+
+        self.replies = {}
+        self.delivered_events = queue.Queue()
+        self.created_events = []
+        self.lock = threading.Lock()
+
+        self._start_server()
+        self._patch_data_provider()
+
+    def _start_server(self):
+        replies = self.replies
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                content = replies.get(self.path)
+                if content is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        self.host = "http://127.0.0.1:{}".format(server.server_address[1])
+
+    def _patch_data_provider(self):
+        number_of_requests = 3  # 5 tickers, 2 tickers per request
+
+        def get_universe_url(universe_id, tickers_str, _):
+            return ",".join(tickers_str)
+
+        def create_request_history(request_id, universe_url, *_):
+            tickers_str = universe_url.split(",")
+            ticker_indices = [[t.as_string() for t in self.tickers].index(t) for t in tickers_str]
+
+            with tempfile.TemporaryDirectory() as directory:
+                filepath = os.path.join(directory, "reply.gz")
+                write_history_response(filepath, tickers_str, self.fields, self.dates,
+                                       self.values[:, ticker_indices, :])
+                with open(filepath, "rb") as file:
+                    self.replies[f"/{request_id}.bbg"] = file.read()
+
+            event = json.dumps({"generated": {
+                "@id": f"{self.host}/{request_id}.bbg",
+                "identifier": f"{request_id}.bbg",
+                "snapshot": {"dataset": {"catalog": {"identifier": "catalog"}}}
+            }})
+
+            with self.lock:
+                self.created_events.append(event)
+                if len(self.created_events) == number_of_requests:
+                    for e in reversed(self.created_events):
+                        self.delivered_events.put(e)
+
+        def read_event():
+            try:
+                return _Event(self.delivered_events.get(timeout=0.05))
+            except queue.Empty:
+                return _Event()
+
+        def __init__(_self, _):
+            _self.fields_hapi_provider = Mock()
+            _self.fields_hapi_provider.get_fields_history_url.return_value = \
+                "fields_url", {"PX_LAST": "Price"}
+            _self.universe_hapi_provider = Mock()
+            _self.universe_hapi_provider.get_universe_url.side_effect = get_universe_url
+            _self.request_hapi_provider = Mock()
+            _self.request_hapi_provider.create_request_history.side_effect = create_request_history
+            _self.parser = BloombergBeapHapiParser()
+            _self.connected = True
+            _self.reply_timeout = timedelta(minutes=1)
+            _self.tickers_per_request = 2
+            _self.max_concurrent_requests = 3
+            _self.logger = Mock()
+            _self.sse_client = Mock()
+            _self.sse_client.read_event.side_effect = read_event
+            _self.session = requests.Session()
+            _self.downloads_path = self.downloads_dir.name
+            _self.catalog_id = "catalog"
+
+        beap_hapi_patcher = patch.object(BloombergBeapHapiDataProvider, '__init__', __init__)
+        beap_hapi_patcher.start()
+        self.addCleanup(beap_hapi_patcher.stop)
+
+        self.data_provider = BloombergBeapHapiDataProvider(Mock())
+        self.addCleanup(self.data_provider.session.close)
+
+    def test_get_history_in_concurrent_requests(self):
+        data_array = self.data_provider.get_history(self.tickers, self.fields, self.dates[0], self.dates[-1])
+
+        self.assertEqual(self.data_provider.request_hapi_provider.create_request_history.call_count, 3)
+        request_ids = [c[0][0] for c in self.data_provider.request_hapi_provider.create_request_history.call_args_list]
+        self.assertEqual(len(set(request_ids)), 3)
+
+        expected_data_array = QFDataArray.create(self.dates, self.tickers, self.fields, self.values)
+        assert_dataarrays_equal(expected_data_array, data_array, check_names=False)
+
+    def test_get_history_with_undelivered_reply(self):
+        self.data_provider.reply_timeout = timedelta(seconds=1)
+        self.data_provider.tickers_per_request = None  # single request, which reply is never delivered
+
+        with self.assertRaises(BloombergError) as context:
+            self.data_provider.get_history(self.tickers, self.fields, self.dates[0], self.dates[-1])
+
+        request_id = self.data_provider.request_hapi_provider.create_request_history.call_args[0][0]
+        self.assertIn(request_id, str(context.exception))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -12,18 +12,24 @@
 #     See the License for the specific language governing permissions and
 #     limitations under the License.
 
+import os
+import tempfile
 import unittest
 from io import BytesIO
 from textwrap import dedent
 from unittest.mock import patch, Mock
 
+import numpy as np
 from numpy import datetime64, datetime_as_string, float64, nan
-from pandas import isna
+from pandas import isna, bdate_range
 from pandas._testing import assert_frame_equal
 
 from qf_lib.containers.dataframe.qf_dataframe import QFDataFrame
 from qf_lib.containers.qf_data_array import QFDataArray
 from qf_lib.data_providers.bloomberg_beap_hapi.bloomberg_beap_hapi_parser import BloombergBeapHapiParser
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataarrays_equal
+from qf_lib.tests.unit_tests.data_providers.bloomberg_beap_hapi.hapi_response_generator import \
+    write_history_response
 
 
 class TestBloombergBeapHapiParser(unittest.TestCase):
@@ -555,6 +561,26 @@ class TestBloombergBeapHapiParser(unittest.TestCase):
         df = parser.get_current_values(Mock(), {"NAME": "String", "PX_LAST": "Price"})
         assert_frame_equal(expected_df, df, check_names=False)
 
+    def test_get_history_in_chunks(self):
+        tickers = ["CTA Comdty", "RTYM1 Index", "SOME SW Equity"]
+        fields = ["PX_LAST", "PX_VOLUME"]
+        dates = bdate_range("2021-01-01", periods=50)
+
+        values = np.random.default_rng(2021).normal(size=(len(dates), len(tickers), len(fields)))
+        values[::7, 0, 1] = nan  # N.A. values
+        values[:10, 1, :] = nan  # rows without data
+        values[:, 2, :] = nan  # ticker without data
+
+        with tempfile.TemporaryDirectory() as directory:
+            filepath = os.path.join(directory, "response.gz")
+            write_history_response(filepath, tickers, fields, dates, values)
+
+            parser = BloombergBeapHapiParser(chunk_size=7)
+            actual_data_array = parser.get_history(filepath, {"PX_LAST": "Price", "PX_VOLUME": "Integer"})
+
+        expected_data_array = QFDataArray.create(dates, tickers, fields, values)
+        assert_dataarrays_equal(expected_data_array, actual_data_array, check_names=False)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,130 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import TestCase
+
+import numpy as np
+import pandas as pd
+from pandas import date_range
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.enums.security_type import SecurityType
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.csv.csv_data_provider import CSVDataProvider
+from qf_lib.data_providers.csv.csv_files_loader import ParsedCSVFile, parsed_files_to_data_array
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataarrays_equal
+from qf_lib.tests.unit_tests.backtesting.portfolio.dummy_ticker import DummyTicker
+
+
+class TestCSVFilesLoader(TestCase):
+
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+        self.path = str(Path(__file__).parent / Path('input_data'))
+        self.tickers = [DummyTicker('BTCBUSD', SecurityType.CRYPTO), DummyTicker('ETHBUSD')]
+        self.fields = ['Open', 'High', 'Low', 'Close', 'Volume']
+        self.field_to_price_field_dict = dict(zip(self.fields, PriceField.ohlcv()))
+        self.start_date = datetime(2021, 1, 1)
+        self.end_date = datetime(2021, 3, 31)
+
+    def tearDown(self):
+        shutil.rmtree(self.snapshot_dir)
+
+    def _create_data_provider(self, **kwargs) -> CSVDataProvider:
+        return CSVDataProvider(self.path, self.tickers, 'Open time', self.field_to_price_field_dict, self.fields,
+                               self.start_date, self.end_date, Frequency.DAILY, **kwargs)
+
+    def test_parallel_loading_with_snapshots_gives_the_same_data(self):
+        expected_prices = self._create_data_provider().get_price(self.tickers, PriceField.ohlcv(), self.start_date,
+                                                                 self.end_date)
+
+        for _ in range(2):  # the second run loads all the files from the snapshots
+            data_provider = self._create_data_provider(number_of_processes=2, snapshot_dir=self.snapshot_dir)
+            prices = data_provider.get_price(self.tickers, PriceField.ohlcv(), self.start_date, self.end_date)
+            assert_dataarrays_equal(expected_prices, prices)
+
+        # both the daily and the skipped intraday files have their snapshots
+        self.assertEqual(len(os.listdir(self.snapshot_dir)), 4)
+
+    def test_loading_file_with_ticker_column_gives_the_same_data(self):
+        expected_prices = self._create_data_provider().get_price(self.tickers, PriceField.ohlcv(), self.start_date,
+                                                                 self.end_date)
+
+        # All the daily files are merged into a single file with rows of both tickers interleaved
+        frames = []
+        for ticker in self.tickers:
+            df = pd.read_csv(Path(self.path) / 'Daily' / '{}.csv'.format(ticker.as_string()), dtype={'Open time': str})
+            df['Ticker'] = ticker.as_string()
+            frames.append(df)
+        merged_df = pd.concat(frames).sort_values('Open time', kind='mergesort')
+        file_path = os.path.join(self.snapshot_dir, 'all_tickers.csv')
+        merged_df.to_csv(file_path, index=False)
+
+        snapshot_dir = os.path.join(self.snapshot_dir, 'snapshots')
+        for _ in range(2):  # the second run loads the file from its snapshot
+            data_provider = CSVDataProvider(file_path, self.tickers, 'Open time', self.field_to_price_field_dict,
+                                            self.fields, self.start_date, self.end_date, Frequency.DAILY,
+                                            ticker_col='Ticker', snapshot_dir=snapshot_dir)
+            prices = data_provider.get_price(self.tickers, PriceField.ohlcv(), self.start_date, self.end_date)
+            assert_dataarrays_equal(expected_prices, prices)
+
+        self.assertEqual(len(os.listdir(snapshot_dir)), 1)
+
+    def test_parsed_files_to_data_array(self):
+        dates = date_range('2021-01-01', periods=4, freq='D').values
+        tickers = [DummyTicker('A'), DummyTicker('B'), DummyTicker('C')]
+        parsed_files = {
+            tickers[0]: ParsedCSVFile(dates[:3], ['Open', 'Close'], np.array([[1.0, 2.0], [3.0, 4.0], [5.0, 6.0]])),
+            tickers[1]: ParsedCSVFile(dates[2:], ['LastPrice'], np.array([[7.0], [8.0]])),
+            tickers[2]: ParsedCSVFile(dates[:0], ['Close'], np.empty((0, 1)))
+        }
+        fields = [PriceField.Open, PriceField.Close]
+        fields_to_columns = {PriceField.Open: ['Open'], PriceField.Close: ['Close', 'LastPrice']}
+
+        data_array = parsed_files_to_data_array(parsed_files, fields, fields_to_columns, start_date=dates[1])
+
+        expected_values = np.full((3, 3, 2), np.nan)
+        expected_values[:2, 0, :] = [[3.0, 4.0], [5.0, 6.0]]
+        expected_values[1:, 1, 1] = [7.0, 8.0]
+        expected_data_array = QFDataArray.create(dates[1:], tickers, fields, expected_values)
+        assert_dataarrays_equal(expected_data_array, data_array)
+
+    def test_parsed_files_keep_source_dtypes(self):
+        dates = date_range('2021-01-01', periods=3, freq='D')
+        df = pd.DataFrame({'Close': [1.5, 2.5, 3.5], 'Volume': [10, 20, 30]})
+        parsed_file = ParsedCSVFile.from_frame(df, dates)
+
+        snapshot_path = os.path.join(self.snapshot_dir, 'parsed_file.npz')
+        parsed_file.save(snapshot_path)
+        loaded_file = ParsedCSVFile.load(snapshot_path)
+
+        ticker = DummyTicker('A')
+        for file in (parsed_file, loaded_file):
+            volumes = parsed_files_to_data_array({ticker: file}, ['Volume'])
+            self.assertEqual(volumes.dtype, np.int64)
+            self.assertEqual(volumes.values[:, 0, 0].tolist(), [10, 20, 30])
+
+            prices = parsed_files_to_data_array({ticker: file}, ['Close', 'Volume'])
+            self.assertEqual(prices.dtype, np.float64)
+
+        # missing values are represented by nans
+        volumes = parsed_files_to_data_array({ticker: parsed_file, DummyTicker('B'): parsed_file.slice(dates[1], None)},
+                                             ['Volume'])
+        self.assertEqual(volumes.dtype, np.float64)
+        self.assertTrue(np.isnan(volumes.values[0, 1, 0]))
@@ -0,0 +1,124 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.columnar_preset_data_provider import ColumnarPresetDataProvider
+from qf_lib.data_providers.preset_data_provider import PresetDataProvider
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_series_equal, \
+    assert_dataframes_equal, assert_dataarrays_equal
+from qf_lib.tests.unit_tests.data_providers import test_preset_data_provider
+
+
+class TestColumnarPresetDataProvider(test_preset_data_provider.TestPresetDataProvider):
+    """ Runs all the PresetDataProvider tests against the ColumnarPresetDataProvider. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.data_provider_daily = ColumnarPresetDataProvider(cls.mock_data_provider(Frequency.DAILY), cls.start_date,
+                                                             cls.end_date, Frequency.DAILY)
+        cls.data_provider_min_1 = ColumnarPresetDataProvider(cls.mock_data_provider(Frequency.MIN_1), cls.start_date,
+                                                             cls.end_date, Frequency.MIN_1)
+        cls.data_provider_min_5 = ColumnarPresetDataProvider(cls.mock_data_provider(Frequency.MIN_5), cls.start_date,
+                                                             cls.end_date, Frequency.MIN_5)
+        cls.preset_data_provider_daily = PresetDataProvider(cls.data_provider_daily.data_bundle, cls.start_date,
+                                                            cls.end_date, Frequency.DAILY)
+        cls.preset_data_provider_min_1 = PresetDataProvider(cls.data_provider_min_1.data_bundle, cls.start_date,
+                                                            cls.end_date, Frequency.MIN_1)
+
+    def test_get_price_same_as_preset_data_provider(self):
+        start_date = datetime(2017, 1, 3, 13, 38)
+        end_date = datetime(2017, 1, 5, 13, 45)
+
+        expected = self.preset_data_provider_min_1.get_price(self.tickers, PriceField.ohlcv(), start_date, end_date,
+                                                             Frequency.MIN_1)
+        actual = self.data_provider_min_1.get_price(self.tickers, PriceField.ohlcv(), start_date, end_date,
+                                                    Frequency.MIN_1)
+        assert_dataarrays_equal(expected, actual)
+
+        expected = self.preset_data_provider_min_1.get_price(self.tickers, PriceField.Close, start_date, end_date,
+                                                             Frequency.MIN_1)
+        actual = self.data_provider_min_1.get_price(self.tickers, PriceField.Close, start_date, end_date,
+                                                    Frequency.MIN_1)
+        assert_dataframes_equal(expected, actual)
+
+        expected = self.preset_data_provider_daily.get_price(self.ticker, PriceField.Close, start_date, end_date)
+        actual = self.data_provider_daily.get_price(self.ticker, PriceField.Close, start_date, end_date)
+        assert_series_equal(expected, actual)
+
+    def test_historical_price_same_as_preset_data_provider(self):
+        end_date = datetime(2017, 1, 9)
+
+        expected = self.preset_data_provider_daily.historical_price(self.tickers, PriceField.ohlcv(), 10, end_date,
+                                                                    Frequency.DAILY)
+        actual = self.data_provider_daily.historical_price(self.tickers, PriceField.ohlcv(), 10, end_date,
+                                                           Frequency.DAILY)
+        assert_dataarrays_equal(expected, actual)
+
+        expected = self.preset_data_provider_daily.historical_price(self.ticker, PriceField.Close, 10, end_date,
+                                                                    Frequency.DAILY)
+        actual = self.data_provider_daily.historical_price(self.ticker, PriceField.Close, 10, end_date,
+                                                           Frequency.DAILY)
+        assert_series_equal(expected, actual)
+
+    def test_get_last_available_price_same_as_preset_data_provider(self):
+        for end_time in (datetime(2017, 1, 3, 15, 21), datetime(2017, 1, 7, 12), datetime(2018, 6, 23, 15, 21)):
+            expected = self.preset_data_provider_min_1.get_last_available_price(self.tickers, Frequency.MIN_1,
+                                                                                end_time)
+            actual = self.data_provider_min_1.get_last_available_price(self.tickers, Frequency.MIN_1, end_time)
+            assert_series_equal(expected, actual, check_names=False)
+
+    def test_get_price_with_missing_values_same_as_preset_data_provider(self):
+        dates = pd.date_range(datetime(2017, 1, 2), periods=5, freq="B")
+        values = np.arange(len(dates) * len(self.tickers) * 5, dtype=np.float64).reshape((len(dates), 2, 5))
+        values[1] = np.nan  # no data for any ticker and field
+        values[2, 0] = np.nan  # no data for one of the tickers
+        values[3, :, 3] = np.nan  # no Close price for any ticker
+        data_array = QFDataArray.create(dates, self.tickers, PriceField.ohlcv(), values)
+
+        preset_data_provider = PresetDataProvider(data_array, dates[0], dates[-1], Frequency.DAILY)
+        columnar_data_provider = ColumnarPresetDataProvider(data_array, dates[0], dates[-1], Frequency.DAILY)
+
+        expected = preset_data_provider.get_price(self.tickers, PriceField.ohlcv(), dates[0], dates[-1])
+        actual = columnar_data_provider.get_price(self.tickers, PriceField.ohlcv(), dates[0], dates[-1])
+        assert_dataarrays_equal(expected, actual)
+        self.assertEqual(actual.dates.to_index().tolist(), dates[[0, 2, 3, 4]].tolist())
+
+        expected = preset_data_provider.get_price(self.tickers, PriceField.Close, dates[0], dates[-1])
+        actual = columnar_data_provider.get_price(self.tickers, PriceField.Close, dates[0], dates[-1])
+        assert_dataframes_equal(expected, actual)
+
+        expected = preset_data_provider.get_price(self.ticker, PriceField.Open, dates[0], dates[-1])
+        actual = columnar_data_provider.get_price(self.ticker, PriceField.Open, dates[0], dates[-1])
+        assert_series_equal(expected, actual)
+
+        expected = preset_data_provider.get_history(self.tickers, PriceField.ohlcv(), dates[0], dates[-1])
+        actual = columnar_data_provider.get_history(self.tickers, PriceField.ohlcv(), dates[0], dates[-1])
+        assert_dataarrays_equal(expected, actual)
+
+    def test_get_price_uncached_ticker(self):
+        with self.assertRaises(ValueError):
+            self.data_provider_daily.historical_price(BloombergTicker("Unknown Equity"), PriceField.Close, 5,
+                                                      datetime(2017, 1, 9), Frequency.DAILY)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.data_bundle_cache import DataBundleCache
+from qf_lib.data_providers.data_provider import DataProvider
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataarrays_equal
+
+
+class TestDataBundleCache(unittest.TestCase):
+    def setUp(self):
+        self.tickers = [BloombergTicker("MSFT US Equity"), BloombergTicker("GOOGL US Equity"),
+                        BloombergTicker("AAPL US Equity")]
+        self.fields = [PriceField.Open, PriceField.Close]
+        self.frequency = Frequency.DAILY
+
+        dates = pd.bdate_range(datetime(2021, 1, 1), datetime(2021, 3, 31))
+        rng = np.random.default_rng(2021)
+        self.all_data = QFDataArray.create(dates, self.tickers, self.fields,
+                                           rng.uniform(10, 20, (len(dates), len(self.tickers), len(self.fields))))
+
+        self.data_provider = Mock(spec=DataProvider)
+        self.data_provider.get_price.side_effect = \
+            lambda tickers, fields, start_date, end_date, frequency: self.all_data.loc[start_date:end_date, tickers,
+                                                                                       fields]
+
+        self.cache_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def _get_price(self, cache, tickers, start_date, end_date):
+        return cache.get_price(self.data_provider, tickers, self.fields, start_date, end_date, self.frequency)
+
+    def test_data_is_downloaded_only_once(self):
+        start_date, end_date = datetime(2021, 1, 4), datetime(2021, 2, 26)
+        expected_data = self.all_data.loc[start_date:end_date, self.tickers[:2], :]
+
+        cache = DataBundleCache(self.cache_dir.name)
+        assert_dataarrays_equal(expected_data, self._get_price(cache, self.tickers[:2], start_date, end_date))
+        self.assertEqual(cache.statistics.misses, 1)
+        self.assertEqual(self.data_provider.get_price.call_count, 1)
+
+        # New instance of the cache should read the data from disk
+        cache = DataBundleCache(self.cache_dir.name)
+        assert_dataarrays_equal(expected_data, self._get_price(cache, self.tickers[:2], start_date, end_date))
+        self.assertEqual(cache.statistics.hits, 1)
+        self.assertEqual(self.data_provider.get_price.call_count, 1)
+
+    def test_only_missing_data_is_downloaded(self):
+        cache = DataBundleCache(self.cache_dir.name)
+        self._get_price(cache, self.tickers[:2], datetime(2021, 1, 4), datetime(2021, 2, 26))
+
+        start_date, end_date = datetime(2021, 1, 4), datetime(2021, 3, 31)
+        actual_data = self._get_price(cache, self.tickers, start_date, end_date)
+        assert_dataarrays_equal(self.all_data.loc[start_date:end_date, :, :], actual_data)
+        self.assertEqual(cache.statistics.partial_hits, 1)
+
+        # The missing tail of the cached tickers and the whole range of the new ticker
+        _, tail_call, new_ticker_call = self.data_provider.get_price.call_args_list
+        self.assertEqual(tail_call[0][0], self.tickers[:2])
+        self.assertEqual(tail_call[0][3], end_date)
+        self.assertEqual(new_ticker_call[0][0], self.tickers[2:])
+        self.assertEqual(new_ticker_call[0][2], start_date)
+
+    def test_invalidate(self):
+        start_date, end_date = datetime(2021, 1, 4), datetime(2021, 2, 26)
+        cache = DataBundleCache(self.cache_dir.name)
+        self._get_price(cache, self.tickers, start_date, end_date)
+
+        cache.invalidate(self.tickers[0])
+        actual_data = self._get_price(cache, self.tickers, start_date, end_date)
+
+        assert_dataarrays_equal(self.all_data.loc[start_date:end_date, :, :], actual_data)
+        self.assertEqual(self.data_provider.get_price.call_count, 2)
+        self.assertEqual(self.data_provider.get_price.call_args[0][0], self.tickers[:1])
+
+
+if __name__ == '__main__':
+    unittest.main()
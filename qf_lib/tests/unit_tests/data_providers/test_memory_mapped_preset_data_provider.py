@@ -0,0 +1,121 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import os
+import tempfile
+import unittest
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from qf_lib.common.enums.frequency import Frequency
+from qf_lib.common.enums.price_field import PriceField
+from qf_lib.common.tickers.tickers import BloombergTicker
+from qf_lib.containers.qf_data_array import QFDataArray
+from qf_lib.data_providers.memory_mapped_preset_data_provider import MemoryMappedPresetDataProvider
+from qf_lib.data_providers.memory_mapped_price_cube import MemoryMappedPriceCube
+from qf_lib.data_providers.price_cube import PriceCube
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataarrays_equal
+from qf_lib.tests.unit_tests.data_providers import test_preset_data_provider
+
+
+class TestMemoryMappedPresetDataProvider(test_preset_data_provider.TestPresetDataProvider):
+    """ Runs all the PresetDataProvider tests against the MemoryMappedPresetDataProvider. """
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.cubes_dir = tempfile.TemporaryDirectory()
+        cls.data_provider_daily = cls._create_data_provider(Frequency.DAILY)
+        cls.data_provider_min_1 = cls._create_data_provider(Frequency.MIN_1)
+        cls.data_provider_min_5 = cls._create_data_provider(Frequency.MIN_5)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.cubes_dir.cleanup()
+
+    @classmethod
+    def _create_data_provider(cls, frequency: Frequency) -> MemoryMappedPresetDataProvider:
+        directory = os.path.join(cls.cubes_dir.name, str(frequency))
+        data_array = cls.mock_data_provider(frequency)
+        MemoryMappedPriceCube.create(directory, [data_array], data_array.tickers.values, data_array.fields.values)
+        return MemoryMappedPresetDataProvider(directory, cls.start_date, cls.end_date, frequency)
+
+    def setUp(self):
+        self.tickers_abc = [BloombergTicker("A Equity"), BloombergTicker("B Equity"), BloombergTicker("C Equity")]
+        self.fields = [PriceField.Open, PriceField.Close, PriceField.Volume]
+        dates = pd.date_range(datetime(2021, 1, 4, 13, 30), periods=50, freq="1min")
+
+        rng = np.random.default_rng(2021)
+        self.data_array = QFDataArray.create(dates, self.tickers_abc, self.fields,
+                                             rng.integers(20, 50, (len(dates), 3, 3)).astype(float))
+        self.data_array.loc[dates[10]:dates[20], self.tickers_abc[0], :] = np.nan
+        self.data_array.loc[dates[30]:, self.tickers_abc[1], PriceField.Close] = np.nan
+        self.data_array.loc[dates[45]:, self.tickers_abc[2], PriceField.Volume] = np.nan
+
+    def _create_cube(self, directory, chunk_size: int = 7, **kwargs) -> MemoryMappedPriceCube:
+        chunks = [self.data_array[i:i + chunk_size] for i in range(0, self.data_array.shape[0], chunk_size)]
+        return MemoryMappedPriceCube.create(directory, chunks, self.tickers_abc, self.fields, **kwargs)
+
+    def test_cube_with_integer_volume_and_float32_prices(self):
+        with tempfile.TemporaryDirectory() as directory:
+            dtypes = {PriceField.Open: np.float32, PriceField.Close: np.float32, PriceField.Volume: np.int64}
+            cube = self._create_cube(directory, dtypes=dtypes)
+            self.assertEqual(os.path.getsize(os.path.join(directory, "field_0.bin")), self.data_array[:, :, 0].size * 4)
+
+            actual_data = cube.get_data_array(slice(None), self.tickers_abc, self.fields, drop_empty_dates=False)
+            assert_dataarrays_equal(self.data_array, actual_data)
+
+    def test_cube_read_in_chunks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cube = self._create_cube(directory)
+            cube.chunk_length = 4
+            expected_cube = PriceCube.from_data_array(self.data_array)
+
+            for date in self.data_array.dates.to_index()[[0, 15, 25, 35, 49]]:
+                expected = expected_cube.get_last_available_values(
+                    self.tickers_abc, self.data_array.dates.to_index()[0], date, PriceField.Open, PriceField.Close)
+                actual = cube.get_last_available_values(
+                    self.tickers_abc, self.data_array.dates.to_index()[0], date, PriceField.Open, PriceField.Close)
+                np.testing.assert_array_equal(expected, actual)
+
+            # The table of the last valid prices is stored on disk and reused
+            reopened_cube = MemoryMappedPriceCube(directory, max_paged_in_dates=5)
+            actual = reopened_cube.get_last_available_values(
+                self.tickers_abc, self.data_array.dates.to_index()[0], self.data_array.dates.to_index()[-1],
+                PriceField.Open, PriceField.Close)
+            np.testing.assert_array_equal(expected, actual)
+
+    def test_released_pages_are_read_again(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self._create_cube(directory)
+            data_provider = MemoryMappedPresetDataProvider(directory, max_paged_in_dates=10)
+            start_date, end_date = self.data_array.dates.to_index()[[0, -1]]
+
+            for _ in range(3):
+                actual_data = data_provider.get_price(self.tickers_abc, self.fields, start_date, end_date,
+                                                      Frequency.MIN_1)
+                assert_dataarrays_equal(self.data_array, actual_data)
+
+    def test_dates_with_values(self):
+        self.data_array.loc[self.data_array.dates.to_index()[[5, 6]], :, :] = np.nan
+        with tempfile.TemporaryDirectory() as directory:
+            cube = self._create_cube(directory, dtypes={PriceField.Volume: np.int64})
+            cube.chunk_length = 4
+
+            expected_dates = self.data_array.dates.to_index().delete([5, 6])
+            self.assertTrue(expected_dates.equals(cube.get_dates_with_values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -95,6 +95,31 @@ class TestPresetDataProvider(unittest.TestCase):
         self.assertEqual(data.shape, (len(self.tickers),))
         self.assertListEqual(list(data.index), self.tickers)
 
+    def test_get_last_available_price_with_missing_prices(self):
+        tickers = [BloombergTicker("A Equity"), BloombergTicker("B Equity"), BloombergTicker("C Equity")]
+        dates = pd.bdate_range(datetime(2021, 1, 4), datetime(2021, 1, 15))
+        data_array = QFDataArray.create(dates, tickers, [PriceField.Open, PriceField.Close])
+        data_array.loc[:, :, PriceField.Open] = np.arange(len(dates) * len(tickers)).reshape(len(dates), len(tickers))
+        data_array.loc[:, :, PriceField.Close] = data_array.loc[:, :, PriceField.Open].values + 0.5
+
+        # Close price is missing for the last bar of A, B disappears after 5th January and C has no Open prices
+        data_array.loc[datetime(2021, 1, 15), tickers[0], PriceField.Close] = np.nan
+        data_array.loc[datetime(2021, 1, 6):, tickers[1], :] = np.nan
+        data_array.loc[:, tickers[2], PriceField.Open] = np.nan
+        data_array.loc[datetime(2021, 1, 14):, tickers[2], PriceField.Close] = np.nan
+
+        data_provider = PresetDataProvider(data_array, dates[0], dates[-1], Frequency.DAILY)
+        prices = data_provider.get_last_available_price(tickers, Frequency.DAILY, datetime(2021, 1, 15))
+
+        self.assertEqual(prices[tickers[0]],
+                         data_array.loc[datetime(2021, 1, 15), tickers[0], PriceField.Open].item())
+        self.assertTrue(math.isnan(prices[tickers[1]]))
+        self.assertEqual(prices[tickers[2]],
+                         data_array.loc[datetime(2021, 1, 13), tickers[2], PriceField.Close].item())
+
+        price = data_provider.get_last_available_price(tickers[1], Frequency.DAILY, datetime(2021, 1, 11))
+        self.assertEqual(price, data_array.loc[datetime(2021, 1, 5), tickers[1], PriceField.Close].item())
+
     def test_get_price_daily(self):
         data = self.data_provider_daily.get_price(self.ticker, PriceField.ohlcv(), datetime(2017, 1, 3),
                                                   datetime(2017, 1, 3), Frequency.DAILY)
@@ -0,0 +1,54 @@
+#     Copyright 2016-present CERN – European Organization for Nuclear Research
+#
+#     Licensed under the Apache License, Version 2.0 (the "License");
+#     you may not use this file except in compliance with the License.
+#     You may obtain a copy of the License at
+#
+#         http://www.apache.org/licenses/LICENSE-2.0
+#
+#     Unless required by applicable law or agreed to in writing, software
+#     distributed under the License is distributed on an "AS IS" BASIS,
+#     WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#     See the License for the specific language governing permissions and
+#     limitations under the License.
+import unittest
+from unittest import TestCase
+
+from arch.univariate import GARCH
+
+from qf_lib.common.utils.volatility.volatility_forecast import VolatilityForecast
+from qf_lib.portfolio_construction.covariance_estimation.robust_covariance import RobustCovariance
+from qf_lib.tests.helpers.testing_tools.containers_comparison import assert_dataframes_equal
+from qf_lib.tests.unit_tests.portfolio_construction.utils import assets_df
+
+
+class TestRobustCovariance(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.assets_df = assets_df.iloc[:, :5]
+
+    def test_calculate_covariance(self):
+        actual_cov_matrix = RobustCovariance(self.assets_df).calculate_covariance(GARCH(p=1, q=1), horizon=1)
+
+        vol_forecasts = [
+            VolatilityForecast(self.assets_df[asset], GARCH(p=1, q=1), annualise=False).calculate_single_forecast()
+            for asset in self.assets_df.columns
+        ]
+        corr_matrix = self.assets_df.corr(method='spearman')
+        expected_cov_matrix = corr_matrix.copy()
+        for i, _ in enumerate(vol_forecasts):
+            for j, _ in enumerate(vol_forecasts):
+                expected_cov_matrix.iloc[i, j] = corr_matrix.iloc[i, j] * vol_forecasts[i] * vol_forecasts[j]
+
+        assert_dataframes_equal(expected_cov_matrix, actual_cov_matrix, absolute_tolerance=1e-14)
+
+    def test_calculate_covariance_in_processes(self):
+        expected_cov_matrix = RobustCovariance(self.assets_df).calculate_covariance(GARCH(p=1, q=1), horizon=1)
+        actual_cov_matrix = RobustCovariance(self.assets_df, number_of_processes=2).calculate_covariance(
+            GARCH(p=1, q=1), horizon=1)
+
+        assert_dataframes_equal(expected_cov_matrix, actual_cov_matrix, absolute_tolerance=1e-14)
+
+
+if __name__ == '__main__':
+    unittest.main()